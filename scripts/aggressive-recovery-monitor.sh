@@ -2,131 +2,36 @@
 
 # Aggressive Recovery Strategy - Monitoring Script
 # Real-time monitoring of recovery progress
-
-echo "=== AGGRESSIVE RECOVERY MONITORING ==="
-echo "Timestamp: $(date)"
-echo "Press Ctrl+C to exit monitoring"
-echo
-
-# Function to get ready count
-get_ready_count() {
-    flux get kustomizations 2>/dev/null | grep -c "True.*Ready" || echo "0"
-}
-
-# Function to check authentication system
-check_auth_system() {
-    kubectl get pods -n authentik-proxy --no-headers 2>/dev/null | grep -c "Running" || echo "0"
-}
-
-# Function to test service accessibility
-test_services() {
-    local success=0
-    local services=("longhorn" "grafana" "prometheus" "alertmanager" "dashboard" "homeassistant")
-
-    for service in "${services[@]}"; do
-        if curl -s -I -k "https://$service.k8s.home.geoffdavis.com" --max-time 5 | grep -q "HTTP"; then
-            ((success++))
-        fi
-    done
-    echo "$success"
-}
-
-# Initial state
-echo "📊 Initial State Assessment:"
-INITIAL_READY=$(get_ready_count)
-INITIAL_AUTH=$(check_auth_system)
-echo "   Ready Kustomizations: $INITIAL_READY/31"
-echo "   Auth System Pods: $INITIAL_AUTH"
-echo
-
-# Monitoring loop
-COUNTER=0
-LAST_READY=$INITIAL_READY
-LAST_AUTH=$INITIAL_AUTH
-
-while true; do
-    ((COUNTER++))
-
-    # Clear previous output (keep header)
-    if [ $COUNTER -gt 1 ]; then
-        tput cuu 15  # Move cursor up 15 lines
-        tput ed      # Clear from cursor to end of screen
-    fi
-
-    echo "🔄 Monitoring Cycle #$COUNTER ($(date +%H:%M:%S))"
-    echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
-
-    # Get current status
-    CURRENT_READY=$(get_ready_count)
-    CURRENT_AUTH=$(check_auth_system)
-
-    # Show progress
-    echo "📈 Progress Tracking:"
-    echo "   Ready Kustomizations: $CURRENT_READY/31"
-    if [ "$CURRENT_READY" -gt "$LAST_READY" ]; then
-        echo "   ✅ IMPROVEMENT: +$(( CURRENT_READY - LAST_READY )) since last check"
-    elif [ "$CURRENT_READY" -lt "$LAST_READY" ]; then
-        echo "   ⚠️  REGRESSION: -$(( LAST_READY - CURRENT_READY )) since last check"
-    else
-        echo "   ➡️  No change since last check"
-    fi
-
-    echo "   Auth System Pods: $CURRENT_AUTH"
-    if [ "$CURRENT_AUTH" -gt "$LAST_AUTH" ]; then
-        echo "   ✅ AUTH IMPROVED: +$(( CURRENT_AUTH - LAST_AUTH )) pods"
-    elif [ "$CURRENT_AUTH" -lt "$LAST_AUTH" ]; then
-        echo "   ⚠️  AUTH REGRESSION: -$(( LAST_AUTH - CURRENT_AUTH )) pods"
-    fi
-
-    # Show failing components
-    echo
-    echo "❌ Failing Components:"
-    FAILING=$(flux get kustomizations 2>/dev/null | grep -v "True.*Ready" | tail -n +2)
-    if [ -z "$FAILING" ]; then
-        echo "   🎉 NO FAILING COMPONENTS!"
-    else
-        echo "$FAILING" | head -5 | sed 's/^/   /'
-        FAILING_COUNT=$(echo "$FAILING" | wc -l)
-        if [ "$FAILING_COUNT" -gt 5 ]; then
-            echo "   ... and $(( FAILING_COUNT - 5 )) more"
-        fi
-    fi
-
-    # Test services periodically (every 5th cycle)
-    if [ $(( COUNTER % 5 )) -eq 0 ]; then
-        echo
-        echo "🌐 Service Accessibility Test:"
-        SERVICE_COUNT=$(test_services)
-        echo "   Accessible Services: $SERVICE_COUNT/6"
-        if [ "$SERVICE_COUNT" -eq 6 ]; then
-            echo "   ✅ All services accessible"
-        elif [ "$SERVICE_COUNT" -gt 3 ]; then
-            echo "   ⚠️  Some services accessible"
-        else
-            echo "   ❌ Most services not accessible"
-        fi
-    fi
-
-    # Success check
-    if [ "$CURRENT_READY" -eq 31 ] && [ "$CURRENT_AUTH" -gt 0 ]; then
-        echo
-        echo "🎉 SUCCESS DETECTED!"
-        echo "   ✅ All 31 Kustomizations Ready"
-        echo "   ✅ Authentication system operational"
-        echo
-        echo "Run './validate-recovery-success.sh' for full validation"
-        break
-    fi
-
-    # Update tracking variables
-    LAST_READY=$CURRENT_READY
-    LAST_AUTH=$CURRENT_AUTH
-
-    # Wait before next check
-    sleep 10
+#
+# Follows Kustomizations, HelmReleases, Pods and Nodes through Kubernetes watch
+# streams (scripts/recovery_monitor.py) and prints each readiness change as it
+# happens. Exits once everything is Ready. The transition log can be replayed
+# later with: python3 scripts/recovery_monitor.py --replay <log>
+
+set -e
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+PROXY_PORT="${RECOVERY_MONITOR_PROXY_PORT:-8011}"
+LOG_FILE="${RECOVERY_MONITOR_LOG:-recovery-transitions-$(date +%Y%m%d-%H%M%S).jsonl}"
+
+kubectl proxy --port="$PROXY_PORT" >/dev/null 2>&1 &
+PROXY_PID=$!
+trap 'kill $PROXY_PID 2>/dev/null' EXIT
+
+# Wait for the API proxy to accept connections
+for _ in $(seq 1 50); do
+    curl -s -o /dev/null "http://127.0.0.1:$PROXY_PORT/version" && break
+    sleep 0.1
 done
 
-echo
-echo "=== MONITORING COMPLETE ==="
-echo "Final Status: $CURRENT_READY/31 Ready, $CURRENT_AUTH Auth Pods"
-echo "Duration: $(( COUNTER * 10 )) seconds"
+echo "Transition log: $LOG_FILE"
+STATUS=0
+python3 "$SCRIPT_DIR/recovery_monitor.py" \
+    --api-server "http://127.0.0.1:$PROXY_PORT" \
+    --log "$LOG_FILE" \
+    --until-recovered "$@" || STATUS=$?
+
+if [ "$STATUS" -eq 0 ]; then
+    echo "Run './validate-recovery-success.sh' for full validation"
+fi
+exit "$STATUS"
@@ -6,6 +6,7 @@ This script configures proxy providers and applications in Authentik for externa
 It replaces the complex bash script with proper error handling, logging, and testability.
 """
 
+import argparse
 import json
 import logging
 import os
@@ -18,23 +19,7 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Dict, List, Optional, Tuple
 
-
-@dataclass
-class ServiceConfig:
-    """Configuration for a service to be proxied."""
-
-    name: str
-    external_host: str
-    internal_host: str
-    internal_port: int
-
-    @property
-    def external_url(self) -> str:
-        return f"https://{self.external_host}"
-
-    @property
-    def internal_url(self) -> str:
-        return f"http://{self.internal_host}:{self.internal_port}"
+from service_catalog import ServiceCatalog, ServiceConfig, load_catalog
 
 
 @dataclass
@@ -65,7 +50,10 @@ class AuthentikProxyConfigurator:
     """Main class for configuring Authentik proxy providers and applications."""
 
     def __init__(
-        self, config: AuthentikConfig, logger: Optional[logging.Logger] = None
+        self,
+        config: AuthentikConfig,
+        logger: Optional[logging.Logger] = None,
+        catalog: Optional[ServiceCatalog] = None,
     ):
         self.config = config
         self.logger = logger or self._setup_logger()
@@ -75,42 +63,9 @@ class AuthentikProxyConfigurator:
             "User-Agent": "authentik-proxy-configurator/1.0.0",
         }
 
-        # Service configurations
-        self.services = [
-            ServiceConfig(
-                "longhorn",
-                "longhorn.k8s.home.geoffdavis.com",
-                "longhorn-frontend.longhorn-system",
-                80,
-            ),
-            ServiceConfig(
-                "grafana",
-                "grafana.k8s.home.geoffdavis.com",
-                "kube-prometheus-stack-grafana.monitoring",
-                80,
-            ),
-            ServiceConfig(
-                "prometheus",
-                "prometheus.k8s.home.geoffdavis.com",
-                "kube-prometheus-stack-prometheus.monitoring",
-                9090,
-            ),
-            ServiceConfig(
-                "alertmanager",
-                "alertmanager.k8s.home.geoffdavis.com",
-                "kube-prometheus-stack-alertmanager.monitoring",
-                9093,
-            ),
-            ServiceConfig(
-                "dashboard",
-                "dashboard.k8s.home.geoffdavis.com",
-                "kubernetes-dashboard-kong-proxy.kubernetes-dashboard",
-                443,
-            ),
-            ServiceConfig(
-                "hubble", "hubble.k8s.home.geoffdavis.com", "hubble-ui.kube-system", 80
-            ),
-        ]
+        # Service configurations from the shared service catalog
+        self.catalog = catalog or load_catalog()
+        self.services = self.catalog.services
 
     def _setup_logger(self) -> logging.Logger:
         """Set up logging configuration."""
@@ -195,6 +150,27 @@ class AuthentikProxyConfigurator:
                 else:
                     raise AuthentikAPIError(f"API request failed: {str(e)}")
 
+    def list_all(self, path: str, page_size: int = 100) -> List[Dict]:
+        """Fetch every object from a paginated Authentik list endpoint."""
+        results = []
+        page = 1
+        separator = "&" if "?" in path else "?"
+
+        while page:
+            url = (
+                f"{self.config.host}{path}{separator}page={page}&page_size={page_size}"
+            )
+            status_code, response = self._make_api_request(url)
+            if status_code != 200:
+                raise AuthentikAPIError(
+                    f"Failed to list {path}", status_code=status_code
+                )
+
+            results.extend(response.get("results", []))
+            page = response.get("pagination", {}).get("next", 0)
+
+        return results
+
     def test_authentication(self) -> bool:
         """Test API authentication."""
         try:
@@ -263,26 +239,30 @@ class AuthentikProxyConfigurator:
             self.logger.error(f"✗ Failed to fetch proxy providers: {e}")
             return {}
 
+    def build_provider_data(self, service: ServiceConfig, auth_flow_uuid: str) -> Dict:
+        """Build the desired proxy provider payload for a service."""
+        return {
+            "name": service.provider_name,
+            "authorization_flow": auth_flow_uuid,
+            "external_host": service.external_url,
+            "internal_host": service.internal_url,
+            "internal_host_ssl_validation": False,
+            "mode": "proxy",
+            "cookie_domain": "k8s.home.geoffdavis.com",
+            "skip_path_regex": "^/api/.*$",
+            "basic_auth_enabled": False,
+        }
+
     def create_proxy_provider(
         self, service: ServiceConfig, auth_flow_uuid: str
     ) -> Optional[int]:
         """Create a proxy provider for a service."""
-        provider_name = f"{service.name}-proxy"
+        provider_name = service.provider_name
 
         try:
             self.logger.info(f"Creating proxy provider: {provider_name}")
 
-            provider_data = {
-                "name": provider_name,
-                "authorization_flow": auth_flow_uuid,
-                "external_host": service.external_url,
-                "internal_host": service.internal_url,
-                "internal_host_ssl_validation": False,
-                "mode": "proxy",
-                "cookie_domain": "k8s.home.geoffdavis.com",
-                "skip_path_regex": "^/api/.*$",
-                "basic_auth_enabled": False,
-            }
+            provider_data = self.build_provider_data(service, auth_flow_uuid)
 
             url = f"{self.config.host}/api/v3/providers/proxy/"
             status_code, response = self._make_api_request(
@@ -309,24 +289,14 @@ class AuthentikProxyConfigurator:
         self, provider_pk: int, service: ServiceConfig, auth_flow_uuid: str
     ) -> bool:
         """Update an existing proxy provider to ensure it's in proxy mode."""
-        provider_name = f"{service.name}-proxy"
+        provider_name = service.provider_name
 
         try:
             self.logger.info(
                 f"Updating proxy provider: {provider_name} (PK: {provider_pk})"
             )
 
-            provider_data = {
-                "name": provider_name,
-                "authorization_flow": auth_flow_uuid,
-                "external_host": service.external_url,
-                "internal_host": service.internal_url,
-                "internal_host_ssl_validation": False,
-                "mode": "proxy",
-                "cookie_domain": "k8s.home.geoffdavis.com",
-                "skip_path_regex": "^/api/.*$",
-                "basic_auth_enabled": False,
-            }
+            provider_data = self.build_provider_data(service, auth_flow_uuid)
 
             url = f"{self.config.host}/api/v3/providers/proxy/{provider_pk}/"
             status_code, response = self._make_api_request(
@@ -677,7 +647,7 @@ class AuthentikProxyConfigurator:
             self.logger.error(f"✗ Failed to update outpost: {e}")
             return False
 
-    def configure_all_services(self) -> bool:
+    def configure_all_services(self, outpost_name: Optional[str] = None) -> bool:
         """Configure proxy providers and applications for all services."""
         self.logger.info("=== Starting Authentik Proxy Configuration ===")
 
@@ -706,7 +676,7 @@ class AuthentikProxyConfigurator:
         for service in self.services:
             self.logger.info(f"=== Configuring {service.name} ===")
 
-            provider_name = f"{service.name}-proxy"
+            provider_name = service.provider_name
             provider_pk = None
 
             # Check if provider exists
@@ -741,7 +711,9 @@ class AuthentikProxyConfigurator:
 
         # Step 3: Get or create external outpost
         self.logger.info("=== Step 3: Configuring External Outpost ===")
-        outpost_name = os.environ.get("OUTPOST_NAME", "k8s-external-proxy-outpost")
+        outpost_name = outpost_name or os.environ.get(
+            "OUTPOST_NAME", "k8s-external-proxy-outpost"
+        )
         outpost_id = self.get_or_create_outpost(outpost_name)
 
         if not outpost_id:
@@ -781,8 +753,35 @@ class AuthentikProxyConfigurator:
             return False
 
 
-def main():
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Configure Authentik proxy providers for the external outpost"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Run as a long-lived controller that reconciles drift incrementally",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=float(os.environ.get("RECONCILE_INTERVAL", "30")),
+        help="Seconds between reconcile passes in --watch mode (default: 30)",
+    )
+    parser.add_argument(
+        "--health-port",
+        type=int,
+        default=int(os.environ.get("HEALTH_PORT", "8080")),
+        help="Port for /healthz, /readyz and /metrics in --watch mode",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
     """Main entry point for the script."""
+    args = parse_args(argv)
+
     # Get configuration from environment variables
     authentik_host = os.environ.get("AUTHENTIK_HOST")
     authentik_token = os.environ.get("AUTHENTIK_TOKEN")
@@ -792,6 +791,7 @@ def main():
         print("  - AUTHENTIK_HOST")
         print("  - AUTHENTIK_TOKEN")
         sys.exit(1)
+        return
 
     # Create configuration (outpost_id will be determined dynamically)
     config = AuthentikConfig(
@@ -803,6 +803,15 @@ def main():
     # Create configurator and run
     configurator = AuthentikProxyConfigurator(config)
 
+    if args.watch:
+        from proxy_controller import run_controller
+
+        outpost_name = os.environ.get("OUTPOST_NAME", "k8s-external-proxy-outpost")
+        sys.exit(
+            run_controller(configurator, args.interval, args.health_port, outpost_name)
+        )
+        return
+
     try:
         success = configurator.configure_all_services()
         sys.exit(0 if success else 1)
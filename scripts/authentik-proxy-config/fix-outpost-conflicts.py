@@ -20,26 +20,9 @@ import sys
 import urllib.error
 import urllib.parse
 import urllib.request
-from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 
-
-@dataclass
-class ServiceConfig:
-    """Configuration for a service to be proxied."""
-
-    name: str
-    external_host: str
-    internal_host: str
-    internal_port: int
-
-    @property
-    def external_url(self) -> str:
-        return f"https://{self.external_host}"
-
-    @property
-    def internal_url(self) -> str:
-        return f"http://{self.internal_host}:{self.internal_port}"
+from service_catalog import ServiceConfig, load_catalog
 
 
 class AuthentikAPIError(Exception):
@@ -80,48 +63,12 @@ class OutpostConflictResolver:
             handler.setFormatter(formatter)
             self.logger.addHandler(handler)
 
-        # Service configurations with CORRECTED Grafana service name
-        self.services = [
-            ServiceConfig(
-                "longhorn",
-                "longhorn.k8s.home.geoffdavis.com",
-                "longhorn-frontend.longhorn-system.svc.cluster.local",
-                80,
-            ),
-            ServiceConfig(
-                "grafana",
-                "grafana.k8s.home.geoffdavis.com",
-                "kube-prometheus-stack-grafana.monitoring.svc.cluster.local",
-                80,
-            ),
-            ServiceConfig(
-                "prometheus",
-                "prometheus.k8s.home.geoffdavis.com",
-                "kube-prometheus-stack-prometheus.monitoring.svc.cluster.local",
-                9090,
-            ),
-            ServiceConfig(
-                "alertmanager",
-                "alertmanager.k8s.home.geoffdavis.com",
-                "kube-prometheus-stack-alertmanager.monitoring.svc.cluster.local",
-                9093,
-            ),
-            ServiceConfig(
-                "dashboard",
-                "dashboard.k8s.home.geoffdavis.com",
-                "kubernetes-dashboard-kong-proxy.kubernetes-dashboard.svc.cluster.local",
-                443,
-            ),
-            ServiceConfig(
-                "hubble",
-                "hubble.k8s.home.geoffdavis.com",
-                "hubble-ui.kube-system.svc.cluster.local",
-                80,
-            ),
-        ]
+        # Service configurations from the shared service catalog
+        self.catalog = load_catalog()
+        self.services = self.catalog.services
 
         # Expected proxy provider names
-        self.expected_providers = [f"{service.name}-proxy" for service in self.services]
+        self.expected_providers = self.catalog.provider_names
 
     def _make_api_request(
         self, url: str, method: str = "GET", data: Optional[Dict] = None
@@ -275,11 +222,11 @@ class OutpostConflictResolver:
         """Update a proxy provider with correct external URL and service configuration."""
         try:
             self.logger.info(
-                f"Updating proxy provider {service.name}-proxy (PK: {provider_pk})"
+                f"Updating proxy provider {service.provider_name} (PK: {provider_pk})"
             )
 
             provider_data = {
-                "name": f"{service.name}-proxy",
+                "name": service.provider_name,
                 "authorization_flow": auth_flow_uuid,
                 "external_host": service.external_url,  # FIXED: Use external URL
                 "internal_host": service.internal_url,  # FIXED: Use correct service name
@@ -296,19 +243,19 @@ class OutpostConflictResolver:
             )
 
             if status_code == 200:
-                self.logger.info(f"✓ Updated proxy provider {service.name}-proxy")
+                self.logger.info(f"✓ Updated proxy provider {service.provider_name}")
                 self.logger.info(f"  External URL: {service.external_url}")
                 self.logger.info(f"  Internal URL: {service.internal_url}")
                 return True
             else:
                 self.logger.error(
-                    f"✗ Failed to update proxy provider {service.name}-proxy: status {status_code}"
+                    f"✗ Failed to update proxy provider {service.provider_name}: status {status_code}"
                 )
                 return False
 
         except AuthentikAPIError as e:
             self.logger.error(
-                f"✗ Failed to update proxy provider {service.name}-proxy: {e}"
+                f"✗ Failed to update proxy provider {service.provider_name}: {e}"
             )
             return False
 
@@ -423,7 +370,7 @@ class OutpostConflictResolver:
         expected_provider_pks = []
 
         for service in self.services:
-            provider_name = f"{service.name}-proxy"
+            provider_name = service.provider_name
             if provider_name in proxy_providers:
                 provider_data = proxy_providers[provider_name]
                 provider_pk = provider_data["pk"]
@@ -19,6 +19,8 @@ import urllib.parse
 import urllib.request
 from typing import Dict, List, Optional, Tuple
 
+from service_catalog import load_catalog
+
 
 class AuthentikAPIError(Exception):
     """Custom exception for Authentik API errors."""
@@ -58,15 +60,8 @@ class OutpostAssignmentFixer:
             handler.setFormatter(formatter)
             self.logger.addHandler(handler)
 
-        # Expected proxy provider names
-        self.expected_providers = [
-            "longhorn-proxy",
-            "grafana-proxy",
-            "prometheus-proxy",
-            "alertmanager-proxy",
-            "dashboard-proxy",
-            "hubble-proxy",
-        ]
+        # Expected proxy provider names from the shared service catalog
+        self.expected_providers = load_catalog().provider_names
 
     def _make_api_request(
         self, url: str, method: str = "GET", data: Optional[Dict] = None
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Authentik Proxy Fleet Reconciler
+
+Reconciles several clusters, each with its own Authentik instance, in one run.
+Every target is configured by its own AuthentikProxyConfigurator in a separate
+worker process (or thread), so a fleet-wide rollout takes as long as the
+slowest cluster rather than the sum of all of them. A failing or hung target is
+recorded in the report and never blocks the others: with --timeout, a target
+still running that many seconds after it started is stopped (its process is
+terminated; a thread is abandoned) and reported as timed out, while targets
+queued behind it still get their full time.
+
+Targets are read from a JSON file:
+
+    {
+      "targets": [
+        {
+          "name": "home-ops",
+          "host": "https://authentik.k8s.home.geoffdavis.com",
+          "token_env": "AUTHENTIK_TOKEN_HOME_OPS",
+          "outpost_name": "k8s-external-proxy-outpost",
+          "catalog": "infrastructure/authentik-proxy/service-catalog.json"
+        }
+      ]
+    }
+
+Tokens are never stored in the targets file; token_env names the environment
+variable holding each target's API token.
+Per-target logs go to stderr, so --json output on stdout stays parseable.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+from configure_proxy import AuthentikConfig, AuthentikProxyConfigurator
+from service_catalog import load_catalog
+
+# How often running targets are checked for completion and timeouts
+POLL_INTERVAL = 0.05
+
+
+@dataclass
+class FleetTarget:
+    """One cluster's Authentik instance to reconcile."""
+
+    name: str
+    config: AuthentikConfig
+    outpost_name: str = "k8s-external-proxy-outpost"
+    catalog_path: Optional[str] = None
+
+
+@dataclass
+class TargetResult:
+    """Outcome of reconciling a single target."""
+
+    name: str
+    success: bool
+    duration_seconds: float = 0.0
+    error: Optional[str] = None
+    timed_out: bool = False
+
+
+@dataclass
+class FleetReport:
+    """Aggregated per-target results and timings for a fleet run."""
+
+    results: List[TargetResult] = field(default_factory=list)
+    wall_seconds: float = 0.0
+
+    @property
+    def success(self) -> bool:
+        return bool(self.results) and all(r.success for r in self.results)
+
+    @property
+    def failed(self) -> List[str]:
+        return [r.name for r in self.results if not r.success]
+
+    @property
+    def timed_out(self) -> List[str]:
+        return [r.name for r in self.results if r.timed_out]
+
+    @property
+    def serial_seconds(self) -> float:
+        """Time the same targets would have taken one after another."""
+        return sum(r.duration_seconds for r in self.results)
+
+    def to_dict(self) -> Dict:
+        return {
+            "success": self.success,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "serial_seconds": round(self.serial_seconds, 3),
+            "failed": self.failed,
+            "targets": [asdict(r) for r in self.results],
+        }
+
+
+class FleetConfigError(Exception):
+    """Raised when the fleet targets file is missing or malformed."""
+
+
+def load_targets(path: str) -> List[FleetTarget]:
+    """Load fleet targets from a JSON file, resolving tokens from the environment."""
+    try:
+        with open(path, "r") as f:
+            document = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise FleetConfigError(f"Cannot read fleet targets {path}: {e}")
+
+    entries = document.get("targets") if isinstance(document, dict) else None
+    if not isinstance(entries, list) or not entries:
+        raise FleetConfigError(f"{path}: 'targets' must be a non-empty list")
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    targets = []
+    seen = set()
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            raise FleetConfigError(f"{path}: targets[{index}] must be an object")
+        name = entry.get("name")
+        host = entry.get("host")
+        token_env = entry.get("token_env")
+        if not all(isinstance(v, str) and v for v in (name, host, token_env)):
+            raise FleetConfigError(
+                f"{path}: targets[{index}] needs 'name', 'host' and 'token_env'"
+            )
+        if name in seen:
+            raise FleetConfigError(f"{path}: duplicate target name '{name}'")
+        seen.add(name)
+
+        catalog_path = entry.get("catalog")
+        if catalog_path and not os.path.isabs(catalog_path):
+            catalog_path = os.path.join(base_dir, catalog_path)
+
+        targets.append(
+            FleetTarget(
+                name=name,
+                config=AuthentikConfig(
+                    host=host.rstrip("/"),
+                    token=os.environ.get(token_env, ""),
+                    outpost_id=entry.get("outpost_id", ""),
+                ),
+                outpost_name=entry.get("outpost_name", "k8s-external-proxy-outpost"),
+                catalog_path=catalog_path,
+            )
+        )
+
+    return targets
+
+
+def _target_logger(name: str) -> logging.Logger:
+    logger = logging.getLogger(f"authentik-proxy-configurator.{name}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        formatter = logging.Formatter(
+            f"%(asctime)s - [{name}] - %(levelname)s - %(message)s"
+        )
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+
+    return logger
+
+
+def reconcile_target(target: FleetTarget) -> TargetResult:
+    """Reconcile one target; runs inside a worker and never raises."""
+    started = time.monotonic()
+
+    try:
+        if not target.config.token:
+            raise ValueError("no API token in the configured token_env variable")
+
+        configurator = AuthentikProxyConfigurator(
+            target.config,
+            logger=_target_logger(target.name),
+            catalog=load_catalog(target.catalog_path),
+        )
+        success = configurator.configure_all_services(outpost_name=target.outpost_name)
+        error = None if success else "configuration reported failure"
+    except Exception as e:
+        success = False
+        error = f"{type(e).__name__}: {e}"
+
+    return TargetResult(
+        name=target.name,
+        success=success,
+        duration_seconds=time.monotonic() - started,
+        error=error,
+    )
+
+
+class FleetReconciler:
+    """Reconcile many Authentik targets concurrently and aggregate the results."""
+
+    def __init__(
+        self,
+        targets: List[FleetTarget],
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        use_processes: bool = True,
+    ):
+        self.targets = targets
+        self.max_workers = max_workers or min(len(targets), 32) or 1
+        self.timeout = timeout
+        self.use_processes = use_processes
+
+    def run(self) -> FleetReport:
+        """Reconcile every target and return the aggregated report."""
+        started = time.monotonic()
+        pending = list(self.targets)
+        running: List[_Worker] = []
+        results: Dict[str, TargetResult] = {}
+
+        try:
+            while pending or running:
+                while pending and len(running) < self.max_workers:
+                    running.append(_Worker(pending.pop(0), self.use_processes))
+                time.sleep(POLL_INTERVAL)
+                for worker in list(running):
+                    if worker.poll():
+                        results[worker.target.name] = worker.result
+                    elif (
+                        self.timeout is not None
+                        and time.monotonic() - worker.started >= self.timeout
+                    ):
+                        worker.stop()
+                        results[worker.target.name] = TargetResult(
+                            name=worker.target.name,
+                            success=False,
+                            duration_seconds=self.timeout,
+                            error=f"timed out after {self.timeout}s",
+                            timed_out=True,
+                        )
+                    else:
+                        continue
+                    running.remove(worker)
+        finally:
+            for worker in running:
+                worker.stop()
+
+        return FleetReport(
+            results=[results[t.name] for t in self.targets],
+            wall_seconds=time.monotonic() - started,
+        )
+
+
+def _reconcile_into(target: FleetTarget, connection):
+    """Worker process body: send the target's result back to the parent."""
+    connection.send(reconcile_target(target))
+    connection.close()
+
+
+class _Worker:
+    """One target running in its own daemon process or thread.
+
+    Processes can be terminated once a target times out; threads cannot, so a
+    timed-out thread is left behind, and being a daemon it does not hold the
+    interpreter at exit.
+    """
+
+    def __init__(self, target: FleetTarget, use_process: bool):
+        self.target = target
+        self.result: Optional[TargetResult] = None
+        self.started = time.monotonic()
+        self._connection = None
+        if use_process:
+            self._connection, sender = multiprocessing.Pipe(duplex=False)
+            self._runner = multiprocessing.Process(
+                target=_reconcile_into,
+                args=(target, sender),
+                name=f"fleet-{target.name}",
+                daemon=True,
+            )
+            self._runner.start()
+            # Only the child writes; closing our end lets a crash read as EOF
+            sender.close()
+        else:
+            self._runner = threading.Thread(
+                target=self._run_in_thread, name=f"fleet-{target.name}", daemon=True
+            )
+            self._runner.start()
+
+    def _run_in_thread(self):
+        self.result = reconcile_target(self.target)
+
+    def poll(self) -> bool:
+        """Whether the target has finished; its result is then set."""
+        if self.result is not None or self._connection is None:
+            return self.result is not None
+        if not self._connection.poll():
+            return False
+        try:
+            self.result = self._connection.recv()
+        except EOFError:
+            # The worker process died before sending a result
+            self._runner.join()
+            self.result = TargetResult(
+                name=self.target.name,
+                success=False,
+                duration_seconds=time.monotonic() - self.started,
+                error=f"worker exited with code {self._runner.exitcode}",
+            )
+        self._connection.close()
+        self._runner.join()
+        return True
+
+    def stop(self):
+        """Stop a worker process still running a target."""
+        if self._connection is None:
+            return
+        self._runner.terminate()
+        self._runner.join(timeout=5)
+        if self._runner.is_alive():
+            self._runner.kill()
+            self._runner.join()
+        self._connection.close()
+
+
+def print_report(report: FleetReport):
+    """Print a human-readable summary of a fleet run."""
+    print("=== Fleet Reconcile Report ===")
+    for result in report.results:
+        mark = "✓" if result.success else "✗"
+        line = f"{mark} {result.name:<24} {result.duration_seconds:8.2f}s"
+        if result.error:
+            line += f"  {result.error}"
+        print(line)
+    print(
+        f"Wall time {report.wall_seconds:.2f}s "
+        f"(serial would be {report.serial_seconds:.2f}s), "
+        f"{len(report.failed)}/{len(report.results)} failed"
+    )
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description="Reconcile Authentik proxy configuration across clusters"
+    )
+    parser.add_argument("targets", help="JSON file listing the Authentik targets")
+    parser.add_argument("--max-workers", type=int, default=None)
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="Seconds each target may run before it is stopped and reported "
+        "as timed out",
+    )
+    parser.add_argument(
+        "--threads",
+        action="store_true",
+        help="Use a thread pool instead of worker processes",
+    )
+    parser.add_argument("--json", action="store_true", help="Output in JSON format")
+    args = parser.parse_args(argv)
+
+    try:
+        targets = load_targets(args.targets)
+    except FleetConfigError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+        return
+
+    report = FleetReconciler(
+        targets,
+        max_workers=args.max_workers,
+        timeout=args.timeout,
+        use_processes=not args.threads,
+    ).run()
+
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print_report(report)
+
+    sys.exit(0 if report.success else 1)
+
+
+if __name__ == "__main__":
+    main()
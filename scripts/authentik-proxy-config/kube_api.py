@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Kubernetes API Client
+
+Minimal stdlib client for the Kubernetes API, used by in-cluster Jobs (service
+account token and CA) and from a workstation through `kubectl proxy`. It covers
+what the discovery and monitoring tools need: paginated label-selected lists
+and watch streams resumed from a resourceVersion.
+"""
+
+import http.client
+import json
+import os
+import ssl
+import urllib.error
+import urllib.parse
+import urllib.request
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+SERVICE_ACCOUNT_DIR = "/var/run/secrets/kubernetes.io/serviceaccount"
+
+
+class KubernetesAPIError(Exception):
+    """Raised when a Kubernetes API request fails."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class KubernetesConfig:
+    """Connection settings for the Kubernetes API server."""
+
+    api_server: str
+    token: Optional[str] = None
+    ca_file: Optional[str] = None
+
+    @classmethod
+    def in_cluster(cls) -> "KubernetesConfig":
+        """Build the config from the pod's service account."""
+        host = os.environ.get("KUBERNETES_SERVICE_HOST")
+        port = os.environ.get("KUBERNETES_SERVICE_PORT", "443")
+        if not host:
+            raise KubernetesAPIError(
+                "KUBERNETES_SERVICE_HOST is not set; pass --api-server when "
+                "running outside the cluster (e.g. via kubectl proxy)"
+            )
+
+        with open(os.path.join(SERVICE_ACCOUNT_DIR, "token"), "r") as f:
+            token = f.read().strip()
+
+        return cls(
+            api_server=f"https://{host}:{port}",
+            token=token,
+            ca_file=os.path.join(SERVICE_ACCOUNT_DIR, "ca.crt"),
+        )
+
+
+class KubernetesClient:
+    """Minimal read-only Kubernetes API client for list calls."""
+
+    def __init__(self, config: KubernetesConfig, timeout: float = 10.0):
+        self.config = config
+        self.timeout = timeout
+        self._context = (
+            ssl.create_default_context(cafile=config.ca_file)
+            if config.ca_file
+            else None
+        )
+
+    def _open(self, path: str, params: Optional[Dict[str, str]], timeout: float):
+        url = self.config.api_server.rstrip("/") + path
+        if params:
+            url += "?" + urllib.parse.urlencode(params)
+
+        headers = {"Accept": "application/json"}
+        if self.config.token:
+            headers["Authorization"] = f"Bearer {self.config.token}"
+
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            return urllib.request.urlopen(
+                request, timeout=timeout, context=self._context
+            )
+        except urllib.error.HTTPError as e:
+            raise KubernetesAPIError(f"GET {path} failed: HTTP {e.code}", e.code)
+        except (urllib.error.URLError, OSError, http.client.HTTPException) as e:
+            reason = getattr(e, "reason", e)
+            raise KubernetesAPIError(f"GET {path} failed: {reason}")
+
+    def get(self, path: str, params: Optional[Dict[str, str]] = None) -> Dict:
+        """GET a path and return the decoded JSON body."""
+        with self._open(path, params, self.timeout) as response:
+            try:
+                return json.loads(response.read().decode("utf-8"))
+            # ValueError covers truncated or undecodable JSON bodies
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                raise KubernetesAPIError(f"GET {path} failed: {e}")
+
+    def list_collection(
+        self, path: str, label_selector: Optional[str] = None, limit: int = 500
+    ) -> Tuple[List[Dict], str]:
+        """List a collection, following continue tokens.
+
+        Returns the items and the collection resourceVersion to watch from.
+        """
+        items: List[Dict] = []
+        params = {"limit": str(limit)}
+        if label_selector:
+            params["labelSelector"] = label_selector
+
+        while True:
+            response = self.get(path, params)
+            items.extend(response.get("items", []))
+            metadata = response.get("metadata", {})
+            token = metadata.get("continue")
+            if not token:
+                return items, metadata.get("resourceVersion", "")
+            params["continue"] = token
+
+    def list_all(
+        self, path: str, label_selector: Optional[str] = None, limit: int = 500
+    ) -> List[Dict]:
+        """List every object at a collection path, following continue tokens."""
+        return self.list_collection(path, label_selector, limit)[0]
+
+    def watch(
+        self,
+        path: str,
+        resource_version: Optional[str] = None,
+        label_selector: Optional[str] = None,
+        timeout_seconds: int = 300,
+    ) -> Iterator[Dict]:
+        """Stream watch events ({"type", "object"}) for a collection.
+
+        The server ends the stream after timeout_seconds; callers resume from
+        the last resourceVersion they saw. Bookmarks are requested so that
+        resourceVersion stays fresh on quiet collections.
+        """
+        params = {
+            "watch": "1",
+            "allowWatchBookmarks": "true",
+            "timeoutSeconds": str(timeout_seconds),
+        }
+        if resource_version:
+            params["resourceVersion"] = resource_version
+        if label_selector:
+            params["labelSelector"] = label_selector
+
+        # Socket timeout slightly beyond the server-side timeout
+        with self._open(path, params, timeout_seconds + 30) as response:
+            try:
+                for line in response:
+                    if line.strip():
+                        yield json.loads(line)
+            # A dropped chunked stream surfaces as IncompleteRead (an
+            # HTTPException) or as a truncated line that fails to decode
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                raise KubernetesAPIError(f"watch {path} interrupted: {e}")
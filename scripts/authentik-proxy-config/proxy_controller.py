@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Authentik Proxy Reconcile Controller
+
+Long-running mode for the proxy configurator. Instead of re-running the full
+configuration sequence from a fresh Job pod, the controller keeps the Authentik
+inventory (proxy providers, applications, outposts) warm, polls Authentik and
+the service catalog on an interval, and only writes the services whose desired
+or observed state changed. Health and Prometheus metrics endpoints are served
+over HTTP for the liveness/readiness probes and ServiceMonitor.
+"""
+
+import logging
+import signal
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from configure_proxy import AuthentikAPIError, AuthentikProxyConfigurator
+from service_catalog import CatalogWatcher, ServiceCatalogError, ServiceConfig
+
+# Provider fields compared against the observed object to detect drift
+DRIFT_FIELDS = (
+    "authorization_flow",
+    "external_host",
+    "internal_host",
+    "internal_host_ssl_validation",
+    "mode",
+    "cookie_domain",
+    "skip_path_regex",
+    "basic_auth_enabled",
+)
+
+
+@dataclass
+class InventorySnapshot:
+    """Observed Authentik state relevant to the managed services."""
+
+    providers: Dict[str, Dict] = field(default_factory=dict)
+    applications: Dict[str, Dict] = field(default_factory=dict)
+    outposts: Dict[str, Dict] = field(default_factory=dict)
+    fetched_at: float = 0.0
+
+
+@dataclass
+class ReconcilePlan:
+    """Changes required to converge observed state on the catalog."""
+
+    create_providers: List[ServiceConfig] = field(default_factory=list)
+    update_providers: List[ServiceConfig] = field(default_factory=list)
+    create_applications: List[ServiceConfig] = field(default_factory=list)
+    outpost_providers: Optional[List[int]] = None
+    release_from: List[str] = field(default_factory=list)
+
+    @property
+    def empty(self) -> bool:
+        return not (
+            self.create_providers
+            or self.update_providers
+            or self.create_applications
+            or self.outpost_providers is not None
+            or self.release_from
+        )
+
+    @property
+    def changed_services(self) -> List[str]:
+        names = []
+        for service in (
+            self.create_providers + self.update_providers + self.create_applications
+        ):
+            if service.name not in names:
+                names.append(service.name)
+        return names
+
+
+class ControllerMetrics:
+    """Prometheus text-format metrics for the reconcile loop."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reconciles_total = 0
+        self.reconcile_errors_total = 0
+        self.services_reconciled_total = 0
+        self.catalog_reloads_total = 0
+        self.managed_services = 0
+        self.last_reconcile_timestamp = 0.0
+        self.last_success_timestamp = 0.0
+        self.last_reconcile_duration_seconds = 0.0
+
+    def record(self, duration: float, success: bool, changed: int):
+        with self._lock:
+            now = time.time()
+            self.reconciles_total += 1
+            self.services_reconciled_total += changed
+            self.last_reconcile_timestamp = now
+            self.last_reconcile_duration_seconds = duration
+            if success:
+                self.last_success_timestamp = now
+            else:
+                self.reconcile_errors_total += 1
+
+    def render(self) -> str:
+        prefix = "authentik_proxy_controller"
+        with self._lock:
+            samples = [
+                ("reconciles_total", "counter", self.reconciles_total),
+                ("reconcile_errors_total", "counter", self.reconcile_errors_total),
+                (
+                    "services_reconciled_total",
+                    "counter",
+                    self.services_reconciled_total,
+                ),
+                ("catalog_reloads_total", "counter", self.catalog_reloads_total),
+                ("managed_services", "gauge", self.managed_services),
+                (
+                    "last_reconcile_timestamp_seconds",
+                    "gauge",
+                    self.last_reconcile_timestamp,
+                ),
+                (
+                    "last_success_timestamp_seconds",
+                    "gauge",
+                    self.last_success_timestamp,
+                ),
+                (
+                    "last_reconcile_duration_seconds",
+                    "gauge",
+                    self.last_reconcile_duration_seconds,
+                ),
+            ]
+
+        lines = []
+        for name, metric_type, value in samples:
+            lines.append(f"# TYPE {prefix}_{name} {metric_type}")
+            lines.append(f"{prefix}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class ProxyReconcileController:
+    """Incrementally reconcile Authentik proxy providers against the catalog."""
+
+    def __init__(
+        self,
+        configurator: AuthentikProxyConfigurator,
+        watcher: Optional[CatalogWatcher] = None,
+        interval: float = 30.0,
+        outpost_name: str = "k8s-external-proxy-outpost",
+        metrics: Optional[ControllerMetrics] = None,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.configurator = configurator
+        self.watcher = watcher or CatalogWatcher()
+        self.interval = interval
+        self.outpost_name = outpost_name
+        self.metrics = metrics or ControllerMetrics()
+        self.logger = logger or configurator.logger
+
+        self.snapshot = InventorySnapshot()
+        self.auth_flow_uuid: Optional[str] = None
+        self.outpost_id: Optional[str] = None
+        self.ready = False
+        self._stop = threading.Event()
+
+    @property
+    def services(self) -> List[ServiceConfig]:
+        return self.watcher.catalog.services
+
+    def refresh_inventory(self) -> InventorySnapshot:
+        """Fetch providers, applications and outposts in one pass."""
+        providers = self.configurator.list_all("/api/v3/providers/proxy/")
+        applications = self.configurator.list_all("/api/v3/core/applications/")
+        outposts = self.configurator.list_all("/api/v3/outposts/instances/")
+
+        self.snapshot = InventorySnapshot(
+            providers={p["name"]: p for p in providers},
+            applications={a["slug"]: a for a in applications},
+            outposts={o["pk"]: o for o in outposts},
+            fetched_at=time.time(),
+        )
+        return self.snapshot
+
+    def _provider_drifted(self, service: ServiceConfig, observed: Dict) -> bool:
+        desired = self.configurator.build_provider_data(service, self.auth_flow_uuid)
+        return any(observed.get(key) != desired[key] for key in DRIFT_FIELDS)
+
+    def plan(self, snapshot: InventorySnapshot) -> ReconcilePlan:
+        """Diff the catalog against the snapshot without touching Authentik."""
+        plan = ReconcilePlan()
+        desired_pks = []
+
+        for service in self.services:
+            observed = snapshot.providers.get(service.provider_name)
+            if observed is None:
+                plan.create_providers.append(service)
+                continue
+
+            desired_pks.append(observed["pk"])
+            if self._provider_drifted(service, observed):
+                plan.update_providers.append(service)
+            if service.name not in snapshot.applications:
+                plan.create_applications.append(service)
+
+        outpost = snapshot.outposts.get(self.outpost_id)
+        current_pks = outpost.get("providers", []) if outpost else []
+        if plan.create_providers or sorted(current_pks) != sorted(desired_pks):
+            plan.outpost_providers = desired_pks
+
+        managed_pks = set(desired_pks)
+        for outpost_pk, other in snapshot.outposts.items():
+            if outpost_pk == self.outpost_id:
+                continue
+            if managed_pks.intersection(other.get("providers", [])):
+                plan.release_from.append(outpost_pk)
+
+        return plan
+
+    def apply(self, plan: ReconcilePlan) -> bool:
+        """Apply a plan, batching all outpost provider changes into one write."""
+        success = True
+        outpost_pks = list(plan.outpost_providers or [])
+
+        for service in plan.create_providers:
+            provider_pk = self.configurator.create_proxy_provider(
+                service, self.auth_flow_uuid
+            )
+            if not provider_pk:
+                success = False
+                continue
+            outpost_pks.append(provider_pk)
+            if not self.configurator.create_application(service, provider_pk):
+                success = False
+
+        for service in plan.update_providers:
+            provider_pk = self.snapshot.providers[service.provider_name]["pk"]
+            if not self.configurator.update_proxy_provider(
+                provider_pk, service, self.auth_flow_uuid
+            ):
+                success = False
+
+        for service in plan.create_applications:
+            provider_pk = self.snapshot.providers[service.provider_name]["pk"]
+            if not self.configurator.create_application(service, provider_pk):
+                success = False
+
+        managed_pks = set(outpost_pks)
+        for outpost_pk in plan.release_from:
+            remaining = [
+                pk
+                for pk in self.snapshot.outposts[outpost_pk].get("providers", [])
+                if pk not in managed_pks
+            ]
+            self.logger.info(f"Releasing managed providers from outpost {outpost_pk}")
+            if not self.configurator.update_outpost_providers(outpost_pk, remaining):
+                success = False
+
+        if plan.outpost_providers is not None:
+            if not self.configurator.update_outpost_providers(
+                self.outpost_id, outpost_pks
+            ):
+                success = False
+
+        return success
+
+    def bootstrap(self) -> bool:
+        """Authenticate and resolve the authorization flow and outpost once."""
+        if not self.configurator.test_authentication():
+            return False
+
+        self.auth_flow_uuid = self.configurator.get_authorization_flow()
+        self.outpost_id = self.configurator.get_or_create_outpost(self.outpost_name)
+        if not self.outpost_id:
+            self.logger.error("✗ Failed to get or create external outpost")
+            return False
+
+        return True
+
+    def reconcile_once(self) -> bool:
+        """Run one incremental reconcile pass."""
+        started = time.monotonic()
+        changed = 0
+
+        try:
+            catalog = self.watcher.poll()
+            if catalog is not None:
+                self.metrics.catalog_reloads_total += 1
+                self.logger.info(f"Service catalog reloaded: {len(catalog)} services")
+        except ServiceCatalogError as e:
+            self.logger.error(f"✗ Invalid service catalog, keeping previous: {e}")
+
+        try:
+            if self.outpost_id is None and not self.bootstrap():
+                self.metrics.record(time.monotonic() - started, False, 0)
+                return False
+
+            snapshot = self.refresh_inventory()
+            if self.outpost_id not in snapshot.outposts:
+                self.logger.warning(
+                    f"⚠ External outpost {self.outpost_id} disappeared, "
+                    "re-resolving on next pass"
+                )
+                self.outpost_id = None
+                self.metrics.record(time.monotonic() - started, False, 0)
+                return False
+
+            plan = self.plan(snapshot)
+            self.metrics.managed_services = len(self.services)
+
+            if plan.empty:
+                self.logger.debug("No drift detected")
+                success = True
+            else:
+                changed = len(plan.changed_services)
+                self.logger.info(
+                    f"Reconciling {changed} changed service(s): "
+                    f"{', '.join(plan.changed_services) or 'outpost assignment'}"
+                )
+                success = self.apply(plan)
+        except AuthentikAPIError as e:
+            self.logger.error(f"✗ Reconcile failed: {e}")
+            success = False
+
+        if success:
+            self.ready = True
+        self.metrics.record(time.monotonic() - started, success, changed)
+        return success
+
+    def run(self):
+        """Reconcile on an interval until stop() is called."""
+        self.logger.info(
+            f"=== Starting proxy reconcile controller (interval {self.interval}s) ==="
+        )
+        while not self._stop.is_set():
+            self.reconcile_once()
+            self._stop.wait(self.interval)
+        self.logger.info("=== Proxy reconcile controller stopped ===")
+
+    def stop(self):
+        self._stop.set()
+
+    def healthy(self) -> bool:
+        """Healthy until reconciles stall for three intervals."""
+        last = self.metrics.last_reconcile_timestamp
+        return last == 0.0 or time.time() - last < self.interval * 3 + 60
+
+
+def serve_health(
+    controller: ProxyReconcileController, port: int
+) -> ThreadingHTTPServer:
+    """Serve /healthz, /readyz and /metrics from a background thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/healthz":
+                ok = controller.healthy()
+                self._respond(200 if ok else 503, "ok\n" if ok else "stalled\n")
+            elif self.path == "/readyz":
+                ok = controller.ready
+                self._respond(200 if ok else 503, "ok\n" if ok else "not ready\n")
+            elif self.path == "/metrics":
+                self._respond(
+                    200, controller.metrics.render(), "text/plain; version=0.0.4"
+                )
+            else:
+                self._respond(404, "not found\n")
+
+        def _respond(self, status: int, body: str, content_type: str = "text/plain"):
+            payload = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            controller.logger.debug(format % args)
+
+    server = ThreadingHTTPServer(("", port), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def run_controller(
+    configurator: AuthentikProxyConfigurator,
+    interval: float,
+    port: int,
+    outpost_name: str,
+) -> int:
+    """Run the controller until SIGTERM/SIGINT and return the exit code."""
+    controller = ProxyReconcileController(
+        configurator, interval=interval, outpost_name=outpost_name
+    )
+    server = serve_health(controller, port)
+    configurator.logger.info(f"✓ Health and metrics endpoints listening on :{port}")
+
+    def _shutdown(signum, frame):
+        controller.stop()
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    signal.signal(signal.SIGINT, _shutdown)
+
+    try:
+        controller.run()
+    finally:
+        server.shutdown()
+
+    return 0
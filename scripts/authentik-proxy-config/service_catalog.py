@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Authentik Service Catalog
+
+This module loads the declarative list of services proxied through the external
+Authentik outpost. The proxy configurator, the outpost fix scripts and the
+in-cluster Jobs all read the same catalog file instead of carrying their own
+hard-coded ServiceConfig lists.
+
+The catalog is a JSON document (YAML is also accepted when PyYAML is installed),
+validated against CATALOG_SCHEMA, parsed once per process and indexed by service
+name and proxy provider name.
+"""
+
+import json
+import os
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+CATALOG_ENV_VAR = "SERVICE_CATALOG_PATH"
+IN_CLUSTER_CATALOG_PATH = "/etc/authentik-proxy/service-catalog.json"
+REPO_CATALOG_PATH = os.path.normpath(
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "../../infrastructure/authentik-proxy/service-catalog.json",
+    )
+)
+
+SUPPORTED_VERSIONS = (1,)
+
+# Field name -> (type, required) for every entry under "services"
+CATALOG_SCHEMA: Dict[str, Tuple[type, bool]] = {
+    "name": (str, True),
+    "external_host": (str, True),
+    "internal_host": (str, True),
+    "internal_port": (int, True),
+    "provider_name": (str, False),
+}
+
+
+@dataclass
+class ServiceConfig:
+    """Configuration for a service to be proxied."""
+
+    name: str
+    external_host: str
+    internal_host: str
+    internal_port: int
+    provider_name: str = ""
+
+    def __post_init__(self):
+        if not self.provider_name:
+            self.provider_name = f"{self.name}-proxy"
+
+    @property
+    def external_url(self) -> str:
+        return f"https://{self.external_host}"
+
+    @property
+    def internal_url(self) -> str:
+        return f"http://{self.internal_host}:{self.internal_port}"
+
+
+class ServiceCatalogError(Exception):
+    """Raised when the service catalog cannot be read or fails validation."""
+
+    def __init__(self, message: str, errors: Optional[List[str]] = None):
+        super().__init__(message)
+        self.errors = errors or []
+
+
+def validate_catalog(document: Any) -> List[str]:
+    """Validate a parsed catalog document and return a list of schema errors."""
+    if not isinstance(document, dict):
+        return ["catalog must be a mapping with a 'services' list"]
+
+    errors = []
+    version = document.get("version", 1)
+    if version not in SUPPORTED_VERSIONS:
+        errors.append(f"unsupported catalog version: {version}")
+
+    services = document.get("services")
+    if not isinstance(services, list):
+        return errors + ["'services' must be a list"]
+
+    seen_names = set()
+    seen_providers = set()
+    for index, entry in enumerate(services):
+        where = f"services[{index}]"
+        if not isinstance(entry, dict):
+            errors.append(f"{where}: entry must be a mapping")
+            continue
+
+        for field_name, (field_type, required) in CATALOG_SCHEMA.items():
+            if field_name not in entry:
+                if required:
+                    errors.append(f"{where}: missing required field '{field_name}'")
+                continue
+            value = entry[field_name]
+            # bool is a subclass of int, so reject it explicitly for ports
+            if not isinstance(value, field_type) or isinstance(value, bool):
+                errors.append(
+                    f"{where}: field '{field_name}' must be {field_type.__name__}"
+                )
+
+        unknown = sorted(set(entry) - set(CATALOG_SCHEMA))
+        if unknown:
+            errors.append(f"{where}: unknown fields {unknown}")
+
+        port = entry.get("internal_port")
+        if isinstance(port, int) and not 0 < port < 65536:
+            errors.append(f"{where}: internal_port {port} out of range")
+
+        name = entry.get("name")
+        if isinstance(name, str):
+            if name in seen_names:
+                errors.append(f"{where}: duplicate service name '{name}'")
+            seen_names.add(name)
+
+            provider_name = entry.get("provider_name") or f"{name}-proxy"
+            if provider_name in seen_providers:
+                errors.append(f"{where}: duplicate provider name '{provider_name}'")
+            seen_providers.add(provider_name)
+
+    return errors
+
+
+class ServiceCatalog:
+    """Validated, indexed set of proxied services."""
+
+    def __init__(
+        self,
+        services: List[ServiceConfig],
+        source: Optional[str] = None,
+        fingerprint: Optional[Tuple[int, int]] = None,
+    ):
+        self.source = source
+        self.fingerprint = fingerprint
+        self._services = list(services)
+        self.by_name: Dict[str, ServiceConfig] = {s.name: s for s in self._services}
+        self.by_provider: Dict[str, ServiceConfig] = {
+            s.provider_name: s for s in self._services
+        }
+
+    @classmethod
+    def from_document(
+        cls,
+        document: Any,
+        source: Optional[str] = None,
+        fingerprint: Optional[Tuple[int, int]] = None,
+    ) -> "ServiceCatalog":
+        """Build a catalog from a parsed document, raising on schema errors."""
+        errors = validate_catalog(document)
+        if errors:
+            raise ServiceCatalogError(
+                f"Invalid service catalog {source or '<memory>'}: "
+                f"{len(errors)} error(s)",
+                errors=errors,
+            )
+
+        services = [
+            ServiceConfig(
+                name=entry["name"],
+                external_host=entry["external_host"],
+                internal_host=entry["internal_host"],
+                internal_port=entry["internal_port"],
+                provider_name=entry.get("provider_name", ""),
+            )
+            for entry in document["services"]
+        ]
+        return cls(services, source=source, fingerprint=fingerprint)
+
+    @property
+    def services(self) -> List[ServiceConfig]:
+        return list(self._services)
+
+    @property
+    def names(self) -> List[str]:
+        return [s.name for s in self._services]
+
+    @property
+    def provider_names(self) -> List[str]:
+        return [s.provider_name for s in self._services]
+
+    def get(self, name: str) -> Optional[ServiceConfig]:
+        """Look up a service by name."""
+        return self.by_name.get(name)
+
+    def get_by_provider(self, provider_name: str) -> Optional[ServiceConfig]:
+        """Look up a service by its proxy provider name."""
+        return self.by_provider.get(provider_name)
+
+    def __iter__(self) -> Iterator[ServiceConfig]:
+        return iter(self._services)
+
+    def __len__(self) -> int:
+        return len(self._services)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.by_name
+
+
+def resolve_catalog_path(path: Optional[str] = None) -> str:
+    """Resolve the catalog path: explicit argument, environment, mount, repo."""
+    if path:
+        return path
+    env_path = os.environ.get(CATALOG_ENV_VAR)
+    if env_path:
+        return env_path
+    if os.path.exists(IN_CLUSTER_CATALOG_PATH):
+        return IN_CLUSTER_CATALOG_PATH
+    return REPO_CATALOG_PATH
+
+
+def _file_fingerprint(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _parse_catalog_file(path: str) -> Any:
+    with open(path, "r") as f:
+        content = f.read()
+
+    if path.endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError:
+            raise ServiceCatalogError(
+                f"PyYAML is required to read YAML service catalog {path}"
+            )
+        try:
+            return yaml.safe_load(content)
+        except yaml.YAMLError as e:
+            raise ServiceCatalogError(f"Failed to parse service catalog {path}: {e}")
+
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError as e:
+        raise ServiceCatalogError(f"Failed to parse service catalog {path}: {e}")
+
+
+_cache: Dict[str, ServiceCatalog] = {}
+_cache_lock = threading.Lock()
+
+
+def load_catalog(path: Optional[str] = None, reload: bool = False) -> ServiceCatalog:
+    """Load the service catalog, parsing each file at most once per process.
+
+    Pass reload=True to re-read the file when it has changed on disk.
+    """
+    resolved = os.path.abspath(resolve_catalog_path(path))
+
+    with _cache_lock:
+        cached = _cache.get(resolved)
+        if cached is not None and not reload:
+            return cached
+
+        try:
+            fingerprint = _file_fingerprint(resolved)
+        except OSError as e:
+            raise ServiceCatalogError(f"Cannot read service catalog {resolved}: {e}")
+
+        if cached is not None and cached.fingerprint == fingerprint:
+            return cached
+
+        catalog = ServiceCatalog.from_document(
+            _parse_catalog_file(resolved), source=resolved, fingerprint=fingerprint
+        )
+        _cache[resolved] = catalog
+        return catalog
+
+
+class CatalogWatcher:
+    """Detect on-disk catalog changes for long-running reconcilers."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = os.path.abspath(resolve_catalog_path(path))
+        self.catalog = load_catalog(self.path)
+
+    def poll(self) -> Optional[ServiceCatalog]:
+        """Return the new catalog if the file changed since the last poll.
+
+        Raises ServiceCatalogError when the changed file fails validation;
+        the previously loaded catalog stays active in that case.
+        """
+        try:
+            fingerprint = _file_fingerprint(self.path)
+        except OSError:
+            return None
+
+        if fingerprint == self.catalog.fingerprint:
+            return None
+
+        catalog = load_catalog(self.path, reload=True)
+        self.catalog = catalog
+        return catalog
+
+
+def main():
+    """Validate a catalog file and print its services."""
+    path = sys.argv[1] if len(sys.argv) > 1 else None
+
+    try:
+        catalog = load_catalog(path)
+    except ServiceCatalogError as e:
+        print(f"✗ {e}")
+        for error in e.errors:
+            print(f"  - {error}")
+        sys.exit(1)
+
+    print(f"✓ {catalog.source}: {len(catalog)} services")
+    for service in catalog:
+        print(
+            f"  {service.provider_name}: "
+            f"{service.external_url} -> {service.internal_url}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Authentik Proxy Service Discovery
+
+Discovers services to proxy through the external Authentik outpost from
+Kubernetes labels instead of a hard-coded list. Services and Ingresses carrying
+the discovery label are listed cluster-wide with a label selector (one
+paginated list per kind), mapped to ServiceConfig objects, merged with the
+static service catalog and reconciled in a single pass through
+ProxyReconcileController, so N discovered services cost one outpost write.
+
+Opting a workload in:
+
+    metadata:
+      labels:
+        proxy.authentik.io/enabled: "true"
+      annotations:
+        proxy.authentik.io/external-host: grafana.k8s.home.geoffdavis.com
+        proxy.authentik.io/port: "80"          # Service port name or number
+        proxy.authentik.io/name: grafana       # optional, defaults to metadata.name
+        proxy.authentik.io/provider-name: ...  # optional
+
+Ingresses take the external host from their first rule and the backend from
+the first path of that rule. Services default the external host to
+<name>.<domain>.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from kube_api import KubernetesAPIError, KubernetesClient, KubernetesConfig
+from service_catalog import ServiceCatalog, ServiceCatalogError, ServiceConfig
+
+DISCOVERY_LABEL_SELECTOR = "proxy.authentik.io/enabled=true"
+ANNOTATION_PREFIX = "proxy.authentik.io/"
+DEFAULT_DOMAIN = "k8s.home.geoffdavis.com"
+
+SERVICES_PATH = "/api/v1/services"
+INGRESSES_PATH = "/apis/networking.k8s.io/v1/ingresses"
+
+
+@dataclass
+class DiscoveryResult:
+    """Services discovered from the cluster and objects that were skipped."""
+
+    services: List[ServiceConfig] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    objects_listed: int = 0
+
+    def to_dict(self):
+        return {
+            "objects_listed": self.objects_listed,
+            "services": [
+                {
+                    "name": s.name,
+                    "provider_name": s.provider_name,
+                    "external_url": s.external_url,
+                    "internal_url": s.internal_url,
+                }
+                for s in self.services
+            ],
+            "skipped": self.skipped,
+        }
+
+
+def _annotation(obj: Dict, key: str) -> Optional[str]:
+    annotations = obj.get("metadata", {}).get("annotations") or {}
+    return annotations.get(ANNOTATION_PREFIX + key)
+
+
+def _object_ref(kind: str, obj: Dict) -> str:
+    metadata = obj.get("metadata", {})
+    return f"{kind} {metadata.get('namespace')}/{metadata.get('name')}"
+
+
+def _resolve_port(ports: List[Dict], wanted: Optional[str]) -> Optional[int]:
+    """Resolve a Service port by name or number; defaults to the first port."""
+    if not ports:
+        return None
+    if wanted is None:
+        return ports[0].get("port")
+
+    for port in ports:
+        if wanted in (port.get("name"), str(port.get("port"))):
+            return port.get("port")
+    return None
+
+
+def _build_service(
+    name: str,
+    external_host: str,
+    namespace: str,
+    backend: str,
+    port: int,
+    provider_name: Optional[str],
+) -> ServiceConfig:
+    return ServiceConfig(
+        name=name,
+        external_host=external_host,
+        internal_host=f"{backend}.{namespace}",
+        internal_port=port,
+        provider_name=provider_name or "",
+    )
+
+
+def service_from_service(
+    obj: Dict, domain: str = DEFAULT_DOMAIN
+) -> Tuple[Optional[ServiceConfig], Optional[str]]:
+    """Map a labelled Service to a ServiceConfig; returns (service, skip reason)."""
+    metadata = obj.get("metadata", {})
+    ports = obj.get("spec", {}).get("ports") or []
+    wanted = _annotation(obj, "port")
+    port = _resolve_port(ports, wanted)
+    if port is None:
+        return None, (
+            f"no port {wanted} on Service" if wanted else "Service has no ports"
+        )
+
+    name = _annotation(obj, "name") or metadata["name"]
+    external_host = _annotation(obj, "external-host") or f"{name}.{domain}"
+    return (
+        _build_service(
+            name,
+            external_host,
+            metadata["namespace"],
+            metadata["name"],
+            port,
+            _annotation(obj, "provider-name"),
+        ),
+        None,
+    )
+
+
+def service_from_ingress(
+    obj: Dict, services: Dict[Tuple[str, str], Dict]
+) -> Tuple[Optional[ServiceConfig], Optional[str]]:
+    """Map a labelled Ingress to a ServiceConfig; returns (service, skip reason).
+
+    Named backend ports are resolved against the listed Services, keyed by
+    (namespace, name).
+    """
+    metadata = obj.get("metadata", {})
+    rules = obj.get("spec", {}).get("rules") or []
+    rule = rules[0] if rules else {}
+    paths = rule.get("http", {}).get("paths") or []
+    backend = paths[0].get("backend", {}).get("service") if paths else None
+    if not backend:
+        return None, "no service backend on first Ingress rule"
+
+    external_host = _annotation(obj, "external-host") or rule.get("host")
+    if not external_host:
+        return None, "no host on first Ingress rule"
+
+    namespace = metadata["namespace"]
+    backend_port = backend.get("port", {})
+    port = backend_port.get("number")
+    if port is None:
+        target = services.get((namespace, backend["name"]))
+        ports = target.get("spec", {}).get("ports") if target else []
+        port = _resolve_port(ports or [], backend_port.get("name"))
+    if port is None:
+        return None, f"cannot resolve backend port of Service {backend['name']}"
+
+    name = _annotation(obj, "name") or metadata["name"]
+    return (
+        _build_service(
+            name,
+            external_host,
+            namespace,
+            backend["name"],
+            port,
+            _annotation(obj, "provider-name"),
+        ),
+        None,
+    )
+
+
+class ServiceDiscovery:
+    """Discover proxied services from labelled Services and Ingresses."""
+
+    def __init__(
+        self,
+        client: KubernetesClient,
+        label_selector: str = DISCOVERY_LABEL_SELECTOR,
+        domain: str = DEFAULT_DOMAIN,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.client = client
+        self.label_selector = label_selector
+        self.domain = domain
+        self.logger = logger or logging.getLogger("authentik-service-discovery")
+
+    def discover(self) -> DiscoveryResult:
+        """List labelled objects once per kind and map them to services."""
+        services = self.client.list_all(SERVICES_PATH, self.label_selector)
+        ingresses = self.client.list_all(INGRESSES_PATH, self.label_selector)
+        result = DiscoveryResult(objects_listed=len(services) + len(ingresses))
+
+        by_key = {
+            (s["metadata"]["namespace"], s["metadata"]["name"]): s for s in services
+        }
+        candidates = []
+        # Ingresses first: they carry the real external host, so they win over
+        # the Service they point at when both are labelled with the same name
+        for obj in ingresses:
+            candidates.append(
+                (_object_ref("Ingress", obj), service_from_ingress(obj, by_key))
+            )
+        for obj in services:
+            candidates.append(
+                (_object_ref("Service", obj), service_from_service(obj, self.domain))
+            )
+
+        seen_names = set()
+        for ref, (service, reason) in candidates:
+            if service is None:
+                result.skipped.append(f"{ref}: {reason}")
+                continue
+            if not 0 < service.internal_port < 65536:
+                result.skipped.append(
+                    f"{ref}: port {service.internal_port} out of range"
+                )
+                continue
+            if service.name in seen_names:
+                result.skipped.append(f"{ref}: duplicate service name '{service.name}'")
+                continue
+            seen_names.add(service.name)
+            result.services.append(service)
+
+        for skipped in result.skipped:
+            self.logger.warning(f"⚠ Skipping {skipped}")
+        self.logger.info(
+            f"✓ Discovered {len(result.services)} service(s) from "
+            f"{result.objects_listed} labelled object(s)"
+        )
+        return result
+
+
+def merge_catalog(
+    static: Optional[ServiceCatalog], result: DiscoveryResult
+) -> ServiceCatalog:
+    """Merge discovered services into the static catalog.
+
+    Static entries win: a discovered service whose name or provider name is
+    already in the catalog is recorded as skipped.
+    """
+    services = list(static or [])
+    names = {s.name for s in services}
+    providers = {s.provider_name for s in services}
+
+    for service in result.services:
+        if service.name in names or service.provider_name in providers:
+            result.skipped.append(f"{service.name}: already in the service catalog")
+            continue
+        names.add(service.name)
+        providers.add(service.provider_name)
+        services.append(service)
+
+    return ServiceCatalog(services, source="discovery")
+
+
+class StaticCatalogSource:
+    """Catalog source for the reconcile controller that never reloads."""
+
+    def __init__(self, catalog: ServiceCatalog):
+        self.catalog = catalog
+
+    def poll(self) -> Optional[ServiceCatalog]:
+        return None
+
+
+def reconcile_catalog(
+    config, catalog: ServiceCatalog, outpost_name: str, logger=None
+) -> bool:
+    """Reconcile a catalog against Authentik in one batched controller pass."""
+    from configure_proxy import AuthentikProxyConfigurator
+    from proxy_controller import ProxyReconcileController
+
+    configurator = AuthentikProxyConfigurator(config, logger=logger, catalog=catalog)
+    controller = ProxyReconcileController(
+        configurator,
+        watcher=StaticCatalogSource(catalog),
+        outpost_name=outpost_name,
+    )
+    return controller.reconcile_once()
+
+
+def setup_logging() -> logging.Logger:
+    """Setup logging on stderr, keeping stdout for the (--json) result."""
+    logger = logging.getLogger("authentik-service-discovery")
+    logger.setLevel(logging.INFO)
+
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+
+    return logger
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description="Discover labelled services and reconcile Authentik proxies"
+    )
+    parser.add_argument("--selector", default=DISCOVERY_LABEL_SELECTOR)
+    parser.add_argument(
+        "--domain",
+        default=DEFAULT_DOMAIN,
+        help="Domain for Services without an external-host annotation",
+    )
+    parser.add_argument(
+        "--api-server",
+        help="Kubernetes API URL (default: in-cluster service account)",
+    )
+    parser.add_argument(
+        "--catalog", help="Static service catalog to merge discovered services into"
+    )
+    parser.add_argument(
+        "--no-catalog",
+        action="store_true",
+        help="Reconcile discovered services only (drops catalog services "
+        "from the outpost)",
+    )
+    parser.add_argument(
+        "--outpost-name",
+        default=os.environ.get("OUTPOST_NAME", "k8s-external-proxy-outpost"),
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the discovered services without contacting Authentik",
+    )
+    parser.add_argument("--json", action="store_true", help="Output in JSON format")
+    args = parser.parse_args(argv)
+
+    logger = setup_logging()
+
+    try:
+        if args.api_server:
+            k8s_config = KubernetesConfig(
+                args.api_server, token=os.environ.get("KUBERNETES_TOKEN")
+            )
+        else:
+            k8s_config = KubernetesConfig.in_cluster()
+        result = ServiceDiscovery(
+            KubernetesClient(k8s_config), args.selector, args.domain, logger
+        ).discover()
+
+        static = None
+        if not args.no_catalog:
+            from service_catalog import load_catalog
+
+            static = load_catalog(args.catalog)
+        catalog = merge_catalog(static, result)
+    except (KubernetesAPIError, ServiceCatalogError, OSError) as e:
+        logger.error(f"✗ Service discovery failed: {e}")
+        sys.exit(1)
+        return
+
+    if args.json:
+        print(json.dumps(result.to_dict(), indent=2))
+    else:
+        for service in result.services:
+            print(
+                f"  {service.provider_name}: "
+                f"{service.external_url} -> {service.internal_url}"
+            )
+
+    if args.dry_run:
+        return
+
+    authentik_host = os.environ.get("AUTHENTIK_HOST")
+    authentik_token = os.environ.get("AUTHENTIK_TOKEN")
+    if not all([authentik_host, authentik_token]):
+        logger.error(
+            "✗ Missing required environment variables: AUTHENTIK_HOST, AUTHENTIK_TOKEN"
+        )
+        sys.exit(1)
+        return
+
+    from configure_proxy import AuthentikConfig
+
+    config = AuthentikConfig(host=authentik_host, token=authentik_token, outpost_id="")
+    logger.info(f"Reconciling {len(catalog)} service(s) in one pass")
+    success = reconcile_catalog(config, catalog, args.outpost_name, logger=logger)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
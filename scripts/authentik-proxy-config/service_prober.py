@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Service Reachability Prober
+
+Probes the externally exposed services from the service catalog concurrently.
+Each probe is a HEAD request over a pooled keep-alive connection, so repeated
+rounds (recovery monitors, exporters) reuse TCP and TLS sessions instead of
+reconnecting, and a round of N services takes about as long as the slowest
+one instead of the sum of all of them.
+
+New connections are opened step by step so every probe reports where its time
+went (DNS, TCP connect, TLS handshake, time to first byte), and each response
+is classified, separating "redirected to the Authentik login" (the proxy is
+doing its job) from "upstream 5xx" (the proxy is up but the backend is not).
+
+The same report drives the terminal output used by the recovery tools, JSON
+output, and Prometheus metrics that a CronJob can push to the Pushgateway:
+
+    service_prober.py \\
+        --pushgateway http://prometheus-pushgateway.monitoring.svc.cluster.local:9091
+"""
+
+import argparse
+import http.client
+import json
+import queue
+import socket
+import ssl
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from service_catalog import ServiceCatalogError, ServiceConfig, load_catalog
+
+DEFAULT_TIMEOUT = 5.0
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_PUSHGATEWAY_JOB = "service-reachability"
+
+# Location substrings that identify a redirect into the Authentik login flow
+AUTHENTIK_LOGIN_MARKERS = (
+    "/outpost.goauthentik.io/",
+    "/application/o/authorize",
+    "/if/flow/",
+    "authentik.",
+)
+
+
+class ProbeOutcome:
+    """Classification of a probe result."""
+
+    OK = "ok"
+    AUTH_REDIRECT = "auth_redirect"
+    REDIRECT = "redirect"
+    CLIENT_ERROR = "client_error"
+    UPSTREAM_ERROR = "upstream_error"
+    DNS_ERROR = "dns_error"
+    CONNECT_ERROR = "connect_error"
+    TLS_ERROR = "tls_error"
+    TIMEOUT = "timeout"
+
+    # The ingress and proxy answered and the backend is not failing
+    HEALTHY = {OK, AUTH_REDIRECT, REDIRECT, CLIENT_ERROR}
+
+
+def classify_response(status: int, location: Optional[str]) -> str:
+    """Classify an HTTP response by status and redirect target."""
+    if 300 <= status < 400:
+        if location and any(m in location for m in AUTHENTIK_LOGIN_MARKERS):
+            return ProbeOutcome.AUTH_REDIRECT
+        return ProbeOutcome.REDIRECT
+    if status >= 500:
+        return ProbeOutcome.UPSTREAM_ERROR
+    if status >= 400:
+        return ProbeOutcome.CLIENT_ERROR
+    return ProbeOutcome.OK
+
+
+@dataclass
+class ProbeTarget:
+    """A URL to probe, usually derived from a ServiceConfig."""
+
+    name: str
+    host: str
+    port: int = 443
+    path: str = "/"
+
+    @classmethod
+    def from_service(cls, service: ServiceConfig) -> "ProbeTarget":
+        return cls(name=service.name, host=service.external_host)
+
+    @property
+    def url(self) -> str:
+        port = "" if self.port == 443 else f":{self.port}"
+        return f"https://{self.host}{port}{self.path}"
+
+
+@dataclass
+class PhaseTimings:
+    """Seconds spent in each phase; connection phases are 0 on reuse."""
+
+    dns: float = 0.0
+    connect: float = 0.0
+    tls: float = 0.0
+    ttfb: float = 0.0
+    total: float = 0.0
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of probing a single target."""
+
+    name: str
+    url: str
+    outcome: Optional[str] = None
+    status: Optional[int] = None
+    location: Optional[str] = None
+    timings: PhaseTimings = field(default_factory=PhaseTimings)
+    reused_connection: bool = False
+    error: Optional[str] = None
+
+    @property
+    def reachable(self) -> bool:
+        """An HTTP response came back, whatever its status."""
+        return self.status is not None
+
+    @property
+    def healthy(self) -> bool:
+        return self.outcome in ProbeOutcome.HEALTHY
+
+    def to_dict(self):
+        data = asdict(self)
+        data["reachable"] = self.reachable
+        data["healthy"] = self.healthy
+        data["timings"] = {k: round(v, 4) for k, v in data["timings"].items()}
+        return data
+
+
+@dataclass
+class ProbeReport:
+    """Results of one probe round."""
+
+    results: List[ProbeResult] = field(default_factory=list)
+    wall_seconds: float = 0.0
+    timestamp: float = 0.0
+
+    @property
+    def reachable(self) -> List[ProbeResult]:
+        return [r for r in self.results if r.reachable]
+
+    @property
+    def unreachable(self) -> List[ProbeResult]:
+        return [r for r in self.results if not r.reachable]
+
+    @property
+    def healthy(self) -> List[ProbeResult]:
+        return [r for r in self.results if r.healthy]
+
+    @property
+    def unhealthy(self) -> List[ProbeResult]:
+        return [r for r in self.results if not r.healthy]
+
+    def by_outcome(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for result in self.results:
+            counts[result.outcome] = counts.get(result.outcome, 0) + 1
+        return counts
+
+    def to_dict(self):
+        return {
+            "healthy": len(self.healthy),
+            "reachable": len(self.reachable),
+            "total": len(self.results),
+            "outcomes": self.by_outcome(),
+            "wall_seconds": round(self.wall_seconds, 3),
+            "results": [r.to_dict() for r in self.results],
+        }
+
+
+class ConnectionPool:
+    """Idle keep-alive HTTPS connections keyed by (host, port)."""
+
+    def __init__(self, timeout: float, context: ssl.SSLContext, maxsize: int = 4):
+        self.timeout = timeout
+        self.context = context
+        self.maxsize = maxsize
+        self._idle: Dict[Tuple[str, int], queue.LifoQueue] = {}
+        self._lock = threading.Lock()
+
+    def _queue(self, key: Tuple[str, int]) -> queue.LifoQueue:
+        with self._lock:
+            return self._idle.setdefault(key, queue.LifoQueue(self.maxsize))
+
+    def get_idle(self, host: str, port: int) -> Optional[http.client.HTTPSConnection]:
+        try:
+            return self._queue((host, port)).get_nowait()
+        except queue.Empty:
+            return None
+
+    def connect(
+        self, host: str, port: int, timings: PhaseTimings
+    ) -> http.client.HTTPSConnection:
+        """Open a new connection, timing DNS, TCP connect and TLS separately."""
+        started = time.monotonic()
+        addresses = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        resolved = time.monotonic()
+        timings.dns = resolved - started
+
+        sock = None
+        error: Optional[OSError] = None
+        for family, socktype, proto, _, address in addresses:
+            sock = socket.socket(family, socktype, proto)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(address)
+                break
+            except OSError as e:
+                sock.close()
+                sock, error = None, e
+        if sock is None:
+            raise error or OSError(f"no addresses for {host}")
+        connected = time.monotonic()
+        timings.connect = connected - resolved
+
+        try:
+            tls_sock = self.context.wrap_socket(sock, server_hostname=host)
+        except (ssl.SSLError, OSError):
+            sock.close()
+            raise
+        timings.tls = time.monotonic() - connected
+
+        connection = http.client.HTTPSConnection(
+            host, port, timeout=self.timeout, context=self.context
+        )
+        # http.client skips its own connect when a socket is already set
+        connection.sock = tls_sock
+        return connection
+
+    def release(self, host: str, port: int, connection: http.client.HTTPSConnection):
+        try:
+            self._queue((host, port)).put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def close(self):
+        with self._lock:
+            queues = list(self._idle.values())
+            self._idle = {}
+        for idle in queues:
+            while not idle.empty():
+                idle.get_nowait().close()
+
+
+def _error_outcome(error: BaseException) -> str:
+    if isinstance(error, socket.gaierror):
+        return ProbeOutcome.DNS_ERROR
+    if isinstance(error, ssl.SSLError):
+        return ProbeOutcome.TLS_ERROR
+    if isinstance(error, (socket.timeout, TimeoutError)):
+        return ProbeOutcome.TIMEOUT
+    return ProbeOutcome.CONNECT_ERROR
+
+
+class ServiceProber:
+    """Probe HTTPS endpoints concurrently over pooled connections."""
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        verify_tls: bool = False,
+    ):
+        self.timeout = timeout
+        self.max_workers = max_workers
+        context = ssl.create_default_context()
+        if not verify_tls:
+            # Matches curl -k: internal CAs and staging certificates still count
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        self.pool = ConnectionPool(timeout, context)
+
+    def _request(self, target: ProbeTarget, retry_stale: bool = True) -> ProbeResult:
+        result = ProbeResult(name=target.name, url=target.url)
+        timings = result.timings
+        started = time.monotonic()
+
+        connection = self.pool.get_idle(target.host, target.port)
+        result.reused_connection = connection is not None
+        try:
+            if connection is None:
+                connection = self.pool.connect(target.host, target.port, timings)
+            sent = time.monotonic()
+            connection.request("HEAD", target.path, headers={"Host": target.host})
+            response = connection.getresponse()
+            timings.ttfb = time.monotonic() - sent
+            response.read()
+        except (http.client.HTTPException, OSError) as e:
+            if connection is not None:
+                connection.close()
+            # The server may have closed an idle connection since the last round
+            if result.reused_connection and retry_stale:
+                return self._request(target, retry_stale=False)
+            result.outcome = _error_outcome(e)
+            result.error = str(e) or e.__class__.__name__
+            timings.total = time.monotonic() - started
+            return result
+
+        timings.total = time.monotonic() - started
+        result.status = response.status
+        result.location = response.getheader("Location")
+        result.outcome = classify_response(response.status, result.location)
+        if response.will_close:
+            connection.close()
+        else:
+            self.pool.release(target.host, target.port, connection)
+        return result
+
+    def probe(self, target: ProbeTarget) -> ProbeResult:
+        """Probe one target."""
+        return self._request(target)
+
+    def probe_all(self, targets: List[ProbeTarget]) -> ProbeReport:
+        """Probe every target concurrently."""
+        timestamp = time.time()
+        started = time.monotonic()
+        if not targets:
+            return ProbeReport(timestamp=timestamp)
+
+        workers = max(1, min(self.max_workers, len(targets)))
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="probe"
+        ) as pool:
+            results = list(pool.map(self.probe, targets))
+
+        return ProbeReport(
+            results=results,
+            wall_seconds=time.monotonic() - started,
+            timestamp=timestamp,
+        )
+
+    def probe_services(self, services: List[ServiceConfig]) -> ProbeReport:
+        """Probe the external URL of every catalog service."""
+        return self.probe_all([ProbeTarget.from_service(s) for s in services])
+
+    def close(self):
+        self.pool.close()
+
+
+def render_metrics(report: ProbeReport) -> str:
+    """Render a probe report in the Prometheus text exposition format."""
+    prefix = "service_probe"
+    lines = [
+        f"# TYPE {prefix}_up gauge",
+        *(
+            f'{prefix}_up{{service="{r.name}",url="{r.url}"}} {int(r.healthy)}'
+            for r in report.results
+        ),
+        f"# TYPE {prefix}_status_code gauge",
+        *(
+            f'{prefix}_status_code{{service="{r.name}"}} {r.status}'
+            for r in report.results
+            if r.status is not None
+        ),
+        f"# TYPE {prefix}_outcome gauge",
+        *(
+            f'{prefix}_outcome{{service="{r.name}",outcome="{r.outcome}"}} 1'
+            for r in report.results
+        ),
+        f"# TYPE {prefix}_phase_duration_seconds gauge",
+    ]
+    for result in report.results:
+        for phase, seconds in asdict(result.timings).items():
+            lines.append(
+                f'{prefix}_phase_duration_seconds{{service="{result.name}",'
+                f'phase="{phase}"}} {seconds:.6f}'
+            )
+    lines += [
+        f"# TYPE {prefix}_round_duration_seconds gauge",
+        f"{prefix}_round_duration_seconds {report.wall_seconds:.6f}",
+        f"# TYPE {prefix}_last_run_timestamp_seconds gauge",
+        f"{prefix}_last_run_timestamp_seconds {report.timestamp:.3f}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def push_to_gateway(gateway: str, job: str, metrics: str) -> None:
+    """Replace a job's metric group on a Prometheus Pushgateway."""
+    request = urllib.request.Request(
+        f"{gateway.rstrip('/')}/metrics/job/{job}",
+        data=metrics.encode("utf-8"),
+        method="PUT",
+        headers={"Content-Type": "text/plain; version=0.0.4"},
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        response.read()
+
+
+def push_metrics(
+    gateway: str, report: ProbeReport, job: str = DEFAULT_PUSHGATEWAY_JOB
+) -> None:
+    """Replace this job's metric group on a Prometheus Pushgateway."""
+    push_to_gateway(gateway, job, render_metrics(report))
+
+
+def print_report(report: ProbeReport):
+    """Print a probe report for terminal use."""
+    for r in report.results:
+        t = r.timings
+        phases = (
+            f"dns {t.dns * 1000:.0f} / connect {t.connect * 1000:.0f} / "
+            f"tls {t.tls * 1000:.0f} / ttfb {t.ttfb * 1000:.0f} ms"
+        )
+        if r.reused_connection:
+            phases = f"reused / ttfb {t.ttfb * 1000:.0f} ms"
+        mark = "✓" if r.healthy else "✗"
+        detail = f"HTTP {r.status}" if r.reachable else r.error
+        print(f"{mark} {r.name}: {r.outcome} ({detail}; {phases})")
+    print(
+        f"{len(report.healthy)}/{len(report.results)} healthy "
+        f"in {report.wall_seconds:.2f}s"
+    )
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description="Probe catalog services over HTTPS concurrently"
+    )
+    parser.add_argument("--catalog", help="Service catalog path")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument("--verify-tls", action="store_true")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("--json", action="store_true", help="Output in JSON format")
+    output.add_argument(
+        "--metrics", action="store_true", help="Output Prometheus text metrics"
+    )
+    parser.add_argument(
+        "--pushgateway", help="Push metrics to this Prometheus Pushgateway URL"
+    )
+    parser.add_argument("--job", default=DEFAULT_PUSHGATEWAY_JOB)
+    args = parser.parse_args(argv)
+
+    try:
+        catalog = load_catalog(args.catalog)
+    except ServiceCatalogError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+        return
+
+    prober = ServiceProber(args.timeout, args.max_workers, args.verify_tls)
+    try:
+        report = prober.probe_services(catalog.services)
+    finally:
+        prober.close()
+
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    elif args.metrics:
+        sys.stdout.write(render_metrics(report))
+    else:
+        print_report(report)
+
+    if args.pushgateway:
+        try:
+            push_metrics(args.pushgateway, report, args.job)
+        except (urllib.error.URLError, OSError) as e:
+            print(f"✗ Failed to push metrics to {args.pushgateway}: {e}")
+            sys.exit(1)
+            return
+
+    sys.exit(0 if not report.unhealthy else 1)
+
+
+if __name__ == "__main__":
+    main()
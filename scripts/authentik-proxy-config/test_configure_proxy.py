@@ -358,7 +358,7 @@ class TestMainFunction(unittest.TestCase):
         from configure_proxy import main
 
         with patch("sys.exit") as mock_exit:
-            main()
+            main([])
             mock_exit.assert_called_once_with(0)
 
     @patch.dict("os.environ", {})
@@ -368,7 +368,7 @@ class TestMainFunction(unittest.TestCase):
 
         with patch("sys.exit") as mock_exit:
             with patch("builtins.print"):
-                main()
+                main([])
                 mock_exit.assert_called_once_with(1)
 
 
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Authentik Proxy Fleet Reconciler
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from configure_proxy import AuthentikConfig, AuthentikProxyConfigurator
+from fleet_reconcile import (
+    FleetConfigError,
+    FleetReconciler,
+    FleetTarget,
+    load_targets,
+    reconcile_target,
+)
+from service_catalog import REPO_CATALOG_PATH
+
+
+def _target(name, token="test-token"):
+    return FleetTarget(
+        name=name,
+        config=AuthentikConfig(
+            host=f"https://{name}.example.com", token=token, outpost_id=""
+        ),
+        catalog_path=REPO_CATALOG_PATH,
+    )
+
+
+def _configure_by_host(self, outpost_name=None):
+    """Stand-in for configure_all_services keyed off the target host."""
+    host = self.config.host
+    if "broken" in host:
+        raise RuntimeError("connection refused")
+    if "slow" in host:
+        time.sleep(1)
+    return "failing" not in host
+
+
+class TestReconcileTarget(unittest.TestCase):
+    """Test cases for reconciling a single target."""
+
+    def test_exception_is_captured(self):
+        """Test errors raised by the configurator become failed results."""
+        with patch.object(
+            AuthentikProxyConfigurator, "configure_all_services", _configure_by_host
+        ):
+            result = reconcile_target(_target("broken"))
+
+        self.assertFalse(result.success)
+        self.assertEqual(result.error, "RuntimeError: connection refused")
+
+    def test_missing_token(self):
+        """Test a target without a token fails without calling the API."""
+        with patch.object(
+            AuthentikProxyConfigurator, "configure_all_services"
+        ) as mock_configure:
+            result = reconcile_target(_target("alpha", token=""))
+
+        self.assertFalse(result.success)
+        mock_configure.assert_not_called()
+
+    def test_outpost_name_passed_through(self):
+        """Test the target's outpost name reaches the configurator."""
+        target = _target("alpha")
+        target.outpost_name = "custom-outpost"
+
+        with patch.object(
+            AuthentikProxyConfigurator, "configure_all_services", return_value=True
+        ) as mock_configure:
+            self.assertTrue(reconcile_target(target).success)
+
+        mock_configure.assert_called_once_with(outpost_name="custom-outpost")
+
+
+class TestFleetReconciler(unittest.TestCase):
+    """Test cases for concurrent fleet reconciliation."""
+
+    def setUp(self):
+        patcher = patch.object(
+            AuthentikProxyConfigurator, "configure_all_services", _configure_by_host
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_failures_are_isolated(self):
+        """Test one failing target does not affect the others."""
+        targets = [_target("alpha"), _target("broken"), _target("failing")]
+
+        report = FleetReconciler(targets, use_processes=False).run()
+
+        self.assertFalse(report.success)
+        self.assertEqual(
+            [r.name for r in report.results], ["alpha", "broken", "failing"]
+        )
+        self.assertTrue(report.results[0].success)
+        self.assertEqual(report.failed, ["broken", "failing"])
+
+    def test_targets_run_concurrently(self):
+        """Test wall time tracks the slowest target, not the sum."""
+        targets = [_target(f"slow-{i}") for i in range(3)]
+
+        report = FleetReconciler(targets, use_processes=False).run()
+
+        self.assertTrue(report.success)
+        self.assertLess(report.wall_seconds, 2.5)
+        self.assertGreaterEqual(report.serial_seconds, 3)
+
+    def test_timeout_marks_unfinished_targets(self):
+        """Test targets still running at the deadline are reported as timed out."""
+        targets = [_target("alpha"), _target("slow")]
+
+        report = FleetReconciler(targets, timeout=0.2, use_processes=False).run()
+
+        self.assertTrue(report.results[0].success)
+        self.assertFalse(report.results[1].success)
+        self.assertIn("timed out", report.results[1].error)
+
+    def test_timeout_is_per_target(self):
+        """Test targets queued behind others get their own full timeout."""
+        targets = [_target(f"slow-{i}") for i in range(2)]
+
+        report = FleetReconciler(
+            targets, max_workers=1, timeout=1.5, use_processes=False
+        ).run()
+
+        self.assertTrue(report.success)
+        self.assertEqual(report.timed_out, [])
+        self.assertGreaterEqual(report.wall_seconds, 2)
+
+    def test_report_dict(self):
+        """Test the JSON report carries per-target results and timings."""
+        report = FleetReconciler([_target("alpha")], use_processes=False).run()
+        data = report.to_dict()
+
+        self.assertTrue(data["success"])
+        self.assertEqual(data["failed"], [])
+        self.assertEqual(data["targets"][0]["name"], "alpha")
+        self.assertIn("serial_seconds", data)
+
+
+class TestHungTarget(unittest.TestCase):
+    """Test cases for a target whose API never answers."""
+
+    def setUp(self):
+        # Accepts connections at the kernel level but never responds
+        self.listener = socket.socket()
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen(8)
+        self.addCleanup(self.listener.close)
+        port = self.listener.getsockname()[1]
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, "targets.json")
+        with open(self.path, "w") as f:
+            json.dump(
+                {
+                    "targets": [
+                        {
+                            "name": "hung",
+                            "host": f"http://127.0.0.1:{port}",
+                            "token_env": "FLEET_TEST_TOKEN",
+                            "catalog": REPO_CATALOG_PATH,
+                        }
+                    ]
+                },
+                f,
+            )
+
+    def _run(self, *options):
+        script = os.path.join(os.path.dirname(__file__), "fleet_reconcile.py")
+        started = time.monotonic()
+        completed = subprocess.run(
+            [sys.executable, script, self.path, "--timeout", "1", *options],
+            capture_output=True,
+            text=True,
+            timeout=30,
+            env={**os.environ, "FLEET_TEST_TOKEN": "secret"},
+        )
+        return completed, time.monotonic() - started
+
+    def test_timeout_exits_with_worker_processes(self):
+        """Test the CLI exits after the report while a worker process hangs."""
+        completed, elapsed = self._run()
+        self.assertEqual(completed.returncode, 1)
+        self.assertIn("timed out after 1.0s", completed.stdout)
+        self.assertLess(elapsed, 15)
+
+    def test_timeout_exits_with_worker_threads(self):
+        """Test the CLI exits after the report while a worker thread hangs."""
+        completed, elapsed = self._run("--threads")
+        self.assertEqual(completed.returncode, 1)
+        self.assertIn("timed out after 1.0s", completed.stdout)
+        self.assertLess(elapsed, 15)
+
+    def test_json_report_is_parseable(self):
+        """Test --json keeps stdout to the report, with logs on stderr."""
+        completed, _ = self._run("--json")
+        report = json.loads(completed.stdout)
+        self.assertTrue(report["targets"][0]["timed_out"])
+        self.assertIn("hung", completed.stderr)
+
+
+class TestLoadTargets(unittest.TestCase):
+    """Test cases for reading the targets file."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "targets.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _write(self, document):
+        with open(self.path, "w") as f:
+            json.dump(document, f)
+
+    def test_tokens_from_environment(self):
+        """Test tokens are resolved from token_env and catalogs made absolute."""
+        self._write(
+            {
+                "targets": [
+                    {
+                        "name": "home",
+                        "host": "https://auth.example.com/",
+                        "token_env": "FLEET_TEST_TOKEN",
+                        "catalog": "catalog.json",
+                    }
+                ]
+            }
+        )
+
+        with patch.dict(os.environ, {"FLEET_TEST_TOKEN": "secret"}):
+            targets = load_targets(self.path)
+
+        self.assertEqual(targets[0].config.token, "secret")
+        self.assertEqual(targets[0].config.host, "https://auth.example.com")
+        self.assertEqual(
+            targets[0].catalog_path, os.path.join(self.tmpdir.name, "catalog.json")
+        )
+
+    def test_invalid_targets(self):
+        """Test missing fields and duplicate names are rejected."""
+        entry = {"name": "a", "host": "https://a", "token_env": "T"}
+
+        self._write({"targets": [entry, dict(entry)]})
+        with self.assertRaises(FleetConfigError):
+            load_targets(self.path)
+
+        self._write({"targets": [{"name": "a"}]})
+        with self.assertRaises(FleetConfigError):
+            load_targets(self.path)
+
+        self._write({"targets": ["a"]})
+        with self.assertRaisesRegex(FleetConfigError, "must be an object"):
+            load_targets(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Authentik Proxy Reconcile Controller
+"""
+
+import json
+import os
+import tempfile
+import unittest
+import urllib.error
+import urllib.request
+from unittest.mock import MagicMock, patch
+
+from configure_proxy import AuthentikConfig, AuthentikProxyConfigurator
+from proxy_controller import (
+    ControllerMetrics,
+    InventorySnapshot,
+    ProxyReconcileController,
+    serve_health,
+)
+from service_catalog import CatalogWatcher
+
+FLOW = "flow-uuid"
+OUTPOST = "external-456"
+
+
+def _service_entry(name, port=80):
+    return {
+        "name": name,
+        "external_host": f"{name}.example.com",
+        "internal_host": f"{name}.ns",
+        "internal_port": port,
+    }
+
+
+class TestProxyReconcileController(unittest.TestCase):
+    """Test cases for incremental reconcile planning and application."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.catalog_path = os.path.join(self.tmpdir.name, "service-catalog.json")
+        with open(self.catalog_path, "w") as f:
+            json.dump(
+                {"services": [_service_entry("alpha"), _service_entry("beta")]}, f
+            )
+
+        config = AuthentikConfig(
+            host="https://auth.example.com", token="test-token", outpost_id=""
+        )
+        watcher = CatalogWatcher(self.catalog_path)
+        self.configurator = AuthentikProxyConfigurator(config, catalog=watcher.catalog)
+        self.controller = ProxyReconcileController(
+            self.configurator, watcher=watcher, interval=1
+        )
+        self.controller.auth_flow_uuid = FLOW
+        self.controller.outpost_id = OUTPOST
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _converged_snapshot(self):
+        providers = {}
+        for pk, service in enumerate(self.controller.services, start=1):
+            data = self.configurator.build_provider_data(service, FLOW)
+            data["pk"] = pk
+            providers[service.provider_name] = data
+
+        return InventorySnapshot(
+            providers=providers,
+            applications={"alpha": {"slug": "alpha"}, "beta": {"slug": "beta"}},
+            outposts={
+                OUTPOST: {"pk": OUTPOST, "providers": [1, 2]},
+                "embedded-123": {"pk": "embedded-123", "providers": []},
+            },
+        )
+
+    def test_plan_converged_is_empty(self):
+        """Test no changes are planned when observed state matches the catalog."""
+        plan = self.controller.plan(self._converged_snapshot())
+
+        self.assertTrue(plan.empty)
+
+    def test_plan_detects_drift(self):
+        """Test only the drifted service is scheduled for update."""
+        snapshot = self._converged_snapshot()
+        snapshot.providers["beta-proxy"]["internal_host"] = "http://stale:80"
+
+        plan = self.controller.plan(snapshot)
+
+        self.assertEqual([s.name for s in plan.update_providers], ["beta"])
+        self.assertEqual(plan.create_providers, [])
+        self.assertIsNone(plan.outpost_providers)
+
+    def test_plan_missing_provider_and_application(self):
+        """Test missing providers and applications are created."""
+        snapshot = self._converged_snapshot()
+        del snapshot.providers["beta-proxy"]
+        del snapshot.applications["alpha"]
+
+        plan = self.controller.plan(snapshot)
+
+        self.assertEqual([s.name for s in plan.create_providers], ["beta"])
+        self.assertEqual([s.name for s in plan.create_applications], ["alpha"])
+        self.assertEqual(plan.outpost_providers, [1])
+        self.assertEqual(plan.changed_services, ["beta", "alpha"])
+
+    def test_plan_releases_conflicting_outposts(self):
+        """Test managed providers on another outpost are released."""
+        snapshot = self._converged_snapshot()
+        snapshot.outposts["embedded-123"]["providers"] = [2, 99]
+
+        plan = self.controller.plan(snapshot)
+
+        self.assertEqual(plan.release_from, ["embedded-123"])
+
+    def test_apply_batches_outpost_write(self):
+        """Test new providers are assigned in a single outpost update."""
+        snapshot = self._converged_snapshot()
+        del snapshot.providers["beta-proxy"]
+        self.controller.snapshot = snapshot
+        plan = self.controller.plan(snapshot)
+
+        with patch.object(
+            self.configurator, "create_proxy_provider", return_value=7
+        ), patch.object(
+            self.configurator, "create_application", return_value=True
+        ), patch.object(
+            self.configurator, "update_outpost_providers", return_value=True
+        ) as mock_outpost:
+            self.assertTrue(self.controller.apply(plan))
+
+        mock_outpost.assert_called_once_with(OUTPOST, [1, 7])
+
+    def test_reconcile_once_noop(self):
+        """Test a converged pass makes no writes and marks the controller ready."""
+        with patch.object(
+            self.controller,
+            "refresh_inventory",
+            return_value=self._converged_snapshot(),
+        ), patch.object(self.controller, "apply") as mock_apply:
+            self.assertTrue(self.controller.reconcile_once())
+
+        mock_apply.assert_not_called()
+        self.assertTrue(self.controller.ready)
+        self.assertEqual(self.controller.metrics.reconciles_total, 1)
+        self.assertEqual(self.controller.metrics.managed_services, 2)
+
+    def test_reconcile_once_outpost_disappeared(self):
+        """Test a vanished outpost triggers re-resolution on the next pass."""
+        snapshot = self._converged_snapshot()
+        del snapshot.outposts[OUTPOST]
+
+        with patch.object(self.controller, "refresh_inventory", return_value=snapshot):
+            self.assertFalse(self.controller.reconcile_once())
+
+        self.assertIsNone(self.controller.outpost_id)
+        self.assertEqual(self.controller.metrics.reconcile_errors_total, 1)
+
+    def test_refresh_inventory_indexes(self):
+        """Test the inventory snapshot is indexed by name, slug and pk."""
+        responses = {
+            "/api/v3/providers/proxy/": [{"name": "alpha-proxy", "pk": 1}],
+            "/api/v3/core/applications/": [{"slug": "alpha", "name": "alpha"}],
+            "/api/v3/outposts/instances/": [{"pk": OUTPOST, "providers": [1]}],
+        }
+
+        with patch.object(
+            self.configurator, "list_all", side_effect=lambda path: responses[path]
+        ):
+            snapshot = self.controller.refresh_inventory()
+
+        self.assertIn("alpha-proxy", snapshot.providers)
+        self.assertIn("alpha", snapshot.applications)
+        self.assertIn(OUTPOST, snapshot.outposts)
+
+
+class TestListAll(unittest.TestCase):
+    """Test cases for paginated Authentik listing."""
+
+    def test_follows_pagination(self):
+        """Test list_all follows pagination.next until it is zero."""
+        config = AuthentikConfig(
+            host="https://auth.example.com", token="t", outpost_id=""
+        )
+        configurator = AuthentikProxyConfigurator(config, catalog=MagicMock())
+
+        with patch.object(configurator, "_make_api_request") as mock_api:
+            mock_api.side_effect = [
+                (200, {"results": [{"pk": 1}], "pagination": {"next": 2}}),
+                (200, {"results": [{"pk": 2}], "pagination": {"next": 0}}),
+            ]
+            results = configurator.list_all("/api/v3/providers/proxy/")
+
+        self.assertEqual(results, [{"pk": 1}, {"pk": 2}])
+        self.assertIn("page=2", mock_api.call_args_list[1][0][0])
+
+
+class TestHealthServer(unittest.TestCase):
+    """Test cases for the health and metrics endpoints."""
+
+    def setUp(self):
+        self.controller = MagicMock()
+        self.controller.metrics = ControllerMetrics()
+        self.controller.healthy.return_value = True
+        self.controller.ready = False
+        self.server = serve_health(self.controller, 0)
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _get(self, path):
+        try:
+            with urllib.request.urlopen(self.base + path) as response:
+                return response.getcode(), response.read().decode("utf-8")
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode("utf-8")
+
+    def test_endpoints(self):
+        """Test /healthz, /readyz and /metrics responses."""
+        self.controller.metrics.record(0.5, True, 2)
+
+        self.assertEqual(self._get("/healthz")[0], 200)
+        self.assertEqual(self._get("/readyz")[0], 503)
+
+        status, body = self._get("/metrics")
+        self.assertEqual(status, 200)
+        self.assertIn("authentik_proxy_controller_reconciles_total 1", body)
+        self.assertIn("authentik_proxy_controller_services_reconciled_total 2", body)
+
+        self.assertEqual(self._get("/missing")[0], 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
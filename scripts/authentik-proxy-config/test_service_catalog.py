@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Authentik Service Catalog
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from service_catalog import (
+    REPO_CATALOG_PATH,
+    CatalogWatcher,
+    ServiceCatalog,
+    ServiceCatalogError,
+    ServiceConfig,
+    load_catalog,
+    resolve_catalog_path,
+    validate_catalog,
+)
+
+
+def _write_catalog(path, services):
+    with open(path, "w") as f:
+        json.dump({"version": 1, "services": services}, f)
+
+
+class TestServiceConfig(unittest.TestCase):
+    """Test cases for ServiceConfig dataclass."""
+
+    def test_default_provider_name(self):
+        """Test provider name defaults to <name>-proxy."""
+        service = ServiceConfig(
+            "grafana", "grafana.example.com", "grafana.monitoring", 80
+        )
+
+        self.assertEqual(service.provider_name, "grafana-proxy")
+        self.assertEqual(service.external_url, "https://grafana.example.com")
+        self.assertEqual(service.internal_url, "http://grafana.monitoring:80")
+
+    def test_explicit_provider_name(self):
+        """Test an explicit provider name is kept."""
+        service = ServiceConfig(
+            "grafana", "g.example.com", "g.monitoring", 80, "g-proxy"
+        )
+
+        self.assertEqual(service.provider_name, "g-proxy")
+
+
+class TestValidateCatalog(unittest.TestCase):
+    """Test cases for catalog schema validation."""
+
+    def test_valid_document(self):
+        """Test a well-formed document has no errors."""
+        document = {
+            "version": 1,
+            "services": [
+                {
+                    "name": "hubble",
+                    "external_host": "hubble.example.com",
+                    "internal_host": "hubble-ui.kube-system",
+                    "internal_port": 80,
+                }
+            ],
+        }
+
+        self.assertEqual(validate_catalog(document), [])
+
+    def test_missing_and_mistyped_fields(self):
+        """Test missing fields, wrong types and unknown fields are reported."""
+        document = {
+            "services": [
+                {"name": "hubble", "internal_port": "80", "colour": "blue"},
+            ]
+        }
+
+        errors = validate_catalog(document)
+
+        self.assertIn("services[0]: missing required field 'external_host'", errors)
+        self.assertIn("services[0]: field 'internal_port' must be int", errors)
+        self.assertIn("services[0]: unknown fields ['colour']", errors)
+
+    def test_duplicate_names_and_bad_port(self):
+        """Test duplicate service names and out-of-range ports are reported."""
+        entry = {
+            "name": "hubble",
+            "external_host": "hubble.example.com",
+            "internal_host": "hubble-ui.kube-system",
+            "internal_port": 70000,
+        }
+
+        errors = validate_catalog({"services": [entry, dict(entry)]})
+
+        self.assertIn("services[0]: internal_port 70000 out of range", errors)
+        self.assertIn("services[1]: duplicate service name 'hubble'", errors)
+        self.assertIn("services[1]: duplicate provider name 'hubble-proxy'", errors)
+
+    def test_not_a_mapping(self):
+        """Test a non-mapping document is rejected."""
+        self.assertEqual(len(validate_catalog([])), 1)
+
+
+class TestServiceCatalog(unittest.TestCase):
+    """Test cases for ServiceCatalog indexes."""
+
+    def test_indexes(self):
+        """Test lookups by service name and provider name."""
+        catalog = ServiceCatalog(
+            [
+                ServiceConfig("a", "a.example.com", "a.ns", 80),
+                ServiceConfig("b", "b.example.com", "b.ns", 80, "custom-b"),
+            ]
+        )
+
+        self.assertEqual(len(catalog), 2)
+        self.assertIn("a", catalog)
+        self.assertEqual(catalog.get("b").provider_name, "custom-b")
+        self.assertEqual(catalog.get_by_provider("a-proxy").name, "a")
+        self.assertIsNone(catalog.get_by_provider("b-proxy"))
+        self.assertEqual(catalog.provider_names, ["a-proxy", "custom-b"])
+
+    def test_from_document_invalid(self):
+        """Test invalid documents raise ServiceCatalogError with details."""
+        with self.assertRaises(ServiceCatalogError) as ctx:
+            ServiceCatalog.from_document({"services": [{}]})
+
+        self.assertTrue(ctx.exception.errors)
+
+
+class TestLoadCatalog(unittest.TestCase):
+    """Test cases for loading, caching and watching catalog files."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "service-catalog.json")
+        _write_catalog(
+            self.path,
+            [
+                {
+                    "name": "a",
+                    "external_host": "a.example.com",
+                    "internal_host": "a.ns",
+                    "internal_port": 80,
+                }
+            ],
+        )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_repository_catalog(self):
+        """Test the repository catalog is valid and has the proxied services."""
+        catalog = load_catalog(REPO_CATALOG_PATH)
+
+        self.assertEqual(
+            catalog.names,
+            [
+                "longhorn",
+                "grafana",
+                "prometheus",
+                "alertmanager",
+                "dashboard",
+                "hubble",
+            ],
+        )
+        self.assertEqual(
+            catalog.get("grafana").internal_host,
+            "kube-prometheus-stack-grafana.monitoring",
+        )
+
+    def test_parsed_once(self):
+        """Test repeated loads return the cached catalog."""
+        self.assertIs(load_catalog(self.path), load_catalog(self.path))
+
+    def test_missing_file(self):
+        """Test a missing file raises ServiceCatalogError."""
+        with self.assertRaises(ServiceCatalogError):
+            load_catalog(os.path.join(self.tmpdir.name, "missing.json"))
+
+    def test_resolve_from_environment(self):
+        """Test SERVICE_CATALOG_PATH overrides the default location."""
+        os.environ["SERVICE_CATALOG_PATH"] = self.path
+        try:
+            self.assertEqual(resolve_catalog_path(), self.path)
+        finally:
+            del os.environ["SERVICE_CATALOG_PATH"]
+
+    def test_watcher_detects_changes(self):
+        """Test the watcher reloads the catalog after the file changes."""
+        watcher = CatalogWatcher(self.path)
+        self.assertIsNone(watcher.poll())
+
+        _write_catalog(
+            self.path,
+            [
+                {
+                    "name": "a",
+                    "external_host": "a.example.com",
+                    "internal_host": "a.ns",
+                    "internal_port": 80,
+                },
+                {
+                    "name": "b",
+                    "external_host": "b.example.com",
+                    "internal_host": "b.ns",
+                    "internal_port": 8080,
+                },
+            ],
+        )
+        os.utime(self.path, ns=(0, 10**9))
+
+        catalog = watcher.poll()
+
+        self.assertIsNotNone(catalog)
+        self.assertEqual(catalog.names, ["a", "b"])
+        self.assertIs(load_catalog(self.path), catalog)
+
+
+if __name__ == "__main__":
+    unittest.main()
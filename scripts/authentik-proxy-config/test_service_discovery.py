@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Authentik Proxy Service Discovery
+"""
+
+import io
+import json
+import threading
+import unittest
+import urllib.parse
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from configure_proxy import AuthentikConfig
+from kube_api import KubernetesClient, KubernetesConfig
+from service_catalog import ServiceCatalog, ServiceConfig
+from service_discovery import (
+    INGRESSES_PATH,
+    SERVICES_PATH,
+    DiscoveryResult,
+    ServiceDiscovery,
+    main,
+    merge_catalog,
+    reconcile_catalog,
+    service_from_ingress,
+    service_from_service,
+)
+
+
+def _service(name, namespace="apps", ports=None, annotations=None):
+    return {
+        "metadata": {
+            "name": name,
+            "namespace": namespace,
+            "annotations": {
+                f"proxy.authentik.io/{k}": v for k, v in (annotations or {}).items()
+            },
+        },
+        "spec": {"ports": ports if ports is not None else [{"port": 80}]},
+    }
+
+
+def _ingress(name, host, backend, port, namespace="apps"):
+    return {
+        "metadata": {"name": name, "namespace": namespace},
+        "spec": {
+            "rules": [
+                {
+                    "host": host,
+                    "http": {
+                        "paths": [
+                            {"backend": {"service": {"name": backend, "port": port}}}
+                        ]
+                    },
+                }
+            ]
+        },
+    }
+
+
+class FakeKubernetes:
+    """Local API server that serves list calls one item per page."""
+
+    def __init__(self, collections):
+        self.collections = collections
+        self.requests = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urllib.parse.urlparse(self.path)
+                query = dict(urllib.parse.parse_qsl(url.query))
+                fake.requests.append((url.path, query))
+
+                items = fake.collections.get(url.path, [])
+                offset = int(query.get("continue", 0))
+                body = {"items": items[offset : offset + 1], "metadata": {}}
+                if offset + 1 < len(items):
+                    body["metadata"]["continue"] = str(offset + 1)
+
+                payload = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestMapping(unittest.TestCase):
+    """Test cases for mapping Kubernetes objects to ServiceConfig."""
+
+    def test_service_defaults(self):
+        """Test a bare labelled Service uses its name, domain and first port."""
+        service, reason = service_from_service(
+            _service("grafana", "monitoring"), domain="example.com"
+        )
+
+        self.assertIsNone(reason)
+        self.assertEqual(service.external_host, "grafana.example.com")
+        self.assertEqual(service.internal_url, "http://grafana.monitoring:80")
+        self.assertEqual(service.provider_name, "grafana-proxy")
+
+    def test_service_annotations(self):
+        """Test annotations override the name, host and port by name."""
+        obj = _service(
+            "kube-prometheus-stack-alertmanager",
+            ports=[{"name": "reloader", "port": 8080}, {"name": "web", "port": 9093}],
+            annotations={
+                "name": "alertmanager",
+                "external-host": "alerts.example.com",
+                "port": "web",
+            },
+        )
+
+        service, _ = service_from_service(obj)
+
+        self.assertEqual(service.name, "alertmanager")
+        self.assertEqual(service.external_host, "alerts.example.com")
+        self.assertEqual(service.internal_port, 9093)
+
+    def test_service_unknown_port(self):
+        """Test a Service without the annotated port is skipped."""
+        service, reason = service_from_service(_service("x", annotations={"port": "9"}))
+
+        self.assertIsNone(service)
+        self.assertEqual(reason, "no port 9 on Service")
+
+    def test_ingress_named_port(self):
+        """Test Ingress backend port names resolve against listed Services."""
+        backend = _service("hubble-ui", ports=[{"name": "http", "port": 8081}])
+        ingress = _ingress(
+            "hubble", "hubble.example.com", "hubble-ui", {"name": "http"}
+        )
+
+        service, _ = service_from_ingress(ingress, {("apps", "hubble-ui"): backend})
+
+        self.assertEqual(service.external_host, "hubble.example.com")
+        self.assertEqual(service.internal_url, "http://hubble-ui.apps:8081")
+
+    def test_ingress_unresolved_port(self):
+        """Test an unlabelled backend with a named port is skipped."""
+        ingress = _ingress(
+            "hubble", "hubble.example.com", "hubble-ui", {"name": "http"}
+        )
+
+        service, reason = service_from_ingress(ingress, {})
+
+        self.assertIsNone(service)
+        self.assertIn("hubble-ui", reason)
+
+
+class TestServiceDiscovery(unittest.TestCase):
+    """Test cases for listing labelled objects from the API server."""
+
+    def setUp(self):
+        self.fake = FakeKubernetes(
+            {
+                SERVICES_PATH: [
+                    _service("longhorn-frontend", "longhorn-system"),
+                    _service("hubble-ui", "kube-system"),
+                    _service("broken", ports=[]),
+                ],
+                INGRESSES_PATH: [
+                    _ingress(
+                        "hubble-ui",
+                        "hubble.example.com",
+                        "hubble-ui",
+                        {"number": 80},
+                        namespace="kube-system",
+                    )
+                ],
+            }
+        )
+        client = KubernetesClient(KubernetesConfig(self.fake.url))
+        self.discovery = ServiceDiscovery(client, domain="example.com")
+
+    def tearDown(self):
+        self.fake.close()
+
+    def test_discover_paginates_with_selector(self):
+        """Test every page is fetched with the label selector."""
+        result = self.discovery.discover()
+
+        self.assertEqual(result.objects_listed, 4)
+        for _, query in self.fake.requests:
+            self.assertEqual(query["labelSelector"], "proxy.authentik.io/enabled=true")
+        service_pages = [q for p, q in self.fake.requests if p == SERVICES_PATH]
+        self.assertEqual(len(service_pages), 3)
+
+    def test_discover_prefers_ingress(self):
+        """Test an Ingress wins over its labelled Service of the same name."""
+        result = self.discovery.discover()
+
+        by_name = {s.name: s for s in result.services}
+        self.assertEqual(sorted(by_name), ["hubble-ui", "longhorn-frontend"])
+        self.assertEqual(by_name["hubble-ui"].external_host, "hubble.example.com")
+        self.assertEqual(len(result.skipped), 2)
+
+    def test_json_output_is_parseable(self):
+        """Test --json writes only the result to stdout, with logs elsewhere."""
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            main(["--api-server", self.fake.url, "--no-catalog", "--dry-run", "--json"])
+
+        result = json.loads(stdout.getvalue())
+        self.assertEqual(len(result["services"]), 2)
+
+
+class TestReconcile(unittest.TestCase):
+    """Test cases for merging and reconciling discovered services."""
+
+    def test_merge_keeps_static_entries(self):
+        """Test discovered services never replace catalog entries."""
+        static = ServiceCatalog([ServiceConfig("grafana", "g.example.com", "g", 80)])
+        result = DiscoveryResult(
+            services=[
+                ServiceConfig("grafana", "other.example.com", "other", 80),
+                ServiceConfig("hubble", "h.example.com", "h", 80),
+            ]
+        )
+
+        catalog = merge_catalog(static, result)
+
+        self.assertEqual(catalog.names, ["grafana", "hubble"])
+        self.assertEqual(catalog.get("grafana").external_host, "g.example.com")
+        self.assertEqual(result.skipped, ["grafana: already in the service catalog"])
+
+    def test_single_outpost_write(self):
+        """Test N new services are assigned to the outpost in one write."""
+        catalog = ServiceCatalog(
+            [ServiceConfig(f"svc{i}", f"svc{i}.example.com", "h", 80) for i in range(5)]
+        )
+        config = AuthentikConfig(
+            host="https://auth.example.com", token="t", outpost_id=""
+        )
+        outpost = {"pk": "outpost-1", "providers": []}
+
+        with patch(
+            "configure_proxy.AuthentikProxyConfigurator.test_authentication",
+            return_value=True,
+        ), patch(
+            "configure_proxy.AuthentikProxyConfigurator.get_authorization_flow",
+            return_value="flow",
+        ), patch(
+            "configure_proxy.AuthentikProxyConfigurator.get_or_create_outpost",
+            return_value="outpost-1",
+        ), patch(
+            "configure_proxy.AuthentikProxyConfigurator.list_all",
+            side_effect=lambda path: [outpost] if "outposts" in path else [],
+        ), patch(
+            "configure_proxy.AuthentikProxyConfigurator.create_proxy_provider",
+            side_effect=range(10, 15),
+        ), patch(
+            "configure_proxy.AuthentikProxyConfigurator.create_application",
+            return_value=True,
+        ), patch(
+            "configure_proxy.AuthentikProxyConfigurator.update_outpost_providers",
+            return_value=True,
+        ) as mock_outpost:
+            self.assertTrue(reconcile_catalog(config, catalog, "outpost"))
+
+        mock_outpost.assert_called_once_with("outpost-1", [10, 11, 12, 13, 14])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Service Reachability Prober
+"""
+
+import os
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from service_catalog import ServiceConfig
+from service_prober import (
+    ProbeOutcome,
+    ProbeTarget,
+    ServiceProber,
+    classify_response,
+    render_metrics,
+)
+
+
+def _self_signed_cert(directory):
+    cert = os.path.join(directory, "cert.pem")
+    key = os.path.join(directory, "key.pem")
+    subprocess.run(
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-subj",
+            "/CN=localhost",
+            "-days",
+            "1",
+            "-keyout",
+            key,
+            "-out",
+            cert,
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+class FakeIngress:
+    """Local keep-alive HTTPS server answering HEAD with a fixed status."""
+
+    def __init__(self, cert, key, status=302, delay=0.0, location=None):
+        self.connections = 0
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                fake.connections += 1
+                super().setup()
+
+            def do_HEAD(self):
+                time.sleep(delay)
+                self.send_response(status)
+                if location:
+                    self.send_header("Location", location)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        self.server.socket = context.wrap_socket(self.server.socket, server_side=True)
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@unittest.skipUnless(shutil.which("openssl"), "openssl is required for the test CA")
+class TestServiceProber(unittest.TestCase):
+    """Test cases for concurrent pooled probing."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.cert, cls.key = _self_signed_cert(cls.tmpdir.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def setUp(self):
+        self.servers = []
+        self.prober = ServiceProber(timeout=2)
+
+    def tearDown(self):
+        self.prober.close()
+        for server in self.servers:
+            server.close()
+
+    def _server(self, **kwargs):
+        server = FakeIngress(self.cert, self.key, **kwargs)
+        self.servers.append(server)
+        return server
+
+    def test_connection_reused_across_rounds(self):
+        """Test a second round reuses the keep-alive connection."""
+        server = self._server()
+        target = ProbeTarget("grafana", "127.0.0.1", server.port)
+
+        first = self.prober.probe(target)
+        second = self.prober.probe(target)
+
+        self.assertTrue(first.reachable)
+        self.assertEqual(first.status, 302)
+        self.assertFalse(first.reused_connection)
+        self.assertTrue(second.reused_connection)
+        self.assertEqual(server.connections, 1)
+
+    def test_phase_timings(self):
+        """Test new connections time every phase and reused ones skip setup."""
+        server = self._server(delay=0.05)
+        target = ProbeTarget("grafana", "127.0.0.1", server.port)
+
+        first = self.prober.probe(target).timings
+        second = self.prober.probe(target).timings
+
+        self.assertGreater(first.tls, 0)
+        self.assertGreaterEqual(first.ttfb, 0.05)
+        self.assertGreaterEqual(first.total, first.tls + first.ttfb)
+        self.assertEqual((second.dns, second.connect, second.tls), (0, 0, 0))
+        self.assertGreaterEqual(second.ttfb, 0.05)
+
+    def test_auth_redirect_vs_upstream_error(self):
+        """Test a login redirect is healthy and an upstream 5xx is not."""
+        login = self._server(
+            location="https://grafana.example.com/outpost.goauthentik.io/start"
+        )
+        broken = self._server(status=502)
+
+        report = self.prober.probe_all(
+            [
+                ProbeTarget("grafana", "127.0.0.1", login.port),
+                ProbeTarget("dashboard", "127.0.0.1", broken.port),
+            ]
+        )
+
+        grafana, dashboard = report.results
+        self.assertEqual(grafana.outcome, ProbeOutcome.AUTH_REDIRECT)
+        self.assertEqual(dashboard.outcome, ProbeOutcome.UPSTREAM_ERROR)
+        self.assertEqual([r.name for r in report.unhealthy], ["dashboard"])
+
+    def test_probe_all_runs_concurrently(self):
+        """Test a round costs about one slow probe, not the sum."""
+        targets = [
+            ProbeTarget(f"svc{i}", "127.0.0.1", self._server(delay=0.3).port)
+            for i in range(4)
+        ]
+
+        report = self.prober.probe_all(targets)
+
+        self.assertEqual(len(report.reachable), 4)
+        self.assertLess(report.wall_seconds, 0.9)
+
+    def test_unreachable_reports_error(self):
+        """Test a closed port is reported as unreachable with an error."""
+        server = self._server()
+        port = server.port
+        server.close()
+        self.servers.remove(server)
+
+        result = self.prober.probe(ProbeTarget("gone", "127.0.0.1", port))
+
+        self.assertFalse(result.reachable)
+        self.assertIsNotNone(result.error)
+        self.assertEqual(result.outcome, ProbeOutcome.CONNECT_ERROR)
+
+    def test_render_metrics(self):
+        """Test the report renders as Prometheus gauges per service and phase."""
+        server = self._server(status=503)
+        report = self.prober.probe_all(
+            [ProbeTarget("grafana", "127.0.0.1", server.port)]
+        )
+
+        metrics = render_metrics(report)
+
+        self.assertIn('service_probe_up{service="grafana",', metrics)
+        self.assertIn('service_probe_status_code{service="grafana"} 503', metrics)
+        self.assertIn('outcome="upstream_error"} 1', metrics)
+        self.assertIn('service="grafana",phase="tls"}', metrics)
+
+    def test_target_from_service(self):
+        """Test catalog services are probed at their external URL."""
+        service = ServiceConfig("grafana", "grafana.example.com", "grafana.ns", 80)
+
+        self.assertEqual(
+            ProbeTarget.from_service(service).url, "https://grafana.example.com/"
+        )
+
+
+class TestClassifyResponse(unittest.TestCase):
+    """Test cases for response classification."""
+
+    def test_classification(self):
+        """Test statuses and redirect targets map to outcomes."""
+        cases = [
+            (200, None, ProbeOutcome.OK),
+            (302, "https://authentik.example.com/if/flow/login/", "auth_redirect"),
+            (301, "https://grafana.example.com/login", ProbeOutcome.REDIRECT),
+            (404, None, ProbeOutcome.CLIENT_ERROR),
+            (504, None, ProbeOutcome.UPSTREAM_ERROR),
+        ]
+        for status, location, expected in cases:
+            self.assertEqual(classify_response(status, location), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
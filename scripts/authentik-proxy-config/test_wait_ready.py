@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Authentik Readiness Waiter
+"""
+
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import islice
+
+from wait_ready import Backoff, ReadinessWaiter
+
+
+class FakeAuthentik:
+    """Local HTTP server whose endpoints become ready after a delay."""
+
+    def __init__(self, ready_after=None, token="good-token"):
+        self.ready_after = ready_after or {}
+        self.token = token
+        self.started = time.monotonic()
+        self.requests = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fake.requests.append(self.path)
+                elapsed = time.monotonic() - fake.started
+                if elapsed < fake.ready_after.get(self.path, 0):
+                    status = 503
+                elif self.path == "/api/v3/core/users/me/" and (
+                    self.headers.get("Authorization") != f"Bearer {fake.token}"
+                ):
+                    status = 403
+                else:
+                    status = 200
+                self.send_response(status)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestBackoff(unittest.TestCase):
+    """Test cases for the backoff schedule."""
+
+    def test_doubles_to_cap(self):
+        """Test delays grow exponentially and stop at the cap."""
+        delays = list(islice(Backoff(0.25, 2.0).delays(), 6))
+
+        self.assertEqual(delays, [0.25, 0.5, 1.0, 2.0, 2.0, 2.0])
+
+
+class TestReadinessWaiter(unittest.TestCase):
+    """Test cases for concurrent readiness probing."""
+
+    def tearDown(self):
+        self.fake.close()
+
+    def test_ready_server_returns_immediately(self):
+        """Test an already-ready server costs one probe per signal."""
+        self.fake = FakeAuthentik()
+        waiter = ReadinessWaiter(self.fake.url, token="good-token")
+
+        report = waiter.wait()
+
+        self.assertTrue(report.ready)
+        self.assertEqual([c.attempts for c in report.checks], [1, 1, 1])
+        self.assertLess(report.elapsed_seconds, 1)
+
+    def test_waits_for_slowest_signal(self):
+        """Test signals are retried independently until all pass."""
+        self.fake = FakeAuthentik(ready_after={"/api/v3/root/config/": 0.3})
+        waiter = ReadinessWaiter(self.fake.url, backoff=Backoff(0.05, 0.1), timeout=5)
+
+        report = waiter.wait()
+
+        self.assertTrue(report.ready)
+        flow, api = report.checks
+        self.assertEqual(flow.attempts, 1)
+        self.assertGreater(api.attempts, 1)
+        self.assertGreaterEqual(api.ready_after_seconds, 0.3)
+        self.assertLess(report.elapsed_seconds, 1)
+
+    def test_token_check_skipped_without_token(self):
+        """Test the token signal is only probed when a token is given."""
+        self.fake = FakeAuthentik()
+        waiter = ReadinessWaiter(self.fake.url)
+
+        self.assertEqual([c.name for c in waiter.checks], ["flow", "api"])
+
+    def test_timeout_reports_failing_signal(self):
+        """Test a rejected token fails the wait with the last error."""
+        self.fake = FakeAuthentik()
+        waiter = ReadinessWaiter(
+            self.fake.url, token="bad-token", backoff=Backoff(0.05, 0.1), timeout=0.3
+        )
+
+        report = waiter.wait()
+
+        self.assertFalse(report.ready)
+        token = report.checks[2]
+        self.assertFalse(token.ready)
+        self.assertEqual(token.last_error, "HTTP 403")
+        self.assertTrue(report.checks[0].ready)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Authentik Readiness Waiter
+
+Waits for the Authentik server to be ready before bootstrap and hook Jobs talk
+to it. Each readiness signal (the initial-setup flow page, the API root config
+and, when a token is given, token authentication) is probed in its own thread,
+starting with short intervals that back off exponentially to a cap. The waiter
+returns as soon as every signal has passed and reports the time-to-ready, so a
+server that is already up costs one round trip instead of a fixed sleep.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Iterator, List, Optional, Tuple
+
+DEFAULT_HOST = "http://authentik-server.authentik.svc.cluster.local:80"
+
+
+@dataclass
+class ReadinessCheck:
+    """One readiness signal probed against the Authentik server."""
+
+    name: str
+    path: str
+    authenticated: bool = False
+
+
+DEFAULT_CHECKS = [
+    ReadinessCheck("flow", "/if/flow/initial-setup/"),
+    ReadinessCheck("api", "/api/v3/root/config/"),
+    ReadinessCheck("token", "/api/v3/core/users/me/", authenticated=True),
+]
+
+
+@dataclass
+class Backoff:
+    """Exponential backoff schedule capped at max_interval."""
+
+    initial_interval: float = 0.25
+    max_interval: float = 5.0
+    factor: float = 2.0
+
+    def delays(self) -> Iterator[float]:
+        delay = self.initial_interval
+        while True:
+            yield delay
+            delay = min(delay * self.factor, self.max_interval)
+
+
+@dataclass
+class CheckResult:
+    """Outcome of waiting for a single readiness signal."""
+
+    name: str
+    ready: bool = False
+    attempts: int = 0
+    ready_after_seconds: Optional[float] = None
+    last_error: Optional[str] = None
+
+
+@dataclass
+class ReadinessReport:
+    """Time-to-ready and per-signal results."""
+
+    ready: bool
+    elapsed_seconds: float
+    checks: List[CheckResult] = field(default_factory=list)
+
+    def to_dict(self):
+        return {
+            "ready": self.ready,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "checks": [asdict(c) for c in self.checks],
+        }
+
+
+class ReadinessWaiter:
+    """Probe Authentik readiness signals concurrently until all pass."""
+
+    def __init__(
+        self,
+        host: str,
+        token: Optional[str] = None,
+        checks: Optional[List[ReadinessCheck]] = None,
+        backoff: Optional[Backoff] = None,
+        timeout: float = 300.0,
+        request_timeout: float = 5.0,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.host = host.rstrip("/")
+        self.token = token
+        checks = DEFAULT_CHECKS if checks is None else checks
+        # Token authentication can only be checked when a token is available
+        self.checks = [c for c in checks if token or not c.authenticated]
+        self.backoff = backoff or Backoff()
+        self.timeout = timeout
+        self.request_timeout = request_timeout
+        self.logger = logger or logging.getLogger("authentik-wait-ready")
+        self._stop = threading.Event()
+
+    def probe(self, check: ReadinessCheck) -> Tuple[bool, Optional[str]]:
+        """Probe one signal once; returns (passed, error)."""
+        headers = {"Accept": "application/json"}
+        if check.authenticated:
+            headers["Authorization"] = f"Bearer {self.token}"
+
+        request = urllib.request.Request(self.host + check.path, headers=headers)
+        try:
+            with urllib.request.urlopen(
+                request, timeout=self.request_timeout
+            ) as response:
+                response.read()
+                return True, None
+        except urllib.error.HTTPError as e:
+            return False, f"HTTP {e.code}"
+        except (urllib.error.URLError, OSError) as e:
+            reason = getattr(e, "reason", e)
+            return False, str(reason)
+
+    def _wait_for(self, check: ReadinessCheck, started: float) -> CheckResult:
+        result = CheckResult(name=check.name)
+        deadline = started + self.timeout
+
+        for delay in self.backoff.delays():
+            result.attempts += 1
+            passed, error = self.probe(check)
+            if passed:
+                result.ready = True
+                result.ready_after_seconds = round(time.monotonic() - started, 3)
+                self.logger.info(
+                    f"✓ {check.name} ready after {result.ready_after_seconds}s "
+                    f"({result.attempts} attempts)"
+                )
+                return result
+
+            result.last_error = error
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self.logger.debug(f"{check.name} not ready ({error}), retry in {delay}s")
+            if self._stop.wait(min(delay, remaining)):
+                break
+
+        return result
+
+    def wait(self) -> ReadinessReport:
+        """Wait until every signal passes or the timeout expires."""
+        started = time.monotonic()
+        self._stop.clear()
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, len(self.checks)), thread_name_prefix="wait-ready"
+        ) as pool:
+            futures = [pool.submit(self._wait_for, c, started) for c in self.checks]
+            results = [f.result() for f in futures]
+
+        return ReadinessReport(
+            ready=all(r.ready for r in results),
+            elapsed_seconds=time.monotonic() - started,
+            checks=results,
+        )
+
+    def stop(self):
+        """Abort an in-progress wait."""
+        self._stop.set()
+
+
+def setup_logging() -> logging.Logger:
+    """Setup logging configuration."""
+    logger = logging.getLogger("authentik-wait-ready")
+    logger.setLevel(logging.INFO)
+
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+
+    return logger
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description="Wait for Authentik to be ready")
+    parser.add_argument(
+        "--host", default=os.environ.get("AUTHENTIK_HOST", DEFAULT_HOST)
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=300.0, help="Give up after this many seconds"
+    )
+    parser.add_argument("--initial-interval", type=float, default=0.25)
+    parser.add_argument("--max-interval", type=float, default=5.0)
+    parser.add_argument(
+        "--no-token",
+        action="store_true",
+        help="Skip the token check even if AUTHENTIK_TOKEN is set",
+    )
+    parser.add_argument("--json", action="store_true", help="Output in JSON format")
+    args = parser.parse_args(argv)
+
+    logger = setup_logging()
+    token = None if args.no_token else os.environ.get("AUTHENTIK_TOKEN")
+
+    waiter = ReadinessWaiter(
+        args.host,
+        token=token,
+        backoff=Backoff(args.initial_interval, args.max_interval),
+        timeout=args.timeout,
+        logger=logger,
+    )
+    logger.info(
+        f"Waiting for Authentik at {waiter.host} "
+        f"({', '.join(c.name for c in waiter.checks)})"
+    )
+    report = waiter.wait()
+
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    elif report.ready:
+        logger.info(f"✓ Authentik ready in {report.elapsed_seconds:.2f}s")
+    else:
+        failed = [f"{c.name}: {c.last_error}" for c in report.checks if not c.ready]
+        logger.error(
+            f"✗ Authentik not ready after {report.elapsed_seconds:.0f}s "
+            f"({'; '.join(failed)})"
+        )
+
+    sys.exit(0 if report.ready else 1)
+
+
+if __name__ == "__main__":
+    main()
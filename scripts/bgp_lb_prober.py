@@ -0,0 +1,700 @@
+#!/usr/bin/env python3
+"""
+BGP LoadBalancer Data-Plane Prober
+
+Probes every LoadBalancer service IP concurrently after BGP or LB-IPAM
+changes. Services, CiliumLoadBalancerIPPools, CiliumBGPAdvertisements and
+CiliumBGPPeeringPolicies are each listed once; every LB IP is then probed
+over TCP connect on each of its service ports, HTTP on web ports, and ICMP
+echo where the host permits unprivileged ICMP sockets. Each probe takes N
+samples and reports loss, latency and jitter (mean difference between
+consecutive samples, as in RFC 3550).
+
+Every IP is cross-checked with the control plane: it must fall inside a
+block of a CiliumLoadBalancerIPPool that selects the service, and its
+LoadBalancerIP must be advertised: by a CiliumBGPAdvertisement of type
+Service (BGPv2), or by a virtual router of a CiliumBGPPeeringPolicy whose
+serviceSelector selects the service (the legacy policy this cluster
+deploys from infrastructure/cilium-bgp). When neither is configured the
+advertisement check is skipped. An IP that is unreachable while advertised
+points at routing or the backend; one that is not advertised explains
+itself.
+
+    bgp_lb_prober.py [--samples 5] [--interval 0.2] [--timeout 2] [--json]
+                     [--no-icmp] [--no-http] [--api-server URL]
+
+All probes run at once, so a round over dozens of services takes about as
+long as the slowest probe's N samples.
+"""
+
+import argparse
+import http.client
+import ipaddress
+import json
+import os
+import socket
+import ssl
+import struct
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from flux_timeout_audit import (
+    FAIL,
+    WARNING,
+    AuditedKind,
+    Finding,
+    api_fetcher,
+    list_kinds,
+)
+
+DEFAULT_SAMPLES = 5
+DEFAULT_INTERVAL = 0.2
+DEFAULT_TIMEOUT = 2.0
+DEFAULT_MAX_WORKERS = 32
+
+TCP = "tcp"
+HTTP = "http"
+ICMP = "icmp"
+
+HTTP_PORTS = {80, 8080}
+HTTPS_PORTS = {443, 8443}
+
+# fmt: off
+COLLECTED_KINDS = [
+    AuditedKind("Service", "v1", "services"),
+    AuditedKind("CiliumLoadBalancerIPPool", "cilium.io/v2alpha1",
+                "ciliumloadbalancerippools"),
+    AuditedKind("CiliumBGPAdvertisement", "cilium.io/v2alpha1",
+                "ciliumbgpadvertisements"),
+    AuditedKind("CiliumBGPPeeringPolicy", "cilium.io/v2alpha1",
+                "ciliumbgppeeringpolicies"),
+]
+# fmt: on
+
+
+def selector_matches(selector: Optional[Dict], labels: Dict[str, str]) -> bool:
+    """Kubernetes label selector semantics; a missing selector matches nothing."""
+    if selector is None:
+        return False
+    for key, value in (selector.get("matchLabels") or {}).items():
+        if labels.get(key) != value:
+            return False
+    for expression in selector.get("matchExpressions") or []:
+        key = expression.get("key")
+        operator = expression.get("operator")
+        values = expression.get("values") or []
+        if operator == "In" and labels.get(key) not in values:
+            return False
+        if operator == "NotIn" and key in labels and labels[key] in values:
+            return False
+        if operator == "Exists" and key not in labels:
+            return False
+        if operator == "DoesNotExist" and key in labels:
+            return False
+    return True
+
+
+def ip_in_block(ip: str, block: Dict) -> bool:
+    """Whether an IP falls in a pool block given as cidr or start/stop."""
+    try:
+        address = ipaddress.ip_address(ip)
+        if block.get("cidr"):
+            return address in ipaddress.ip_network(block["cidr"], strict=False)
+        start = ipaddress.ip_address(block.get("start", ""))
+        stop = ipaddress.ip_address(block.get("stop") or block.get("start", ""))
+        return address.version == start.version and start <= address <= stop
+    except ValueError:
+        return False
+
+
+@dataclass
+class ServicePort:
+    """A TCP port of a LoadBalancer service."""
+
+    port: int
+    name: str = ""
+    app_protocol: str = ""
+
+    @property
+    def scheme(self) -> Optional[str]:
+        """http or https when the port serves web traffic, else None."""
+        hint = f"{self.name} {self.app_protocol}".lower()
+        if "https" in hint or self.port in HTTPS_PORTS:
+            return "https"
+        if "http" in hint or self.port in HTTP_PORTS:
+            return "http"
+        return None
+
+
+@dataclass
+class LBTarget:
+    """A LoadBalancer service and the IPs assigned to it."""
+
+    namespace: str
+    name: str
+    ips: List[str]
+    ports: List[ServicePort]
+    labels: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ref(self) -> str:
+        return f"{self.namespace}/{self.name}"
+
+    @classmethod
+    def from_service(cls, service: Dict) -> "LBTarget":
+        metadata = service.get("metadata", {})
+        ingress = service.get("status", {}).get("loadBalancer", {}).get("ingress")
+        ports = [
+            ServicePort(p["port"], p.get("name", ""), p.get("appProtocol", ""))
+            for p in service.get("spec", {}).get("ports") or []
+            if p.get("protocol", "TCP") == "TCP" and p.get("port")
+        ]
+        return cls(
+            namespace=metadata.get("namespace", ""),
+            name=metadata.get("name", ""),
+            ips=[i["ip"] for i in ingress or [] if i.get("ip")],
+            ports=ports,
+            labels=metadata.get("labels") or {},
+        )
+
+
+@dataclass
+class SampleStats:
+    """Latency samples of one probe."""
+
+    sent: int = 0
+    latencies: List[float] = field(default_factory=list)
+
+    @property
+    def received(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def loss(self) -> float:
+        return 1 - self.received / self.sent if self.sent else 0.0
+
+    @property
+    def avg(self) -> Optional[float]:
+        if not self.latencies:
+            return None
+        return sum(self.latencies) / len(self.latencies)
+
+    @property
+    def jitter(self) -> Optional[float]:
+        """Mean absolute difference between consecutive samples."""
+        if len(self.latencies) < 2:
+            return None
+        pairs = zip(self.latencies, self.latencies[1:])
+        return sum(abs(b - a) for a, b in pairs) / (len(self.latencies) - 1)
+
+    def to_dict(self):
+        def ms(value):
+            return None if value is None else round(value * 1000, 3)
+
+        return {
+            "sent": self.sent,
+            "received": self.received,
+            "loss": round(self.loss, 3),
+            "min_ms": ms(min(self.latencies)) if self.latencies else None,
+            "avg_ms": ms(self.avg),
+            "max_ms": ms(max(self.latencies)) if self.latencies else None,
+            "jitter_ms": ms(self.jitter),
+        }
+
+
+@dataclass
+class ProbeResult:
+    """N samples of one probe against one IP."""
+
+    ip: str
+    probe: str
+    port: Optional[int] = None
+    stats: SampleStats = field(default_factory=SampleStats)
+    status: Optional[int] = None
+    error: Optional[str] = None
+    # The probe could not run here (e.g. ICMP sockets not permitted)
+    skipped: bool = False
+
+    @property
+    def label(self) -> str:
+        return f"{self.probe}/{self.port}" if self.port else self.probe
+
+    def to_dict(self):
+        return {
+            "ip": self.ip,
+            "probe": self.probe,
+            "port": self.port,
+            "status": self.status,
+            "error": self.error,
+            "skipped": self.skipped,
+            **self.stats.to_dict(),
+        }
+
+
+@dataclass
+class ServiceResult:
+    """Probes and control-plane cross-checks of one LoadBalancer service."""
+
+    target: LBTarget
+    pools: Dict[str, str] = field(default_factory=dict)
+    advertisements: List[str] = field(default_factory=list)
+    probes: List[ProbeResult] = field(default_factory=list)
+    findings: List[Finding] = field(default_factory=list)
+
+    @property
+    def healthy(self) -> bool:
+        return not any(f.severity == FAIL for f in self.findings)
+
+    def to_dict(self):
+        return {
+            "namespace": self.target.namespace,
+            "name": self.target.name,
+            "ips": self.target.ips,
+            "healthy": self.healthy,
+            "pools": self.pools,
+            "advertisements": self.advertisements,
+            "probes": [p.to_dict() for p in self.probes],
+            "findings": [f.to_dict() for f in self.findings],
+        }
+
+
+@dataclass
+class LBReport:
+    """Outcome of one probing round."""
+
+    services: List[ServiceResult] = field(default_factory=list)
+    findings: List[Finding] = field(default_factory=list)
+    api_calls: int = 0
+    samples: int = 0
+    wall_seconds: float = 0.0
+
+    @property
+    def all_findings(self) -> List[Finding]:
+        return self.findings + [f for s in self.services for f in s.findings]
+
+    @property
+    def passed(self) -> bool:
+        return not any(f.severity == FAIL for f in self.all_findings)
+
+    def to_dict(self):
+        return {
+            "passed": self.passed,
+            "api_calls": self.api_calls,
+            "samples": self.samples,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "findings": [f.to_dict() for f in self.findings],
+            "services": [s.to_dict() for s in self.services],
+        }
+
+
+def icmp_checksum(data: bytes) -> int:
+    """Internet checksum (RFC 1071)."""
+    if len(data) % 2:
+        data += b"\0"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def echo_request(ipv6: bool, sequence: int, payload: bytes) -> bytes:
+    """ICMP(v6) echo request; the kernel fills in the id (and v6 checksum)."""
+    icmp_type = 128 if ipv6 else 8
+    header = struct.pack("!BBHHH", icmp_type, 0, 0, 0, sequence)
+    if ipv6:
+        return header + payload
+    checksum = icmp_checksum(header + payload)
+    return struct.pack("!BBHHH", icmp_type, 0, checksum, 0, sequence) + payload
+
+
+def icmp_sample(ip: str, timeout: float, sequence: int = 1) -> float:
+    """Round trip of one echo over an unprivileged ICMP datagram socket.
+
+    Raises PermissionError when the host does not allow these sockets
+    (Linux: net.ipv4.ping_group_range) and OSError on timeout.
+    """
+    ipv6 = ipaddress.ip_address(ip).version == 6
+    family = socket.AF_INET6 if ipv6 else socket.AF_INET
+    proto = socket.IPPROTO_ICMPV6 if ipv6 else socket.IPPROTO_ICMP
+    reply_type = 129 if ipv6 else 0
+    payload = os.urandom(16)
+    with socket.socket(family, socket.SOCK_DGRAM, proto) as sock:
+        sock.settimeout(timeout)
+        started = time.perf_counter()
+        sock.sendto(echo_request(ipv6, sequence, payload), (ip, 0))
+        while True:
+            data = sock.recv(2048)
+            # macOS includes the IPv4 header on ICMP datagram sockets
+            if not ipv6 and data and data[0] >> 4 == 4:
+                data = data[(data[0] & 0x0F) * 4 :]
+            if data[:1] == bytes([reply_type]) and data.endswith(payload):
+                return time.perf_counter() - started
+            if time.perf_counter() - started > timeout:
+                raise socket.timeout("timed out")
+
+
+def tcp_sample(ip: str, port: int, timeout: float) -> float:
+    """Time to complete a TCP handshake."""
+    started = time.perf_counter()
+    with socket.create_connection((ip, port), timeout=timeout):
+        return time.perf_counter() - started
+
+
+_UNVERIFIED = ssl.create_default_context()
+_UNVERIFIED.check_hostname = False
+_UNVERIFIED.verify_mode = ssl.CERT_NONE
+
+
+def http_sample(ip: str, port: int, scheme: str, timeout: float) -> Tuple[float, int]:
+    """Time to the response headers of a HEAD request, and its status.
+
+    Certificates are not verified: LB IPs are probed directly, not by name.
+    """
+    if scheme == "https":
+        connection: http.client.HTTPConnection = http.client.HTTPSConnection(
+            ip, port, timeout=timeout, context=_UNVERIFIED
+        )
+    else:
+        connection = http.client.HTTPConnection(ip, port, timeout=timeout)
+    started = time.perf_counter()
+    try:
+        connection.request("HEAD", "/", headers={"User-Agent": "bgp-lb-prober"})
+        response = connection.getresponse()
+        return time.perf_counter() - started, response.status
+    finally:
+        connection.close()
+
+
+class LBProber:
+    """List LoadBalancer services and IPAM objects, probe every IP at once."""
+
+    def __init__(
+        self,
+        fetch: Callable[[AuditedKind], List[Dict]],
+        samples: int = DEFAULT_SAMPLES,
+        interval: float = DEFAULT_INTERVAL,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        icmp: bool = True,
+        http: bool = True,
+    ):
+        self.fetch = fetch
+        self.samples = samples
+        self.interval = interval
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.icmp = icmp
+        self.http = http
+
+    def _sample(self, result: ProbeResult, sample: Callable[[int], float]):
+        for sequence in range(1, self.samples + 1):
+            if sequence > 1:
+                time.sleep(self.interval)
+            result.stats.sent += 1
+            try:
+                result.stats.latencies.append(sample(sequence))
+            except PermissionError as e:
+                if result.probe != ICMP:
+                    result.error = str(e)
+                    continue
+                result.stats.sent = 0
+                result.skipped = True
+                result.error = f"not permitted: {e.strerror or e}"
+                return result
+            except (OSError, http.client.HTTPException) as e:
+                result.error = str(e) or type(e).__name__
+        return result
+
+    def probe(self, ip: str, kind: str, port: Optional[ServicePort] = None):
+        """Take all samples of one probe."""
+        result = ProbeResult(ip, kind, port.port if port else None)
+        if kind == ICMP:
+            return self._sample(result, lambda seq: icmp_sample(ip, self.timeout, seq))
+        if kind == TCP:
+            return self._sample(
+                result, lambda seq: tcp_sample(ip, port.port, self.timeout)
+            )
+
+        def sample(sequence):
+            latency, result.status = http_sample(
+                ip, port.port, port.scheme, self.timeout
+            )
+            return latency
+
+        return self._sample(result, sample)
+
+    def plan(
+        self, targets: List[LBTarget]
+    ) -> List[Tuple[LBTarget, str, str, Optional[ServicePort]]]:
+        """Every probe to run: (target, ip, kind, port)."""
+        probes = []
+        for target in targets:
+            for ip in target.ips:
+                if self.icmp:
+                    probes.append((target, ip, ICMP, None))
+                for port in target.ports:
+                    probes.append((target, ip, TCP, port))
+                    if self.http and port.scheme:
+                        probes.append((target, ip, HTTP, port))
+        return probes
+
+    def run(self) -> LBReport:
+        """List, probe and cross-check every LoadBalancer service."""
+        started = time.monotonic()
+        objects, errors = list_kinds(self.fetch, COLLECTED_KINDS, len(COLLECTED_KINDS))
+        report = LBReport(api_calls=len(COLLECTED_KINDS), samples=self.samples)
+        report.findings.extend(errors)
+
+        targets = [
+            LBTarget.from_service(s)
+            for s in objects.get("Service", [])
+            if s.get("spec", {}).get("type") == "LoadBalancer"
+        ]
+        targets.sort(key=lambda t: t.ref)
+        probes = self.plan(targets)
+        results: Dict[str, List[ProbeResult]] = {t.ref: [] for t in targets}
+        if probes:
+            with ThreadPoolExecutor(
+                max_workers=max(1, min(self.max_workers, len(probes))),
+                thread_name_prefix="probe",
+            ) as pool:
+                futures = [
+                    (target, pool.submit(self.probe, ip, kind, port))
+                    for target, ip, kind, port in probes
+                ]
+                for target, future in futures:
+                    results[target.ref].append(future.result())
+
+        for target in targets:
+            report.services.append(
+                evaluate_service(
+                    target,
+                    results[target.ref],
+                    objects.get("CiliumLoadBalancerIPPool"),
+                    objects.get("CiliumBGPAdvertisement"),
+                    objects.get("CiliumBGPPeeringPolicy"),
+                )
+            )
+        report.wall_seconds = time.monotonic() - started
+        return report
+
+
+def advertised_by(
+    target: LBTarget, advertisements: List[Dict], peering_policies: List[Dict]
+) -> List[str]:
+    """Names of the BGP objects that advertise the service's LoadBalancerIP."""
+    names = []
+    for advertisement in advertisements:
+        for entry in advertisement.get("spec", {}).get("advertisements") or []:
+            service = entry.get("service") or {}
+            if (
+                entry.get("advertisementType") == "Service"
+                and "LoadBalancerIP" in (service.get("addresses") or [])
+                and selector_matches(entry.get("selector"), target.labels)
+            ):
+                names.append(advertisement.get("metadata", {}).get("name", ""))
+                break
+    for policy in peering_policies:
+        for router in policy.get("spec", {}).get("virtualRouters") or []:
+            # serviceAdvertisements defaults to LoadBalancerIP; a router
+            # without a serviceSelector advertises no services
+            if "LoadBalancerIP" in router.get(
+                "serviceAdvertisements", ["LoadBalancerIP"]
+            ) and selector_matches(router.get("serviceSelector"), target.labels):
+                names.append(policy.get("metadata", {}).get("name", ""))
+                break
+    return names
+
+
+def evaluate_service(
+    target: LBTarget,
+    probes: List[ProbeResult],
+    pools: Optional[List[Dict]],
+    advertisements: Optional[List[Dict]],
+    peering_policies: Optional[List[Dict]] = None,
+) -> ServiceResult:
+    """Cross-check one service's IPs with the pools, advertisements and probes.
+
+    pools, advertisements or peering_policies is None when it could not be
+    listed. The pool check is then skipped; an unmatched service is only
+    reported when both BGP kinds were listed and at least one object exists.
+    """
+    result = ServiceResult(target, probes=probes)
+
+    def finding(rule: str, severity: str, message: str, value=None):
+        result.findings.append(
+            Finding(
+                rule,
+                severity,
+                "Service",
+                target.namespace,
+                target.name,
+                message,
+                value,
+            )
+        )
+
+    if not target.ips:
+        finding("pending", WARNING, "no LoadBalancer IP assigned")
+
+    for ip in target.ips:
+        if pools is None:
+            break
+        containing = [
+            p
+            for p in pools
+            if any(ip_in_block(ip, b) for b in p.get("spec", {}).get("blocks") or [])
+        ]
+        if not containing:
+            finding("pool", FAIL, "IP is outside every LoadBalancer IP pool", ip)
+            continue
+        pool = containing[0]
+        result.pools[ip] = pool.get("metadata", {}).get("name", "")
+        spec = pool.get("spec", {})
+        # A pool without a serviceSelector serves every service
+        selector = spec.get("serviceSelector")
+        if spec.get("disabled"):
+            finding("pool", WARNING, "IP pool is disabled", result.pools[ip])
+        elif selector is not None and not selector_matches(selector, target.labels):
+            finding(
+                "pool",
+                WARNING,
+                "IP pool's serviceSelector does not select the service",
+                result.pools[ip],
+            )
+
+    if target.ips:
+        result.advertisements = advertised_by(
+            target, advertisements or [], peering_policies or []
+        )
+        configured = bool(advertisements or peering_policies)
+        listed = advertisements is not None and peering_policies is not None
+        if not result.advertisements and configured and listed:
+            finding("advertisement", FAIL, "LoadBalancerIP is not advertised over BGP")
+
+    for ip in target.ips:
+        tcp = [p for p in probes if p.ip == ip and p.probe == TCP]
+        unreachable = bool(tcp) and all(p.stats.received == 0 for p in tcp)
+        if unreachable:
+            finding("unreachable", FAIL, "no TCP port answered", ip)
+        for probe in probes:
+            if probe.ip != ip or probe.skipped:
+                continue
+            # Already reported as unreachable; ICMP still tells routing apart
+            if unreachable and probe.probe != ICMP:
+                continue
+            if probe.stats.loss:
+                finding(
+                    "loss",
+                    WARNING,
+                    f"{probe.label} lost {probe.stats.loss:.0%} of samples",
+                    probe.error,
+                )
+            if probe.probe == HTTP and probe.status and probe.status >= 500:
+                finding("http", WARNING, f"{probe.label} answered", probe.status)
+    return result
+
+
+def _ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value * 1000:.1f}"
+
+
+def print_report(report: LBReport):
+    """Print the report for terminal use."""
+    print("=== BGP LOADBALANCER DATA PLANE ===")
+    for finding in report.findings:
+        mark = "✗" if finding.severity == FAIL else "⚠"
+        print(f"{mark} {finding.kind}: {finding.message}")
+
+    for service in report.services:
+        target = service.target
+        mark = "✓" if service.healthy else "✗"
+        print()
+        print(f"{mark} {target.ref}: {', '.join(target.ips) or 'pending'}")
+        for ip in target.ips:
+            pool = service.pools.get(ip, "-")
+            advertised = ", ".join(service.advertisements) or "not advertised"
+            print(f"  {ip}: pool {pool}, {advertised}")
+        for probe in service.probes:
+            if probe.skipped:
+                print(f"    {probe.label:<10} skipped ({probe.error})")
+                continue
+            status = f" HTTP {probe.status}" if probe.status else ""
+            print(
+                f"    {probe.label:<10} {probe.stats.received}/{probe.stats.sent} "
+                f"avg {_ms(probe.stats.avg)}ms "
+                f"jitter {_ms(probe.stats.jitter)}ms{status}"
+            )
+        for finding in service.findings:
+            mark = "✗" if finding.severity == FAIL else "⚠"
+            value = f" ({finding.value})" if finding.value not in (None, "") else ""
+            print(f"  {mark} {finding.message}{value}")
+
+    print()
+    failures = sum(1 for f in report.all_findings if f.severity == FAIL)
+    print(
+        f"{len(report.services)} LoadBalancer services, {failures} failures, "
+        f"{report.samples} samples per probe in {report.wall_seconds:.2f}s"
+    )
+    if report.passed:
+        print("✓ All LoadBalancer IPs are advertised and reachable")
+    else:
+        print("✗ LoadBalancer data plane needs attention")
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description="Probe all LoadBalancer IPs concurrently and cross-check BGP"
+    )
+    parser.add_argument(
+        "--api-server",
+        help="List from this Kubernetes API URL (e.g. kubectl proxy) "
+        "instead of the Flux MCP server; token from KUBERNETES_TOKEN",
+    )
+    parser.add_argument(
+        "--samples", type=int, default=DEFAULT_SAMPLES, help="Samples per probe"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help="Seconds between samples of a probe",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=DEFAULT_TIMEOUT, help="Per-sample timeout"
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+        help="Probes run at once",
+    )
+    parser.add_argument("--no-icmp", action="store_true", help="Skip ICMP echo")
+    parser.add_argument("--no-http", action="store_true", help="Skip HTTP probes")
+    parser.add_argument("--json", action="store_true", help="Output in JSON format")
+    args = parser.parse_args(argv)
+
+    report = LBProber(
+        api_fetcher(args.api_server),
+        samples=max(1, args.samples),
+        interval=args.interval,
+        timeout=args.timeout,
+        max_workers=args.max_workers,
+        icmp=not args.no_icmp,
+        http=not args.no_http,
+    ).run()
+
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print_report(report)
+
+    sys.exit(0 if report.passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Cluster State Snapshots
+
+Captures the cluster's resources as normalized objects and diffs two
+captures by object key, to show exactly what a run of `task
+apps:deploy-core` re-created or changed:
+
+    cluster_snapshot.py capture before.jsonl.gz [--namespace kube-system ...]
+    task apps:deploy-core
+    cluster_snapshot.py capture after.jsonl.gz [--namespace kube-system ...]
+    cluster_snapshot.py diff before.jsonl.gz after.jsonl.gz [--json]
+
+Every object keeps its uid, generation and resourceVersion; status,
+managedFields, timestamps and other volatile metadata are dropped, and
+Secret values are replaced by digests so no secret material is written to
+disk. A snapshot is gzip-compressed JSON lines, one object per line sorted
+by key, after a header line.
+
+The diff joins the two snapshots on their keys and classifies each object:
+
+    added / removed   only in one snapshot
+    recreated         same key, different uid (deleted and created again)
+    mutated           same uid, different normalized content; changed
+                      field paths are listed
+    touched           same content, new resourceVersion (status or no-op
+                      writes); counted, not a failure
+
+An idempotent run adds, removes, re-creates and mutates nothing outside the
+--ignore patterns (Helm release secrets are ignored by default: every
+`helm upgrade` writes a new revision).
+"""
+
+import argparse
+import fnmatch
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from flux_timeout_audit import AuditedKind, api_fetcher, list_kinds
+
+FORMAT = "cluster-snapshot/1"
+
+# fmt: off
+SNAPSHOT_KINDS = [
+    AuditedKind("Namespace", "v1", "namespaces"),
+    AuditedKind("Pod", "v1", "pods"),
+    AuditedKind("Service", "v1", "services"),
+    AuditedKind("ConfigMap", "v1", "configmaps"),
+    AuditedKind("Secret", "v1", "secrets"),
+    AuditedKind("ServiceAccount", "v1", "serviceaccounts"),
+    AuditedKind("PersistentVolumeClaim", "v1", "persistentvolumeclaims"),
+    AuditedKind("Deployment", "apps/v1", "deployments"),
+    AuditedKind("DaemonSet", "apps/v1", "daemonsets"),
+    AuditedKind("StatefulSet", "apps/v1", "statefulsets"),
+    AuditedKind("ReplicaSet", "apps/v1", "replicasets"),
+    AuditedKind("Job", "batch/v1", "jobs"),
+    AuditedKind("CronJob", "batch/v1", "cronjobs"),
+    AuditedKind("Role", "rbac.authorization.k8s.io/v1", "roles"),
+    AuditedKind("RoleBinding", "rbac.authorization.k8s.io/v1", "rolebindings"),
+    AuditedKind("ClusterRole", "rbac.authorization.k8s.io/v1", "clusterroles"),
+    AuditedKind("ClusterRoleBinding", "rbac.authorization.k8s.io/v1",
+                "clusterrolebindings"),
+    AuditedKind("CustomResourceDefinition", "apiextensions.k8s.io/v1",
+                "customresourcedefinitions"),
+    AuditedKind("StorageClass", "storage.k8s.io/v1", "storageclasses"),
+    AuditedKind("MutatingWebhookConfiguration", "admissionregistration.k8s.io/v1",
+                "mutatingwebhookconfigurations"),
+    AuditedKind("ValidatingWebhookConfiguration", "admissionregistration.k8s.io/v1",
+                "validatingwebhookconfigurations"),
+]
+# fmt: on
+
+# Metadata that changes without anyone changing the object
+VOLATILE_METADATA = (
+    "managedFields",
+    "creationTimestamp",
+    "selfLink",
+    "uid",
+    "generation",
+    "resourceVersion",
+)
+VOLATILE_ANNOTATIONS = (
+    # Duplicates the applied spec, and is large
+    "kubectl.kubernetes.io/last-applied-configuration",
+    "control-plane.alpha.kubernetes.io/leader",
+)
+
+# Keys expected to change on every deploy: one Helm release secret per upgrade
+DEFAULT_IGNORE = ["Secret/*/sh.helm.release.v1.*"]
+
+
+def object_key(obj: Dict) -> str:
+    """Kind.group/namespace/name, or Kind.group/name when cluster scoped."""
+    api_version = obj.get("apiVersion", "v1")
+    group = api_version.rsplit("/", 1)[0] if "/" in api_version else ""
+    kind = f"{obj.get('kind', '')}.{group}" if group else obj.get("kind", "")
+    metadata = obj.get("metadata", {})
+    if metadata.get("namespace"):
+        return f"{kind}/{metadata['namespace']}/{metadata.get('name', '')}"
+    return f"{kind}/{metadata.get('name', '')}"
+
+
+def _digest(value: Any) -> str:
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+def normalize(obj: Dict) -> Dict:
+    """Copy of an object without status and volatile metadata."""
+    normalized = {k: v for k, v in obj.items() if k != "status"}
+    metadata = {
+        k: v for k, v in obj.get("metadata", {}).items() if k not in VOLATILE_METADATA
+    }
+    annotations = {
+        k: v
+        for k, v in (metadata.get("annotations") or {}).items()
+        if k not in VOLATILE_ANNOTATIONS
+    }
+    if annotations:
+        metadata["annotations"] = annotations
+    else:
+        metadata.pop("annotations", None)
+    normalized["metadata"] = metadata
+    if obj.get("kind") == "Secret":
+        for section in ("data", "stringData"):
+            if section in normalized:
+                normalized[section] = {
+                    k: "sha256:" + _digest(v)
+                    for k, v in (normalized[section] or {}).items()
+                }
+    return normalized
+
+
+@dataclass
+class Entry:
+    """One object of a snapshot."""
+
+    uid: str
+    generation: Optional[int]
+    resource_version: str
+    digest: str
+    object: Optional[Dict] = None
+
+    @classmethod
+    def from_object(cls, obj: Dict, keep_object: bool = True) -> "Entry":
+        metadata = obj.get("metadata", {})
+        normalized = normalize(obj)
+        return cls(
+            uid=metadata.get("uid", ""),
+            generation=metadata.get("generation"),
+            resource_version=metadata.get("resourceVersion", ""),
+            digest=_digest(normalized),
+            object=normalized if keep_object else None,
+        )
+
+
+@dataclass
+class Snapshot:
+    """Normalized objects by key."""
+
+    entries: Dict[str, Entry] = field(default_factory=dict)
+    captured: float = field(default_factory=time.time)
+    errors: List[str] = field(default_factory=list)
+
+    def add(self, obj: Dict, keep_object: bool = True):
+        self.entries[object_key(obj)] = Entry.from_object(obj, keep_object)
+
+    def save(self, path: str):
+        """Write gzip-compressed JSON lines, sorted by key."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.tmp"
+        with gzip.open(temporary, "wt", encoding="utf-8", compresslevel=6) as f:
+            header = {
+                "format": FORMAT,
+                "captured": self.captured,
+                "objects": len(self.entries),
+                "errors": self.errors,
+            }
+            f.write(json.dumps(header) + "\n")
+            for key in sorted(self.entries):
+                entry = self.entries[key]
+                line = [
+                    key,
+                    entry.uid,
+                    entry.generation,
+                    entry.resource_version,
+                    entry.digest,
+                    entry.object,
+                ]
+                f.write(json.dumps(line, separators=(",", ":")) + "\n")
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str) -> "Snapshot":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline() or "{}")
+            if header.get("format") != FORMAT:
+                raise ValueError(f"{path}: not a {FORMAT} snapshot")
+            snapshot = cls(captured=header["captured"], errors=header["errors"])
+            for line in f:
+                key, uid, generation, resource_version, digest, obj = json.loads(line)
+                snapshot.entries[key] = Entry(
+                    uid, generation, resource_version, digest, obj
+                )
+        return snapshot
+
+
+def capture(
+    fetch: Callable[[AuditedKind], List[Dict]],
+    kinds: List[AuditedKind] = SNAPSHOT_KINDS,
+    namespaces: Optional[List[str]] = None,
+    keep_objects: bool = True,
+    max_workers: int = 8,
+) -> Snapshot:
+    """List every kind once, concurrently, into a snapshot.
+
+    With namespaces, namespaced objects outside them are left out; cluster
+    scoped objects are always kept.
+    """
+    objects, errors = list_kinds(
+        fetch, kinds, max_workers, thread_name_prefix="snapshot"
+    )
+    snapshot = Snapshot(errors=[finding.message for finding in errors])
+    for kind in kinds:
+        for item in objects.get(kind.kind, []):
+            item.setdefault("kind", kind.kind)
+            item.setdefault("apiVersion", kind.api_version)
+            namespace = item.get("metadata", {}).get("namespace")
+            if namespaces and namespace and namespace not in namespaces:
+                continue
+            snapshot.add(item, keep_objects)
+    return snapshot
+
+
+def changed_paths(before: Any, after: Any, prefix: str = "", depth: int = 4):
+    """Dotted paths whose values differ; lists and deep values compare whole."""
+    if before == after:
+        return []
+    if not (isinstance(before, dict) and isinstance(after, dict)) or depth == 0:
+        return [prefix or "."]
+    paths = []
+    for key in sorted(set(before) | set(after)):
+        path = f"{prefix}.{key}" if prefix else str(key)
+        paths.extend(changed_paths(before.get(key), after.get(key), path, depth - 1))
+    return paths
+
+
+@dataclass
+class Mutation:
+    """An object whose normalized content changed."""
+
+    key: str
+    paths: List[str]
+    generation: List[Optional[int]]
+
+    def to_dict(self):
+        return {"key": self.key, "paths": self.paths, "generation": self.generation}
+
+
+@dataclass
+class SnapshotDiff:
+    """Keyed differences between two snapshots."""
+
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    recreated: List[str] = field(default_factory=list)
+    mutated: List[Mutation] = field(default_factory=list)
+    touched: List[str] = field(default_factory=list)
+    ignored: int = 0
+    unchanged: int = 0
+    wall_seconds: float = 0.0
+
+    @property
+    def idempotent(self) -> bool:
+        return not (self.added or self.removed or self.recreated or self.mutated)
+
+    def to_dict(self):
+        return {
+            "idempotent": self.idempotent,
+            "added": self.added,
+            "removed": self.removed,
+            "recreated": self.recreated,
+            "mutated": [m.to_dict() for m in self.mutated],
+            "touched": len(self.touched),
+            "ignored": self.ignored,
+            "unchanged": self.unchanged,
+            "wall_seconds": round(self.wall_seconds, 3),
+        }
+
+
+def diff_snapshots(
+    before: Snapshot, after: Snapshot, ignore: List[str] = DEFAULT_IGNORE
+) -> SnapshotDiff:
+    """Classify every key of either snapshot."""
+    started = time.monotonic()
+    result = SnapshotDiff()
+    for key in sorted(before.entries.keys() | after.entries.keys()):
+        if any(fnmatch.fnmatchcase(key, pattern) for pattern in ignore):
+            result.ignored += 1
+            continue
+        old = before.entries.get(key)
+        new = after.entries.get(key)
+        if old is None:
+            result.added.append(key)
+        elif new is None:
+            result.removed.append(key)
+        elif old.uid != new.uid:
+            result.recreated.append(key)
+        elif old.digest != new.digest:
+            paths = (
+                changed_paths(old.object, new.object)
+                if old.object is not None and new.object is not None
+                else []
+            )
+            result.mutated.append(
+                Mutation(key, paths, [old.generation, new.generation])
+            )
+        elif old.resource_version != new.resource_version:
+            result.touched.append(key)
+        else:
+            result.unchanged += 1
+    result.wall_seconds = time.monotonic() - started
+    return result
+
+
+def print_diff(result: SnapshotDiff):
+    """Print the diff for terminal use."""
+    for label, keys in (
+        ("Re-created", result.recreated),
+        ("Added", result.added),
+        ("Removed", result.removed),
+    ):
+        if keys:
+            print(f"{label} ({len(keys)}):")
+            for key in keys:
+                print(f"  ✗ {key}")
+    if result.mutated:
+        print(f"Mutated ({len(result.mutated)}):")
+        for mutation in result.mutated:
+            before, after = mutation.generation
+            generation = f" (generation {before} → {after})" if before != after else ""
+            print(f"  ✗ {mutation.key}{generation}")
+            for path in mutation.paths[:10]:
+                print(f"      {path}")
+            if len(mutation.paths) > 10:
+                print(f"      ... {len(mutation.paths) - 10} more")
+
+    print(
+        f"{result.unchanged} unchanged, {len(result.touched)} touched "
+        f"(status only), {result.ignored} ignored in {result.wall_seconds:.2f}s"
+    )
+    if result.idempotent:
+        print("✓ No objects were re-created or changed")
+    else:
+        print("✗ Objects were re-created or changed")
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description="Capture and diff cluster state")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    capture_parser = commands.add_parser("capture", help="Write a snapshot")
+    capture_parser.add_argument("output", help="Snapshot file (.jsonl.gz)")
+    capture_parser.add_argument(
+        "--namespace",
+        "-n",
+        action="append",
+        help="Only keep namespaced objects in this namespace (repeatable)",
+    )
+    capture_parser.add_argument(
+        "--digest-only",
+        action="store_true",
+        help="Store digests without object bodies (no changed paths in diffs)",
+    )
+    capture_parser.add_argument(
+        "--api-server",
+        help="List from this Kubernetes API URL (e.g. kubectl proxy) "
+        "instead of the Flux MCP server; token from KUBERNETES_TOKEN",
+    )
+
+    diff_parser = commands.add_parser("diff", help="Compare two snapshots")
+    diff_parser.add_argument("before")
+    diff_parser.add_argument("after")
+    diff_parser.add_argument(
+        "--ignore",
+        action="append",
+        default=[],
+        help="Key glob to leave out, e.g. 'Pod/*' (repeatable; added to "
+        "the default Helm release secret pattern)",
+    )
+    diff_parser.add_argument(
+        "--json", action="store_true", help="Output in JSON format"
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "capture":
+        started = time.monotonic()
+        snapshot = capture(
+            api_fetcher(args.api_server),
+            namespaces=args.namespace,
+            keep_objects=not args.digest_only,
+        )
+        snapshot.save(args.output)
+        for error in snapshot.errors:
+            print(f"⚠ {error}", file=sys.stderr)
+        print(
+            f"✓ {len(snapshot.entries)} objects written to {args.output} "
+            f"in {time.monotonic() - started:.2f}s"
+        )
+        sys.exit(1 if snapshot.errors else 0)
+
+    try:
+        before = Snapshot.load(args.before)
+        after = Snapshot.load(args.after)
+    except (OSError, ValueError) as e:
+        print(f"✗ {e}", file=sys.stderr)
+        sys.exit(2)
+    result = diff_snapshots(before, after, DEFAULT_IGNORE + args.ignore)
+    if args.json:
+        print(json.dumps(result.to_dict(), indent=2))
+    else:
+        print_diff(result)
+    sys.exit(0 if result.idempotent else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""
+CloudNativePG Backup Health Collector
+
+Checks that every CNPG Postgres cluster is backed up through the Barman
+Cloud plugin: the cluster is healthy, has the barman-cloud plugin with an
+objectStoreName, that ObjectStore exists, continuous WAL archiving works,
+no deprecated spec.backup.barmanObjectStore is left, a plugin
+ScheduledBackup exists and the last completed backup is recent. The plugin
+pods in cnpg-system must be running.
+
+Clusters, ObjectStores, ScheduledBackups, Backups and the cnpg-system pods
+are each listed once, concurrently, and every check runs in memory. The
+shell version ran five or more `kubectl get -o jsonpath` calls per cluster;
+this costs five list calls however many clusters there are.
+
+    cnpg_backup_health.py [--json | --metrics] [--pushgateway URL]
+                          [--api-server http://127.0.0.1:8001]
+
+Objects are listed through FluxMCPClient by default, or straight from the
+Kubernetes API with --api-server (`kubectl proxy` on a workstation).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+# The Pushgateway client lives with the proxy configuration scripts
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, "authentik-proxy-config"))
+
+from flux_mcp_wrapper import get_condition, parse_timestamp  # noqa: E402
+from flux_timeout_audit import (  # noqa: E402
+    FAIL,
+    WARNING,
+    AuditedKind,
+    Finding,
+    api_fetcher,
+    list_kinds,
+)
+from service_prober import push_to_gateway  # noqa: E402
+
+BARMAN_PLUGIN = "barman-cloud.cloudnative-pg.io"
+PLUGIN_NAMESPACE = "cnpg-system"
+PLUGIN_POD_LABEL = ("app.kubernetes.io/name", "cnpg-barman-plugin")
+HEALTHY_PHASES = {"Cluster in healthy state", "Running"}
+DEFAULT_MAX_BACKUP_AGE_HOURS = 26  # daily schedule plus slack
+DEFAULT_PUSHGATEWAY_JOB = "cnpg-backup-health"
+
+# Clusters that must exist: (namespace, name)
+EXPECTED_CLUSTERS = [
+    ("home-automation", "homeassistant-postgresql"),
+    ("postgresql-system", "postgresql-cluster"),
+]
+
+# fmt: off
+COLLECTED_KINDS = [
+    AuditedKind("Cluster", "postgresql.cnpg.io/v1", "clusters"),
+    AuditedKind("ObjectStore", "barmancloud.cnpg.io/v1", "objectstores"),
+    AuditedKind("ScheduledBackup", "postgresql.cnpg.io/v1", "scheduledbackups",
+                severity_on_error=WARNING),
+    AuditedKind("Backup", "postgresql.cnpg.io/v1", "backups",
+                severity_on_error=WARNING),
+    AuditedKind("Pod", "v1", "pods", PLUGIN_NAMESPACE),
+]
+# fmt: on
+
+
+def _key(obj: Dict):
+    metadata = obj.get("metadata", {})
+    return metadata.get("namespace", ""), metadata.get("name", "")
+
+
+@dataclass
+class ClusterHealth:
+    """Backup state of one Postgres cluster."""
+
+    namespace: str
+    name: str
+    phase: str = ""
+    plugins: List[str] = field(default_factory=list)
+    object_store: str = ""
+    archiving: str = "Unknown"
+    last_archived_wal: str = ""
+    scheduled_backups: List[str] = field(default_factory=list)
+    last_backup: Optional[float] = None
+    findings: List[Finding] = field(default_factory=list)
+
+    @property
+    def healthy(self) -> bool:
+        return not any(f.severity == FAIL for f in self.findings)
+
+    def to_dict(self):
+        return {
+            "namespace": self.namespace,
+            "name": self.name,
+            "healthy": self.healthy,
+            "phase": self.phase,
+            "plugins": self.plugins,
+            "object_store": self.object_store,
+            "continuous_archiving": self.archiving,
+            "last_archived_wal": self.last_archived_wal,
+            "scheduled_backups": self.scheduled_backups,
+            "last_backup": self.last_backup,
+            "findings": [f.to_dict() for f in self.findings],
+        }
+
+
+@dataclass
+class BackupHealthReport:
+    """Outcome of one collection."""
+
+    clusters: List[ClusterHealth] = field(default_factory=list)
+    findings: List[Finding] = field(default_factory=list)
+    plugin_pods_ready: int = 0
+    api_calls: int = 0
+    wall_seconds: float = 0.0
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def all_findings(self) -> List[Finding]:
+        return self.findings + [f for c in self.clusters for f in c.findings]
+
+    @property
+    def passed(self) -> bool:
+        return not any(f.severity == FAIL for f in self.all_findings)
+
+    def to_dict(self):
+        return {
+            "passed": self.passed,
+            "plugin_pods_ready": self.plugin_pods_ready,
+            "api_calls": self.api_calls,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "findings": [f.to_dict() for f in self.findings],
+            "clusters": [c.to_dict() for c in self.clusters],
+        }
+
+
+def evaluate_cluster(
+    cluster: Dict,
+    object_stores: set,
+    scheduled: List[Dict],
+    backups: List[Dict],
+    now: float,
+    max_backup_age: float,
+) -> ClusterHealth:
+    """Run every check for one cluster against the listed objects."""
+    namespace, name = _key(cluster)
+    spec = cluster.get("spec", {})
+    status = cluster.get("status", {})
+    health = ClusterHealth(namespace, name, phase=status.get("phase", ""))
+
+    def finding(rule: str, severity: str, message: str, value=None):
+        health.findings.append(
+            Finding(rule, severity, "Cluster", namespace, name, message, value)
+        )
+
+    if health.phase not in HEALTHY_PHASES:
+        finding("phase", FAIL, "cluster is not healthy", health.phase or None)
+
+    plugins = spec.get("plugins") or []
+    health.plugins = [p.get("name", "") for p in plugins]
+    barman = next((p for p in plugins if p.get("name") == BARMAN_PLUGIN), None)
+    if barman is None:
+        finding("plugin", FAIL, f"missing {BARMAN_PLUGIN} plugin")
+    else:
+        health.object_store = (barman.get("parameters") or {}).get(
+            "objectStoreName", ""
+        )
+        if not health.object_store:
+            finding("object-store", FAIL, "no objectStoreName configured")
+        elif (namespace, health.object_store) not in object_stores:
+            finding(
+                "object-store",
+                FAIL,
+                "ObjectStore not found",
+                health.object_store,
+            )
+
+    if (spec.get("backup") or {}).get("barmanObjectStore"):
+        finding("deprecated", FAIL, "still has deprecated barmanObjectStore")
+
+    archiving = get_condition(cluster, "ContinuousArchiving")
+    health.archiving = archiving.get("status", "Unknown")
+    health.last_archived_wal = status.get("lastArchivedWAL", "")
+    if health.archiving == "False":
+        finding("archiving", FAIL, "WAL archiving failing", archiving.get("message"))
+    elif health.archiving != "True":
+        finding("archiving", WARNING, "WAL archiving status unknown")
+
+    mine = [
+        s
+        for s in scheduled
+        if _key(s)[0] == namespace
+        and (s.get("spec", {}).get("cluster") or {}).get("name") == name
+    ]
+    health.scheduled_backups = sorted(_key(s)[1] for s in mine)
+    active = [s for s in mine if not s.get("spec", {}).get("suspend")]
+    if not active:
+        finding("scheduled-backup", WARNING, "no active ScheduledBackup")
+    for s in active:
+        if s.get("spec", {}).get("method") != "plugin":
+            finding(
+                "scheduled-backup",
+                WARNING,
+                "ScheduledBackup does not use the plugin method",
+                _key(s)[1],
+            )
+
+    completed = [
+        parse_timestamp(b.get("status", {}).get("stoppedAt"))
+        for b in backups
+        if _key(b)[0] == namespace
+        and (b.get("spec", {}).get("cluster") or {}).get("name") == name
+        and b.get("status", {}).get("phase") == "completed"
+    ]
+    completed = [t for t in completed if t is not None]
+    health.last_backup = max(completed) if completed else None
+    if health.last_backup is None:
+        finding("last-backup", WARNING, "no completed backup")
+    elif now - health.last_backup > max_backup_age:
+        hours = (now - health.last_backup) / 3600
+        finding("last-backup", WARNING, f"last completed backup {hours:.0f}h ago")
+    return health
+
+
+def evaluate(
+    objects: Dict[str, List[Dict]],
+    expected=EXPECTED_CLUSTERS,
+    now: Optional[float] = None,
+    max_backup_age: float = DEFAULT_MAX_BACKUP_AGE_HOURS * 3600,
+) -> BackupHealthReport:
+    """Evaluate every check against the listed objects, in memory."""
+    now = time.time() if now is None else now
+    report = BackupHealthReport()
+    clusters = objects.get("Cluster", [])
+    object_stores = {_key(o) for o in objects.get("ObjectStore", [])}
+
+    label, value = PLUGIN_POD_LABEL
+    plugin_pods = [
+        p
+        for p in objects.get("Pod", [])
+        if (p.get("metadata", {}).get("labels") or {}).get(label) == value
+    ]
+    report.plugin_pods_ready = sum(
+        1
+        for p in plugin_pods
+        if p.get("status", {}).get("phase") == "Running"
+        and get_condition(p).get("status") == "True"
+    )
+    if "Pod" in objects and not report.plugin_pods_ready:
+        report.findings.append(
+            Finding(
+                "plugin-pods",
+                FAIL,
+                "Pod",
+                PLUGIN_NAMESPACE,
+                value,
+                f"no ready barman plugin pods ({len(plugin_pods)} found)",
+            )
+        )
+
+    if "Cluster" in objects:
+        present = {_key(c) for c in clusters}
+        for namespace, name in expected:
+            if (namespace, name) not in present:
+                report.findings.append(
+                    Finding("exists", FAIL, "Cluster", namespace, name, "not found")
+                )
+
+    for cluster in sorted(clusters, key=_key):
+        report.clusters.append(
+            evaluate_cluster(
+                cluster,
+                object_stores,
+                objects.get("ScheduledBackup", []),
+                objects.get("Backup", []),
+                now,
+                max_backup_age,
+            )
+        )
+    return report
+
+
+class BackupHealthCollector:
+    """List every collected kind once, concurrently, then evaluate."""
+
+    def __init__(
+        self,
+        fetch: Callable[[AuditedKind], List[Dict]],
+        kinds: List[AuditedKind] = COLLECTED_KINDS,
+        max_backup_age: float = DEFAULT_MAX_BACKUP_AGE_HOURS * 3600,
+    ):
+        self.fetch = fetch
+        self.kinds = kinds
+        self.max_backup_age = max_backup_age
+
+    def run(self) -> BackupHealthReport:
+        """Collect and evaluate the backup health of every cluster."""
+        started = time.monotonic()
+        objects, errors = list_kinds(
+            self.fetch, self.kinds, len(self.kinds), thread_name_prefix="cnpg"
+        )
+
+        report = evaluate(objects, max_backup_age=self.max_backup_age)
+        report.findings = errors + report.findings
+        report.api_calls = len(self.kinds)
+        report.wall_seconds = time.monotonic() - started
+        return report
+
+
+def render_metrics(report: BackupHealthReport) -> str:
+    """Render a report in the Prometheus text exposition format."""
+    prefix = "cnpg_backup"
+
+    def labels(c: ClusterHealth) -> str:
+        return f'namespace="{c.namespace}",cluster="{c.name}"'
+
+    lines = [
+        f"# TYPE {prefix}_cluster_healthy gauge",
+        *(
+            f"{prefix}_cluster_healthy{{{labels(c)}}} {int(c.healthy)}"
+            for c in report.clusters
+        ),
+        f"# TYPE {prefix}_continuous_archiving gauge",
+        *(
+            f"{prefix}_continuous_archiving{{{labels(c)}}} "
+            f"{int(c.archiving == 'True')}"
+            for c in report.clusters
+        ),
+        f"# TYPE {prefix}_scheduled_backups gauge",
+        *(
+            f"{prefix}_scheduled_backups{{{labels(c)}}} {len(c.scheduled_backups)}"
+            for c in report.clusters
+        ),
+        f"# TYPE {prefix}_last_completed_timestamp_seconds gauge",
+        *(
+            f"{prefix}_last_completed_timestamp_seconds{{{labels(c)}}} "
+            f"{c.last_backup:.0f}"
+            for c in report.clusters
+            if c.last_backup is not None
+        ),
+        f"# TYPE {prefix}_findings gauge",
+    ]
+    for cluster in report.clusters:
+        for severity in (FAIL, WARNING):
+            count = sum(1 for f in cluster.findings if f.severity == severity)
+            lines.append(
+                f'{prefix}_findings{{{labels(cluster)},severity="{severity}"}} '
+                f"{count}"
+            )
+    lines += [
+        f"# TYPE {prefix}_plugin_pods_ready gauge",
+        f"{prefix}_plugin_pods_ready {report.plugin_pods_ready}",
+        f"# TYPE {prefix}_passed gauge",
+        f"{prefix}_passed {int(report.passed)}",
+        f"# TYPE {prefix}_collection_duration_seconds gauge",
+        f"{prefix}_collection_duration_seconds {report.wall_seconds:.6f}",
+        f"# TYPE {prefix}_last_run_timestamp_seconds gauge",
+        f"{prefix}_last_run_timestamp_seconds {report.timestamp:.3f}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def push_metrics(
+    gateway: str, report: BackupHealthReport, job: str = DEFAULT_PUSHGATEWAY_JOB
+) -> None:
+    """Replace this job's metric group on a Prometheus Pushgateway."""
+    push_to_gateway(gateway, job, render_metrics(report))
+
+
+def print_report(report: BackupHealthReport):
+    """Print the report for terminal use."""
+    print("=== CNPG BACKUP HEALTH ===")
+    print(f"Barman plugin pods ready: {report.plugin_pods_ready}")
+    for finding in report.findings:
+        mark = "✗" if finding.severity == FAIL else "⚠"
+        print(f"{mark} {finding.kind} {finding.ref}: {finding.message}")
+
+    for cluster in report.clusters:
+        print()
+        mark = "✓" if cluster.healthy else "✗"
+        print(f"{mark} {cluster.namespace}/{cluster.name}: {cluster.phase or '-'}")
+        print(f"  Plugins: {', '.join(cluster.plugins) or 'None'}")
+        print(f"  ObjectStore: {cluster.object_store or '-'}")
+        print(
+            f"  Continuous archiving: {cluster.archiving} "
+            f"(last WAL {cluster.last_archived_wal or '-'})"
+        )
+        print(f"  Scheduled backups: {', '.join(cluster.scheduled_backups) or '-'}")
+        if cluster.last_backup is not None:
+            stamp = datetime.fromtimestamp(cluster.last_backup).isoformat(" ")
+            print(f"  Last completed backup: {stamp}")
+        for finding in cluster.findings:
+            mark = "✗" if finding.severity == FAIL else "⚠"
+            value = f" ({finding.value})" if finding.value else ""
+            print(f"  {mark} {finding.message}{value}")
+
+    print()
+    failures = sum(1 for f in report.all_findings if f.severity == FAIL)
+    print(
+        f"{len(report.clusters)} clusters, {failures} failures, "
+        f"{report.api_calls} API calls in {report.wall_seconds:.2f}s"
+    )
+    if report.passed:
+        print("✓ Backups are configured and working")
+    else:
+        print("✗ Backup configuration needs attention")
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description="Collect CNPG backup health")
+    parser.add_argument(
+        "--api-server",
+        help="List from this Kubernetes API URL (e.g. kubectl proxy) "
+        "instead of the Flux MCP server; token from KUBERNETES_TOKEN",
+    )
+    parser.add_argument(
+        "--max-backup-age",
+        type=float,
+        default=DEFAULT_MAX_BACKUP_AGE_HOURS,
+        help="Hours before the last completed backup counts as stale",
+    )
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("--json", action="store_true", help="Output in JSON format")
+    output.add_argument(
+        "--metrics", action="store_true", help="Output Prometheus metrics"
+    )
+    parser.add_argument("--pushgateway", help="Push metrics to this Pushgateway URL")
+    parser.add_argument(
+        "--job", default=DEFAULT_PUSHGATEWAY_JOB, help="Pushgateway job name"
+    )
+    args = parser.parse_args(argv)
+
+    report = BackupHealthCollector(
+        api_fetcher(args.api_server), max_backup_age=args.max_backup_age * 3600
+    ).run()
+
+    if args.pushgateway:
+        try:
+            push_metrics(args.pushgateway, report, args.job)
+        except OSError as e:
+            print(f"⚠ Could not push metrics: {e}", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    elif args.metrics:
+        sys.stdout.write(render_metrics(report))
+    else:
+        print_report(report)
+
+    sys.exit(0 if report.passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Flux Kustomization Critical-Path Analyzer
+
+Finds the Kustomizations that bound bootstrap time. The dependency graph is
+the static `spec.dependsOn` graph from the manifests (core.yaml,
+networking.yaml, storage.yaml, identity.yaml, ...); each Kustomization's
+duration is observed from the cluster through FluxMCPClient, or read from a
+`reconcile_scheduler.py --json` report with --report.
+
+A Kustomization cannot start before its dependencies are Ready, so its
+observed duration runs from the later of its last reconcile request
+(`status.lastHandledReconcileAt`), its creation and its dependencies'
+Ready transitions, up to its own Ready transition. With those durations the
+classic critical-path method gives, per Kustomization:
+
+- earliest start and finish if every dependency were met as soon as possible
+- slack: how much later it could finish without delaying the whole graph
+- the critical path: the zero-slack chain that sets the total time
+
+and points out serialization that isn't needed:
+
+- redundant dependencies, already implied through another dependency
+- critical dependencies whose removal would shorten the whole graph, with
+  the time it would save; whether they can be dropped is for a human to judge
+
+    flux_critical_path.py [--report schedule.json] [--json] [--dot graph.dot]
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from flux_mcp_wrapper import FluxMCPClient, FluxMCPError, get_condition, parse_timestamp
+from reconcile_scheduler import (
+    DEFAULT_NAMESPACE,
+    KUSTOMIZATION_API,
+    Graph,
+    SchedulerError,
+    graph_from_manifests,
+    topological_waves,
+    validate_graph,
+)
+
+# Everything observe_durations reads from a live Kustomization
+OBSERVED_FIELDS = [
+    "metadata.name",
+    "metadata.namespace",
+    "metadata.creationTimestamp",
+    "status.lastHandledReconcileAt",
+    "status.conditions",
+]
+
+# Slack below this many seconds counts as critical
+CRITICAL_EPSILON = 0.5
+
+
+def observe_durations(graph: Graph, objects: List[Dict]) -> Dict[str, float]:
+    """Seconds each Ready Kustomization took once its dependencies were Ready."""
+    ready_at: Dict[str, float] = {}
+    started_at: Dict[str, float] = {}
+    for obj in objects:
+        metadata = obj.get("metadata", {})
+        namespace = metadata.get("namespace") or DEFAULT_NAMESPACE
+        key = f"{namespace}/{metadata.get('name')}"
+        condition = get_condition(obj)
+        ready = parse_timestamp(condition.get("lastTransitionTime"))
+        if key not in graph or condition.get("status") != "True" or ready is None:
+            continue
+        ready_at[key] = ready
+        starts = [
+            parse_timestamp(metadata.get("creationTimestamp")),
+            parse_timestamp(obj.get("status", {}).get("lastHandledReconcileAt")),
+        ]
+        # A request after the Ready transition belongs to a later no-op reconcile
+        started_at[key] = max((s for s in starts if s and s <= ready), default=ready)
+
+    durations = {}
+    for key, ready in ready_at.items():
+        gates = [ready_at[d] for d in graph[key].depends_on if d in ready_at]
+        start = max([started_at[key]] + gates)
+        durations[key] = max(0.0, ready - start)
+    return durations
+
+
+def report_durations(data: Dict) -> Dict[str, float]:
+    """Durations from a reconcile_scheduler.py --json report."""
+    return {
+        item["kustomization"]: item["duration_seconds"]
+        for item in data.get("kustomizations", [])
+        if item.get("duration_seconds") is not None
+    }
+
+
+@dataclass
+class NodeTiming:
+    """Critical-path-method timings of one Kustomization."""
+
+    key: str
+    duration: float
+    observed: bool
+    earliest_start: float = 0.0
+    earliest_finish: float = 0.0
+    latest_finish: float = 0.0
+
+    @property
+    def slack(self) -> float:
+        return self.latest_finish - self.earliest_finish
+
+    @property
+    def critical(self) -> bool:
+        return self.slack < CRITICAL_EPSILON
+
+    def to_dict(self):
+        return {
+            "kustomization": self.key,
+            "duration": round(self.duration, 3),
+            "observed": self.observed,
+            "earliest_start": round(self.earliest_start, 3),
+            "earliest_finish": round(self.earliest_finish, 3),
+            "slack": round(self.slack, 3),
+            "critical": self.critical,
+        }
+
+
+@dataclass
+class EdgeFinding:
+    """A dependency worth revisiting: `key` depends on `dependency`."""
+
+    key: str
+    dependency: str
+    reason: str
+    saving: float = 0.0
+    via: List[str] = field(default_factory=list)
+
+    def to_dict(self):
+        return {
+            "kustomization": self.key,
+            "depends_on": self.dependency,
+            "reason": self.reason,
+            "saving": round(self.saving, 3),
+            "via": self.via,
+        }
+
+
+def schedule(graph: Graph, durations: Dict[str, float]) -> Tuple[Dict, float]:
+    """Earliest/latest finish per node and the total length of the graph."""
+    order = [key for wave in topological_waves(graph) for key in wave]
+    timings = {
+        key: NodeTiming(key, durations.get(key, 0.0), key in durations) for key in order
+    }
+    for key in order:
+        timing = timings[key]
+        timing.earliest_start = max(
+            (timings[d].earliest_finish for d in graph[key].depends_on),
+            default=0.0,
+        )
+        timing.earliest_finish = timing.earliest_start + timing.duration
+    length = max((t.earliest_finish for t in timings.values()), default=0.0)
+
+    dependents: Dict[str, List[str]] = {key: [] for key in order}
+    for key in order:
+        for dependency in graph[key].depends_on:
+            dependents[dependency].append(key)
+    for key in reversed(order):
+        timings[key].latest_finish = min(
+            (timings[d].latest_finish - timings[d].duration for d in dependents[key]),
+            default=length,
+        )
+    return timings, length
+
+
+def _ancestors(graph: Graph, key: str, cache: Dict[str, Set[str]]) -> Set[str]:
+    if key not in cache:
+        found: Set[str] = set()
+        for dependency in graph[key].depends_on:
+            found.add(dependency)
+            found |= _ancestors(graph, dependency, cache)
+        cache[key] = found
+    return cache[key]
+
+
+def redundant_dependencies(graph: Graph) -> List[EdgeFinding]:
+    """dependsOn entries already implied through another dependency."""
+    cache: Dict[str, Set[str]] = {}
+    findings = []
+    for key in sorted(graph):
+        depends_on = graph[key].depends_on
+        for dependency in depends_on:
+            via = sorted(
+                other
+                for other in depends_on
+                if other != dependency and dependency in _ancestors(graph, other, cache)
+            )
+            if via:
+                findings.append(
+                    EdgeFinding(
+                        key, dependency, "implied by another dependency", via=via
+                    )
+                )
+    return findings
+
+
+def _without(graph: Graph, key: str, dependency: str) -> Graph:
+    copy = dict(graph)
+    node = graph[key]
+    copy[key] = type(node)(
+        node.name,
+        node.namespace,
+        [d for d in node.depends_on if d != dependency],
+        node.suspended,
+    )
+    return copy
+
+
+@dataclass
+class CriticalPathReport:
+    """Critical path, slack and dependency findings for the graph."""
+
+    timings: Dict[str, NodeTiming]
+    length: float
+    critical_path: List[str]
+    redundant: List[EdgeFinding]
+    costly: List[EdgeFinding]
+
+    @property
+    def unobserved(self) -> List[str]:
+        return sorted(k for k, t in self.timings.items() if not t.observed)
+
+    def to_dict(self):
+        return {
+            "length": round(self.length, 3),
+            "critical_path": self.critical_path,
+            "kustomizations": [
+                t.to_dict()
+                for t in sorted(self.timings.values(), key=lambda t: (t.slack, t.key))
+            ],
+            "redundant_dependencies": [f.to_dict() for f in self.redundant],
+            "critical_dependencies": [f.to_dict() for f in self.costly],
+            "unobserved": self.unobserved,
+        }
+
+
+def analyze(graph: Graph, durations: Dict[str, float]) -> CriticalPathReport:
+    """Run the critical-path method and look for unneeded serialization."""
+    problems = validate_graph(graph)
+    if problems:
+        raise SchedulerError("; ".join(problems))
+
+    timings, length = schedule(graph, durations)
+    path: List[str] = []
+    if timings:
+        key = max(timings, key=lambda k: (timings[k].earliest_finish, k))
+        path.append(key)
+        while graph[key].depends_on:
+            key = max(
+                graph[key].depends_on, key=lambda d: (timings[d].earliest_finish, d)
+            )
+            path.append(key)
+        path.reverse()
+
+    # Dropping a dependency on the critical path may shorten the graph; try
+    # each one (a few dozen nodes, so recomputing is cheap)
+    costly = []
+    for dependent, dependency in zip(path[1:], path):
+        shortened = schedule(_without(graph, dependent, dependency), durations)[1]
+        if length - shortened >= CRITICAL_EPSILON:
+            costly.append(
+                EdgeFinding(
+                    dependent,
+                    dependency,
+                    "on the critical path",
+                    saving=length - shortened,
+                )
+            )
+    costly.sort(key=lambda f: -f.saving)
+
+    return CriticalPathReport(
+        timings, length, path, redundant_dependencies(graph), costly
+    )
+
+
+def _dot_id(key: str) -> str:
+    return json.dumps(key.split("/", 1)[-1])
+
+
+def to_dot(graph: Graph, report: CriticalPathReport) -> str:
+    """Graphviz DOT of the graph: critical path in red, redundant edges dashed."""
+    on_path = set(zip(report.critical_path, report.critical_path[1:]))
+    redundant = {(f.dependency, f.key) for f in report.redundant}
+    lines = [
+        "digraph kustomizations {",
+        "  rankdir=LR;",
+        '  node [shape=box, fontname="Helvetica"];',
+    ]
+    for key in sorted(graph):
+        timing = report.timings[key]
+        label = f"{graph[key].name}\\n{timing.duration:.0f}s, slack {timing.slack:.0f}s"
+        style = ", color=red, penwidth=2" if timing.critical else ""
+        if not timing.observed:
+            style += ", style=dashed"
+        lines.append(f'  {_dot_id(key)} [label="{label}"{style}];')
+    for key in sorted(graph):
+        for dependency in sorted(graph[key].depends_on):
+            edge = (dependency, key)
+            if edge in on_path:
+                style = " [color=red, penwidth=2]"
+            elif edge in redundant:
+                style = " [style=dashed, color=gray]"
+            else:
+                style = ""
+            lines.append(f"  {_dot_id(dependency)} -> {_dot_id(key)}{style};")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def print_report(report: CriticalPathReport):
+    """Print the critical path, slack table and findings."""
+    print("=== FLUX KUSTOMIZATION CRITICAL PATH ===")
+    print(f"Critical path ({report.length:.1f}s):")
+    for key in report.critical_path:
+        timing = report.timings[key]
+        print(
+            f"  {key} {timing.duration:.1f}s "
+            f"(ready at {timing.earliest_finish:.1f}s)"
+        )
+
+    print()
+    print("Slack per Kustomization:")
+    for timing in sorted(report.timings.values(), key=lambda t: (t.slack, t.key)):
+        mark = "✗" if timing.critical else "✓"
+        note = "" if timing.observed else " (not observed)"
+        print(
+            f"{mark} {timing.key} {timing.duration:.1f}s, "
+            f"slack {timing.slack:.1f}s{note}"
+        )
+
+    if report.costly:
+        print()
+        print("Critical dependencies (dropping one shortens the whole graph):")
+        for finding in report.costly:
+            print(
+                f"⚠ {finding.key} -> {finding.dependency}: "
+                f"saves {finding.saving:.1f}s"
+            )
+    if report.redundant:
+        print()
+        print("Redundant dependencies (already implied):")
+        for finding in report.redundant:
+            print(
+                f"⚠ {finding.key} -> {finding.dependency} "
+                f"via {', '.join(finding.via)}"
+            )
+    if report.unobserved:
+        print()
+        print(f"⚠ {len(report.unobserved)} Kustomizations not Ready, counted as 0s")
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description="Find the Kustomizations that bound bootstrap time"
+    )
+    parser.add_argument(
+        "--report",
+        help="Durations from a reconcile_scheduler.py --json report "
+        "instead of the live cluster",
+    )
+    parser.add_argument("--dot", help="Write a Graphviz DOT graph here (- for stdout)")
+    parser.add_argument("--json", action="store_true", help="Output in JSON format")
+    args = parser.parse_args(argv)
+
+    from manifest_index import DEFAULT_CACHE, REPO_ROOT, load_index
+
+    graph = graph_from_manifests(load_index(f"{REPO_ROOT}/{DEFAULT_CACHE}"))
+    try:
+        if args.report:
+            with open(args.report) as f:
+                durations = report_durations(json.load(f))
+        else:
+            objects = FluxMCPClient().list_resources(
+                KUSTOMIZATION_API, "Kustomization", fields=OBSERVED_FIELDS
+            )
+            durations = observe_durations(graph, objects)
+        report = analyze(graph, durations)
+    except (OSError, ValueError, FluxMCPError, SchedulerError) as e:
+        print(f"✗ {e}", file=sys.stderr)
+        sys.exit(1)
+        return
+
+    if args.dot:
+        dot = to_dot(graph, report)
+        if args.dot == "-":
+            sys.stdout.write(dot)
+            return 0
+        with open(args.dot, "w") as f:
+            f.write(dot)
+
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Async Flux MCP Client
+
+asyncio counterpart of FluxMCPClient for async automation (health sweeps,
+recovery controllers) that needs dozens of Flux queries at once. Instead of
+one `flux-operator-mcp serve` process per call, a single persistent stdio
+session is opened and every call is a JSON-RPC request on it: requests are
+written as they are made, a reader task decodes response frames as they
+arrive and hands each to the caller waiting on its id, in whatever order
+the server answers.
+
+    async with AsyncFluxMCPClient() as client:
+        instance, releases = await asyncio.gather(
+            client.get_flux_instance(),
+            client.list_resources("helm.toolkit.fluxcd.io/v2", "HelmRelease"),
+        )
+
+Each call takes an optional timeout (default: the client's); a call that
+times out or whose task is cancelled is withdrawn and the server is sent a
+`notifications/cancelled` for it. Responses keep the synchronous client's
+shape, so tool_text() and parse_resources() work on them unchanged.
+"""
+
+import asyncio
+import json
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from flux_mcp_wrapper import (
+    DEFAULT_MAX_FRAME_SIZE,
+    READ_CHUNK_SIZE,
+    FluxMCPClient,
+    FluxMCPError,
+    FrameDecoder,
+    parse_resources,
+)
+
+PROTOCOL_VERSION = "0.1.0"
+
+# Default for a call's timeout argument: use the client's timeout. None
+# means wait forever.
+CLIENT_TIMEOUT: Any = object()
+
+
+class AsyncFluxMCPClient:
+    """Multiplexes concurrent tool calls over one MCP stdio session."""
+
+    def __init__(
+        self,
+        mcp_path: Optional[str] = None,
+        kubeconfig: Optional[str] = None,
+        timeout: Optional[float] = 60.0,
+        max_frame_size: int = DEFAULT_MAX_FRAME_SIZE,
+    ):
+        defaults = FluxMCPClient()
+        self.mcp_path = mcp_path or defaults.mcp_path
+        self.kubeconfig = kubeconfig or defaults.kubeconfig
+        self.timeout = timeout
+        self.max_frame_size = max_frame_size
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_id = 0
+        self._write_lock = asyncio.Lock()
+        self._tasks: List[asyncio.Task] = []
+        self._stderr_tail: deque = deque(maxlen=64)
+        self._closed_error: Optional[str] = None
+
+    async def __aenter__(self) -> "AsyncFluxMCPClient":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self):
+        """Start the server and complete the MCP initialize handshake."""
+        self._process = await asyncio.create_subprocess_exec(
+            self.mcp_path,
+            "serve",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env={"KUBECONFIG": self.kubeconfig},
+        )
+        self._tasks = [
+            asyncio.create_task(self._read_responses()),
+            asyncio.create_task(self._drain_stderr()),
+        ]
+        response = await self._call_method(
+            "initialize",
+            {"protocolVersion": PROTOCOL_VERSION, "capabilities": {"tools": {}}},
+        )
+        if "error" in response:
+            await self.close()
+            raise FluxMCPError(f"MCP initialize failed: {response['error']}")
+        await self._send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+
+    async def close(self):
+        """End the session and fail any calls still waiting."""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        if process.stdin and not process.stdin.is_closing():
+            process.stdin.close()
+        try:
+            await asyncio.wait_for(process.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._fail_pending("MCP session closed")
+
+    async def _send(self, message: Dict):
+        if self._process is None or self._closed_error:
+            raise FluxMCPError(self._closed_error or "MCP session is not started")
+        async with self._write_lock:
+            self._process.stdin.write(json.dumps(message).encode() + b"\n")
+            # Waits while the server is not reading: backpressure on writers
+            await self._process.stdin.drain()
+
+    async def _read_responses(self):
+        decoder = FrameDecoder(self.max_frame_size)
+        reason = "MCP server exited"
+        try:
+            while True:
+                chunk = await self._process.stdout.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                for message in decoder.feed(chunk):
+                    if not isinstance(message, dict):
+                        continue
+                    future = self._pending.pop(message.get("id"), None)
+                    # Notifications and answers to withdrawn calls are dropped
+                    if future is not None and not future.done():
+                        future.set_result(message)
+        except FluxMCPError as e:
+            reason = str(e)
+        except (OSError, ValueError) as e:
+            reason = f"MCP stdout read failed: {e}"
+        self._fail_pending(reason)
+
+    async def _drain_stderr(self):
+        # Fixed-size reads like stdout: line iteration fails on a line longer
+        # than the stream limit, and then nothing drains the pipe
+        while True:
+            chunk = await self._process.stderr.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            self._stderr_tail.append(chunk)
+
+    def _fail_pending(self, reason: str):
+        self._closed_error = self._closed_error or reason
+        stderr = b"".join(self._stderr_tail).decode(errors="replace")
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_result({"error": reason, "stderr": stderr})
+
+    async def _call_method(
+        self, method: str, params: Optional[Dict] = None, timeout: Any = CLIENT_TIMEOUT
+    ) -> Dict:
+        """Send a request and wait for the response with its id."""
+        timeout = self.timeout if timeout is CLIENT_TIMEOUT else timeout
+        request_id = self._next_id
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await self._send(
+                {
+                    "jsonrpc": "2.0",
+                    "method": method,
+                    "params": params or {},
+                    "id": request_id,
+                }
+            )
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            await self._withdraw(request_id, f"timed out after {timeout}s")
+            return {"error": f"MCP {method} timed out after {timeout}s"}
+        except (FluxMCPError, OSError) as e:
+            self._pending.pop(request_id, None)
+            return {"error": str(e) or type(e).__name__}
+        except asyncio.CancelledError:
+            await asyncio.shield(self._withdraw(request_id, "cancelled"))
+            raise
+
+    async def _withdraw(self, request_id: int, reason: str):
+        """Forget a request and tell the server it can stop working on it."""
+        if self._pending.pop(request_id, None) is None:
+            return
+        try:
+            await self._send(
+                {
+                    "jsonrpc": "2.0",
+                    "method": "notifications/cancelled",
+                    "params": {"requestId": request_id, "reason": reason},
+                }
+            )
+        except (FluxMCPError, OSError):
+            pass
+
+    async def call_tool(
+        self,
+        tool_name: str,
+        params: Optional[Dict] = None,
+        timeout: Any = CLIENT_TIMEOUT,
+    ) -> Dict:
+        """Call a specific tool."""
+        return await self._call_method(
+            "tools/call", {"name": tool_name, "arguments": params or {}}, timeout
+        )
+
+    async def get_flux_instance(self, timeout: Any = CLIENT_TIMEOUT) -> Dict:
+        """Get Flux instance status."""
+        return await self.call_tool("get_flux_instance", timeout=timeout)
+
+    async def get_kubernetes_resources(
+        self,
+        api_version: str,
+        kind: str,
+        namespace: Optional[str] = None,
+        name: Optional[str] = None,
+        selector: Optional[str] = None,
+        limit: Optional[int] = None,
+        timeout: Any = CLIENT_TIMEOUT,
+    ) -> Dict:
+        """Get Kubernetes resources."""
+        params: Dict[str, Any] = {"apiVersion": api_version, "kind": kind}
+        for key, value in (
+            ("namespace", namespace),
+            ("name", name),
+            ("selector", selector),
+            ("limit", limit),
+        ):
+            if value:
+                params[key] = value
+        return await self.call_tool("get_kubernetes_resources", params, timeout)
+
+    async def list_resources(
+        self,
+        api_version: str,
+        kind: str,
+        namespace: Optional[str] = None,
+        selector: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        condition: Optional[str] = None,
+        timeout: Any = CLIENT_TIMEOUT,
+    ) -> List[Dict]:
+        """Get Kubernetes resources as a list of parsed objects."""
+        response = await self.get_kubernetes_resources(
+            api_version, kind, namespace, selector=selector, timeout=timeout
+        )
+        return parse_resources(
+            response, fields=fields, condition=condition, selector=selector
+        )
+
+    async def reconcile_flux_kustomization(
+        self,
+        name: str,
+        namespace: str = "flux-system",
+        with_source: bool = True,
+        timeout: Any = CLIENT_TIMEOUT,
+    ) -> Dict:
+        """Reconcile a Flux Kustomization."""
+        return await self.call_tool(
+            "reconcile_flux_kustomization",
+            {"name": name, "namespace": namespace, "with_source": with_source},
+            timeout,
+        )
+
+    async def reconcile_flux_helmrelease(
+        self,
+        name: str,
+        namespace: str,
+        with_source: bool = True,
+        timeout: Any = CLIENT_TIMEOUT,
+    ) -> Dict:
+        """Reconcile a Flux HelmRelease."""
+        return await self.call_tool(
+            "reconcile_flux_helmrelease",
+            {"name": name, "namespace": namespace, "with_source": with_source},
+            timeout,
+        )
@@ -3,23 +3,194 @@
 Flux MCP Wrapper - Makes it easy to call Flux MCP tools from Claude Code
 """
 import json
+import re
 import subprocess
 import sys
 import os
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+
+# Largest JSON-RPC frame accepted from the server, and how much of the pipe
+# is read at a time
+DEFAULT_MAX_FRAME_SIZE = 64 * 1024 * 1024
+READ_CHUNK_SIZE = 64 * 1024
+
+# Tools that only read state and whose results may be cached
+CACHED_TOOLS = {"get_flux_instance", "get_kubernetes_resources"}
+
+# Kinds a reconcile tool changes directly, without and with its source
+RECONCILE_KINDS = {
+    "reconcile_flux_kustomization": (
+        {"Kustomization"},
+        {"GitRepository", "OCIRepository", "Bucket"},
+    ),
+    "reconcile_flux_helmrelease": (
+        {"HelmRelease", "HelmChart"},
+        {"HelmRepository", "OCIRepository", "GitRepository"},
+    ),
+}
+
+
+class ResultCache:
+    """TTL and LRU bounded cache of read-only tool results
+
+    Entries are keyed by tool name and arguments. With a path the entries are
+    kept in a small JSON file too, so consecutive wrapper invocations share
+    them; the file is re-read whenever another process has changed it. It
+    holds cluster state in plain text, so it is only readable by its owner.
+    """
+
+    def __init__(self, ttl=10.0, max_entries=128, path=None, clock=time.time):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Cache configured by FLUX_MCP_CACHE_TTL and FLUX_MCP_CACHE_FILE
+
+        Returns None when FLUX_MCP_CACHE_TTL is 0. The cache stays in memory
+        unless FLUX_MCP_CACHE_FILE names a file to share it through.
+        """
+        ttl = float(os.environ.get("FLUX_MCP_CACHE_TTL", "10"))
+        if ttl <= 0:
+            return None
+        return cls(ttl=ttl, path=os.environ.get("FLUX_MCP_CACHE_FILE") or None)
+
+    @staticmethod
+    def key(tool_name, arguments):
+        return json.dumps([tool_name, arguments or {}], sort_keys=True)
+
+    def _sync(self):
+        """Reload the on-disk entries if another process wrote them"""
+        if not self.path:
+            return
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return
+        # Size too, as two writes can land within the mtime resolution
+        mtime = (stat.st_mtime_ns, stat.st_size)
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._entries = OrderedDict(
+            (key, tuple(entry)) for key, entry in entries if isinstance(entry, list)
+        )
+        self._mtime = mtime
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", mode=0o700, exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with os.fdopen(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+                json.dump([[k, list(v)] for k, v in self._entries.items()], f)
+            os.replace(tmp, self.path)
+            stat = os.stat(self.path)
+            self._mtime = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            pass  # the in-memory cache still works
+
+    def _expire(self, now):
+        expired = [k for k, (stored, _) in self._entries.items() if now - stored >= self.ttl]
+        for key in expired:
+            del self._entries[key]
+        return bool(expired)
+
+    def get(self, tool_name, arguments):
+        """Cached response, or None if missing or older than the TTL"""
+        key = self.key(tool_name, arguments)
+        with self._lock:
+            self._sync()
+            entry = self._entries.get(key)
+            if entry is None or self.clock() - entry[0] >= self.ttl:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, tool_name, arguments, response):
+        """Store a response, evicting the least recently used entries"""
+        with self._lock:
+            self._sync()
+            now = self.clock()
+            self._expire(now)
+            key = self.key(tool_name, arguments)
+            self._entries[key] = (now, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save()
+
+    def invalidate(self, namespace=None, kinds=()):
+        """Drop entries a write to namespace or to any of kinds may have changed
+
+        Flux instance status and lists across all namespaces always go, as
+        do entries for the namespace or for one of the kinds.
+        """
+        kinds = set(kinds)
+        with self._lock:
+            self._sync()
+            changed = self._expire(self.clock())
+            for key in list(self._entries):
+                tool_name, arguments = json.loads(key)
+                if (
+                    tool_name != "get_kubernetes_resources"
+                    or not arguments.get("namespace")
+                    or arguments.get("namespace") == namespace
+                    or arguments.get("kind") in kinds
+                ):
+                    del self._entries[key]
+                    changed = True
+            if changed:
+                self._save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._save()
+
+
+def _cacheable(response):
+    return "error" not in response and not response.get("result", {}).get("isError")
+
 
 class FluxMCPClient:
-    def __init__(self):
+    def __init__(self, cache=None):
         self.mcp_path = "/opt/homebrew/bin/flux-operator-mcp"
         self.kubeconfig = os.environ.get("KUBECONFIG", "/Users/geoff/.kube/config")
-        self.initialized = False
         self.request_id = 0
+        # Each call runs its own server process, so calls may run concurrently
+        # from threads; only request id allocation needs to be serialized.
+        # Every process gets its own initialize handshake
+        self._lock = threading.Lock()
+        # Optional ResultCache for read-only tools; off unless given, since
+        # scripts that poll for changes need fresh results every time
+        self.cache = cache
+        self.max_frame_size = DEFAULT_MAX_FRAME_SIZE
 
     def _call_method(self, method, params=None):
         """Call an MCP method and return the result"""
         requests = []
 
-        # Initialize if not done
-        if not self.initialized:
+        with self._lock:
+            # A fresh server process is started for this call, so it has to
+            # be initialized before it will answer the request
             requests.append({
                 "jsonrpc": "2.0",
                 "method": "initialize",
@@ -30,61 +201,134 @@ class FluxMCPClient:
                 "id": self.request_id
             })
             self.request_id += 1
-            self.initialized = True
-
-        # Add the actual request
-        requests.append({
-            "jsonrpc": "2.0",
-            "method": method,
-            "params": params or {},
-            "id": self.request_id
-        })
-        current_id = self.request_id
-        self.request_id += 1
+
+            # Add the actual request
+            requests.append({
+                "jsonrpc": "2.0",
+                "method": method,
+                "params": params or {},
+                "id": self.request_id
+            })
+            current_id = self.request_id
+            self.request_id += 1
 
         # Send requests
         input_data = "\n".join(json.dumps(r) for r in requests) + "\n"
 
-        result = subprocess.run(
+        return self._exchange(input_data.encode(), current_id)
+
+    def _exchange(self, input_data, current_id):
+        """Send requests to a fresh server and read frames until current_id
+
+        stdout is read a chunk at a time and decoded frame by frame as it
+        arrives, so the response is returned as soon as its frame is
+        complete rather than when the server exits. Nothing is read ahead of
+        the decoder: a slow reader leaves the server blocked on a full pipe.
+        """
+        process = subprocess.Popen(
             [self.mcp_path, "serve"],
-            input=input_data,
-            capture_output=True,
-            text=True,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             env={"KUBECONFIG": self.kubeconfig}
         )
+        # Drain stderr in the background so a chatty server never blocks on
+        # it; only the tail is kept for error reports
+        stderr_tail = deque(maxlen=64)
+        stderr_reader = threading.Thread(
+            target=lambda: stderr_tail.extend(process.stderr), daemon=True
+        )
+        stderr_reader.start()
 
-        # Parse responses
-        for line in result.stdout.split("\n"):
-            if line.strip():
-                try:
-                    response = json.loads(line)
-                    if response.get("id") == current_id:
+        try:
+            try:
+                process.stdin.write(input_data)
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+
+            decoder = FrameDecoder(self.max_frame_size)
+            while True:
+                chunk = process.stdout.read1(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                for response in decoder.feed(chunk):
+                    if isinstance(response, dict) and response.get("id") == current_id:
                         return response
-                except json.JSONDecodeError:
-                    continue
+        except FrameTooLarge as e:
+            return {"error": str(e)}
+        finally:
+            if process.poll() is None:
+                process.terminate()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            stderr_reader.join(timeout=1)
+            if not stderr_reader.is_alive():
+                process.stderr.close()
 
-        return {"error": "No valid response", "stderr": result.stderr}
+        stderr = b"".join(stderr_tail).decode(errors="replace")
+        return {"error": "No valid response", "stderr": stderr}
 
     def call_tool(self, tool_name, params=None):
         """Call a specific tool"""
-        return self._call_method(f"tools/call", {
+        if self.cache is not None and tool_name in CACHED_TOOLS:
+            cached = self.cache.get(tool_name, params)
+            if cached is not None:
+                return cached
+
+        response = self._call_method(f"tools/call", {
             "name": tool_name,
             "arguments": params or {}
         })
 
+        if self.cache is not None:
+            if tool_name in CACHED_TOOLS and _cacheable(response):
+                self.cache.put(tool_name, params, response)
+            elif tool_name in RECONCILE_KINDS:
+                kinds, source_kinds = RECONCILE_KINDS[tool_name]
+                if (params or {}).get("with_source"):
+                    kinds = kinds | source_kinds
+                self.cache.invalidate((params or {}).get("namespace"), kinds)
+        return response
+
     def get_flux_instance(self):
         """Get Flux instance status"""
         return self.call_tool("get_flux_instance")
 
-    def get_kubernetes_resources(self, api_version, kind, namespace=None, name=None):
-        """Get Kubernetes resources"""
+    def get_kubernetes_resources(self, api_version, kind, namespace=None, name=None,
+                                 selector=None, limit=None):
+        """Get Kubernetes resources
+
+        The label selector and limit are applied by the MCP server.
+        """
         params = {"apiVersion": api_version, "kind": kind}
         if namespace:
             params["namespace"] = namespace
         if name:
             params["name"] = name
+        if selector:
+            params["selector"] = selector
+        if limit:
+            params["limit"] = limit
         return self.call_tool("get_kubernetes_resources", params)
 
+    def list_resources(self, api_version, kind, namespace=None, selector=None,
+                       fields=None, condition=None):
+        """Get Kubernetes resources as a list of parsed objects
+
+        fields is a list of dotted paths to keep (e.g. "status.conditions") and
+        condition a "Type=Status" filter such as "Ready=False". The server
+        cannot project or filter on conditions, so both are applied here as
+        each object is decoded from the response text; only the kept (and
+        projected) objects accumulate.
+        """
+        response = self.get_kubernetes_resources(api_version, kind, namespace, selector=selector)
+        return parse_resources(response, fields=fields, condition=condition, selector=selector)
+
     def reconcile_flux_kustomization(self, name, namespace="flux-system", with_source=True):
         """Reconcile a Flux Kustomization"""
         return self.call_tool("reconcile_flux_kustomization", {
@@ -101,44 +345,435 @@ class FluxMCPClient:
             "with_source": with_source
         })
 
-def main():
+class FluxMCPError(Exception):
+    """Raised when an MCP tool call fails or returns unparseable content"""
+
+
+class FrameTooLarge(FluxMCPError):
+    """Raised when a JSON-RPC frame exceeds the maximum frame size"""
+
+
+class FrameDecoder:
+    """Incremental decoder of newline-delimited JSON-RPC frames
+
+    Bytes are fed as they are read; each complete line is decoded straight
+    from the receive buffer and removed from it, so a large frame is held
+    once, not as a string of the whole output plus its split lines. Lines
+    that are not JSON (stray log output) are skipped.
+    """
+
+    def __init__(self, max_frame_size=DEFAULT_MAX_FRAME_SIZE):
+        self.max_frame_size = max_frame_size
+        self._buffer = bytearray()
+        # Where to resume looking for a newline in a partial frame
+        self._scanned = 0
+
+    def feed(self, data):
+        """Add bytes and return the messages of every frame they complete"""
+        self._buffer += data
+        messages = []
+        while True:
+            end = self._buffer.find(b"\n", self._scanned)
+            if end < 0:
+                self._scanned = len(self._buffer)
+                if self._scanned > self.max_frame_size:
+                    raise FrameTooLarge(
+                        f"MCP frame exceeds {self.max_frame_size} bytes")
+                return messages
+            if end > self.max_frame_size:
+                raise FrameTooLarge(f"MCP frame exceeds {self.max_frame_size} bytes")
+
+            frame = self._buffer[:end]
+            del self._buffer[:end + 1]
+            self._scanned = 0
+            if frame.strip():
+                try:
+                    messages.append(json.loads(frame))
+                except ValueError:
+                    continue
+
+
+def tool_text(response):
+    """Return the text content of a tools/call response"""
+    if "error" in response:
+        raise FluxMCPError(f"{response['error']} {response.get('stderr', '')}".strip())
+
+    result = response.get("result", {})
+    text = "".join(
+        block.get("text", "") for block in result.get("content", [])
+        if block.get("type") == "text"
+    )
+    if result.get("isError"):
+        raise FluxMCPError(text or "tool call failed")
+    return text
+
+
+def project(obj, fields):
+    """Keep only the given dotted field paths of an object
+
+    A path through a list applies to every element, so "spec.containers.image"
+    keeps the image of each container.
+    """
+    projected = {}
+    for path in fields:
+        _copy_path(obj, projected, path.split("."))
+    return projected
+
+
+def _copy_path(source, target, parts):
+    if not isinstance(source, dict) or parts[0] not in source:
+        return
+    value = source[parts[0]]
+    if len(parts) == 1:
+        target[parts[0]] = value
+    elif isinstance(value, list):
+        existing = target.setdefault(parts[0], [{} for _ in value])
+        for item, projected in zip(value, existing):
+            _copy_path(item, projected, parts[1:])
+    elif isinstance(value, dict):
+        _copy_path(value, target.setdefault(parts[0], {}), parts[1:])
+
+
+def find_condition(conditions, condition_type):
+    """The condition of a type in a status conditions list, or {}"""
+    for condition in conditions or []:
+        if condition.get("type") == condition_type:
+            return condition
+    return {}
+
+
+def get_condition(obj, condition_type="Ready"):
+    """obj's status condition of a type, or {}"""
+    return find_condition(obj.get("status", {}).get("conditions"), condition_type)
+
+
+def is_ready(obj):
+    """Whether obj's Ready condition is True"""
+    return get_condition(obj).get("status") == "True"
+
+
+def object_ref(obj):
+    """namespace/name of an object, or just the name when cluster scoped"""
+    metadata = obj.get("metadata", {})
+    if metadata.get("namespace"):
+        return f"{metadata['namespace']}/{metadata.get('name')}"
+    return metadata.get("name", "")
+
+
+def has_condition(obj, condition):
+    """Whether obj has a status condition matching "Type" or "Type=Status"
+
+    The status defaults to True, so "Ready" matches Ready objects.
+    """
+    condition_type, _, status = condition.partition("=")
+    item = get_condition(obj, condition_type)
+    if item:
+        return item.get("status") == (status or "True")
+    # A missing condition only matches an explicit Unknown
+    return status == "Unknown"
+
+
+def parse_timestamp(value):
+    """RFC 3339 timestamp (any sub-second precision) as epoch seconds, or None"""
+    if not isinstance(value, str) or not value:
+        return None
+    text = value.strip().replace("Z", "+00:00")
+    # fromisoformat takes at most microseconds; Flux writes nanoseconds
+    if "." in text:
+        head, _, rest = text.partition(".")
+        digits = len(rest) - len(rest.lstrip("0123456789"))
+        text = f"{head}.{rest[:min(digits, 6)]}{rest[digits:]}"
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        return None
+
+
+def match_labels(obj, selector):
+    """Client-side check of an equality-based label selector
+
+    Set-based selectors (in, notin) are left to the server.
+    """
+    if not selector or "(" in selector:
+        return True
+    labels = obj.get("metadata", {}).get("labels") or {}
+    for term in selector.split(","):
+        term = term.strip()
+        if "!=" in term:
+            key, value = (p.strip() for p in term.split("!=", 1))
+            if labels.get(key) == value:
+                return False
+        elif "=" in term:
+            key, value = (p.strip() for p in term.replace("==", "=").split("=", 1))
+            if labels.get(key) != value:
+                return False
+        elif term.startswith("!"):
+            if term[1:] in labels:
+                return False
+        elif term and term not in labels:
+            return False
+    return True
+
+
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def _json_array(text, pos, decoder):
+    """Decode the elements of the JSON array starting at pos one at a time
+
+    Yields (element, end) where end is the offset just past the element; the
+    array's closing bracket is the final end.
+    """
+    pos = _JSON_WHITESPACE.match(text, pos + 1).end()
+    if text[pos:pos + 1] == "]":
+        yield None, pos + 1
+        return
+    while True:
+        element, pos = decoder.raw_decode(text, pos)
+        pos = _JSON_WHITESPACE.match(text, pos).end()
+        delimiter = text[pos:pos + 1]
+        if delimiter == "]":
+            yield element, None
+            yield None, pos + 1
+            return
+        if delimiter != ",":
+            raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+        yield element, None
+        pos = _JSON_WHITESPACE.match(text, pos + 1).end()
+
+
+def _json_objects(text):
+    """Objects of a JSON resource document, decoded one at a time
+
+    The elements of a top-level array or of a List's "items" are decoded
+    individually, so the caller can drop or project each one before the next
+    is decoded; the whole document is never materialised. Raises
+    JSONDecodeError, possibly after some objects were yielded, if the text is
+    not a single JSON document.
+    """
+    decoder = json.JSONDecoder()
+    end = None
+    if text[:1] == "[":
+        for element, end in _json_array(text, 0, decoder):
+            if end is None:
+                yield element
+    elif text[:1] == "{":
+        document = {}
+        pos = _JSON_WHITESPACE.match(text, 1).end()
+        if text[pos:pos + 1] == "}":
+            end = pos + 1
+        while end is None:
+            if text[pos:pos + 1] != '"':
+                raise json.JSONDecodeError("Expecting property name enclosed in double quotes", text, pos)
+            key, pos = decoder.raw_decode(text, pos)
+            pos = _JSON_WHITESPACE.match(text, pos).end()
+            if text[pos:pos + 1] != ":":
+                raise json.JSONDecodeError("Expecting ':' delimiter", text, pos)
+            pos = _JSON_WHITESPACE.match(text, pos + 1).end()
+            if key == "items" and text[pos:pos + 1] == "[":
+                document[key] = []
+                for element, array_end in _json_array(text, pos, decoder):
+                    if array_end is None:
+                        yield element
+                    else:
+                        pos = array_end
+            else:
+                document[key], pos = decoder.raw_decode(text, pos)
+            pos = _JSON_WHITESPACE.match(text, pos).end()
+            delimiter = text[pos:pos + 1]
+            if delimiter == "}":
+                end = pos + 1
+            elif delimiter == ",":
+                pos = _JSON_WHITESPACE.match(text, pos + 1).end()
+            else:
+                raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+        if not isinstance(document.get("items"), list):
+            yield from _objects([document])
+    else:
+        document, end = decoder.raw_decode(text)
+        yield from _objects([document])
+    if end != len(text):
+        raise json.JSONDecodeError("Extra data", text, end)
+
+
+def _objects(documents):
+    for document in documents:
+        if isinstance(document, list):
+            yield from document
+        elif isinstance(document, dict) and "items" in document:
+            yield from document["items"] or []
+        elif isinstance(document, dict):
+            yield document
+
+
+def _keep(objects, fields=None, condition=None, selector=None):
+    """Objects passing the selector and condition filters, projected to fields"""
+    items = []
+    for obj in objects:
+        if selector and not match_labels(obj, selector):
+            continue
+        if condition and not has_condition(obj, condition):
+            continue
+        items.append(project(obj, fields) if fields else obj)
+    return items
+
+
+def parse_resources(response, fields=None, condition=None, selector=None):
+    """Parse a get_kubernetes_resources response into a list of objects
+
+    The server returns JSON or multi-document YAML depending on version;
+    YAML needs PyYAML. The response text arrives whole in one JSON-RPC frame,
+    but the objects in it are decoded one at a time (JSON list items, YAML
+    documents) and filtered and projected before the next one is decoded, so
+    only the kept objects accumulate.
+    """
+    text = tool_text(response).strip()
+    if not text:
+        return []
+
+    try:
+        return _keep(_json_objects(text), fields, condition, selector)
+    except json.JSONDecodeError:
+        pass
+
+    try:
+        import yaml
+    except ImportError:
+        raise FluxMCPError("MCP server returned YAML; install PyYAML to parse it")
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    try:
+        return _keep(_objects(yaml.load_all(text, Loader=loader)), fields, condition, selector)
+    except yaml.YAMLError as e:
+        raise FluxMCPError(f"Unparseable MCP resource output: {e}")
+
+
+# Default columns of the compact table output
+TABLE_COLUMNS = [
+    ("NAMESPACE", "metadata.namespace"),
+    ("NAME", "metadata.name"),
+    ("READY", "Ready.status"),
+    ("REASON", "Ready.reason"),
+    ("MESSAGE", "Ready.message"),
+]
+TABLE_FIELDS = ["metadata.namespace", "metadata.name", "status.conditions"]
+
+
+def _cell(obj, path):
+    condition_type, _, attribute = path.partition(".")
+    if condition_type[:1].isupper():
+        for item in obj.get("status", {}).get("conditions", []) or []:
+            if item.get("type") == condition_type:
+                return str(item.get(attribute, ""))
+        return "-"
+    value = obj
+    for part in path.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    if value is None:
+        return "-"
+    return value if isinstance(value, str) else json.dumps(value, separators=(",", ":"))
+
+
+def format_table(items, columns=TABLE_COLUMNS, max_width=60):
+    """Render objects as a compact, aligned text table"""
+    rows = [[header for header, _ in columns]]
+    for obj in items:
+        rows.append([_cell(obj, path).replace("\n", " ")[:max_width] for _, path in columns])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    return "\n".join(
+        "  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip()
+        for row in rows
+    )
+
+
+def _list_command(client, api_version, kind, options):
+    """List a kind with optional projection, filters and table output"""
+    if not (options.selector or options.condition or options.fields or options.table):
+        return client.get_kubernetes_resources(api_version, kind, options.namespace)
+
+    fields = options.fields.split(",") if options.fields else None
+    if options.table and not fields:
+        fields = TABLE_FIELDS
+    try:
+        items = client.list_resources(api_version, kind, options.namespace,
+                                      selector=options.selector, fields=fields,
+                                      condition=options.condition)
+    except FluxMCPError as e:
+        return {"error": str(e)}
+
+    if options.table:
+        columns = TABLE_COLUMNS
+        if options.fields:
+            columns = [(path.rsplit(".", 1)[-1].upper(), path) for path in fields]
+        print(format_table(items, columns))
+    else:
+        for obj in items:
+            print(json.dumps(obj, separators=(",", ":")))
+    return None
+
+
+# Kinds listed by the kustomizations and helmreleases commands
+LIST_COMMANDS = {
+    "kustomizations": ("kustomize.toolkit.fluxcd.io/v1", "Kustomization"),
+    "helmreleases": ("helm.toolkit.fluxcd.io/v2", "HelmRelease"),
+}
+
+
+def build_parser():
+    """Parser of the wrapper CLI
+
+    Arguments, --help included, are parsed before the MCP server is started,
+    so help never reaches the server as a resource name.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="flux_mcp_wrapper.py",
+        description="Call Flux MCP tools",
+        epilog="Read-only results are cached in memory for FLUX_MCP_CACHE_TTL "
+               "seconds (default 10, 0 disables); set FLUX_MCP_CACHE_FILE to share "
+               "them between invocations through a file readable only by you.",
+    )
+    commands = parser.add_subparsers(dest="command", metavar="<command>")
+    commands.add_parser("flux-status", help="Get Flux instance status")
+    for name, (_, kind) in LIST_COMMANDS.items():
+        list_parser = commands.add_parser(name, help=f"List all {kind}s")
+        list_parser.add_argument("-n", "--namespace", help="Only this namespace")
+        list_parser.add_argument("-l", "--selector", help="Label selector, e.g. app=authentik")
+        list_parser.add_argument("--condition", help='Condition filter, e.g. "Ready=False"')
+        list_parser.add_argument("--fields", help="Comma-separated field paths to keep")
+        list_parser.add_argument("--table", action="store_true", help="Compact table output")
+    reconcile_ks = commands.add_parser("reconcile-ks", help="Reconcile a Kustomization")
+    reconcile_ks.add_argument("name")
+    reconcile_ks.add_argument("namespace", nargs="?", default="flux-system")
+    reconcile_hr = commands.add_parser("reconcile-hr", help="Reconcile a HelmRelease")
+    reconcile_hr.add_argument("name")
+    reconcile_hr.add_argument("namespace")
+    return parser
+
+
+def main(argv=None):
     """Main function for CLI usage"""
-    if len(sys.argv) < 2:
-        print("Usage: flux_mcp_wrapper.py <command> [args...]")
-        print("\nCommands:")
-        print("  flux-status - Get Flux instance status")
-        print("  kustomizations - List all Kustomizations")
-        print("  helmreleases - List all HelmReleases")
-        print("  reconcile-ks <name> [namespace] - Reconcile a Kustomization")
-        print("  reconcile-hr <name> <namespace> - Reconcile a HelmRelease")
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
         return 1
 
-    client = FluxMCPClient()
-    command = sys.argv[1]
+    client = FluxMCPClient(cache=ResultCache.from_env())
 
-    if command == "flux-status":
+    if args.command == "flux-status":
         result = client.get_flux_instance()
-    elif command == "kustomizations":
-        result = client.get_kubernetes_resources("kustomize.toolkit.fluxcd.io/v1", "Kustomization")
-    elif command == "helmreleases":
-        result = client.get_kubernetes_resources("helm.toolkit.fluxcd.io/v2", "HelmRelease")
-    elif command == "reconcile-ks":
-        if len(sys.argv) < 3:
-            print("Error: Missing kustomization name")
-            return 1
-        name = sys.argv[2]
-        namespace = sys.argv[3] if len(sys.argv) > 3 else "flux-system"
-        result = client.reconcile_flux_kustomization(name, namespace)
-    elif command == "reconcile-hr":
-        if len(sys.argv) < 4:
-            print("Error: Missing helmrelease name and/or namespace")
-            return 1
-        name = sys.argv[2]
-        namespace = sys.argv[3]
-        result = client.reconcile_flux_helmrelease(name, namespace)
+    elif args.command in LIST_COMMANDS:
+        api_version, kind = LIST_COMMANDS[args.command]
+        result = _list_command(client, api_version, kind, args)
+    elif args.command == "reconcile-ks":
+        result = client.reconcile_flux_kustomization(args.name, args.namespace)
     else:
-        print(f"Unknown command: {command}")
-        return 1
+        result = client.reconcile_flux_helmrelease(args.name, args.namespace)
+
+    # Projected and table output has been printed already
+    if result is None:
+        return 0
 
     # Pretty print the result
     if "result" in result:
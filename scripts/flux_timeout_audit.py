@@ -0,0 +1,504 @@
+#!/usr/bin/env python3
+"""
+Flux Timeout Audit
+
+Checks every Flux HelmRelease, Kustomization, GitRepository and HelmRepository
+for the timeout, retry and interval settings we rely on during recovery, and
+that the Flux controllers and their monitoring objects exist.
+
+Each kind is listed once, all kinds concurrently, and every rule in RULES is
+evaluated in memory against the listed objects. The old shell version ran a
+separate `kubectl get -o json` per object, so its run time grew with the
+number of releases; this one costs a handful of list calls.
+
+    flux_timeout_audit.py [--json] [--api-server http://127.0.0.1:8001]
+
+Objects are listed through FluxMCPClient by default, or straight from the
+Kubernetes API with --api-server (`kubectl proxy` on a workstation).
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+# The Kubernetes client lives with the proxy configuration scripts
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, "authentik-proxy-config"))
+
+from flux_mcp_wrapper import FluxMCPClient, FluxMCPError  # noqa: E402
+from kube_api import (  # noqa: E402
+    KubernetesAPIError,
+    KubernetesClient,
+    KubernetesConfig,
+)
+
+FAIL = "fail"
+WARNING = "warning"
+
+
+@dataclass(frozen=True)
+class AuditedKind:
+    """A resource collection listed once per audit."""
+
+    kind: str
+    api_version: str
+    plural: str
+    namespace: Optional[str] = None
+    # Severity of the finding when the list call itself fails
+    severity_on_error: str = FAIL
+
+    @property
+    def path(self) -> str:
+        prefix = "/api/v1" if self.api_version == "v1" else f"/apis/{self.api_version}"
+        if self.namespace:
+            prefix += f"/namespaces/{self.namespace}"
+        return f"{prefix}/{self.plural}"
+
+
+AUDITED_KINDS = [
+    AuditedKind("HelmRelease", "helm.toolkit.fluxcd.io/v2", "helmreleases"),
+    AuditedKind("Kustomization", "kustomize.toolkit.fluxcd.io/v1", "kustomizations"),
+    AuditedKind("GitRepository", "source.toolkit.fluxcd.io/v1", "gitrepositories"),
+    AuditedKind("HelmRepository", "source.toolkit.fluxcd.io/v1", "helmrepositories"),
+    AuditedKind("Deployment", "apps/v1", "deployments", "flux-system"),
+    AuditedKind(
+        "ServiceMonitor",
+        "monitoring.coreos.com/v1",
+        "servicemonitors",
+        "monitoring",
+        WARNING,
+    ),
+    AuditedKind(
+        "PrometheusRule",
+        "monitoring.coreos.com/v1",
+        "prometheusrules",
+        "monitoring",
+        WARNING,
+    ),
+]
+
+
+@dataclass(frozen=True)
+class Rule:
+    """A declarative check applied to every object of a kind.
+
+    check is one of:
+      required     the field is set
+      equals       the field equals value
+      min_duration the field's duration is at least value (a Flux duration)
+      below_field  the field's duration is shorter than the field named by value
+      ready        readyReplicas equals spec.replicas (Deployments)
+
+    Duration checks skip objects where the field is unset; the matching
+    required rule reports those. names limits the rule to matching object
+    names (fnmatch patterns).
+    """
+
+    id: str
+    kind: str
+    field: str
+    check: str
+    severity: str
+    message: str
+    value: Any = None
+    names: Tuple[str, ...] = ()
+
+
+# fmt: off
+RULES = [
+    # HelmReleases
+    Rule("hr-timeout", "HelmRelease", "spec.timeout", "required", FAIL,
+         "missing main timeout"),
+    Rule("hr-install-timeout", "HelmRelease", "spec.install.timeout", "required",
+         FAIL, "missing install timeout"),
+    Rule("hr-upgrade-timeout", "HelmRelease", "spec.upgrade.timeout", "required",
+         FAIL, "missing upgrade timeout"),
+    Rule("hr-rollback-timeout", "HelmRelease", "spec.rollback.timeout", "required",
+         WARNING, "missing rollback timeout"),
+    Rule("hr-install-retries", "HelmRelease", "spec.install.remediation.retries",
+         "required", WARNING, "missing install remediation retries"),
+    Rule("hr-upgrade-retries", "HelmRelease", "spec.upgrade.remediation.retries",
+         "required", WARNING, "missing upgrade remediation retries"),
+    Rule("hr-critical-timeout", "HelmRelease", "spec.timeout", "min_duration",
+         WARNING, "timeout may be too short for a critical component", "15m",
+         ("longhorn", "cilium")),
+    Rule("hr-standard-timeout", "HelmRelease", "spec.timeout", "min_duration",
+         WARNING, "timeout may be too short for a standard component", "10m",
+         ("cert-manager", "ingress-nginx")),
+    Rule("hr-simple-timeout", "HelmRelease", "spec.timeout", "min_duration",
+         WARNING, "timeout may be too short", "5m",
+         ("external-dns", "monitoring*")),
+    Rule("hr-interval", "HelmRelease", "spec.interval", "min_duration", WARNING,
+         "interval below 1m polls the API needlessly often", "1m"),
+    # Kustomizations
+    Rule("ks-timeout", "Kustomization", "spec.timeout", "required", FAIL,
+         "missing timeout"),
+    Rule("ks-retry-interval", "Kustomization", "spec.retryInterval", "required",
+         WARNING, "missing retryInterval"),
+    Rule("ks-wait", "Kustomization", "spec.wait", "equals", WARNING,
+         "should have wait: true", True),
+    Rule("ks-retry-below-interval", "Kustomization", "spec.retryInterval",
+         "below_field", WARNING,
+         "retryInterval should be shorter than interval", "spec.interval"),
+    Rule("ks-interval", "Kustomization", "spec.interval", "min_duration", WARNING,
+         "interval below 1m polls the API needlessly often", "1m"),
+    # Sources
+    Rule("git-timeout", "GitRepository", "spec.timeout", "required", FAIL,
+         "missing timeout"),
+    Rule("helmrepo-timeout", "HelmRepository", "spec.timeout", "required", FAIL,
+         "missing timeout"),
+    # Controllers
+    Rule("controller-ready", "Deployment", "status.readyReplicas", "ready", FAIL,
+         "controller is not ready",
+         names=("source-controller", "kustomize-controller", "helm-controller",
+                "notification-controller")),
+]
+# fmt: on
+
+# Objects that must exist: (kind, namespace, name, severity)
+REQUIRED_OBJECTS = [
+    ("Deployment", "flux-system", "source-controller", FAIL),
+    ("Deployment", "flux-system", "kustomize-controller", FAIL),
+    ("Deployment", "flux-system", "helm-controller", FAIL),
+    ("Deployment", "flux-system", "notification-controller", FAIL),
+    ("ServiceMonitor", "monitoring", "flux-system-source-controller", WARNING),
+    ("ServiceMonitor", "monitoring", "flux-system-helm-controller", WARNING),
+    ("PrometheusRule", "monitoring", "flux-system-alerts", WARNING),
+]
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_SECONDS = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+
+
+def parse_duration(value: Any) -> Optional[float]:
+    """Parse a Go/Flux duration such as "15m", "1h30m" or "5m0s" into seconds.
+
+    Returns None for values that are not durations.
+    """
+    text = str(value).strip()
+    if not text:
+        return None
+    position = 0
+    seconds = 0.0
+    for match in _DURATION_PART.finditer(text):
+        if match.start() != position:
+            return None
+        seconds += float(match.group(1)) * _DURATION_SECONDS[match.group(2)]
+        position = match.end()
+    return seconds if position == len(text) else None
+
+
+_MISSING = object()
+
+
+def get_field(obj: Dict, path: str) -> Any:
+    """Look up a dotted field path, returning _MISSING when any part is unset."""
+    value: Any = obj
+    for part in path.split("."):
+        if not isinstance(value, dict) or value.get(part) is None:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+@dataclass
+class Finding:
+    """A rule an object did not satisfy."""
+
+    rule: str
+    severity: str
+    kind: str
+    namespace: str
+    name: str
+    message: str
+    value: Any = None
+
+    @property
+    def ref(self) -> str:
+        return f"{self.namespace}/{self.name}" if self.namespace else self.name
+
+    def to_dict(self):
+        return {
+            "rule": self.rule,
+            "severity": self.severity,
+            "kind": self.kind,
+            "namespace": self.namespace,
+            "name": self.name,
+            "message": self.message,
+            "value": self.value,
+        }
+
+
+@dataclass
+class AuditReport:
+    """Findings of one audit run."""
+
+    findings: List[Finding] = field(default_factory=list)
+    objects: Dict[str, int] = field(default_factory=dict)
+    rules_evaluated: int = 0
+    wall_seconds: float = 0.0
+
+    @property
+    def failures(self) -> List[Finding]:
+        return [f for f in self.findings if f.severity == FAIL]
+
+    @property
+    def warnings(self) -> List[Finding]:
+        return [f for f in self.findings if f.severity == WARNING]
+
+    @property
+    def passed(self) -> bool:
+        return not self.failures
+
+    def to_dict(self):
+        return {
+            "passed": self.passed,
+            "objects": self.objects,
+            "rules_evaluated": self.rules_evaluated,
+            "failures": len(self.failures),
+            "warnings": len(self.warnings),
+            "wall_seconds": round(self.wall_seconds, 3),
+            "findings": [f.to_dict() for f in self.findings],
+        }
+
+
+def evaluate_rule(rule: Rule, obj: Dict) -> Optional[Finding]:
+    """Apply one rule to one object, returning a Finding when it fails."""
+    metadata = obj.get("metadata", {})
+    name = metadata.get("name", "")
+    if rule.names and not any(fnmatch.fnmatch(name, p) for p in rule.names):
+        return None
+
+    value = get_field(obj, rule.field)
+    message = rule.message
+    if rule.check == "required":
+        failed = value is _MISSING
+    elif rule.check == "equals":
+        failed = value != rule.value
+    elif rule.check == "min_duration":
+        seconds = parse_duration(value) if value is not _MISSING else None
+        failed = seconds is not None and seconds < parse_duration(rule.value)
+        message = f"{message} ({value} < {rule.value})"
+    elif rule.check == "below_field":
+        other = get_field(obj, rule.value)
+        seconds = parse_duration(value) if value is not _MISSING else None
+        limit = parse_duration(other) if other is not _MISSING else None
+        failed = None not in (seconds, limit) and seconds >= limit
+        message = f"{message} ({value} >= {other})"
+    elif rule.check == "ready":
+        desired = get_field(obj, "spec.replicas")
+        ready = 0 if value is _MISSING else value
+        desired = 1 if desired is _MISSING else desired
+        failed = ready != desired
+        value = f"{ready}/{desired}"
+        message = f"{message} ({value})"
+    else:
+        raise ValueError(f"Unknown check {rule.check!r} in rule {rule.id}")
+
+    if not failed:
+        return None
+    return Finding(
+        rule.id,
+        rule.severity,
+        obj.get("kind") or rule.kind,
+        metadata.get("namespace", ""),
+        name,
+        message,
+        None if value is _MISSING else value,
+    )
+
+
+def audit_objects(
+    objects: Dict[str, List[Dict]],
+    rules: List[Rule] = RULES,
+    required: List[Tuple[str, str, str, str]] = REQUIRED_OBJECTS,
+) -> AuditReport:
+    """Evaluate the rules table against already listed objects by kind."""
+    report = AuditReport(objects={kind: len(items) for kind, items in objects.items()})
+    rules_by_kind: Dict[str, List[Rule]] = {}
+    for rule in rules:
+        rules_by_kind.setdefault(rule.kind, []).append(rule)
+
+    for kind, items in objects.items():
+        for obj in items:
+            for rule in rules_by_kind.get(kind, []):
+                report.rules_evaluated += 1
+                finding = evaluate_rule(rule, obj)
+                if finding:
+                    report.findings.append(finding)
+
+    for kind, namespace, name, severity in required:
+        if kind not in objects:
+            continue  # the list call failed and was already reported
+        report.rules_evaluated += 1
+        names = {
+            (o.get("metadata", {}).get("namespace", ""), o["metadata"].get("name"))
+            for o in objects[kind]
+            if "metadata" in o
+        }
+        if (namespace, name) not in names:
+            report.findings.append(
+                Finding("exists", severity, kind, namespace, name, "not found")
+            )
+    return report
+
+
+def mcp_fetcher(client: FluxMCPClient) -> Callable[[AuditedKind], List[Dict]]:
+    """List a kind through the Flux MCP server."""
+
+    def fetch(kind: AuditedKind) -> List[Dict]:
+        return client.list_resources(kind.api_version, kind.kind, kind.namespace)
+
+    return fetch
+
+
+def kube_fetcher(client: KubernetesClient) -> Callable[[AuditedKind], List[Dict]]:
+    """List a kind straight from the Kubernetes API."""
+
+    def fetch(kind: AuditedKind) -> List[Dict]:
+        items = client.list_all(kind.path)
+        # Collection items omit kind; the rules and findings rely on it
+        for item in items:
+            item.setdefault("kind", kind.kind)
+        return items
+
+    return fetch
+
+
+def api_fetcher(
+    api_server: Optional[str] = None,
+) -> Callable[[AuditedKind], List[Dict]]:
+    """Fetch from the Kubernetes API at api_server, else the Flux MCP server.
+
+    The API token, if any, comes from KUBERNETES_TOKEN.
+    """
+    if api_server:
+        config = KubernetesConfig(api_server, token=os.environ.get("KUBERNETES_TOKEN"))
+        return kube_fetcher(KubernetesClient(config))
+    return mcp_fetcher(FluxMCPClient())
+
+
+def list_kinds(
+    fetch: Callable[[AuditedKind], List[Dict]],
+    kinds: List[AuditedKind],
+    max_workers: int = 8,
+    thread_name_prefix: str = "list",
+) -> Tuple[Dict[str, List[Dict]], List[Finding]]:
+    """List every kind once, concurrently.
+
+    Returns the objects by kind, and a "list" finding at the kind's
+    severity_on_error for each kind that could not be listed; such a kind
+    is left out of the objects, so callers can skip its checks.
+    """
+
+    def list_kind(kind: AuditedKind):
+        try:
+            return fetch(kind), None
+        except (FluxMCPError, KubernetesAPIError) as e:
+            return None, e
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(kinds))),
+        thread_name_prefix=thread_name_prefix,
+    ) as pool:
+        fetched = list(pool.map(list_kind, kinds))
+
+    objects: Dict[str, List[Dict]] = {}
+    errors = []
+    for kind, (items, error) in zip(kinds, fetched):
+        if error is None:
+            objects[kind.kind] = items
+        else:
+            errors.append(
+                Finding(
+                    "list",
+                    kind.severity_on_error,
+                    kind.kind,
+                    kind.namespace or "",
+                    "",
+                    f"could not list {kind.plural}: {error}",
+                )
+            )
+    return objects, errors
+
+
+class FluxTimeoutAudit:
+    """List every audited kind once, concurrently, then apply the rules."""
+
+    def __init__(
+        self,
+        fetch: Callable[[AuditedKind], List[Dict]],
+        kinds: List[AuditedKind] = AUDITED_KINDS,
+        rules: List[Rule] = RULES,
+        max_workers: int = 8,
+    ):
+        self.fetch = fetch
+        self.kinds = kinds
+        self.rules = rules
+        self.max_workers = max_workers
+
+    def run(self) -> AuditReport:
+        """Run the audit and return its findings."""
+        started = time.monotonic()
+        objects, errors = list_kinds(
+            self.fetch, self.kinds, self.max_workers, thread_name_prefix="audit"
+        )
+
+        report = audit_objects(objects, self.rules)
+        report.findings = errors + report.findings
+        report.wall_seconds = time.monotonic() - started
+        return report
+
+
+def print_report(report: AuditReport):
+    """Print the findings for terminal use."""
+    print("=== FLUX TIMEOUT AUDIT ===")
+    counts = ", ".join(f"{n} {kind}" for kind, n in report.objects.items())
+    print(f"Checked {counts}")
+    for finding in report.findings:
+        mark = "✗" if finding.severity == FAIL else "⚠"
+        print(
+            f"{mark} {finding.kind} {finding.ref}: {finding.message} [{finding.rule}]"
+        )
+
+    print()
+    print(
+        f"{report.rules_evaluated} checks, {len(report.failures)} failed, "
+        f"{len(report.warnings)} warnings in {report.wall_seconds:.2f}s"
+    )
+    if report.passed:
+        print("✓ All critical timeout configurations are in place")
+    else:
+        print("✗ Some timeout configurations are missing or incorrect")
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description="Audit Flux timeout configuration")
+    parser.add_argument(
+        "--api-server",
+        help="List from this Kubernetes API URL (e.g. kubectl proxy) "
+        "instead of the Flux MCP server; token from KUBERNETES_TOKEN",
+    )
+    parser.add_argument("--json", action="store_true", help="Output in JSON format")
+    args = parser.parse_args(argv)
+
+    report = FluxTimeoutAudit(api_fetcher(args.api_server)).run()
+
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print_report(report)
+
+    sys.exit(0 if report.passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+GitOps Operations CLI
+
+Single entry point for the Authentik proxy, outpost, token and Flux scripts:
+
+    gitops_cli.py proxy configure [--watch ...]
+    gitops_cli.py proxy fleet targets.json
+    gitops_cli.py proxy catalog [path]
+    gitops_cli.py proxy discover [--dry-run]
+    gitops_cli.py proxy probe [--json | --metrics] [--pushgateway url]
+    gitops_cli.py authentik wait-ready [--timeout 300]
+    gitops_cli.py outposts fix
+    gitops_cli.py outposts assign
+    gitops_cli.py tokens list|rotate|validate [--json ...]
+    gitops_cli.py tokens extract
+    gitops_cli.py flux status|kustomizations|helmreleases|reconcile-ks|reconcile-hr
+    gitops_cli.py flux audit-timeouts [--json]
+    gitops_cli.py flux reconcile-all [--parallelism 4] [--dry-run] [name ...]
+    gitops_cli.py flux critical-path [--report file] [--json] [--dot file]
+    gitops_cli.py recovery validate [--json]
+    gitops_cli.py recovery monitor [--api-server URL] [--log file | --replay file]
+    gitops_cli.py cnpg backup-health [--json | --metrics] [--pushgateway url]
+    gitops_cli.py longhorn ssd-inventory [--json] [--api-server URL]
+    gitops_cli.py network lb-probe [--samples 5] [--json] [--api-server URL]
+    gitops_cli.py cluster snapshot capture FILE [--namespace NS] [--api-server URL]
+    gitops_cli.py cluster snapshot diff BEFORE AFTER [--json]
+
+Only argparse is imported up front. The script behind a subcommand is loaded
+when that subcommand runs, so `tokens list` never pays for urllib/ssl and
+`proxy configure` never pays for requests. CronJobs and Flux hooks start this
+fresh on every run, which is where the startup time adds up.
+
+Any arguments after the subcommand, including --help, are passed through to
+the underlying script unchanged.
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+class Command(NamedTuple):
+    """A subcommand backed by a script's main() function."""
+
+    script: str
+    help: str
+    prefix: Tuple[str, ...] = ()
+
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# group -> command -> script relative to SCRIPTS_DIR
+COMMANDS: Dict[str, Dict[str, Command]] = {
+    "proxy": {
+        "configure": Command(
+            "authentik-proxy-config/configure_proxy.py",
+            "Configure proxy providers, applications and outpost assignments",
+        ),
+        "fleet": Command(
+            "authentik-proxy-config/fleet_reconcile.py",
+            "Reconcile proxy configuration across several clusters",
+        ),
+        "catalog": Command(
+            "authentik-proxy-config/service_catalog.py",
+            "Validate and print the service catalog",
+        ),
+        "discover": Command(
+            "authentik-proxy-config/service_discovery.py",
+            "Discover labelled Services and Ingresses and reconcile their proxies",
+        ),
+        "probe": Command(
+            "authentik-proxy-config/service_prober.py",
+            "Probe catalog services over HTTPS concurrently",
+        ),
+    },
+    "authentik": {
+        "wait-ready": Command(
+            "authentik-proxy-config/wait_ready.py",
+            "Wait until the Authentik server and API are ready",
+        ),
+    },
+    "outposts": {
+        "fix": Command(
+            "authentik-proxy-config/fix-outpost-conflicts.py",
+            "Resolve providers assigned to multiple outposts",
+        ),
+        "assign": Command(
+            "authentik-proxy-config/fix_outpost_assignments.py",
+            "Assign catalog providers to the external outpost",
+        ),
+    },
+    "tokens": {
+        "list": Command(
+            "token-management/authentik_token_manager.py",
+            "List Authentik API tokens",
+            ("list",),
+        ),
+        "rotate": Command(
+            "token-management/authentik_token_manager.py",
+            "Rotate tokens that are expiring soon",
+            ("rotate",),
+        ),
+        "validate": Command(
+            "token-management/authentik_token_manager.py",
+            "Validate all tokens concurrently and classify their expiry",
+            ("validate",),
+        ),
+        "extract": Command(
+            "token-management/extract-outpost-tokens.py",
+            "Extract external outpost tokens for 1Password",
+        ),
+    },
+    "flux": {
+        "status": Command(
+            "flux_mcp_wrapper.py", "Get Flux instance status", ("flux-status",)
+        ),
+        "kustomizations": Command(
+            "flux_mcp_wrapper.py", "List all Kustomizations", ("kustomizations",)
+        ),
+        "helmreleases": Command(
+            "flux_mcp_wrapper.py", "List all HelmReleases", ("helmreleases",)
+        ),
+        "reconcile-ks": Command(
+            "flux_mcp_wrapper.py", "Reconcile a Kustomization", ("reconcile-ks",)
+        ),
+        "reconcile-hr": Command(
+            "flux_mcp_wrapper.py", "Reconcile a HelmRelease", ("reconcile-hr",)
+        ),
+        "audit-timeouts": Command(
+            "flux_timeout_audit.py",
+            "Audit timeout and interval settings of all Flux resources",
+        ),
+        "reconcile-all": Command(
+            "reconcile_scheduler.py",
+            "Reconcile Kustomizations concurrently in dependsOn order",
+        ),
+        "critical-path": Command(
+            "flux_critical_path.py",
+            "Find the Kustomization dependencies that bound bootstrap time",
+        ),
+    },
+    "recovery": {
+        "validate": Command(
+            "recovery_validator.py",
+            "Validate Flux, nodes, pods and services after a recovery",
+        ),
+        "monitor": Command(
+            "recovery_monitor.py",
+            "Follow recovery progress from Kubernetes watch streams",
+        ),
+    },
+    "cnpg": {
+        "backup-health": Command(
+            "cnpg_backup_health.py",
+            "Check backup configuration and status of all CNPG clusters",
+        ),
+    },
+    "longhorn": {
+        "ssd-inventory": Command(
+            "longhorn_ssd_inventory.py",
+            "Validate Samsung Portable SSD T5 disks and capacity on all nodes",
+        ),
+    },
+    "network": {
+        "lb-probe": Command(
+            "bgp_lb_prober.py",
+            "Probe all LoadBalancer IPs and cross-check BGP pools and advertisements",
+        ),
+    },
+    "cluster": {
+        "snapshot": Command(
+            "cluster_snapshot.py",
+            "Capture cluster state or diff two captures by object",
+        ),
+    },
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the two-level group/command parser."""
+    parser = argparse.ArgumentParser(
+        prog="gitops_cli.py", description="GitOps operations CLI"
+    )
+    groups = parser.add_subparsers(dest="group", metavar="<group>")
+    groups.required = True
+
+    for group, commands in COMMANDS.items():
+        group_parser = groups.add_parser(group, help=f"{group} commands")
+        subcommands = group_parser.add_subparsers(dest="command", metavar="<command>")
+        subcommands.required = True
+        for name, command in commands.items():
+            # add_help=False so --help reaches the underlying script
+            subcommands.add_parser(name, help=command.help, add_help=False)
+
+    return parser
+
+
+def load_script(script: str):
+    """Import a script by path without running its __main__ block."""
+    path = os.path.join(SCRIPTS_DIR, script)
+    module_name = os.path.splitext(os.path.basename(path))[0].replace("-", "_")
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    # Inside the gitops-tools.pyz bundle every script is a top-level module
+    if not os.path.exists(path):
+        return importlib.import_module(module_name)
+
+    script_dir = os.path.dirname(path)
+    # Scripts import their siblings (e.g. service_catalog) by bare name
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def run(group: str, name: str, args: List[str]) -> int:
+    """Run a subcommand's script with the given arguments."""
+    command = COMMANDS[group][name]
+    module = load_script(command.script)
+
+    # Scripts read sys.argv themselves, so present them with their own argv
+    sys.argv = [os.path.join(SCRIPTS_DIR, command.script)] + list(command.prefix) + args
+    result = module.main()
+    return result if isinstance(result, int) else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Main entry point for the CLI."""
+    args, rest = build_parser().parse_known_args(argv)
+    return run(args.group, args.command, rest)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,525 @@
+#!/usr/bin/env python3
+"""
+Longhorn Samsung Portable SSD T5 Inventory
+
+Validates the Longhorn USB SSD setup across all nodes at once: every node
+has a disk at /var/lib/longhorn-ssd tagged "ssd" that is ready and
+schedulable, no other disk carries the "ssd" tag, there are enough usable
+SSD disks for the longhorn-ssd StorageClass's replica count, disk capacity
+is within the over-provisioning and minimal-available settings, and the
+Longhorn workloads and instance managers are running. Prints a capacity
+and health table per disk.
+
+Longhorn nodes, settings, deployments, daemonsets, instance managers and
+StorageClasses are each listed once, concurrently, and joined in memory.
+Disks are read from the nodes' spec.disks and status.diskStatus, so the
+number of API calls stays the same as nodes and disks are added.
+
+    longhorn_ssd_inventory.py [--json] [--api-server http://127.0.0.1:8001]
+
+Objects are listed through FluxMCPClient by default, or straight from the
+Kubernetes API with --api-server (`kubectl proxy` on a workstation).
+"""
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from flux_mcp_wrapper import find_condition
+from flux_timeout_audit import (
+    FAIL,
+    WARNING,
+    AuditedKind,
+    Finding,
+    api_fetcher,
+    list_kinds,
+)
+
+LONGHORN_NAMESPACE = "longhorn-system"
+LONGHORN_API = "longhorn.io/v1beta2"
+SSD_PATH = "/var/lib/longhorn-ssd"
+SSD_TAG = "ssd"
+SSD_STORAGE_CLASS = "longhorn-ssd"
+MIN_SSD_BYTES = 100 * 1000**3  # MIN_SIZE_GB in validate-complete-usb-ssd-setup.sh
+
+# Workloads that must be fully ready: (kind, name)
+REQUIRED_WORKLOADS = [
+    ("DaemonSet", "longhorn-manager"),
+    ("DaemonSet", "longhorn-csi-plugin"),
+    ("Deployment", "longhorn-driver-deployer"),
+]
+
+# Setting name -> (check, expected, message); values are strings in Longhorn
+# fmt: off
+EXPECTED_SETTINGS = {
+    "create-default-disk-labeled-nodes": ("eq", "false",
+                                          "should be false for the SSD setup"),
+    "storage-over-provisioning-percentage": ("max", 150, "might be too high for SSDs"),
+    "storage-minimal-available-percentage": ("max", 20, "might be too high for SSDs"),
+}
+
+COLLECTED_KINDS = [
+    AuditedKind("Node", LONGHORN_API, "nodes", LONGHORN_NAMESPACE),
+    AuditedKind("Setting", LONGHORN_API, "settings", LONGHORN_NAMESPACE),
+    AuditedKind("InstanceManager", LONGHORN_API, "instancemanagers", LONGHORN_NAMESPACE,
+                severity_on_error=WARNING),
+    AuditedKind("Deployment", "apps/v1", "deployments", LONGHORN_NAMESPACE),
+    AuditedKind("DaemonSet", "apps/v1", "daemonsets", LONGHORN_NAMESPACE),
+    AuditedKind("StorageClass", "storage.k8s.io/v1", "storageclasses"),
+]
+# fmt: on
+
+
+def _name(obj: Dict) -> str:
+    return obj.get("metadata", {}).get("name", "")
+
+
+def _condition(conditions, condition_type: str) -> str:
+    return find_condition(conditions, condition_type).get("status", "Unknown")
+
+
+def _int(value, default: int = 0) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def format_bytes(value: int) -> str:
+    """Human readable size in binary units."""
+    size = float(value)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(size) < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}TiB"
+
+
+@dataclass
+class DiskInventory:
+    """One disk of a Longhorn node, spec and status joined."""
+
+    node: str
+    name: str
+    path: str
+    tags: List[str] = field(default_factory=list)
+    allow_scheduling: bool = True
+    ready: str = "Unknown"
+    schedulable: str = "Unknown"
+    maximum: int = 0
+    available: int = 0
+    scheduled: int = 0
+    reserved: int = 0
+
+    @property
+    def is_ssd(self) -> bool:
+        return self.path == SSD_PATH
+
+    @property
+    def usable(self) -> bool:
+        return (
+            self.allow_scheduling
+            and self.ready == "True"
+            and self.schedulable == "True"
+            and SSD_TAG in self.tags
+        )
+
+    def to_dict(self):
+        return {
+            "node": self.node,
+            "name": self.name,
+            "path": self.path,
+            "tags": self.tags,
+            "allow_scheduling": self.allow_scheduling,
+            "ready": self.ready,
+            "schedulable": self.schedulable,
+            "storage_maximum": self.maximum,
+            "storage_available": self.available,
+            "storage_scheduled": self.scheduled,
+            "storage_reserved": self.reserved,
+        }
+
+
+@dataclass
+class WorkloadStatus:
+    """Readiness of a Longhorn deployment or daemonset."""
+
+    kind: str
+    name: str
+    ready: int
+    desired: int
+
+    @property
+    def healthy(self) -> bool:
+        return self.desired > 0 and self.ready == self.desired
+
+    def to_dict(self):
+        return {
+            "kind": self.kind,
+            "name": self.name,
+            "ready": self.ready,
+            "desired": self.desired,
+        }
+
+
+@dataclass
+class InventoryReport:
+    """Outcome of one inventory run."""
+
+    disks: List[DiskInventory] = field(default_factory=list)
+    workloads: List[WorkloadStatus] = field(default_factory=list)
+    findings: List[Finding] = field(default_factory=list)
+    api_calls: int = 0
+    wall_seconds: float = 0.0
+
+    @property
+    def passed(self) -> bool:
+        return not any(f.severity == FAIL for f in self.findings)
+
+    @property
+    def ssd_disks(self) -> List[DiskInventory]:
+        return [d for d in self.disks if d.is_ssd]
+
+    def to_dict(self):
+        ssd = self.ssd_disks
+        return {
+            "passed": self.passed,
+            "api_calls": self.api_calls,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "ssd_disks": len(ssd),
+            "usable_ssd_disks": sum(1 for d in ssd if d.usable),
+            "ssd_storage_maximum": sum(d.maximum for d in ssd),
+            "ssd_storage_available": sum(d.available for d in ssd),
+            "findings": [f.to_dict() for f in self.findings],
+            "disks": [d.to_dict() for d in self.disks],
+            "workloads": [w.to_dict() for w in self.workloads],
+        }
+
+
+def node_disks(node: Dict) -> List[DiskInventory]:
+    """Disks of a Longhorn node from its spec.disks and status.diskStatus."""
+    name = _name(node)
+    statuses = node.get("status", {}).get("diskStatus") or {}
+    disks = []
+    for disk_name, spec in sorted((node.get("spec", {}).get("disks") or {}).items()):
+        status = statuses.get(disk_name) or {}
+        conditions = status.get("conditions")
+        disks.append(
+            DiskInventory(
+                node=name,
+                name=disk_name,
+                path=spec.get("path", ""),
+                tags=list(spec.get("tags") or []),
+                allow_scheduling=spec.get("allowScheduling", True),
+                ready=_condition(conditions, "Ready"),
+                schedulable=_condition(conditions, "Schedulable"),
+                maximum=_int(status.get("storageMaximum")),
+                available=_int(status.get("storageAvailable")),
+                scheduled=_int(status.get("storageScheduled")),
+                reserved=_int(spec.get("storageReserved")),
+            )
+        )
+    return disks
+
+
+def workload_status(obj: Dict) -> WorkloadStatus:
+    """Ready and desired pod counts of a Deployment or DaemonSet."""
+    status = obj.get("status", {})
+    if obj.get("kind") == "DaemonSet":
+        ready = status.get("numberReady")
+        desired = status.get("desiredNumberScheduled")
+    else:
+        ready = status.get("readyReplicas")
+        desired = obj.get("spec", {}).get("replicas", 1)
+    return WorkloadStatus(obj.get("kind", ""), _name(obj), _int(ready), _int(desired))
+
+
+def evaluate(objects: Dict[str, List[Dict]]) -> InventoryReport:
+    """Join the listed objects and run every check in memory."""
+    report = InventoryReport()
+
+    def finding(rule, severity, kind, name, message, value=None, namespace=""):
+        report.findings.append(
+            Finding(rule, severity, kind, namespace, name, message, value)
+        )
+
+    settings = {_name(s): s.get("value") for s in objects.get("Setting", [])}
+    classes = {_name(c): c for c in objects.get("StorageClass", [])}
+    storage_class = classes.get(SSD_STORAGE_CLASS)
+    minimal_pct = _int(settings.get("storage-minimal-available-percentage"), 25)
+    over_pct = _int(settings.get("storage-over-provisioning-percentage"), 200)
+
+    for setting, (check, expected, message) in EXPECTED_SETTINGS.items():
+        if "Setting" not in objects:
+            break
+        value = settings.get(setting)
+        if check == "eq" and str(value).lower() != expected:
+            finding("setting", WARNING, "Setting", setting, message, value)
+        elif check == "max" and _int(value, expected + 1) > expected:
+            finding("setting", WARNING, "Setting", setting, message, value)
+
+    for node in sorted(objects.get("Node", []), key=_name):
+        name = _name(node)
+        if _condition(node.get("status", {}).get("conditions"), "Ready") != "True":
+            finding("node", FAIL, "Node", name, "Longhorn node is not ready")
+        if not node.get("spec", {}).get("allowScheduling", True):
+            finding("node", WARNING, "Node", name, "scheduling is disabled on node")
+
+        disks = node_disks(node)
+        report.disks.extend(disks)
+        if not any(d.is_ssd for d in disks):
+            finding("ssd", WARNING, "Node", name, f"no disk at {SSD_PATH}")
+
+        for disk in disks:
+            ref = f"{name}/{disk.name}"
+            if not disk.is_ssd:
+                if SSD_TAG in disk.tags:
+                    finding(
+                        "ssd-tag",
+                        FAIL,
+                        "Disk",
+                        ref,
+                        "tagged ssd but not the SSD",
+                        disk.path,
+                    )
+                continue
+            if SSD_TAG not in disk.tags:
+                finding("ssd-tag", FAIL, "Disk", ref, "SSD disk is missing the ssd tag")
+            if disk.ready != "True" or disk.schedulable != "True":
+                finding(
+                    "ssd-ready",
+                    WARNING,
+                    "Disk",
+                    ref,
+                    "SSD disk is not ready or not schedulable",
+                    f"ready={disk.ready} schedulable={disk.schedulable}",
+                )
+            elif not disk.allow_scheduling:
+                finding(
+                    "ssd-ready", WARNING, "Disk", ref, "scheduling disabled on disk"
+                )
+            if disk.maximum and disk.maximum < MIN_SSD_BYTES:
+                finding(
+                    "capacity",
+                    WARNING,
+                    "Disk",
+                    ref,
+                    "smaller than expected",
+                    format_bytes(disk.maximum),
+                )
+            if disk.maximum and disk.available * 100 < disk.maximum * minimal_pct:
+                finding(
+                    "capacity",
+                    WARNING,
+                    "Disk",
+                    ref,
+                    f"less than {minimal_pct}% available, no new replicas",
+                    format_bytes(disk.available),
+                )
+            limit = (disk.maximum - disk.reserved) * over_pct // 100
+            if disk.maximum and disk.scheduled > limit:
+                finding(
+                    "capacity",
+                    WARNING,
+                    "Disk",
+                    ref,
+                    f"scheduled beyond {over_pct}% over-provisioning",
+                    format_bytes(disk.scheduled),
+                )
+
+    if "Node" in objects:
+        usable = sum(1 for d in report.ssd_disks if d.usable)
+        replicas = 1
+        if storage_class is not None:
+            parameters = storage_class.get("parameters", {})
+            replicas = _int(parameters.get("numberOfReplicas"), 3)
+        if not report.ssd_disks:
+            finding("ssd", FAIL, "Disk", "", f"no SSD disks at {SSD_PATH} in Longhorn")
+        elif usable < replicas:
+            finding(
+                "ssd",
+                FAIL,
+                "StorageClass",
+                SSD_STORAGE_CLASS,
+                f"{usable} usable SSD disks for {replicas} replicas",
+            )
+
+    if "StorageClass" in objects:
+        if storage_class is None:
+            finding(
+                "storage-class", FAIL, "StorageClass", SSD_STORAGE_CLASS, "not found"
+            )
+        else:
+            selector = storage_class.get("parameters", {}).get("diskSelector")
+            if selector != SSD_TAG:
+                finding(
+                    "storage-class",
+                    FAIL,
+                    "StorageClass",
+                    SSD_STORAGE_CLASS,
+                    f"diskSelector should be {SSD_TAG}",
+                    selector,
+                )
+
+    for kind in ("DaemonSet", "Deployment"):
+        for obj in objects.get(kind, []):
+            obj.setdefault("kind", kind)
+            report.workloads.append(workload_status(obj))
+    report.workloads.sort(key=lambda w: (w.kind, w.name))
+    workloads = {(w.kind, w.name): w for w in report.workloads}
+    for kind, name in REQUIRED_WORKLOADS:
+        if kind not in objects:
+            continue
+        workload = workloads.get((kind, name))
+        if workload is None:
+            finding(
+                "workload", FAIL, kind, name, "not found", namespace=LONGHORN_NAMESPACE
+            )
+        elif not workload.healthy:
+            finding(
+                "workload",
+                FAIL,
+                kind,
+                name,
+                "not fully ready",
+                f"{workload.ready}/{workload.desired}",
+                namespace=LONGHORN_NAMESPACE,
+            )
+
+    for manager in objects.get("InstanceManager", []):
+        state = manager.get("status", {}).get("currentState", "unknown")
+        if state != "running":
+            finding(
+                "instance-manager",
+                WARNING,
+                "InstanceManager",
+                _name(manager),
+                "instance manager is not running",
+                state,
+                namespace=LONGHORN_NAMESPACE,
+            )
+    return report
+
+
+class InventoryCollector:
+    """List every collected kind once, concurrently, then evaluate."""
+
+    def __init__(
+        self,
+        fetch: Callable[[AuditedKind], List[Dict]],
+        kinds: List[AuditedKind] = COLLECTED_KINDS,
+    ):
+        self.fetch = fetch
+        self.kinds = kinds
+
+    def run(self) -> InventoryReport:
+        """Collect and evaluate the Longhorn SSD inventory."""
+        started = time.monotonic()
+        objects, errors = list_kinds(
+            self.fetch, self.kinds, len(self.kinds), thread_name_prefix="longhorn"
+        )
+
+        report = evaluate(objects)
+        report.findings = errors + report.findings
+        report.api_calls = len(self.kinds)
+        report.wall_seconds = time.monotonic() - started
+        return report
+
+
+def format_table(disks: List[DiskInventory]) -> str:
+    """Capacity and health table, one row per disk, SSD totals last."""
+    header = "NODE DISK PATH TAGS READY SCHED MAX AVAIL SCHEDULED RESERVED".split()
+    rows = [
+        [
+            d.node,
+            d.name,
+            d.path,
+            ",".join(d.tags) or "-",
+            d.ready,
+            d.schedulable if d.allow_scheduling else "Disabled",
+            format_bytes(d.maximum),
+            format_bytes(d.available),
+            format_bytes(d.scheduled),
+            format_bytes(d.reserved),
+        ]
+        for d in disks
+    ]
+    ssd = [d for d in disks if d.is_ssd]
+    rows.append(
+        [
+            "TOTAL",
+            f"{sum(1 for d in ssd if d.usable)}/{len(ssd)} ssd",
+            SSD_PATH,
+            "",
+            "",
+            "",
+            format_bytes(sum(d.maximum for d in ssd)),
+            format_bytes(sum(d.available for d in ssd)),
+            format_bytes(sum(d.scheduled for d in ssd)),
+            format_bytes(sum(d.reserved for d in ssd)),
+        ]
+    )
+    widths = [max(len(str(r[i])) for r in [header] + rows) for i in range(len(header))]
+    return "\n".join(
+        "  ".join(str(c).ljust(w) for c, w in zip(row, widths)).rstrip()
+        for row in [header] + rows
+    )
+
+
+def print_report(report: InventoryReport):
+    """Print the report for terminal use."""
+    print("=== LONGHORN SAMSUNG PORTABLE SSD T5 INVENTORY ===")
+    print(format_table(report.disks))
+    print()
+    for workload in report.workloads:
+        mark = "✓" if workload.healthy else "✗"
+        print(
+            f"{mark} {workload.kind} {workload.name}: "
+            f"{workload.ready}/{workload.desired} ready"
+        )
+    if report.findings:
+        print()
+    for finding in report.findings:
+        mark = "✗" if finding.severity == FAIL else "⚠"
+        value = f" ({finding.value})" if finding.value not in (None, "") else ""
+        print(f"{mark} {finding.kind} {finding.ref}: {finding.message}{value}")
+
+    print()
+    failures = sum(1 for f in report.findings if f.severity == FAIL)
+    print(
+        f"{len(report.disks)} disks, {failures} failures, "
+        f"{report.api_calls} API calls in {report.wall_seconds:.2f}s"
+    )
+    if report.passed:
+        print("✓ Longhorn is configured for Samsung Portable SSD T5 storage")
+    else:
+        print("✗ Longhorn SSD storage needs attention")
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description="Validate the Longhorn Samsung Portable SSD T5 inventory"
+    )
+    parser.add_argument(
+        "--api-server",
+        help="List from this Kubernetes API URL (e.g. kubectl proxy) "
+        "instead of the Flux MCP server; token from KUBERNETES_TOKEN",
+    )
+    parser.add_argument("--json", action="store_true", help="Output in JSON format")
+    args = parser.parse_args(argv)
+
+    report = InventoryCollector(api_fetcher(args.api_server)).run()
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print_report(report)
+
+    sys.exit(0 if report.passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""
+Repository Manifest Index
+
+Walks infrastructure/, apps/ and clusters/ once, parses every YAML document
+and builds an index by kind, namespace and name, with cross-references:
+
+    Flux Kustomization     -> spec.path in the repository
+    kustomize Kustomization -> local resources, components and patches
+    ExternalSecret         -> 1Password item (secret store + remote key)
+    Job / CronJob          -> heredoc-embedded scripts in its containers
+
+The index is persisted keyed by each file's SHA-256, so a re-run re-parses
+only files whose content changed. Changed files are parsed in parallel across
+cores. Pre-commit hooks and CI checks query the index instead of re-reading
+every manifest:
+
+    manifest_index.py build
+    manifest_index.py query --kind ExternalSecret --namespace authentik-proxy
+    manifest_index.py refs --type onepassword
+    manifest_index.py validate
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import yaml
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INDEX_ROOTS = ("infrastructure", "apps", "clusters")
+DEFAULT_CACHE = os.path.join(".cache", "manifest-index.json")
+# Bump when the stored document summary changes shape
+INDEX_VERSION = 1
+
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Changed files below this count are parsed inline; a process pool only pays
+# off once there is enough work to amortise starting it
+PARALLEL_THRESHOLD = 32
+
+FLUX_KUSTOMIZE_GROUP = "kustomize.toolkit.fluxcd.io/"
+KUSTOMIZE_CONFIG_GROUP = "kustomize.config.k8s.io/"
+# kustomize only builds these; other files holding a kustomize Kustomization
+# (drafts, alternates) are indexed but their resources are not cross-referenced
+KUSTOMIZE_FILENAMES = ("kustomization.yaml", "kustomization.yml", "Kustomization")
+
+# `cat > /tmp/configure_proxy.py << 'EOF'` in container commands and args
+_HEREDOC = re.compile(r"cat\s+>\s*(\S+)\s+<<-?\s*['\"]?\w+['\"]?")
+
+
+@dataclass
+class Document:
+    """Index entry for one YAML document."""
+
+    path: str
+    index: int
+    api_version: str
+    kind: str
+    namespace: str
+    name: str
+    # (type, target) pairs, e.g. ("path", "infrastructure/authentik-proxy")
+    refs: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        return (self.kind, self.namespace, self.name)
+
+    def to_dict(self):
+        return {
+            "path": self.path,
+            "index": self.index,
+            "apiVersion": self.api_version,
+            "kind": self.kind,
+            "namespace": self.namespace,
+            "name": self.name,
+            "refs": [list(ref) for ref in self.refs],
+        }
+
+    @classmethod
+    def from_dict(cls, data) -> "Document":
+        return cls(
+            data["path"],
+            data["index"],
+            data["apiVersion"],
+            data["kind"],
+            data["namespace"],
+            data["name"],
+            [tuple(ref) for ref in data["refs"]],
+        )
+
+
+@dataclass
+class FileEntry:
+    """Parsed summary of one manifest file and the hash it was parsed from."""
+
+    sha256: str
+    documents: List[Document] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def _local_path(base_dir: str, target: str) -> Optional[str]:
+    """Repository-relative path for a local kustomize reference."""
+    if "://" in target or target.startswith(("github.com/", "git@")):
+        return None
+    return os.path.normpath(os.path.join(base_dir, target))
+
+
+def _container_strings(spec: Dict) -> Iterator[str]:
+    for key in ("initContainers", "containers"):
+        for container in spec.get(key) or []:
+            for value in (container.get("command") or []) + (
+                container.get("args") or []
+            ):
+                if isinstance(value, str):
+                    yield value
+
+
+def document_refs(obj: Dict, path: str) -> List[Tuple[str, str]]:
+    """Cross-references from one document to paths, secrets and scripts."""
+    api_version = str(obj.get("apiVersion", ""))
+    kind = obj.get("kind")
+    spec = obj.get("spec") or {}
+    refs: List[Tuple[str, str]] = []
+
+    if kind == "Kustomization" and api_version.startswith(FLUX_KUSTOMIZE_GROUP):
+        if spec.get("path"):
+            refs.append(("path", os.path.normpath(spec["path"])))
+        for dependency in spec.get("dependsOn") or []:
+            refs.append(("dependsOn", dependency.get("name", "")))
+
+    elif (
+        kind == "Kustomization"
+        and os.path.basename(path) in KUSTOMIZE_FILENAMES
+        and (api_version.startswith(KUSTOMIZE_CONFIG_GROUP) or not api_version)
+    ):
+        base_dir = os.path.dirname(path)
+        entries = list(obj.get("resources") or []) + list(obj.get("components") or [])
+        entries += [
+            p.get("path") for p in obj.get("patches") or [] if isinstance(p, dict)
+        ]
+        entries += [
+            p for p in obj.get("patchesStrategicMerge") or [] if isinstance(p, str)
+        ]
+        for entry in entries:
+            local = _local_path(base_dir, entry) if isinstance(entry, str) else None
+            if local:
+                refs.append(("resource", local))
+
+    elif kind == "ExternalSecret":
+        store = (spec.get("secretStoreRef") or {}).get("name", "")
+        keys = [
+            (item.get("remoteRef") or {}).get("key") for item in spec.get("data") or []
+        ]
+        keys += [
+            (item.get("extract") or {}).get("key")
+            for item in spec.get("dataFrom") or []
+        ]
+        for key in keys:
+            if key:
+                refs.append(("onepassword", f"{store}/{key}"))
+
+    elif kind in ("Job", "CronJob"):
+        template = spec
+        if kind == "CronJob":
+            template = (spec.get("jobTemplate") or {}).get("spec") or {}
+        pod_spec = (template.get("template") or {}).get("spec") or {}
+        for value in _container_strings(pod_spec):
+            for target in _HEREDOC.findall(value):
+                refs.append(("script", target))
+
+    # Several fields of one 1Password item resolve to the same reference
+    return list(dict.fromkeys(refs))
+
+
+def parse_manifest(path: str, text: str) -> Tuple[List[Document], Optional[str]]:
+    """Parse one manifest's documents into index entries."""
+    try:
+        loaded = list(yaml.load_all(text, Loader=YAML_LOADER))
+    except yaml.YAMLError as e:
+        return [], str(e).replace("\n", " ")
+
+    documents = []
+    for index, obj in enumerate(loaded):
+        if not isinstance(obj, dict) or "kind" not in obj:
+            continue
+        metadata = obj.get("metadata") or {}
+        documents.append(
+            Document(
+                path,
+                index,
+                str(obj.get("apiVersion", "")),
+                str(obj["kind"]),
+                str(metadata.get("namespace") or ""),
+                str(metadata.get("name") or ""),
+                document_refs(obj, path),
+            )
+        )
+    return documents, None
+
+
+def _indexer_hash() -> str:
+    """Hash of this module; a changed indexer invalidates every cached entry."""
+    with open(os.path.abspath(__file__), "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _parse_job(job: Tuple[str, str]):
+    path, text = job
+    return parse_manifest(path, text)
+
+
+class ManifestIndex:
+    """Index of every manifest document, persisted by file content hash."""
+
+    def __init__(self, root: str = REPO_ROOT, roots=INDEX_ROOTS):
+        self.root = root
+        self.roots = roots
+        self.files: Dict[str, FileEntry] = {}
+        self.parsed = 0
+        self.build_seconds = 0.0
+
+    def manifest_paths(self) -> List[str]:
+        """Repository-relative paths of every YAML file under the index roots."""
+        paths = []
+        for top in self.roots:
+            for directory, dirnames, filenames in os.walk(os.path.join(self.root, top)):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    if filename.endswith((".yaml", ".yml")):
+                        full = os.path.join(directory, filename)
+                        paths.append(os.path.relpath(full, self.root))
+        return paths
+
+    def build(self, jobs: Optional[int] = None) -> "ManifestIndex":
+        """Hash every manifest and re-parse only those whose content changed."""
+        started = time.monotonic()
+        files: Dict[str, FileEntry] = {}
+        changed: List[Tuple[str, str]] = []
+        hashes = {}
+
+        for path in self.manifest_paths():
+            with open(os.path.join(self.root, path), "rb") as f:
+                data = f.read()
+            digest = hashlib.sha256(data).hexdigest()
+            cached = self.files.get(path)
+            if cached is not None and cached.sha256 == digest:
+                files[path] = cached
+            else:
+                hashes[path] = digest
+                changed.append((path, data.decode("utf-8", errors="replace")))
+
+        if len(changed) >= PARALLEL_THRESHOLD and jobs != 1:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(_parse_job, changed, chunksize=8))
+        else:
+            results = [_parse_job(job) for job in changed]
+
+        for (path, _), (documents, error) in zip(changed, results):
+            files[path] = FileEntry(hashes[path], documents, error)
+
+        self.files = files
+        self.parsed = len(changed)
+        self.build_seconds = time.monotonic() - started
+        return self
+
+    def load(self, cache_path: str) -> "ManifestIndex":
+        """Load a previously saved index; a missing or stale cache is ignored."""
+        try:
+            with open(cache_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if (
+            data.get("version") != INDEX_VERSION
+            or data.get("indexer") != _indexer_hash()
+        ):
+            return self
+
+        self.files = {
+            path: FileEntry(
+                entry["sha256"],
+                [Document.from_dict(d) for d in entry["documents"]],
+                entry.get("error"),
+            )
+            for path, entry in data.get("files", {}).items()
+        }
+        return self
+
+    def save(self, cache_path: str):
+        """Write the index atomically next to cache_path."""
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        data = {
+            "version": INDEX_VERSION,
+            "indexer": _indexer_hash(),
+            "files": {
+                path: {
+                    "sha256": entry.sha256,
+                    "documents": [d.to_dict() for d in entry.documents],
+                    "error": entry.error,
+                }
+                for path, entry in sorted(self.files.items())
+            },
+        }
+        tmp = f"{cache_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, cache_path)
+
+    def documents(self) -> Iterator[Document]:
+        for entry in self.files.values():
+            yield from entry.documents
+
+    def find(
+        self,
+        kind: Optional[str] = None,
+        namespace: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> List[Document]:
+        """Documents matching every given field."""
+        return [
+            d
+            for d in self.documents()
+            if (kind is None or d.kind == kind)
+            and (namespace is None or d.namespace == namespace)
+            and (name is None or d.name == name)
+        ]
+
+    def by_key(self) -> Dict[Tuple[str, str, str], List[Document]]:
+        """Documents grouped by (kind, namespace, name)."""
+        grouped: Dict[Tuple[str, str, str], List[Document]] = {}
+        for document in self.documents():
+            grouped.setdefault(document.key, []).append(document)
+        return grouped
+
+    def references(
+        self, ref_type: Optional[str] = None
+    ) -> List[Tuple[Document, str, str]]:
+        """(document, type, target) for every cross-reference of the given type."""
+        return [
+            (document, kind, target)
+            for document in self.documents()
+            for kind, target in document.refs
+            if ref_type is None or kind == ref_type
+        ]
+
+    def validate(self) -> List[str]:
+        """Problems found without leaving the index: parse errors and dangling refs."""
+        problems = [
+            f"{path}: YAML error: {entry.error}"
+            for path, entry in sorted(self.files.items())
+            if entry.error
+        ]
+
+        for document, _, target in self.references("path"):
+            if not os.path.isdir(os.path.join(self.root, target)):
+                problems.append(
+                    f"{document.path}: Kustomization {document.name} "
+                    f"path {target} does not exist"
+                )
+        for document, _, target in self.references("resource"):
+            if not os.path.exists(os.path.join(self.root, target)):
+                problems.append(f"{document.path}: resource {target} does not exist")
+
+        flux_names = {
+            d.name
+            for d in self.find(kind="Kustomization")
+            if d.api_version.startswith(FLUX_KUSTOMIZE_GROUP)
+        }
+        for document, _, target in self.references("dependsOn"):
+            if target not in flux_names:
+                problems.append(
+                    f"{document.path}: Kustomization {document.name} "
+                    f"depends on unknown Kustomization {target}"
+                )
+        return problems
+
+    def summary(self) -> Dict:
+        kinds: Dict[str, int] = {}
+        for document in self.documents():
+            kinds[document.kind] = kinds.get(document.kind, 0) + 1
+        return {
+            "files": len(self.files),
+            "documents": sum(kinds.values()),
+            "parsed": self.parsed,
+            "build_seconds": round(self.build_seconds, 3),
+            "kinds": dict(sorted(kinds.items())),
+        }
+
+
+def load_index(
+    cache_path: Optional[str] = None, root: str = REPO_ROOT, jobs: Optional[int] = None
+) -> ManifestIndex:
+    """Load the persisted index, bring it up to date and save it back."""
+    index = ManifestIndex(root)
+    if cache_path:
+        index.load(cache_path)
+    index.build(jobs)
+    if cache_path and index.parsed:
+        index.save(cache_path)
+    return index
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description="Index repository manifests")
+    parser.add_argument("--root", default=REPO_ROOT, help="Repository root")
+    parser.add_argument(
+        "--cache",
+        help=f"Index cache file (default: <root>/{DEFAULT_CACHE})",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Parse every file")
+    parser.add_argument("--jobs", type=int, help="Parser processes (default: cores)")
+    parser.add_argument("--json", action="store_true", help="Output in JSON format")
+
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("build", help="Update the index and print a summary")
+    query = subparsers.add_parser("query", help="Find documents")
+    query.add_argument("--kind")
+    query.add_argument("--namespace")
+    query.add_argument("--name")
+    refs = subparsers.add_parser("refs", help="List cross-references")
+    refs.add_argument(
+        "--type", choices=["path", "resource", "dependsOn", "onepassword", "script"]
+    )
+    subparsers.add_parser("validate", help="Report parse errors and dangling refs")
+    args = parser.parse_args(argv)
+
+    cache = (
+        None
+        if args.no_cache
+        else (args.cache or os.path.join(args.root, DEFAULT_CACHE))
+    )
+    index = load_index(cache, args.root, args.jobs)
+    command = args.command or "build"
+
+    if command == "query":
+        documents = index.find(args.kind, args.namespace, args.name)
+        if args.json:
+            print(json.dumps([d.to_dict() for d in documents], indent=2))
+        else:
+            for d in documents:
+                ref = f"{d.namespace}/{d.name}" if d.namespace else d.name
+                print(f"{d.kind}\t{ref}\t{d.path}")
+    elif command == "refs":
+        references = index.references(args.type)
+        if args.json:
+            rows = [
+                {
+                    "kind": d.kind,
+                    "namespace": d.namespace,
+                    "name": d.name,
+                    "path": d.path,
+                    "type": ref_type,
+                    "target": target,
+                }
+                for d, ref_type, target in references
+            ]
+            print(json.dumps(rows, indent=2))
+        else:
+            for d, ref_type, target in references:
+                print(f"{ref_type}\t{d.kind}/{d.name}\t{target}\t{d.path}")
+    elif command == "validate":
+        problems = index.validate()
+        if args.json:
+            print(json.dumps({"problems": problems, **index.summary()}, indent=2))
+        else:
+            for problem in problems:
+                print(f"✗ {problem}")
+            if not problems:
+                summary = index.summary()
+                print(
+                    f"✓ {summary['documents']} documents in {summary['files']} "
+                    "files validated"
+                )
+        sys.exit(1 if problems else 0)
+        return
+    else:
+        summary = index.summary()
+        if args.json:
+            print(json.dumps(summary, indent=2))
+        else:
+            print(
+                f"✓ Indexed {summary['documents']} documents in {summary['files']} "
+                f"files ({summary['parsed']} parsed) in {summary['build_seconds']}s"
+            )
+            for kind, count in summary["kinds"].items():
+                print(f"    {kind}: {count}")
+
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
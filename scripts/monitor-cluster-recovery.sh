@@ -2,28 +2,27 @@
 
 # Cluster Recovery Monitoring Script
 # Monitors cluster recovery after physical power cycling of affected nodes
+#
+# Follows Nodes and Pods through Kubernetes watch streams
+# (scripts/recovery_monitor.py) instead of polling kubectl every 30 seconds,
+# and prints each readiness change as it happens. Once everything is Ready,
+# the power-cycled nodes' kernel logs are checked for the virtual device
+# errors that prompted the power cycle; talosctl is the only source for those.
+# The transition log can be replayed later with:
+#   python3 scripts/recovery_monitor.py --replay <log>
 
 set -e
 
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+PROXY_PORT="${RECOVERY_MONITOR_PROXY_PORT:-8011}"
+LOG_FILE="${RECOVERY_MONITOR_LOG:-cluster-recovery-transitions-$(date +%Y%m%d-%H%M%S).jsonl}"
+TIMEOUT=900  # 15 minutes
+
 echo "=== Cluster Recovery Monitoring ==="
 echo "Monitoring recovery of mini01 (172.29.51.11) and mini03 (172.29.51.13)"
 echo "Started at: $(date)"
 echo
 
-# Function to check node status
-check_nodes() {
-    echo "--- Node Status ---"
-    mise exec -- kubectl get nodes -o wide
-    echo
-}
-
-# Function to check Cilium pods
-check_cilium() {
-    echo "--- Cilium Pod Status ---"
-    mise exec -- kubectl get pods -n kube-system | grep cilium
-    echo
-}
-
 # Function to check for virtual device errors
 check_virtual_device_errors() {
     echo "--- Checking for Virtual Device Errors ---"
@@ -43,72 +42,33 @@ check_virtual_device_errors() {
     echo
 }
 
-# Function to check cluster health
-check_cluster_health() {
-    echo "--- Cluster Health Summary ---"
+mise exec -- kubectl proxy --port="$PROXY_PORT" >/dev/null 2>&1 &
+PROXY_PID=$!
+trap 'kill $PROXY_PID 2>/dev/null' EXIT
 
-    # Count ready nodes
-    READY_NODES=$(mise exec -- kubectl get nodes --no-headers | grep -c "Ready" || echo "0")
-    TOTAL_NODES=$(mise exec -- kubectl get nodes --no-headers | wc -l)
-
-    echo "Ready nodes: $READY_NODES/$TOTAL_NODES"
-
-    # Check Cilium status
-    CILIUM_RUNNING=$(mise exec -- kubectl get pods -n kube-system | grep cilium | grep -c "Running" || echo "0")
-    CILIUM_TOTAL=$(mise exec -- kubectl get pods -n kube-system | grep -c cilium)
-
-    echo "Cilium pods running: $CILIUM_RUNNING/$CILIUM_TOTAL"
-
-    if [ "$READY_NODES" -eq 3 ] && [ "$CILIUM_RUNNING" -gt 0 ]; then
-        echo "🎉 Cluster recovery appears successful!"
-        return 0
-    else
-        echo "⏳ Cluster still recovering..."
-        return 1
-    fi
-}
-
-# Main monitoring loop
-RECOVERY_COMPLETE=false
-ATTEMPT=1
-MAX_ATTEMPTS=30  # 15 minutes with 30-second intervals
-
-while [ "$RECOVERY_COMPLETE" = false ] && [ $ATTEMPT -le $MAX_ATTEMPTS ]; do
-    echo "=== Recovery Check #$ATTEMPT ($(date)) ==="
-
-    check_nodes
-    check_cilium
-
-    # Only check for virtual device errors if nodes are responsive
-    if mise exec -- talosctl version --nodes 172.29.51.11,172.29.51.13 >/dev/null 2>&1; then
-        check_virtual_device_errors
-    else
-        echo "--- Virtual Device Error Check ---"
-        echo "⏳ Nodes not yet responsive to talosctl commands"
-        echo
-    fi
-
-    if check_cluster_health; then
-        RECOVERY_COMPLETE=true
-        echo
-        echo "🎉 CLUSTER RECOVERY COMPLETE! 🎉"
-        echo "All nodes are Ready and Cilium is running normally."
-        echo "Recovery completed at: $(date)"
-        break
-    fi
-
-    if [ $ATTEMPT -lt $MAX_ATTEMPTS ]; then
-        echo "Waiting 30 seconds before next check..."
-        echo "========================================"
-        echo
-        sleep 30
-    fi
-
-    ATTEMPT=$((ATTEMPT + 1))
+# Wait for the API proxy to accept connections
+for _ in $(seq 1 50); do
+    curl -s -o /dev/null "http://127.0.0.1:$PROXY_PORT/version" && break
+    sleep 0.1
 done
 
-if [ "$RECOVERY_COMPLETE" = false ]; then
-    echo "⚠️  Recovery monitoring timed out after $MAX_ATTEMPTS attempts"
+echo "Transition log: $LOG_FILE"
+STATUS=0
+python3 "$SCRIPT_DIR/recovery_monitor.py" \
+    --api-server "http://127.0.0.1:$PROXY_PORT" \
+    --kinds Node,Pod \
+    --log "$LOG_FILE" \
+    --timeout "$TIMEOUT" \
+    --until-recovered "$@" || STATUS=$?
+
+if [ "$STATUS" -ne 0 ]; then
+    echo "⚠️  Recovery monitoring timed out after ${TIMEOUT}s"
     echo "Manual intervention may be required."
     exit 1
 fi
+
+check_virtual_device_errors
+
+echo "🎉 CLUSTER RECOVERY COMPLETE! 🎉"
+echo "All nodes are Ready and every pod is running normally."
+echo "Recovery completed at: $(date)"
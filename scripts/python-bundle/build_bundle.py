@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+GitOps Tools Bundle Builder
+
+Builds gitops-tools.pyz, a self-contained zipapp holding the Authentik proxy,
+token and 1Password modules plus their pure-Python dependencies, so in-cluster
+Jobs and CronJobs run without a pip install at pod start.
+
+The archive works two ways once mounted from a ConfigMap:
+
+    python /opt/gitops-tools/gitops-tools.pyz tokens validate --json
+    PYTHONPATH=/opt/gitops-tools/gitops-tools.pyz python /app/token_exporter.py
+
+Every module is precompiled to unchecked hash-based bytecode for the target
+interpreter, so a cold start imports straight from the archive without
+compiling. Bytecode only loads on the Python version that wrote it, so the
+build uses python3.14 (TARGET_PYTHON, the Jobs' python:3.14-slim image) when
+it is on PATH. Dependency sources are dropped to fit the 1 MiB ConfigMap
+limit only when the interpreter matches TARGET_PYTHON; with any other
+interpreter, or --keep-sources, they stay and the Jobs import from source.
+First-party sources always stay for readable tracebacks. Entries are sorted
+and timestamped at a fixed date, so the archive and its ConfigMap only change
+when the contents do.
+
+Each profile bundles only the dependencies its consumers import:
+
+    core      first-party modules only (stdlib consumers)
+    exporter  + prometheus_client and requests (token metrics exporter)
+    http      + requests and its dependencies (token validation, Headlamp Job)
+
+Usage:
+    build_bundle.py --profile http
+    build_bundle.py --profile exporter --configmap --namespace authentik \\
+        | kubectl apply -f -
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+from typing import Dict, List, Optional
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REQUIREMENTS_PATH = os.path.join(os.path.dirname(__file__), "requirements.txt")
+DIST_DIR = os.path.normpath(os.path.join(SCRIPTS_DIR, "..", "dist"))
+
+# Python minor version of the Job images (python:3.14-slim)
+TARGET_PYTHON = "3.14"
+
+BUNDLE_NAME = "gitops-tools.pyz"
+CONFIGMAP_NAME = "gitops-python-bundle"
+
+# Profile -> distributions from requirements.txt to vendor
+PROFILES: Dict[str, List[str]] = {
+    "core": [],
+    "exporter": [
+        "prometheus_client",
+        "requests",
+        "urllib3",
+        "idna",
+        "certifi",
+        "charset-normalizer",
+    ],
+    "http": ["requests", "urllib3", "idna", "certifi", "charset-normalizer"],
+}
+
+# Fixed timestamp for reproducible archives (earliest date zip supports)
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+# First-party scripts bundled as top-level modules, keyed by source path
+# relative to scripts/. Hyphenated file names become importable names.
+BUNDLED_SCRIPTS = [
+    "gitops_cli.py",
+    "flux_mcp_wrapper.py",
+    "authentik-proxy-config/configure_proxy.py",
+    "authentik-proxy-config/service_catalog.py",
+    "authentik-proxy-config/proxy_controller.py",
+    "authentik-proxy-config/fleet_reconcile.py",
+    "authentik-proxy-config/kube_api.py",
+    "authentik-proxy-config/service_discovery.py",
+    "authentik-proxy-config/service_prober.py",
+    "authentik-proxy-config/wait_ready.py",
+    "authentik-proxy-config/fix-outpost-conflicts.py",
+    "authentik-proxy-config/fix_outpost_assignments.py",
+    "token-management/authentik_token_manager.py",
+    "token-management/extract-outpost-tokens.py",
+]
+
+MAIN_SOURCE = """\
+import sys
+
+from gitops_cli import main
+
+sys.exit(main())
+"""
+
+
+def module_name(script: str) -> str:
+    """Importable module name for a bundled script path."""
+    return os.path.splitext(os.path.basename(script))[0].replace("-", "_")
+
+
+def _sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def source_hashes() -> Dict[str, str]:
+    """SHA-256 of every first-party source, used to detect a stale bundle."""
+    return {
+        script: _sha256(os.path.join(SCRIPTS_DIR, script)) for script in BUNDLED_SCRIPTS
+    }
+
+
+def stage_sources(stage_dir: str):
+    """Copy first-party scripts into the staging directory as flat modules."""
+    for script in BUNDLED_SCRIPTS:
+        shutil.copyfile(
+            os.path.join(SCRIPTS_DIR, script),
+            os.path.join(stage_dir, module_name(script) + ".py"),
+        )
+
+    with open(os.path.join(stage_dir, "__main__.py"), "w") as f:
+        f.write(MAIN_SOURCE)
+
+
+def _canonical(name: str) -> str:
+    return name.lower().replace("_", "-")
+
+
+def pinned_requirements(
+    profile: str, requirements: str = REQUIREMENTS_PATH
+) -> List[str]:
+    """Pinned requirement lines for the distributions a profile vendors."""
+    wanted = {_canonical(name) for name in PROFILES[profile]}
+    pins = []
+    with open(requirements, "r") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line and _canonical(line.split("==", 1)[0]) in wanted:
+                pins.append(line)
+
+    missing = wanted - {_canonical(pin.split("==", 1)[0]) for pin in pins}
+    if missing:
+        raise ValueError(f"{requirements} has no pin for {sorted(missing)}")
+    return sorted(pins)
+
+
+def install_dependencies(stage_dir: str, python: str, pins: List[str]):
+    """Install pinned pure-Python wheels into the staging directory."""
+    version = subprocess.run(
+        [python, "-c", "import sys; print('%d.%d' % sys.version_info[:2])"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "pip",
+            "install",
+            "--quiet",
+            "--no-deps",
+            "--no-compile",
+            "--only-binary=:all:",
+            "--platform",
+            "any",
+            "--implementation",
+            "py",
+            "--python-version",
+            version,
+            "--target",
+            stage_dir,
+        ]
+        + pins,
+        check=True,
+    )
+
+    # Wheel metadata and console scripts are dead weight inside the archive
+    for entry in os.listdir(stage_dir):
+        if entry.endswith((".dist-info", ".data")) or entry == "bin":
+            shutil.rmtree(os.path.join(stage_dir, entry))
+
+
+def compile_bytecode(stage_dir: str, python: str, keep_sources: bool):
+    """Precompile every module next to its source for zipimport to load."""
+    subprocess.run(
+        [
+            python,
+            "-m",
+            "compileall",
+            "-q",
+            "-b",
+            # Stable filenames in code objects keep the archive reproducible
+            "-d",
+            BUNDLE_NAME,
+            "--invalidation-mode",
+            "unchecked-hash",
+            stage_dir,
+        ],
+        check=True,
+    )
+
+    if keep_sources:
+        return
+
+    # zipimport prefers the .pyc, so dependency sources only add size
+    for root, _, files in os.walk(stage_dir):
+        if root == stage_dir:
+            continue
+        for name in files:
+            if name.endswith(".py") and name + "c" in files:
+                os.remove(os.path.join(root, name))
+
+
+def write_archive(stage_dir: str, output: str, manifest: Dict) -> str:
+    """Write a reproducible zipapp from the staging directory."""
+    with open(os.path.join(stage_dir, "BUNDLE_MANIFEST.json"), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    entries: List[str] = []
+    for root, dirs, files in os.walk(stage_dir):
+        dirs[:] = [d for d in dirs if d != "__pycache__"]
+        for name in files:
+            full = os.path.join(root, name)
+            entries.append(os.path.relpath(full, stage_dir).replace(os.sep, "/"))
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "wb") as f:
+        f.write(b"#!/usr/bin/env python3\n")
+        with zipfile.ZipFile(f, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for entry in sorted(entries):
+                info = zipfile.ZipInfo(entry, date_time=ZIP_DATE_TIME)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.external_attr = 0o644 << 16
+                with open(os.path.join(stage_dir, entry), "rb") as src:
+                    archive.writestr(info, src.read())
+
+    os.chmod(output, 0o755)
+    return _sha256(output)
+
+
+def default_python() -> str:
+    """The target interpreter when installed, else the current one."""
+    return shutil.which(f"python{TARGET_PYTHON}") or sys.executable
+
+
+def build_bundle(
+    output: str,
+    profile: str = "core",
+    python: str = sys.executable,
+    requirements: str = REQUIREMENTS_PATH,
+    keep_sources: bool = False,
+    target: str = TARGET_PYTHON,
+) -> Dict:
+    """Build the bundle for a profile and return its manifest.
+
+    Dependency sources are kept whenever the interpreter is not the target
+    version, since its bytecode would not load in the Job image.
+    """
+    version = subprocess.run(
+        [python, "-c", "import sys; print(sys.version.split()[0])"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+    if ".".join(version.split(".")[:2]) != target:
+        keep_sources = True
+
+    pins = pinned_requirements(profile, requirements)
+    manifest = {
+        "profile": profile,
+        "python": version,
+        "target_python": target,
+        "keep_sources": keep_sources,
+        "sources": source_hashes(),
+        "requirements": pins,
+    }
+
+    with tempfile.TemporaryDirectory() as stage_dir:
+        stage_sources(stage_dir)
+        if pins:
+            install_dependencies(stage_dir, python, pins)
+        compile_bytecode(stage_dir, python, keep_sources)
+        manifest["sha256"] = write_archive(stage_dir, output, manifest)
+
+    manifest["size_bytes"] = os.path.getsize(output)
+    return manifest
+
+
+def read_manifest(bundle: str) -> Dict:
+    """Read the manifest embedded in a built bundle."""
+    with zipfile.ZipFile(bundle) as archive:
+        return json.loads(archive.read("BUNDLE_MANIFEST.json"))
+
+
+def stale_sources(bundle: str) -> List[str]:
+    """First-party scripts that changed since the bundle was built."""
+    bundled = read_manifest(bundle).get("sources", {})
+    current = source_hashes()
+    return sorted(
+        script for script in current if bundled.get(script) != current[script]
+    )
+
+
+def render_configmap(bundle: str, namespace: str) -> str:
+    """Render a ConfigMap manifest carrying the bundle as binaryData."""
+    manifest = read_manifest(bundle)
+    with open(bundle, "rb") as f:
+        payload = base64.b64encode(f.read()).decode("ascii")
+
+    return "\n".join(
+        [
+            "---",
+            "apiVersion: v1",
+            "kind: ConfigMap",
+            "metadata:",
+            f"  name: {CONFIGMAP_NAME}-{manifest['profile']}",
+            f"  namespace: {namespace}",
+            "  labels:",
+            "    app.kubernetes.io/name: gitops-python-bundle",
+            "    app.kubernetes.io/component: tooling",
+            "  annotations:",
+            f"    gitops.geoffdavis.com/bundle-sha256: {_sha256(bundle)}",
+            f'    gitops.geoffdavis.com/bundle-python: "{manifest["python"]}"',
+            "binaryData:",
+            f"  {BUNDLE_NAME}: {payload}",
+            "",
+        ]
+    )
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description="Build the gitops-tools.pyz bundle")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="core")
+    parser.add_argument(
+        "--output", help="Bundle path (default dist/gitops-tools-<profile>.pyz)"
+    )
+    parser.add_argument(
+        "--python",
+        default=default_python(),
+        help=f"Interpreter used to compile bytecode (default python{TARGET_PYTHON} "
+        "when installed, else this one)",
+    )
+    parser.add_argument(
+        "--keep-sources",
+        action="store_true",
+        help="Keep dependency sources so other Python versions can import them",
+    )
+    parser.add_argument(
+        "--configmap",
+        action="store_true",
+        help="Print a ConfigMap manifest for the bundle instead of a summary",
+    )
+    parser.add_argument("--namespace", default="authentik")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit non-zero if the existing bundle is older than its sources",
+    )
+    args = parser.parse_args(argv)
+    output = args.output or os.path.join(DIST_DIR, f"gitops-tools-{args.profile}.pyz")
+
+    if args.check:
+        stale = stale_sources(output)
+        for script in stale:
+            print(f"✗ {script} changed since {output} was built")
+        sys.exit(1 if stale else 0)
+        return
+
+    manifest = build_bundle(
+        output,
+        profile=args.profile,
+        python=args.python,
+        keep_sources=args.keep_sources,
+    )
+
+    if not manifest["python"].startswith(f"{TARGET_PYTHON}."):
+        print(
+            f"⚠ Built with Python {manifest['python']}, not the Jobs' "
+            f"{TARGET_PYTHON}: dependency sources kept, modules compile at start",
+            file=sys.stderr,
+        )
+
+    if args.configmap:
+        sys.stdout.write(render_configmap(output, args.namespace))
+        return
+
+    print(
+        f"✓ Built {output} ({args.profile}) for Python {manifest['python']}: "
+        f"{manifest['size_bytes'] / 1024:.0f} KiB, sha256 {manifest['sha256'][:12]}"
+    )
+    # ConfigMaps are capped at 1 MiB including the base64 overhead
+    if manifest["size_bytes"] * 4 / 3 > 1024 * 1024:
+        print("⚠ Bundle is too large to ship as a single ConfigMap")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the GitOps Tools Bundle Builder
+"""
+
+import base64
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import zipfile
+from unittest.mock import patch
+
+import build_bundle
+
+REPO_ROOT = os.path.dirname(build_bundle.SCRIPTS_DIR)
+
+# Jobs that used to pip install at pod start
+JOB_MANIFESTS = [
+    "infrastructure/authentik-proxy/proxy-config-job-python.yaml",
+    "infrastructure/authentik-proxy/fix-oauth2-redirect-urls-job.yaml",
+    "infrastructure/authentik/token-rotation-cronjob.yaml",
+    "infrastructure/authentik/token-monitoring.yaml",
+    "apps/headlamp/authentik-config-job.yaml",
+]
+
+
+class TestBuildBundle(unittest.TestCase):
+    """Test cases for building the core bundle."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.bundle = os.path.join(cls.tmpdir.name, "gitops-tools.pyz")
+        cls.manifest = build_bundle.build_bundle(cls.bundle, profile="core")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def test_reproducible(self):
+        """Test rebuilding unchanged sources produces an identical archive."""
+        again = os.path.join(self.tmpdir.name, "again.pyz")
+        manifest = build_bundle.build_bundle(again, profile="core")
+
+        self.assertEqual(manifest["sha256"], self.manifest["sha256"])
+
+    def test_contains_precompiled_modules(self):
+        """Test every first-party module ships with bytecode and source."""
+        with zipfile.ZipFile(self.bundle) as archive:
+            names = set(archive.namelist())
+
+        for script in build_bundle.BUNDLED_SCRIPTS:
+            module = build_bundle.module_name(script)
+            self.assertIn(f"{module}.py", names)
+            self.assertIn(f"{module}.pyc", names)
+        self.assertIn("__main__.py", names)
+
+    def test_runs_as_zipapp(self):
+        """Test the archive runs the CLI and its modules resolve from the zip."""
+        catalog = os.path.join(
+            REPO_ROOT, "infrastructure/authentik-proxy/service-catalog.json"
+        )
+        result = subprocess.run(
+            [sys.executable, self.bundle, "proxy", "catalog", catalog],
+            capture_output=True,
+            text=True,
+            cwd=self.tmpdir.name,
+        )
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("6 services", result.stdout)
+
+    def test_stale_sources(self):
+        """Test --check detects first-party sources changed after the build."""
+        self.assertEqual(build_bundle.stale_sources(self.bundle), [])
+
+        hashes = dict(self.manifest["sources"])
+        hashes["gitops_cli.py"] = "0" * 64
+        with patch.object(build_bundle, "source_hashes", return_value=hashes):
+            self.assertEqual(build_bundle.stale_sources(self.bundle), ["gitops_cli.py"])
+
+    def test_render_configmap(self):
+        """Test the ConfigMap carries the archive as binaryData."""
+        rendered = build_bundle.render_configmap(self.bundle, "authentik")
+
+        self.assertIn("name: gitops-python-bundle-core", rendered)
+        self.assertIn("namespace: authentik", rendered)
+        payload = rendered.split(f"{build_bundle.BUNDLE_NAME}: ", 1)[1].strip()
+        with open(self.bundle, "rb") as f:
+            self.assertEqual(base64.b64decode(payload), f.read())
+
+
+class TestProfiles(unittest.TestCase):
+    """Test cases for dependency profiles and Job manifests."""
+
+    def test_every_profile_is_pinned(self):
+        """Test requirements.txt pins every distribution a profile vendors."""
+        for profile, packages in build_bundle.PROFILES.items():
+            pins = build_bundle.pinned_requirements(profile)
+            self.assertEqual(len(pins), len(packages), profile)
+            self.assertTrue(all("==" in pin for pin in pins), profile)
+
+    def test_sources_kept_off_target(self):
+        """Test dependency sources are only dropped for the target Python."""
+        current = "%d.%d" % sys.version_info[:2]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            bundle = os.path.join(tmpdir, "gitops-tools.pyz")
+            for target, keep_sources in ((current, False), ("3.0", True)):
+                with patch.object(build_bundle, "compile_bytecode") as compile_:
+                    manifest = build_bundle.build_bundle(
+                        bundle, profile="core", target=target
+                    )
+                self.assertEqual(compile_.call_args.args[2], keep_sources, target)
+                self.assertEqual(manifest["keep_sources"], keep_sources)
+                self.assertEqual(manifest["target_python"], target)
+
+    def test_jobs_do_not_pip_install(self):
+        """Test the Jobs start without installing packages."""
+        for manifest in JOB_MANIFESTS:
+            with open(os.path.join(REPO_ROOT, manifest), "r") as f:
+                self.assertNotIn("pip install", f.read(), manifest)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,639 @@
+#!/usr/bin/env python3
+"""
+Dependency-Aware Kustomization Reconcile Scheduler
+
+Reconciles Flux Kustomizations in `spec.dependsOn` order. Kustomizations
+whose dependencies are all Ready are reconciled concurrently, up to
+--parallelism at a time, and a Kustomization is only released once every
+Kustomization it depends on has handled its reconcile request and reports
+Ready. After a cluster recovery this replaces reconciling the 30-odd
+infrastructure Kustomizations one by one, or all at once and letting Flux
+retry the ones whose dependencies were not ready yet.
+
+    reconcile_scheduler.py [--parallelism 4] [--timeout 900] [--json]
+    reconcile_scheduler.py --dry-run               # print the waves only
+    reconcile_scheduler.py infrastructure-authentik  # and its dependencies
+
+The dependency graph comes from the live Kustomizations, or from the
+manifests under clusters/ with --from-manifests. Progress is tracked with a
+single Kustomization list call per poll interval, however many
+Kustomizations are in flight. The report gives each Kustomization's wait,
+reconcile and Ready timings and the critical path: the chain of dependencies
+that decided the total run time.
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set
+
+from flux_mcp_wrapper import FluxMCPClient, FluxMCPError, get_condition, tool_text
+
+KUSTOMIZATION_API = "kustomize.toolkit.fluxcd.io/v1"
+DEFAULT_NAMESPACE = "flux-system"
+REQUESTED_AT = "reconcile.fluxcd.io/requestedAt"
+
+# Only what the graph and the progress polls read; the rest of each object
+# is dropped while the MCP response is parsed
+GRAPH_FIELDS = [
+    "metadata.name",
+    "metadata.namespace",
+    "spec.dependsOn",
+    "spec.suspend",
+]
+STATUS_FIELDS = [
+    "metadata.name",
+    "metadata.namespace",
+    "metadata.generation",
+    "metadata.annotations",
+    "status.observedGeneration",
+    "status.lastHandledReconcileAt",
+    "status.conditions",
+]
+
+# Ready=False reasons that mean the reconcile is still going
+IN_PROGRESS_REASONS = {"Progressing", "DependencyNotReady", "ProgressingWithRetry"}
+
+PENDING = "pending"
+RECONCILING = "reconciling"
+READY = "ready"
+FAILED = "failed"
+TIMEOUT = "timeout"
+SKIPPED = "skipped"
+SUSPENDED = "suspended"
+# Suspended Kustomizations are not reconciled but do not block dependents
+DONE = {READY, SUSPENDED}
+
+
+class SchedulerError(Exception):
+    """Raised when the dependency graph cannot be scheduled"""
+
+
+@dataclass
+class KustomizationNode:
+    """A Kustomization and the Kustomizations it depends on, as ns/name keys."""
+
+    name: str
+    namespace: str = DEFAULT_NAMESPACE
+    depends_on: List[str] = field(default_factory=list)
+    suspended: bool = False
+
+    @property
+    def key(self) -> str:
+        return f"{self.namespace}/{self.name}"
+
+
+Graph = Dict[str, KustomizationNode]
+
+
+def _add_node(graph: Graph, node: KustomizationNode):
+    existing = graph.get(node.key)
+    if existing is None:
+        graph[node.key] = node
+        return
+    # The same Kustomization defined twice: keep every dependency of both
+    for dependency in node.depends_on:
+        if dependency not in existing.depends_on:
+            existing.depends_on.append(dependency)
+    existing.suspended = existing.suspended or node.suspended
+
+
+def graph_from_objects(objects: List[Dict]) -> Graph:
+    """Build the graph from Kustomization objects, live or parsed manifests."""
+    graph: Graph = {}
+    for obj in objects:
+        metadata = obj.get("metadata", {})
+        spec = obj.get("spec") or {}
+        namespace = metadata.get("namespace") or DEFAULT_NAMESPACE
+        depends_on = [
+            f"{ref.get('namespace') or namespace}/{ref['name']}"
+            for ref in spec.get("dependsOn") or []
+            if ref.get("name")
+        ]
+        _add_node(
+            graph,
+            KustomizationNode(
+                metadata["name"], namespace, depends_on, bool(spec.get("suspend"))
+            ),
+        )
+    return graph
+
+
+def graph_from_manifests(index) -> Graph:
+    """Build the graph from the Flux Kustomizations in a manifest index."""
+    from manifest_index import FLUX_KUSTOMIZE_GROUP
+
+    graph: Graph = {}
+    for document in index.find(kind="Kustomization"):
+        if not document.api_version.startswith(FLUX_KUSTOMIZE_GROUP):
+            continue
+        namespace = document.namespace or DEFAULT_NAMESPACE
+        depends_on = [
+            f"{namespace}/{target}"
+            for ref_type, target in document.refs
+            if ref_type == "dependsOn"
+        ]
+        _add_node(graph, KustomizationNode(document.name, namespace, depends_on))
+    return graph
+
+
+def dependency_closure(graph: Graph, targets: List[str]) -> Set[str]:
+    """The targets and everything they depend on, directly or not."""
+    selected: Set[str] = set()
+    stack = list(targets)
+    while stack:
+        key = stack.pop()
+        if key in selected:
+            continue
+        if key not in graph:
+            raise SchedulerError(f"Unknown Kustomization {key}")
+        selected.add(key)
+        stack.extend(graph[key].depends_on)
+    return selected
+
+
+def find_cycle(graph: Graph) -> Optional[List[str]]:
+    """A dependency cycle as a list of keys, or None."""
+    state: Dict[str, int] = {}  # 1 = on the current path, 2 = finished
+
+    def visit(key: str, path: List[str]) -> Optional[List[str]]:
+        state[key] = 1
+        path.append(key)
+        for dependency in graph[key].depends_on:
+            if dependency not in graph:
+                continue
+            if state.get(dependency) == 1:
+                return path[path.index(dependency) :] + [dependency]
+            if dependency not in state:
+                cycle = visit(dependency, path)
+                if cycle:
+                    return cycle
+        path.pop()
+        state[key] = 2
+        return None
+
+    for key in sorted(graph):
+        if key not in state:
+            cycle = visit(key, [])
+            if cycle:
+                return cycle
+    return None
+
+
+def validate_graph(graph: Graph) -> List[str]:
+    """Problems that make the graph unschedulable."""
+    problems = [
+        f"{key} depends on unknown Kustomization {dependency}"
+        for key, node in sorted(graph.items())
+        for dependency in node.depends_on
+        if dependency not in graph
+    ]
+    cycle = find_cycle(graph)
+    if cycle:
+        problems.append("dependency cycle: " + " -> ".join(cycle))
+    return problems
+
+
+def topological_waves(graph: Graph) -> List[List[str]]:
+    """Kustomizations grouped by depth: each wave only depends on earlier ones."""
+    depth: Dict[str, int] = {}
+
+    def node_depth(key: str) -> int:
+        if key not in depth:
+            depth[key] = 1 + max(
+                (node_depth(d) for d in graph[key].depends_on if d in graph),
+                default=-1,
+            )
+        return depth[key]
+
+    waves: List[List[str]] = []
+    for key in sorted(graph):
+        level = node_depth(key)
+        while len(waves) <= level:
+            waves.append([])
+        waves[level].append(key)
+    return waves
+
+
+@dataclass
+class NodeResult:
+    """Timings of one Kustomization, in seconds since the run started."""
+
+    key: str
+    depends_on: List[str]
+    status: str = PENDING
+    released: Optional[float] = None
+    started: Optional[float] = None
+    requested: Optional[float] = None
+    finished: Optional[float] = None
+    requested_at: Optional[str] = None
+    message: str = ""
+
+    @property
+    def wait_seconds(self) -> Optional[float]:
+        """Time spent Ready to run but waiting for a parallelism slot."""
+        if self.released is None or self.started is None:
+            return None
+        return self.started - self.released
+
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        """Time from the reconcile request until Ready (or failure)."""
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+    def to_dict(self):
+        def rounded(value):
+            return None if value is None else round(value, 3)
+
+        return {
+            "kustomization": self.key,
+            "status": self.status,
+            "depends_on": self.depends_on,
+            "released": rounded(self.released),
+            "started": rounded(self.started),
+            "finished": rounded(self.finished),
+            "wait_seconds": rounded(self.wait_seconds),
+            "duration_seconds": rounded(self.duration_seconds),
+            "message": self.message,
+        }
+
+
+@dataclass
+class ScheduleReport:
+    """Outcome of a scheduled reconcile run."""
+
+    nodes: Dict[str, NodeResult]
+    parallelism: int
+    wall_seconds: float = 0.0
+    polls: int = 0
+
+    @property
+    def succeeded(self) -> bool:
+        return all(node.status in DONE for node in self.nodes.values())
+
+    def by_status(self, status: str) -> List[NodeResult]:
+        return [n for n in self.nodes.values() if n.status == status]
+
+    @property
+    def critical_path(self) -> List[str]:
+        """The chain of dependencies that finished last.
+
+        Walks back from the last Kustomization to finish, each time to the
+        dependency that finished last, i.e. the one that released it.
+        """
+        finished = {k: n for k, n in self.nodes.items() if n.finished is not None}
+        if not finished:
+            return []
+        key = max(finished, key=lambda k: finished[k].finished)
+        path = [key]
+        while True:
+            dependencies = [d for d in finished[key].depends_on if d in finished]
+            if not dependencies:
+                break
+            key = max(dependencies, key=lambda d: finished[d].finished)
+            path.append(key)
+        return list(reversed(path))
+
+    @property
+    def critical_path_seconds(self) -> float:
+        path = self.critical_path
+        return self.nodes[path[-1]].finished if path else 0.0
+
+    @property
+    def serial_seconds(self) -> float:
+        """What the same reconciles would have taken one after another."""
+        return sum(n.duration_seconds or 0.0 for n in self.nodes.values())
+
+    def to_dict(self):
+        return {
+            "succeeded": self.succeeded,
+            "parallelism": self.parallelism,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "serial_seconds": round(self.serial_seconds, 3),
+            "polls": self.polls,
+            "critical_path": self.critical_path,
+            "critical_path_seconds": round(self.critical_path_seconds, 3),
+            "kustomizations": [
+                n.to_dict()
+                for n in sorted(
+                    self.nodes.values(),
+                    key=lambda n: (n.started is None, n.started or 0.0, n.key),
+                )
+            ],
+        }
+
+
+class ReconcileScheduler:
+    """Reconcile a Kustomization graph in dependency order, concurrently."""
+
+    def __init__(
+        self,
+        client: FluxMCPClient,
+        graph: Graph,
+        parallelism: int = 4,
+        timeout: float = 900.0,
+        poll_interval: float = 5.0,
+        with_source: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.client = client
+        self.graph = graph
+        self.parallelism = max(1, parallelism)
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.with_source = with_source
+        self.clock = clock
+
+    def plan(self, targets: Optional[List[str]] = None) -> Graph:
+        """The subgraph to reconcile: targets and their dependencies, or all."""
+        keys = dependency_closure(self.graph, targets) if targets else set(self.graph)
+        selected = {key: self.graph[key] for key in keys}
+        problems = validate_graph(selected)
+        if problems:
+            raise SchedulerError("; ".join(problems))
+        return selected
+
+    def _reconcile(self, node: KustomizationNode):
+        tool_text(
+            self.client.reconcile_flux_kustomization(
+                node.name, node.namespace, with_source=self.with_source
+            )
+        )
+
+    def _poll(self, results: Dict[str, NodeResult], started: float, now: float):
+        """Update every requested Kustomization from a single list call."""
+        objects = {
+            f"{o['metadata'].get('namespace', '')}/{o['metadata']['name']}": o
+            for o in self.client.list_resources(
+                KUSTOMIZATION_API, "Kustomization", fields=STATUS_FIELDS
+            )
+            if "metadata" in o
+        }
+        for key, result in results.items():
+            if result.status != RECONCILING or result.requested is None:
+                continue
+            # A list that started before the reconcile call returned may
+            # predate the request
+            if result.requested > started:
+                continue
+            obj = objects.get(key)
+            if obj is None:
+                result.status, result.finished = FAILED, now
+                result.message = "Kustomization disappeared"
+                continue
+
+            if result.requested_at is None:
+                annotations = obj["metadata"].get("annotations") or {}
+                result.requested_at = annotations.get(REQUESTED_AT, "")
+            condition = get_condition(obj)
+            status = obj.get("status", {})
+            if result.requested_at:
+                handled = status.get("lastHandledReconcileAt") == result.requested_at
+            else:
+                handled = status.get("observedGeneration") == obj["metadata"].get(
+                    "generation"
+                )
+            if not handled:
+                continue
+
+            if condition.get("status") == "True":
+                result.status, result.finished = READY, now
+            elif (
+                condition.get("status") == "False"
+                and condition.get("reason") not in IN_PROGRESS_REASONS
+            ):
+                result.status, result.finished = FAILED, now
+                result.message = (
+                    f"{condition.get('reason', '')}: {condition.get('message', '')}"
+                )
+
+    def run(self, targets: Optional[List[str]] = None) -> ScheduleReport:
+        """Reconcile the graph and return the per-Kustomization timings."""
+        graph = self.plan(targets)
+        start = self.clock()
+        results = {
+            key: NodeResult(key, sorted(node.depends_on)) for key, node in graph.items()
+        }
+        report = ScheduleReport(results, self.parallelism)
+
+        def elapsed() -> float:
+            return self.clock() - start
+
+        def settle():
+            """Release or skip nodes whose dependencies have all finished."""
+            changed = True
+            while changed:
+                changed = False
+                for key, result in results.items():
+                    if result.status != PENDING or result.released is not None:
+                        continue
+                    dependencies = [results[d] for d in result.depends_on]
+                    blocked = [d for d in dependencies if d.status not in DONE]
+                    if not blocked:
+                        result.released = elapsed()
+                        if graph[key].suspended:
+                            result.status = SUSPENDED
+                            result.finished = result.released
+                        changed = True
+                    elif any(d.status in (FAILED, TIMEOUT, SKIPPED) for d in blocked):
+                        result.status = SKIPPED
+                        result.message = "dependency failed: " + ", ".join(
+                            d.key
+                            for d in blocked
+                            if d.status in (FAILED, TIMEOUT, SKIPPED)
+                        )
+                        changed = True
+
+        calls = {}
+        next_poll = 0.0
+        with ThreadPoolExecutor(
+            max_workers=self.parallelism, thread_name_prefix="reconcile"
+        ) as pool:
+            while True:
+                settle()
+                in_flight = [r for r in results.values() if r.status == RECONCILING]
+                runnable = sorted(
+                    (
+                        r
+                        for r in results.values()
+                        if r.status == PENDING and r.released is not None
+                    ),
+                    key=lambda r: (r.released, r.key),
+                )
+                for result in runnable[: self.parallelism - len(in_flight)]:
+                    result.status, result.started = RECONCILING, elapsed()
+                    future = pool.submit(self._reconcile, graph[result.key])
+                    calls[future] = result
+
+                if not any(
+                    r.status in (PENDING, RECONCILING) for r in results.values()
+                ):
+                    break
+
+                # Wait for a reconcile call to return or the next poll
+                if calls:
+                    done, _ = wait(
+                        list(calls),
+                        timeout=max(0.0, next_poll - elapsed()),
+                        return_when=FIRST_COMPLETED,
+                    )
+                else:
+                    time.sleep(max(0.0, next_poll - elapsed()))
+                    done = set()
+                for future in done:
+                    result = calls.pop(future)
+                    try:
+                        future.result()
+                        result.requested = elapsed()
+                    except FluxMCPError as e:
+                        result.status, result.finished = FAILED, elapsed()
+                        result.message = f"reconcile request failed: {e}"
+
+                if elapsed() >= next_poll:
+                    if any(
+                        r.status == RECONCILING and r.requested is not None
+                        for r in results.values()
+                    ):
+                        poll_started = elapsed()
+                        try:
+                            self._poll(results, poll_started, elapsed())
+                            report.polls += 1
+                        except FluxMCPError as e:
+                            print(f"⚠ Poll failed: {e}", file=sys.stderr)
+                    next_poll = elapsed() + self.poll_interval
+
+                now = elapsed()
+                for result in results.values():
+                    if (
+                        result.status == RECONCILING
+                        and now - result.started > self.timeout
+                    ):
+                        result.status, result.finished = TIMEOUT, now
+                        result.message = f"not Ready after {self.timeout:.0f}s"
+
+        report.wall_seconds = elapsed()
+        return report
+
+
+def print_plan(graph: Graph):
+    """Print the reconcile waves for --dry-run."""
+    for number, wave in enumerate(topological_waves(graph), 1):
+        print(f"Wave {number}: {len(wave)} Kustomizations")
+        for key in wave:
+            node = graph[key]
+            suffix = " (suspended)" if node.suspended else ""
+            print(f"  {key}{suffix}")
+
+
+def print_report(report: ScheduleReport):
+    """Print the per-Kustomization and critical-path timings."""
+    print("=== KUSTOMIZATION RECONCILE SCHEDULE ===")
+    marks = {READY: "✓", SUSPENDED: "⚠", SKIPPED: "⚠"}
+    for data in report.to_dict()["kustomizations"]:
+        mark = marks.get(data["status"], "✗")
+        timing = ""
+        if data["started"] is not None and data["finished"] is not None:
+            timing = (
+                f" started {data['started']:.1f}s, waited {data['wait_seconds']:.1f}s,"
+                f" took {data['duration_seconds']:.1f}s"
+            )
+        message = f": {data['message']}" if data["message"] else ""
+        print(f"{mark} {data['kustomization']} {data['status']}{timing}{message}")
+
+    print()
+    path = report.critical_path
+    if path:
+        print(f"Critical path ({report.critical_path_seconds:.1f}s):")
+        for key in path:
+            node = report.nodes[key]
+            print(f"  {key} {node.duration_seconds or 0.0:.1f}s")
+    print(
+        f"{len(report.by_status(READY))}/{len(report.nodes)} Ready in "
+        f"{report.wall_seconds:.1f}s with parallelism {report.parallelism} "
+        f"({report.serial_seconds:.1f}s of reconciling, {report.polls} polls)"
+    )
+
+
+def _key(name: str) -> str:
+    return name if "/" in name else f"{DEFAULT_NAMESPACE}/{name}"
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description="Reconcile Flux Kustomizations in dependency order"
+    )
+    parser.add_argument(
+        "kustomizations",
+        nargs="*",
+        help="Reconcile only these (name or namespace/name) and their dependencies",
+    )
+    parser.add_argument(
+        "--parallelism", type=int, default=4, help="Concurrent reconciles"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=900, help="Seconds to wait for each Ready"
+    )
+    parser.add_argument(
+        "--poll-interval", type=float, default=5, help="Seconds between status polls"
+    )
+    parser.add_argument(
+        "--with-source", action="store_true", help="Also reconcile the sources"
+    )
+    parser.add_argument(
+        "--from-manifests",
+        action="store_true",
+        help="Read dependsOn from the repository manifests instead of the cluster",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Print the reconcile waves only"
+    )
+    parser.add_argument("--json", action="store_true", help="Output in JSON format")
+    args = parser.parse_args(argv)
+
+    client = FluxMCPClient()
+    try:
+        if args.from_manifests:
+            from manifest_index import DEFAULT_CACHE, REPO_ROOT, load_index
+
+            index = load_index(f"{REPO_ROOT}/{DEFAULT_CACHE}")
+            graph = graph_from_manifests(index)
+        else:
+            graph = graph_from_objects(
+                client.list_resources(
+                    KUSTOMIZATION_API, "Kustomization", fields=GRAPH_FIELDS
+                )
+            )
+        scheduler = ReconcileScheduler(
+            client,
+            graph,
+            parallelism=args.parallelism,
+            timeout=args.timeout,
+            poll_interval=args.poll_interval,
+            with_source=args.with_source,
+        )
+        targets = [_key(name) for name in args.kustomizations]
+        if args.dry_run:
+            print_plan(scheduler.plan(targets))
+            return 0
+        report = scheduler.run(targets)
+    except (FluxMCPError, SchedulerError) as e:
+        print(f"✗ {e}", file=sys.stderr)
+        sys.exit(1)
+        return
+
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print_report(report)
+
+    sys.exit(0 if report.succeeded else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+"""
+Event-Driven Cluster Recovery Monitor
+
+Follows recovery progress from Kubernetes watch streams instead of polling
+`flux get` and `kubectl get` on an interval. Each watched kind (Kustomizations,
+HelmReleases, Pods, Nodes) is listed once, then watched from the list's
+resourceVersion; when a stream ends it resumes from the last resourceVersion
+seen, and relists only if the server reports it expired (410 Gone).
+
+Every readiness change is applied to an in-memory state model, printed with
+the updated progress the moment it arrives, and appended to a JSON Lines
+transition log that can be replayed after an incident:
+
+    recovery_monitor.py --api-server http://127.0.0.1:8001 --log recovery.jsonl
+    recovery_monitor.py --replay recovery.jsonl
+
+--kinds narrows the watch, e.g. to Node,Pod after power cycling nodes.
+
+Run `kubectl proxy` for --api-server on a workstation; inside the cluster the
+pod's service account is used.
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, TextIO
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+# The Kubernetes client lives with the proxy configuration scripts
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, "authentik-proxy-config"))
+
+from flux_mcp_wrapper import get_condition, is_ready, object_ref  # noqa: E402
+from kube_api import (  # noqa: E402
+    KubernetesAPIError,
+    KubernetesClient,
+    KubernetesConfig,
+)
+from recovery_validator import pod_failure  # noqa: E402
+
+
+@dataclass
+class WatchedKind:
+    """A resource collection the monitor watches."""
+
+    name: str
+    path: str
+
+
+WATCHED_KINDS = [
+    WatchedKind("Kustomization", "/apis/kustomize.toolkit.fluxcd.io/v1/kustomizations"),
+    WatchedKind("HelmRelease", "/apis/helm.toolkit.fluxcd.io/v2/helmreleases"),
+    WatchedKind("Pod", "/api/v1/pods"),
+    WatchedKind("Node", "/api/v1/nodes"),
+]
+
+
+def select_kinds(names: str) -> List[WatchedKind]:
+    """The watched kinds named in a comma-separated list, e.g. "Node,Pod"."""
+    by_name = {k.name.lower(): k for k in WATCHED_KINDS}
+    selected = []
+    for name in filter(None, (n.strip() for n in names.split(","))):
+        if name.lower() not in by_name:
+            raise ValueError(
+                f"unknown kind {name!r} (choose from "
+                f"{', '.join(k.name for k in WATCHED_KINDS)})"
+            )
+        selected.append(by_name[name.lower()])
+    return selected
+
+
+@dataclass
+class ObjectState:
+    """Readiness of one watched object."""
+
+    ready: bool
+    reason: str = ""
+    suspended: bool = False
+
+
+@dataclass
+class Transition:
+    """A readiness change, as written to the transition log."""
+
+    timestamp: str
+    kind: str
+    key: str
+    event: str
+    ready: Optional[bool]
+    reason: str = ""
+    previous_ready: Optional[bool] = None
+    suspended: bool = False
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), sort_keys=True)
+
+
+def object_state(kind: str, obj: Dict) -> ObjectState:
+    """Derive the readiness of an object from its status."""
+    if kind == "Pod":
+        reason = pod_failure(obj)
+        return ObjectState(ready=reason is None, reason=reason or "")
+
+    condition = get_condition(obj)
+    return ObjectState(
+        ready=is_ready(obj),
+        reason=condition.get("reason") or condition.get("message") or "",
+        suspended=bool(obj.get("spec", {}).get("suspend")),
+    )
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+class ClusterState:
+    """In-memory readiness model for every watched object."""
+
+    def __init__(self, kinds: Optional[List[str]] = None):
+        if kinds is None:
+            kinds = [k.name for k in WATCHED_KINDS]
+        self.kinds = list(kinds)
+        self.objects: Dict[str, Dict[str, ObjectState]] = {k: {} for k in self.kinds}
+        self.synced = set()
+        self._lock = threading.Lock()
+
+    def apply(
+        self, kind: str, event: str, key: str, state: Optional[ObjectState]
+    ) -> Optional[Transition]:
+        """Apply an event and return a Transition if readiness changed."""
+        with self._lock:
+            objects = self.objects.setdefault(kind, {})
+            previous = objects.get(key)
+
+            if event == "DELETED":
+                if previous is None:
+                    return None
+                del objects[key]
+                return Transition(
+                    _now(), kind, key, event, None, previous_ready=previous.ready
+                )
+
+            objects[key] = state
+            if previous is not None and (previous.ready, previous.suspended) == (
+                state.ready,
+                state.suspended,
+            ):
+                return None
+            return Transition(
+                _now(),
+                kind,
+                key,
+                event,
+                state.ready,
+                state.reason,
+                previous.ready if previous else None,
+                state.suspended,
+            )
+
+    def replace(self, kind: str, states: Dict[str, ObjectState]) -> List[Transition]:
+        """Replace a kind's objects from a (re)list and return the differences."""
+        with self._lock:
+            current = dict(self.objects.get(kind, {}))
+        transitions = []
+        for key in current.keys() - states.keys():
+            transition = self.apply(kind, "DELETED", key, None)
+            if transition:
+                transitions.append(transition)
+        for key, state in sorted(states.items()):
+            transition = self.apply(kind, "SYNC", key, state)
+            if transition:
+                transitions.append(transition)
+        with self._lock:
+            self.synced.add(kind)
+        return transitions
+
+    def counts(self, kind: str) -> Dict[str, int]:
+        with self._lock:
+            active = [s for s in self.objects.get(kind, {}).values() if not s.suspended]
+        ready = sum(1 for s in active if s.ready)
+        return {"ready": ready, "total": len(active)}
+
+    def not_ready(self, kind: str) -> List[str]:
+        with self._lock:
+            return sorted(
+                f"{key}: {state.reason}".rstrip(": ")
+                for key, state in self.objects.get(kind, {}).items()
+                if not state.ready and not state.suspended
+            )
+
+    def recovered(self) -> bool:
+        """Every kind synced and every non-suspended object ready."""
+        if not set(self.kinds) <= self.synced:
+            return False
+        for kind in self.kinds:
+            counts = self.counts(kind)
+            if counts["ready"] != counts["total"]:
+                return False
+        return True
+
+    def progress(self) -> str:
+        parts = []
+        for kind in self.kinds:
+            counts = self.counts(kind)
+            parts.append(f"{kind}s {counts['ready']}/{counts['total']}")
+        return " | ".join(parts)
+
+
+class KindWatcher(threading.Thread):
+    """List then watch one kind, resuming from the last resourceVersion."""
+
+    def __init__(
+        self,
+        client: KubernetesClient,
+        kind: WatchedKind,
+        state: ClusterState,
+        emit: Callable[[Transition], None],
+        stop: threading.Event,
+        watch_timeout: int = 300,
+        retry_interval: float = 2.0,
+        max_retry_interval: float = 30.0,
+        on_sync: Optional[Callable[[], None]] = None,
+    ):
+        super().__init__(name=f"watch-{kind.name}", daemon=True)
+        self.client = client
+        self.kind = kind
+        self.state = state
+        self.emit = emit
+        self.stop_event = stop
+        self.watch_timeout = watch_timeout
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+        self.on_sync = on_sync
+        self.resource_version: Optional[str] = None
+        self.relists = 0
+
+    def relist(self):
+        items, self.resource_version = self.client.list_collection(self.kind.path)
+        self.relists += 1
+        states = {object_ref(o): object_state(self.kind.name, o) for o in items}
+        for transition in self.state.replace(self.kind.name, states):
+            self.emit(transition)
+        if self.on_sync:
+            self.on_sync()
+
+    def handle(self, event: Dict) -> bool:
+        """Apply one watch event; returns False when a relist is needed."""
+        event_type = event.get("type")
+        obj = event.get("object") or {}
+
+        if event_type == "ERROR":
+            # 410 Gone: the resourceVersion is too old to resume from
+            return obj.get("code") != 410
+        rv = obj.get("metadata", {}).get("resourceVersion")
+        if rv:
+            self.resource_version = rv
+        if event_type == "BOOKMARK":
+            return True
+
+        transition = self.state.apply(
+            self.kind.name,
+            event_type,
+            object_ref(obj),
+            object_state(self.kind.name, obj),
+        )
+        if transition:
+            self.emit(transition)
+        return True
+
+    def run(self):
+        needs_list = True
+        backoff = self.retry_interval
+        while not self.stop_event.is_set():
+            try:
+                if needs_list:
+                    self.relist()
+                    needs_list = False
+                for event in self.client.watch(
+                    self.kind.path, self.resource_version, None, self.watch_timeout
+                ):
+                    if not self.handle(event):
+                        needs_list = True
+                        break
+                    if self.stop_event.is_set():
+                        return
+                backoff = self.retry_interval
+            except KubernetesAPIError as e:
+                if e.status_code == 410:
+                    needs_list = True
+                    continue
+                # Dropped streams and API outages: resume after a growing pause
+                print(
+                    f"⚠ {self.kind.name}: {e}; retrying in {backoff:.0f}s",
+                    file=sys.stderr,
+                )
+                self.stop_event.wait(backoff)
+                backoff = min(backoff * 2, self.max_retry_interval)
+
+
+class RecoveryMonitor:
+    """Watch every kind and report transitions as they happen."""
+
+    def __init__(
+        self,
+        client: KubernetesClient,
+        kinds: Optional[List[WatchedKind]] = None,
+        log: Optional[TextIO] = None,
+        on_transition: Optional[Callable[[Transition, ClusterState], None]] = None,
+        watch_timeout: int = 300,
+    ):
+        self.client = client
+        self.kinds = kinds or WATCHED_KINDS
+        self.state = ClusterState([k.name for k in self.kinds])
+        self.log = log
+        self.on_transition = on_transition
+        self.watch_timeout = watch_timeout
+        self.recovered = threading.Event()
+        self._stop = threading.Event()
+        self._emit_lock = threading.Lock()
+        self.watchers: List[KindWatcher] = []
+
+    def _emit(self, transition: Transition):
+        with self._emit_lock:
+            # Watchers may still deliver while the monitor is being stopped
+            if self._stop.is_set():
+                return
+            if self.log is not None:
+                self.log.write(transition.to_json() + "\n")
+                self.log.flush()
+            if self.on_transition:
+                self.on_transition(transition, self.state)
+            self._check_recovered()
+
+    def _check_recovered(self):
+        if self.state.recovered():
+            self.recovered.set()
+
+    def start(self):
+        self.watchers = [
+            KindWatcher(
+                self.client,
+                kind,
+                self.state,
+                self._emit,
+                self._stop,
+                self.watch_timeout,
+                on_sync=self._check_recovered,
+            )
+            for kind in self.kinds
+        ]
+        for watcher in self.watchers:
+            watcher.start()
+
+    def wait(
+        self, timeout: Optional[float] = None, until_recovered: bool = True
+    ) -> bool:
+        """Block until recovered (or stopped) or the timeout expires.
+
+        Returns whether everything is Ready.
+        """
+        (self.recovered if until_recovered else self._stop).wait(timeout)
+        return self.recovered.is_set()
+
+    def stop(self, timeout: float = 1.0):
+        """Stop the watchers; no transition is emitted once this returns.
+
+        Watchers blocked on a quiet stream notice the stop when it ends, so
+        each is only joined for up to timeout seconds; being daemons, they
+        do not hold the process.
+        """
+        with self._emit_lock:
+            self._stop.set()
+        for watcher in self.watchers:
+            watcher.join(timeout)
+
+
+def read_transitions(path: str) -> Iterator[Transition]:
+    """Read a transition log written by the monitor."""
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield Transition(**json.loads(line))
+
+
+def replay(path: str, on_transition=None) -> ClusterState:
+    """Rebuild the state model from a transition log."""
+    state = ClusterState([])
+    for transition in read_transitions(path):
+        if transition.kind not in state.kinds:
+            state.kinds.append(transition.kind)
+            state.objects[transition.kind] = {}
+        if transition.event == "DELETED":
+            state.apply(transition.kind, "DELETED", transition.key, None)
+        else:
+            state.apply(
+                transition.kind,
+                transition.event,
+                transition.key,
+                ObjectState(transition.ready, transition.reason, transition.suspended),
+            )
+        state.synced.add(transition.kind)
+        if on_transition:
+            on_transition(transition, state)
+    return state
+
+
+def print_transition(transition: Transition, state: ClusterState):
+    """Print a transition with the updated progress line."""
+    # The initial list only reports what is not Ready yet
+    if transition.event == "SYNC" and transition.previous_ready is None:
+        if transition.ready:
+            return
+    if transition.ready is None:
+        mark = "-"
+    else:
+        mark = "✓" if transition.ready else "✗"
+    reason = f" ({transition.reason})" if transition.reason else ""
+    print(
+        f"{transition.timestamp} {mark} {transition.kind} {transition.key}"
+        f"{reason}  [{state.progress()}]"
+    )
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description="Follow cluster recovery from Kubernetes watch streams"
+    )
+    parser.add_argument(
+        "--api-server",
+        help="Kubernetes API URL, e.g. kubectl proxy (default: in-cluster)",
+    )
+    parser.add_argument("--log", help="Append transitions to this JSON Lines file")
+    parser.add_argument("--replay", help="Replay a transition log and exit")
+    parser.add_argument(
+        "--until-recovered",
+        action="store_true",
+        help="Exit 0 as soon as everything is Ready",
+    )
+    parser.add_argument("--timeout", type=float, help="Give up after this many seconds")
+    parser.add_argument(
+        "--kinds",
+        help="Comma-separated kinds to watch, e.g. Node,Pod (default: all)",
+    )
+    args = parser.parse_args(argv)
+    try:
+        kinds = select_kinds(args.kinds) if args.kinds else None
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.replay:
+        state = replay(args.replay, print_transition)
+        print(f"Final state: {state.progress()}")
+        for kind in state.kinds:
+            for entry in state.not_ready(kind):
+                print(f"  ✗ {kind} {entry}")
+        return
+
+    try:
+        if args.api_server:
+            config = KubernetesConfig(
+                args.api_server, token=os.environ.get("KUBERNETES_TOKEN")
+            )
+        else:
+            config = KubernetesConfig.in_cluster()
+    except (KubernetesAPIError, OSError) as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+        return
+
+    log = open(args.log, "a") if args.log else None
+    monitor = RecoveryMonitor(
+        KubernetesClient(config),
+        kinds=kinds,
+        log=log,
+        on_transition=print_transition,
+    )
+    print("=== RECOVERY MONITOR (watching, Ctrl+C to exit) ===")
+    monitor.start()
+
+    started = time.monotonic()
+    recovered = False
+    try:
+        recovered = monitor.wait(args.timeout, args.until_recovered)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        monitor.stop()
+        if log is not None:
+            log.close()
+
+    print(
+        f"Final state after {time.monotonic() - started:.0f}s: "
+        f"{monitor.state.progress()}"
+    )
+    if recovered:
+        print("🎉 All watched resources Ready")
+    if args.until_recovered:
+        sys.exit(0 if recovered else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Cluster Recovery Validator
+
+Validates that the cluster has recovered: every Flux Kustomization Ready, every
+node Ready, no failing pods, the Authentik proxy running and the catalog
+services reachable. The Kubernetes checks go through FluxMCPClient and the
+service checks through the pooled ServiceProber, and all of them run
+concurrently, so a full validation takes about as long as the slowest check.
+
+Expected counts come from what the cluster reports (Kustomizations that are
+not suspended, registered nodes) rather than hard-coded totals, so the
+validator keeps working as Kustomizations and nodes are added.
+
+Usage:
+    recovery_validator.py [--json] [--skip-services] [--catalog path]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+# The prober and service catalog live with the proxy configuration scripts
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, "authentik-proxy-config"))
+
+from flux_mcp_wrapper import (  # noqa: E402
+    FluxMCPClient,
+    FluxMCPError,
+    get_condition,
+    is_ready,
+    object_ref,
+)
+from service_catalog import ServiceCatalogError, load_catalog  # noqa: E402
+from service_prober import ServiceProber  # noqa: E402
+
+AUTH_NAMESPACE = "authentik-proxy"
+
+# Container waiting reasons that mean a Running pod is not actually healthy
+FAILING_WAIT_REASONS = {
+    "CrashLoopBackOff",
+    "ImagePullBackOff",
+    "ErrImagePull",
+    "CreateContainerConfigError",
+}
+
+
+@dataclass
+class CheckResult:
+    """Outcome of one validation check."""
+
+    name: str
+    passed: bool
+    summary: str
+    ready: int = 0
+    expected: int = 0
+    details: List[str] = field(default_factory=list)
+    duration_seconds: float = 0.0
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "passed": self.passed,
+            "summary": self.summary,
+            "ready": self.ready,
+            "expected": self.expected,
+            "details": self.details,
+            "duration_seconds": round(self.duration_seconds, 3),
+        }
+
+
+@dataclass
+class RecoveryReport:
+    """All check results and the wall-clock time of the validation."""
+
+    checks: List[CheckResult] = field(default_factory=list)
+    wall_seconds: float = 0.0
+
+    @property
+    def passed(self) -> bool:
+        return all(c.passed for c in self.checks)
+
+    def to_dict(self):
+        return {
+            "passed": self.passed,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "checks": [c.to_dict() for c in self.checks],
+        }
+
+
+def evaluate_kustomizations(items: List[Dict]) -> CheckResult:
+    """All non-suspended Kustomizations must be Ready."""
+    active = [k for k in items if not k.get("spec", {}).get("suspend")]
+    failing = []
+    for kustomization in active:
+        if not is_ready(kustomization):
+            condition = get_condition(kustomization)
+            reason = condition.get("message") or condition.get("reason") or "no status"
+            failing.append(f"{object_ref(kustomization)}: {reason}")
+
+    ready = len(active) - len(failing)
+    suspended = len(items) - len(active)
+    summary = f"{ready}/{len(active)} Kustomizations Ready"
+    if suspended:
+        summary += f" ({suspended} suspended)"
+    return CheckResult(
+        "kustomizations",
+        passed=bool(active) and not failing,
+        summary=summary,
+        ready=ready,
+        expected=len(active),
+        details=sorted(failing),
+    )
+
+
+def evaluate_nodes(items: List[Dict]) -> CheckResult:
+    """Every registered node must be Ready."""
+    failing = sorted(object_ref(node) for node in items if not is_ready(node))
+    ready = len(items) - len(failing)
+    return CheckResult(
+        "nodes",
+        passed=bool(items) and not failing,
+        summary=f"{ready}/{len(items)} nodes Ready",
+        ready=ready,
+        expected=len(items),
+        details=[f"{name}: NotReady" for name in failing],
+    )
+
+
+def pod_failure(pod: Dict) -> Optional[str]:
+    """Why a pod counts as failing, or None when it is healthy or completed."""
+    status = pod.get("status", {})
+    phase = status.get("phase")
+    if phase == "Succeeded":
+        return None
+    if phase != "Running":
+        return phase or "Unknown"
+
+    for container in status.get("containerStatuses") or []:
+        reason = (container.get("state", {}).get("waiting") or {}).get("reason")
+        if reason in FAILING_WAIT_REASONS:
+            return reason
+    return None
+
+
+def evaluate_pods(items: List[Dict]) -> CheckResult:
+    """No pod may be failing; completed Job pods are fine."""
+    failing = []
+    for pod in items:
+        reason = pod_failure(pod)
+        if reason:
+            failing.append(f"{object_ref(pod)}: {reason}")
+
+    return CheckResult(
+        "pods",
+        passed=not failing,
+        summary=f"{len(failing)} failing pods out of {len(items)}",
+        ready=len(items) - len(failing),
+        expected=len(items),
+        details=sorted(failing),
+    )
+
+
+def evaluate_auth(items: List[Dict], namespace: str = AUTH_NAMESPACE) -> CheckResult:
+    """At least one Authentik proxy pod must be running."""
+    pods = [p for p in items if p.get("metadata", {}).get("namespace") == namespace]
+    running = [p for p in pods if pod_failure(p) is None]
+    return CheckResult(
+        "authentication",
+        passed=bool(running),
+        summary=f"{len(running)} {namespace} pods running",
+        ready=len(running),
+        expected=len(pods),
+    )
+
+
+class RecoveryValidator:
+    """Run all recovery checks concurrently."""
+
+    def __init__(
+        self,
+        client: Optional[FluxMCPClient] = None,
+        prober: Optional[ServiceProber] = None,
+        services=None,
+    ):
+        self.client = client or FluxMCPClient()
+        self.prober = prober
+        self.services = services or []
+
+    def _timed(self, check: Callable[[], List[CheckResult]]) -> List[CheckResult]:
+        started = time.monotonic()
+        try:
+            results = check()
+        except FluxMCPError as e:
+            name = check.__name__.replace("check_", "")
+            results = [CheckResult(name, passed=False, summary=f"query failed: {e}")]
+        for result in results:
+            result.duration_seconds = time.monotonic() - started
+        return results
+
+    def check_kustomizations(self) -> List[CheckResult]:
+        items = self.client.list_resources(
+            "kustomize.toolkit.fluxcd.io/v1", "Kustomization"
+        )
+        return [evaluate_kustomizations(items)]
+
+    def check_nodes(self) -> List[CheckResult]:
+        return [evaluate_nodes(self.client.list_resources("v1", "Node"))]
+
+    def check_pods(self) -> List[CheckResult]:
+        # One cluster-wide pod list serves both the failing pod scan and the
+        # authentication check
+        items = self.client.list_resources("v1", "Pod")
+        return [evaluate_pods(items), evaluate_auth(items)]
+
+    def check_services(self) -> List[CheckResult]:
+        report = self.prober.probe_services(self.services)
+        # A redirect to the Authentik login counts as healthy; an upstream 5xx
+        # behind a working proxy does not
+        return [
+            CheckResult(
+                "services",
+                passed=not report.unhealthy,
+                summary=f"{len(report.healthy)}/{len(report.results)} "
+                "services healthy",
+                ready=len(report.healthy),
+                expected=len(report.results),
+                details=[
+                    f"{r.url}: {r.outcome} ({r.error or f'HTTP {r.status}'})"
+                    for r in report.unhealthy
+                ],
+            )
+        ]
+
+    def validate(self) -> RecoveryReport:
+        """Run every check concurrently and collect the report."""
+        checks = [self.check_kustomizations, self.check_nodes, self.check_pods]
+        if self.prober is not None and self.services:
+            checks.append(self.check_services)
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(
+            max_workers=len(checks), thread_name_prefix="recovery"
+        ) as pool:
+            futures = [pool.submit(self._timed, check) for check in checks]
+            results = [r for future in futures for r in future.result()]
+
+        return RecoveryReport(checks=results, wall_seconds=time.monotonic() - started)
+
+
+def print_report(report: RecoveryReport, max_details: int = 10):
+    """Print the report for terminal use."""
+    print("=== RECOVERY VALIDATION ===")
+    for check in report.checks:
+        mark = "✓" if check.passed else "✗"
+        print(f"{mark} {check.name}: {check.summary} ({check.duration_seconds:.2f}s)")
+        for detail in check.details[:max_details]:
+            print(f"    - {detail}")
+        if len(check.details) > max_details:
+            print(f"    ... and {len(check.details) - max_details} more")
+
+    print()
+    if report.passed:
+        print(f"✓ RECOVERY SUCCESSFUL in {report.wall_seconds:.2f}s")
+    else:
+        print(f"✗ RECOVERY INCOMPLETE ({report.wall_seconds:.2f}s)")
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description="Validate cluster recovery")
+    parser.add_argument("--catalog", help="Service catalog to probe")
+    parser.add_argument(
+        "--skip-services", action="store_true", help="Skip the reachability probes"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=5.0, help="Per-service probe timeout"
+    )
+    parser.add_argument("--json", action="store_true", help="Output in JSON format")
+    args = parser.parse_args(argv)
+
+    prober = None
+    services = []
+    if not args.skip_services:
+        try:
+            services = load_catalog(args.catalog).services
+        except ServiceCatalogError as e:
+            print(f"✗ {e}")
+            sys.exit(1)
+            return
+        prober = ServiceProber(timeout=args.timeout)
+
+    try:
+        report = RecoveryValidator(prober=prober, services=services).validate()
+    finally:
+        if prober is not None:
+            prober.close()
+
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print_report(report)
+
+    sys.exit(0 if report.passed else 1)
+
+
+if __name__ == "__main__":
+    main()
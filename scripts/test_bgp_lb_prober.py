@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the BGP LoadBalancer data-plane prober
+"""
+
+import os
+import socket
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import yaml
+
+from bgp_lb_prober import (
+    COLLECTED_KINDS,
+    HTTP,
+    ICMP,
+    TCP,
+    LBProber,
+    ProbeResult,
+    SampleStats,
+    echo_request,
+    icmp_checksum,
+    ip_in_block,
+    selector_matches,
+)
+
+LEGACY_POLICY = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "infrastructure",
+    "cilium-bgp",
+    "bgp-policy-legacy.yaml",
+)
+
+POOLS = [
+    {
+        "metadata": {"name": "bgp-default"},
+        "spec": {
+            "blocks": [{"start": "127.0.0.1", "stop": "127.0.0.9"}],
+            "serviceSelector": {
+                "matchLabels": {"io.cilium/lb-ipam-pool": "bgp-default"}
+            },
+        },
+    },
+    {
+        "metadata": {"name": "bgp-default-ipv6"},
+        "spec": {"blocks": [{"cidr": "fd47:25e1:2f96:52:100::/120"}]},
+    },
+]
+
+ADVERTISEMENTS = [
+    {
+        "metadata": {"name": "bgp-loadbalancer-advertisements"},
+        "spec": {
+            "advertisements": [
+                {"advertisementType": "PodCIDR"},
+                {
+                    "advertisementType": "Service",
+                    "service": {"addresses": ["LoadBalancerIP", "ExternalIP"]},
+                    "selector": {"matchLabels": {"type": "LoadBalancer"}},
+                },
+            ]
+        },
+    }
+]
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_HEAD(self):
+        self.send_response(503 if self.path == "/" and self.server.broken else 200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def _server(broken=False):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.broken = broken
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _closed_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _service(name, ip, ports, labels=None):
+    return {
+        "metadata": {
+            "name": name,
+            "namespace": "default",
+            "labels": {
+                "type": "LoadBalancer",
+                "io.cilium/lb-ipam-pool": "bgp-default",
+                **(labels or {}),
+            },
+        },
+        "spec": {
+            "type": "LoadBalancer",
+            "ports": [{"name": "http", "port": p, "protocol": "TCP"} for p in ports],
+        },
+        "status": {"loadBalancer": {"ingress": [{"ip": ip}] if ip else []}},
+    }
+
+
+def _findings(service):
+    return sorted((f.rule, f.severity) for f in service.findings)
+
+
+class TestHelpers(unittest.TestCase):
+    """Test cases for selectors, pool blocks, statistics and ICMP packets."""
+
+    def test_selectors_and_blocks(self):
+        """Test label selector operators and start/stop and CIDR blocks."""
+        labels = {"type": "LoadBalancer", "app": "grafana"}
+        self.assertTrue(
+            selector_matches(
+                {
+                    "matchLabels": {"type": "LoadBalancer"},
+                    "matchExpressions": [
+                        {"key": "app", "operator": "In", "values": ["grafana"]},
+                        {"key": "tier", "operator": "DoesNotExist"},
+                    ],
+                },
+                labels,
+            )
+        )
+        self.assertFalse(
+            selector_matches(
+                {
+                    "matchExpressions": [
+                        {"key": "app", "operator": "NotIn", "values": ["grafana"]}
+                    ]
+                },
+                labels,
+            )
+        )
+        self.assertFalse(selector_matches(None, labels))
+        self.assertTrue(
+            ip_in_block(
+                "172.29.52.150", {"start": "172.29.52.100", "stop": "172.29.52.199"}
+            )
+        )
+        self.assertFalse(
+            ip_in_block(
+                "172.29.52.200", {"start": "172.29.52.100", "stop": "172.29.52.199"}
+            )
+        )
+        self.assertTrue(
+            ip_in_block(
+                "fd47:25e1:2f96:52:100::10", {"cidr": "fd47:25e1:2f96:52:100::/120"}
+            )
+        )
+        self.assertFalse(
+            ip_in_block("172.29.52.150", {"cidr": "fd47:25e1:2f96:52:100::/120"})
+        )
+
+    def test_jitter_and_loss(self):
+        """Test jitter is the mean difference between consecutive samples."""
+        stats = SampleStats(sent=5, latencies=[0.010, 0.014, 0.012, 0.012])
+        self.assertAlmostEqual(stats.jitter, 0.002)
+        self.assertAlmostEqual(stats.avg, 0.012)
+        self.assertAlmostEqual(stats.loss, 0.2)
+        self.assertIsNone(SampleStats(sent=1, latencies=[0.01]).jitter)
+
+    def test_echo_request_checksum(self):
+        """Test that an IPv4 echo request carries a valid checksum."""
+        packet = echo_request(False, 7, b"payload!")
+        self.assertEqual(packet[0], 8)
+        self.assertEqual(icmp_checksum(packet), 0)
+        self.assertEqual(echo_request(True, 7, b"x")[0], 128)
+
+
+class TestProber(unittest.TestCase):
+    """Test cases for concurrent probing and the control-plane cross-check."""
+
+    def setUp(self):
+        self.healthy = _server()
+        self.broken = _server(broken=True)
+
+    def tearDown(self):
+        for server in (self.healthy, self.broken):
+            server.shutdown()
+            server.server_close()
+
+    def _run(self, services, advertisements=ADVERTISEMENTS, policies=(), **options):
+        objects = {
+            "Service": services,
+            "CiliumLoadBalancerIPPool": POOLS,
+            "CiliumBGPAdvertisement": advertisements,
+            "CiliumBGPPeeringPolicy": list(policies),
+        }
+        calls = []
+
+        def fetch(kind):
+            calls.append(kind.kind)
+            return objects[kind.kind]
+
+        options.setdefault("icmp", False)
+        prober = LBProber(fetch, samples=3, interval=0, timeout=1, **options)
+        report = prober.run()
+        self.assertEqual(len(calls), len(COLLECTED_KINDS))
+        return report
+
+    def test_reachable_and_advertised(self):
+        """Test latency samples for TCP and HTTP on a healthy service."""
+        port = self.healthy.server_address[1]
+        report = self._run([_service("grafana", "127.0.0.1", [port])])
+        service = report.services[0]
+        self.assertTrue(report.passed)
+        self.assertEqual(service.findings, [])
+        self.assertEqual(service.pools, {"127.0.0.1": "bgp-default"})
+        self.assertEqual(service.advertisements, ["bgp-loadbalancer-advertisements"])
+        self.assertEqual([p.probe for p in service.probes], [TCP, HTTP])
+        for probe in service.probes:
+            self.assertEqual((probe.stats.sent, probe.stats.received), (3, 3))
+        self.assertEqual(service.probes[1].status, 200)
+
+    def test_cross_check_and_failures(self):
+        """Test pool, advertisement, reachability and HTTP findings."""
+        report = self._run(
+            [
+                # Closed port, outside every pool, not labelled for BGP
+                _service("dead", "127.0.0.10", [_closed_port()], {"type": "internal"}),
+                _service("broken", "127.0.0.1", [self.broken.server_address[1]]),
+                _service("pending", None, [80]),
+            ]
+        )
+        self.assertFalse(report.passed)
+        services = {s.target.name: s for s in report.services}
+        self.assertEqual(
+            _findings(services["dead"]),
+            [("advertisement", "fail"), ("pool", "fail"), ("unreachable", "fail")],
+        )
+        self.assertEqual(_findings(services["broken"]), [("http", "warning")])
+        self.assertEqual(_findings(services["pending"]), [("pending", "warning")])
+
+    def test_legacy_peering_policy(self):
+        """Test the repo's CiliumBGPPeeringPolicy advertises by pool label."""
+        with open(LEGACY_POLICY) as f:
+            policies = [
+                doc
+                for doc in yaml.safe_load_all(f)
+                if doc and doc["kind"] == "CiliumBGPPeeringPolicy"
+            ]
+        port = self.healthy.server_address[1]
+        report = self._run(
+            [
+                _service("grafana", "127.0.0.1", [port]),
+                # Selected by the pool, but not by the policy's serviceSelector
+                _service(
+                    "other",
+                    "127.0.0.2",
+                    [_closed_port()],
+                    {"io.cilium/lb-ipam-pool": "bgp-other"},
+                ),
+            ],
+            advertisements=[],
+            policies=policies,
+        )
+        services = {s.target.name: s for s in report.services}
+        self.assertEqual(services["grafana"].findings, [])
+        self.assertEqual(services["grafana"].advertisements, ["bgp-peering-policy"])
+        self.assertIn(("advertisement", "fail"), _findings(services["other"]))
+
+    def test_no_bgp_configuration_skips_advertisement(self):
+        """Test the advertisement check is skipped when nothing is configured."""
+        port = self.healthy.server_address[1]
+        report = self._run(
+            [_service("grafana", "127.0.0.1", [port])], advertisements=[]
+        )
+        self.assertTrue(report.passed)
+        self.assertEqual(report.services[0].findings, [])
+        self.assertEqual(report.services[0].advertisements, [])
+
+    def test_icmp_not_permitted_is_skipped(self):
+        """Test that ICMP is skipped, not failed, without socket permission."""
+        port = self.healthy.server_address[1]
+        with patch(
+            "bgp_lb_prober.icmp_sample", side_effect=PermissionError(1, "denied")
+        ):
+            report = self._run([_service("grafana", "127.0.0.1", [port])], icmp=True)
+        icmp = report.services[0].probes[0]
+        self.assertEqual(icmp.probe, ICMP)
+        self.assertTrue(icmp.skipped)
+        self.assertTrue(report.passed)
+
+    def test_partial_loss_warns(self):
+        """Test that a probe losing some samples is a warning."""
+        prober = LBProber(lambda kind: [], samples=4, interval=0)
+        answers = iter([0.01, OSError("timed out"), 0.012, 0.011])
+
+        def sample(sequence):
+            answer = next(answers)
+            if isinstance(answer, Exception):
+                raise answer
+            return answer
+
+        result = prober._sample(ProbeResult("127.0.0.1", ICMP), sample)
+        self.assertEqual((result.stats.sent, result.stats.received), (4, 3))
+        self.assertEqual(result.error, "timed out")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the cluster state snapshots
+"""
+
+import copy
+import gzip
+import json
+import os
+import tempfile
+import unittest
+
+from cluster_snapshot import (
+    SNAPSHOT_KINDS,
+    Snapshot,
+    capture,
+    diff_snapshots,
+    normalize,
+    object_key,
+)
+from flux_mcp_wrapper import FluxMCPError
+
+
+def _object(kind, name, namespace="kube-system", uid=None, rv="1", **fields):
+    api_version = {
+        "Deployment": "apps/v1",
+        "ClusterRole": "rbac.authorization.k8s.io/v1",
+    }
+    metadata = {
+        "name": name,
+        "uid": uid or f"uid-{name}",
+        "resourceVersion": rv,
+        "generation": 1,
+        "creationTimestamp": "2026-01-01T00:00:00Z",
+        "managedFields": [{"manager": "helm"}],
+        "annotations": {
+            "kubectl.kubernetes.io/last-applied-configuration": "{}",
+            "meta.helm.sh/release-name": "cilium",
+        },
+    }
+    if namespace:
+        metadata["namespace"] = namespace
+    return {
+        "apiVersion": api_version.get(kind, "v1"),
+        "kind": kind,
+        "metadata": metadata,
+        **fields,
+    }
+
+
+def _objects():
+    return [
+        _object(
+            "Deployment",
+            "cilium-operator",
+            spec={"replicas": 2},
+            status={"readyReplicas": 2},
+        ),
+        _object("Secret", "cilium-ca", data={"ca.crt": "c2VjcmV0"}),
+        _object("Secret", "sh.helm.release.v1.cilium.v3", data={"release": "eA=="}),
+        _object("ClusterRole", "cilium", namespace=None, rules=[]),
+        _object("Pod", "cilium-abcde", spec={"nodeName": "mini01"}),
+    ]
+
+
+def _snapshot(objects):
+    snapshot = Snapshot()
+    for obj in objects:
+        snapshot.add(obj)
+    return snapshot
+
+
+class TestNormalize(unittest.TestCase):
+    """Test cases for object keys and stripping volatile fields."""
+
+    def test_keys(self):
+        """Test keys carry the API group and omit it for the core group."""
+        self.assertEqual(
+            [object_key(o) for o in _objects()[:4]],
+            [
+                "Deployment.apps/kube-system/cilium-operator",
+                "Secret/kube-system/cilium-ca",
+                "Secret/kube-system/sh.helm.release.v1.cilium.v3",
+                "ClusterRole.rbac.authorization.k8s.io/cilium",
+            ],
+        )
+
+    def test_volatile_fields_and_secrets(self):
+        """Test status and volatile metadata are dropped and secrets hashed."""
+        deployment, secret = (normalize(o) for o in _objects()[:2])
+        self.assertNotIn("status", deployment)
+        self.assertEqual(
+            deployment["metadata"],
+            {
+                "name": "cilium-operator",
+                "namespace": "kube-system",
+                "annotations": {"meta.helm.sh/release-name": "cilium"},
+            },
+        )
+        self.assertTrue(secret["data"]["ca.crt"].startswith("sha256:"))
+        self.assertNotIn("c2VjcmV0", json.dumps(secret))
+
+
+class TestDiff(unittest.TestCase):
+    """Test cases for classifying objects between two snapshots."""
+
+    def test_identical_run(self):
+        """Test that status changes and Helm revisions are not changes."""
+        after = copy.deepcopy(_objects())
+        after[0]["metadata"]["resourceVersion"] = "2"
+        after[0]["status"] = {"readyReplicas": 1}
+        after[2]["metadata"]["name"] = "sh.helm.release.v1.cilium.v4"
+        result = diff_snapshots(_snapshot(_objects()), _snapshot(after))
+        self.assertTrue(result.idempotent)
+        self.assertEqual(
+            result.touched, ["Deployment.apps/kube-system/cilium-operator"]
+        )
+        self.assertEqual(result.ignored, 2)
+        self.assertEqual(result.unchanged, 3)
+
+    def test_recreated_mutated_added_removed(self):
+        """Test each kind of change is reported by key."""
+        after = copy.deepcopy(_objects())
+        after[0]["spec"]["replicas"] = 3
+        after[0]["metadata"]["generation"] = 2
+        after[1]["metadata"]["uid"] = "uid-new"
+        after[4] = _object("Pod", "cilium-fghij")
+        result = diff_snapshots(_snapshot(_objects()), _snapshot(after))
+        self.assertFalse(result.idempotent)
+        self.assertEqual(result.recreated, ["Secret/kube-system/cilium-ca"])
+        self.assertEqual(result.added, ["Pod/kube-system/cilium-fghij"])
+        self.assertEqual(result.removed, ["Pod/kube-system/cilium-abcde"])
+        self.assertEqual(len(result.mutated), 1)
+        self.assertEqual(result.mutated[0].paths, ["spec.replicas"])
+        self.assertEqual(result.mutated[0].generation, [1, 2])
+
+    def test_scales_to_thousands(self):
+        """Test a keyed diff of thousands of objects finds the one change."""
+        before = [
+            _object("ConfigMap", f"cm-{i}", data={"key": str(i)}) for i in range(5000)
+        ]
+        after = copy.deepcopy(before)
+        after[4321]["data"]["key"] = "changed"
+        result = diff_snapshots(_snapshot(before), _snapshot(after))
+        self.assertEqual(
+            [m.key for m in result.mutated], ["ConfigMap/kube-system/cm-4321"]
+        )
+        self.assertEqual(result.unchanged, 4999)
+
+
+class TestCapture(unittest.TestCase):
+    """Test cases for listing kinds and the on-disk format."""
+
+    def test_one_list_per_kind(self):
+        """Test each kind is listed once and namespaces are filtered."""
+        calls = []
+
+        def fetch(kind):
+            calls.append(kind.kind)
+            if kind.kind == "CronJob":
+                raise FluxMCPError("timed out")
+            return [
+                copy.deepcopy(o)
+                for o in _objects() + [_object("Deployment", "grafana", "monitoring")]
+                if o["kind"] == kind.kind
+            ]
+
+        snapshot = capture(fetch, namespaces=["kube-system"])
+        self.assertEqual(sorted(calls), sorted(k.kind for k in SNAPSHOT_KINDS))
+        self.assertEqual(len(snapshot.entries), 5)
+        self.assertEqual(snapshot.errors, ["could not list cronjobs: timed out"])
+
+    def test_save_and_load(self):
+        """Test a snapshot survives a round trip through a gzip file."""
+        snapshot = _snapshot(_objects())
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "snapshot.jsonl.gz")
+            snapshot.save(path)
+            with gzip.open(path, "rt") as f:
+                lines = f.read().splitlines()
+            loaded = Snapshot.load(path)
+        self.assertEqual(json.loads(lines[0])["objects"], 5)
+        self.assertEqual(lines[1:], sorted(lines[1:]))
+        self.assertEqual(loaded.entries, snapshot.entries)
+        self.assertTrue(diff_snapshots(snapshot, loaded).idempotent)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the CNPG backup health collector
+"""
+
+import io
+import unittest
+from contextlib import redirect_stdout
+from datetime import datetime
+
+from cnpg_backup_health import (
+    COLLECTED_KINDS,
+    BackupHealthCollector,
+    evaluate,
+    print_report,
+    render_metrics,
+)
+from flux_mcp_wrapper import FluxMCPError, parse_timestamp
+
+NOW = parse_timestamp("2025-01-02T12:00:00Z")
+
+
+def _cluster(namespace, name, store="backup-store", archiving="True", **spec):
+    plugins = [
+        {
+            "name": "barman-cloud.cloudnative-pg.io",
+            "parameters": {"barmanObjectName": store, "objectStoreName": store},
+        }
+    ]
+    return {
+        "metadata": {"name": name, "namespace": namespace},
+        "spec": {"plugins": plugins, **spec},
+        "status": {
+            "phase": "Cluster in healthy state",
+            "conditions": [{"type": "ContinuousArchiving", "status": archiving}],
+        },
+    }
+
+
+def _meta(namespace, name, **extra):
+    return {"metadata": {"name": name, "namespace": namespace, **extra}}
+
+
+def _scheduled(namespace, cluster, method="plugin"):
+    obj = _meta(namespace, f"{cluster}-daily")
+    obj["spec"] = {"cluster": {"name": cluster}, "method": method}
+    return obj
+
+
+def _backup(namespace, cluster, stopped, phase="completed"):
+    obj = _meta(namespace, f"{cluster}-{stopped}")
+    obj["spec"] = {"cluster": {"name": cluster}}
+    obj["status"] = {"phase": phase, "stoppedAt": stopped}
+    return obj
+
+
+def _plugin_pod(ready="True"):
+    pod = _meta(
+        "cnpg-system",
+        "barman-cloud-0",
+        labels={"app.kubernetes.io/name": "cnpg-barman-plugin"},
+    )
+    pod["status"] = {
+        "phase": "Running",
+        "conditions": [{"type": "Ready", "status": ready}],
+    }
+    return pod
+
+
+def _objects():
+    return {
+        "Cluster": [
+            _cluster("home-automation", "homeassistant-postgresql"),
+            _cluster("postgresql-system", "postgresql-cluster"),
+        ],
+        "ObjectStore": [
+            _meta("home-automation", "backup-store"),
+            _meta("postgresql-system", "backup-store"),
+        ],
+        "ScheduledBackup": [
+            _scheduled("home-automation", "homeassistant-postgresql"),
+            _scheduled("postgresql-system", "postgresql-cluster"),
+        ],
+        "Backup": [
+            _backup(
+                "home-automation", "homeassistant-postgresql", "2025-01-01T02:00:00Z"
+            ),
+            _backup(
+                "home-automation", "homeassistant-postgresql", "2025-01-02T02:00:00Z"
+            ),
+            _backup("postgresql-system", "postgresql-cluster", "2025-01-02T02:00:00Z"),
+        ],
+        "Pod": [_plugin_pod()],
+    }
+
+
+def _rules(health):
+    return {(f.rule, f.severity) for f in health.findings}
+
+
+class TestEvaluate(unittest.TestCase):
+    """Test cases for the in-memory backup checks."""
+
+    def test_healthy_clusters_pass(self):
+        """Test that correctly configured clusters produce no findings."""
+        report = evaluate(_objects(), now=NOW)
+        self.assertTrue(report.passed)
+        self.assertEqual(report.all_findings, [])
+        self.assertEqual(report.plugin_pods_ready, 1)
+        self.assertEqual(
+            report.clusters[0].last_backup, parse_timestamp("2025-01-02T02:00:00Z")
+        )
+
+    def test_misconfigured_cluster(self):
+        """Test missing ObjectStore, failing archiving and legacy config."""
+        objects = _objects()
+        objects["Cluster"][1] = _cluster(
+            "postgresql-system",
+            "postgresql-cluster",
+            store="missing-store",
+            archiving="False",
+            backup={"barmanObjectStore": {"destinationPath": "s3://old"}},
+        )
+        report = evaluate(objects, now=NOW)
+        self.assertFalse(report.passed)
+        self.assertTrue(report.clusters[0].healthy)
+        self.assertEqual(
+            _rules(report.clusters[1]),
+            {("object-store", "fail"), ("archiving", "fail"), ("deprecated", "fail")},
+        )
+
+    def test_backup_schedule_warnings(self):
+        """Test stale backups and non-plugin schedules only warn."""
+        objects = _objects()
+        objects["ScheduledBackup"][0] = _scheduled(
+            "home-automation", "homeassistant-postgresql", method="barmanObjectStore"
+        )
+        objects["ScheduledBackup"].pop()
+        objects["Backup"] = [
+            _backup(
+                "home-automation", "homeassistant-postgresql", "2024-12-30T02:00:00Z"
+            ),
+            _backup(
+                "home-automation",
+                "homeassistant-postgresql",
+                "2025-01-02T02:00:00Z",
+                phase="failed",
+            ),
+        ]
+        report = evaluate(objects, now=NOW)
+        self.assertTrue(report.passed)
+        self.assertEqual(
+            _rules(report.clusters[0]),
+            {("scheduled-backup", "warning"), ("last-backup", "warning")},
+        )
+        self.assertEqual(
+            _rules(report.clusters[1]),
+            {("scheduled-backup", "warning"), ("last-backup", "warning")},
+        )
+
+    def test_missing_cluster_and_plugin_pods(self):
+        """Test expected clusters and ready plugin pods are required."""
+        objects = _objects()
+        objects["Cluster"].pop()
+        objects["Pod"] = [_plugin_pod(ready="False")]
+        report = evaluate(objects, now=NOW)
+        self.assertEqual(
+            sorted((f.rule, f.ref) for f in report.findings),
+            [
+                ("exists", "postgresql-system/postgresql-cluster"),
+                ("plugin-pods", "cnpg-system/cnpg-barman-plugin"),
+            ],
+        )
+
+
+class TestCollector(unittest.TestCase):
+    """Test cases for listing each kind once and reporting."""
+
+    def test_one_list_per_kind(self):
+        """Test that the API call count does not depend on the cluster count."""
+        objects = _objects()
+        objects["Cluster"] += [_cluster("apps", f"db-{i}") for i in range(20)]
+        calls = []
+
+        def fetch(kind):
+            calls.append(kind.kind)
+            if kind.kind == "Backup":
+                raise FluxMCPError("timed out")
+            return objects[kind.kind]
+
+        report = BackupHealthCollector(fetch).run()
+        self.assertEqual(sorted(calls), sorted(k.kind for k in COLLECTED_KINDS))
+        self.assertEqual(report.api_calls, len(COLLECTED_KINDS))
+        self.assertEqual(len(report.clusters), 22)
+        self.assertEqual(
+            [(f.rule, f.severity) for f in report.findings], [("list", "warning")]
+        )
+
+    def test_metrics(self):
+        """Test the Prometheus exposition of a report."""
+        metrics = render_metrics(evaluate(_objects(), now=NOW))
+        labels = 'namespace="home-automation",cluster="homeassistant-postgresql"'
+        self.assertIn(f"cnpg_backup_cluster_healthy{{{labels}}} 1", metrics)
+        self.assertIn(f"cnpg_backup_continuous_archiving{{{labels}}} 1", metrics)
+        self.assertIn(
+            f"cnpg_backup_last_completed_timestamp_seconds{{{labels}}} 1735783200",
+            metrics,
+        )
+        self.assertIn(f'cnpg_backup_findings{{{labels},severity="fail"}} 0', metrics)
+        self.assertIn("cnpg_backup_plugin_pods_ready 1\n", metrics)
+
+    def test_print_report(self):
+        """Test the terminal report shows the last completed backup."""
+        report = evaluate(_objects(), now=NOW)
+        last_backup = report.clusters[0].last_backup
+        self.assertIsNotNone(last_backup)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            print_report(report)
+        stamp = datetime.fromtimestamp(last_backup).isoformat(" ")
+        self.assertIn(f"  Last completed backup: {stamp}", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Flux Kustomization critical-path analyzer
+"""
+
+import unittest
+
+from flux_critical_path import analyze, observe_durations, parse_timestamp, to_dot
+from reconcile_scheduler import graph_from_objects
+
+
+def _ks(name, depends_on=(), created=None, requested=None, ready=None):
+    obj = {
+        "metadata": {"name": name, "namespace": "flux-system"},
+        "spec": {"dependsOn": [{"name": d} for d in depends_on]},
+        "status": {},
+    }
+    if created:
+        obj["metadata"]["creationTimestamp"] = created
+    if requested:
+        obj["status"]["lastHandledReconcileAt"] = requested
+    if ready:
+        obj["status"]["conditions"] = [
+            {"type": "Ready", "status": "True", "lastTransitionTime": ready}
+        ]
+    return obj
+
+
+def _key(name):
+    return f"flux-system/{name}"
+
+
+# sources -> secrets -> (cert-manager, external-dns); ingress depends on
+# cert-manager and, redundantly, on secrets
+GRAPH = graph_from_objects(
+    [
+        _ks("sources"),
+        _ks("secrets", ["sources"]),
+        _ks("cert-manager", ["secrets"]),
+        _ks("external-dns", ["secrets"]),
+        _ks("ingress", ["cert-manager", "secrets"]),
+    ]
+)
+DURATIONS = {
+    _key("sources"): 10,
+    _key("secrets"): 30,
+    _key("cert-manager"): 60,
+    _key("external-dns"): 20,
+    _key("ingress"): 40,
+}
+
+
+class TestParseTimestamp(unittest.TestCase):
+    """Test cases for Kubernetes timestamp parsing."""
+
+    def test_nanosecond_precision(self):
+        """Test that Flux's nanosecond timestamps parse."""
+        self.assertAlmostEqual(
+            parse_timestamp("2025-01-01T00:00:01.123456789Z")
+            - parse_timestamp("2025-01-01T00:00:00Z"),
+            1.123456,
+            places=5,
+        )
+        self.assertIsNone(parse_timestamp("yesterday"))
+        self.assertIsNone(parse_timestamp(None))
+
+
+class TestObserveDurations(unittest.TestCase):
+    """Test cases for deriving durations from live objects."""
+
+    def test_duration_starts_when_dependencies_are_ready(self):
+        """Test that a node's duration starts at its last dependency's Ready."""
+        objects = [
+            _ks(
+                "sources",
+                created="2025-01-01T00:00:00Z",
+                ready="2025-01-01T00:00:10Z",
+            ),
+            _ks(
+                "secrets",
+                ["sources"],
+                created="2025-01-01T00:00:00Z",
+                ready="2025-01-01T00:00:40Z",
+            ),
+            # Requested after it became Ready: ignored
+            _ks(
+                "cert-manager",
+                ["secrets"],
+                created="2025-01-01T00:00:00Z",
+                requested="2025-01-01T01:00:00Z",
+                ready="2025-01-01T00:01:40Z",
+            ),
+            _ks("external-dns", ["secrets"], created="2025-01-01T00:00:00Z"),
+        ]
+        durations = observe_durations(GRAPH, objects)
+        self.assertEqual(durations[_key("sources")], 10)
+        self.assertEqual(durations[_key("secrets")], 30)
+        self.assertEqual(durations[_key("cert-manager")], 60)
+        self.assertNotIn(_key("external-dns"), durations)
+
+
+class TestAnalyze(unittest.TestCase):
+    """Test cases for the critical-path method and findings."""
+
+    def setUp(self):
+        self.report = analyze(GRAPH, DURATIONS)
+
+    def test_critical_path_and_slack(self):
+        """Test the critical path, its length and the slack off the path."""
+        self.assertEqual(
+            self.report.critical_path,
+            [_key("sources"), _key("secrets"), _key("cert-manager"), _key("ingress")],
+        )
+        self.assertEqual(self.report.length, 140)
+        # external-dns finishes at 60 but nothing waits for it
+        self.assertEqual(self.report.timings[_key("external-dns")].slack, 80)
+        self.assertTrue(self.report.timings[_key("cert-manager")].critical)
+
+    def test_redundant_and_critical_dependencies(self):
+        """Test that implied and costly dependencies are pointed out."""
+        redundant = [(f.key, f.dependency, f.via) for f in self.report.redundant]
+        self.assertEqual(
+            redundant, [(_key("ingress"), _key("secrets"), [_key("cert-manager")])]
+        )
+
+        costly = {(f.key, f.dependency): f.saving for f in self.report.costly}
+        # Without ingress -> cert-manager, ingress only waits for secrets and
+        # the graph ends with cert-manager at 100s instead of ingress at 140s
+        self.assertEqual(costly[(_key("ingress"), _key("cert-manager"))], 40)
+        self.assertEqual(costly[(_key("secrets"), _key("sources"))], 10)
+
+    def test_dot_export(self):
+        """Test that the DOT graph marks critical and redundant edges."""
+        dot = to_dot(GRAPH, self.report)
+        self.assertTrue(dot.startswith("digraph kustomizations {"))
+        self.assertIn('"cert-manager" -> "ingress" [color=red, penwidth=2];', dot)
+        self.assertIn('"secrets" -> "ingress" [style=dashed, color=gray];', dot)
+        self.assertIn('"secrets" -> "external-dns";', dot)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the async Flux MCP client
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+from flux_mcp_async import AsyncFluxMCPClient
+from flux_mcp_wrapper import tool_text
+
+# A stdio MCP server that answers each tool call after the `delay` in its
+# arguments, so responses come back out of order. The `cancelled` tool
+# returns the request ids the client withdrew, `stderr` writes a line of
+# `size` bytes to stderr before answering, and `exit` stops the server.
+FAKE_SERVER = """#!{python}
+import json, sys, threading, time
+lock = threading.Lock()
+cancelled = []
+
+def reply(request_id, result, delay=0):
+    time.sleep(delay)
+    with lock:
+        print(json.dumps({{"jsonrpc": "2.0", "id": request_id, "result": result}}))
+        sys.stdout.flush()
+
+for line in sys.stdin:
+    message = json.loads(line)
+    method = message["method"]
+    if method == "notifications/cancelled":
+        cancelled.append(message["params"]["requestId"])
+    elif method == "initialize":
+        reply(message["id"], {{"protocolVersion": "0.1.0"}})
+    elif method == "tools/call":
+        name = message["params"]["name"]
+        arguments = message["params"]["arguments"]
+        if name == "exit":
+            sys.exit(0)
+        if name == "stderr":
+            sys.stderr.write("x" * arguments["size"] + "\\n")
+            sys.stderr.flush()
+        text = json.dumps(cancelled if name == "cancelled" else arguments)
+        result = {{"content": [{{"type": "text", "text": text}}]}}
+        threading.Thread(
+            target=reply,
+            args=(message["id"], result, arguments.get("delay", 0)),
+            daemon=True,
+        ).start()
+"""
+
+
+class TestAsyncFluxMCPClient(unittest.IsolatedAsyncioTestCase):
+    """Test cases for multiplexed calls over one MCP session."""
+
+    async def asyncSetUp(self):
+        self.directory = tempfile.mkdtemp()
+        path = os.path.join(self.directory, "fake-mcp")
+        with open(path, "w") as f:
+            f.write(FAKE_SERVER.format(python=sys.executable))
+        os.chmod(path, 0o755)
+        self.client = AsyncFluxMCPClient(mcp_path=path, timeout=5)
+        await self.client.start()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        shutil.rmtree(self.directory)
+
+    async def _echo(self, delay, timeout=None, **arguments):
+        kwargs = {} if timeout is None else {"timeout": timeout}
+        response = await self.client.call_tool(
+            "echo", dict(arguments, delay=delay), **kwargs
+        )
+        return response
+
+    async def test_concurrent_calls_out_of_order(self):
+        """Test that each caller gets its own response whatever the order."""
+        delays = [0.3 - i * 0.01 for i in range(25)]
+        started = time.monotonic()
+        responses = await asyncio.gather(
+            *(self._echo(delay, index=i) for i, delay in enumerate(delays))
+        )
+        elapsed = time.monotonic() - started
+
+        for index, response in enumerate(responses):
+            self.assertEqual(json.loads(tool_text(response))["index"], index)
+        # Concurrent, so about the longest delay rather than their sum (4.5s)
+        self.assertLess(elapsed, 2)
+
+    async def test_timeout_withdraws_the_call(self):
+        """Test that a timed-out call fails alone and the server is told."""
+        slow = asyncio.create_task(self._echo(2, timeout=0.1))
+        fast = await self._echo(0)
+        self.assertEqual(json.loads(tool_text(fast))["delay"], 0)
+
+        response = await slow
+        self.assertIn("timed out after 0.1s", response["error"])
+        cancelled = json.loads(tool_text(await self.client.call_tool("cancelled")))
+        self.assertEqual(len(cancelled), 1)
+        self.assertEqual(self.client._pending, {})
+
+    async def test_cancellation(self):
+        """Test that cancelling a task withdraws its request."""
+        task = asyncio.create_task(self._echo(2))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        cancelled = json.loads(tool_text(await self.client.call_tool("cancelled")))
+        self.assertEqual(len(cancelled), 1)
+
+    async def test_server_exit_fails_pending_calls(self):
+        """Test that calls in flight fail when the server goes away."""
+        slow = asyncio.create_task(self._echo(2))
+        await asyncio.sleep(0.1)
+        await self.client.call_tool("exit", timeout=0.5)
+        response = await slow
+        self.assertEqual(response["error"], "MCP server exited")
+        later = await self._echo(0)
+        self.assertIn("error", later)
+
+    async def test_long_stderr_line(self):
+        """Test that a stderr line over the stream limit does not stall calls."""
+        response = await self.client.call_tool("stderr", {"size": 256 * 1024})
+        self.assertNotIn("error", response)
+
+        slow = asyncio.create_task(self._echo(2))
+        await asyncio.sleep(0.1)
+        await self.client.call_tool("exit", timeout=0.5)
+        self.assertTrue((await slow)["stderr"].endswith("x\n"))
+
+    async def test_list_resources_parses_objects(self):
+        """Test the list helper on top of the async transport."""
+        items = await self.client.list_resources("v1", "Pod", "default")
+        self.assertEqual(
+            items, [{"apiVersion": "v1", "kind": "Pod", "namespace": "default"}]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Flux MCP wrapper: transport, result cache, projection and filters
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest.mock import patch
+
+from flux_mcp_wrapper import (
+    FluxMCPClient,
+    FrameDecoder,
+    FrameTooLarge,
+    ResultCache,
+    format_table,
+    main,
+    parse_resources,
+    project,
+)
+
+# Stands in for `flux-operator-mcp serve`: answers every request, with a
+# notification, a log line and a large frame first, then stays alive
+FAKE_SERVER = """#!{python}
+import json, sys, time
+for line in sys.stdin:
+    request = json.loads(line)
+    print("starting server", flush=True)
+    print(json.dumps({{"jsonrpc": "2.0", "method": "notifications/progress"}}))
+    print(json.dumps({{"jsonrpc": "2.0", "id": -1, "result": "x" * {padding}}}))
+    result = {{"ok": True}}
+    print(json.dumps({{"jsonrpc": "2.0", "id": request["id"], "result": result}}))
+    sys.stdout.flush()
+time.sleep(30)
+"""
+
+# Records each request's method as "<pid> <method>" before answering it
+RECORDING_SERVER = """#!{python}
+import json, os, sys
+for line in sys.stdin:
+    request = json.loads(line)
+    with open({log!r}, "a") as f:
+        f.write(f"{{os.getpid()}} {{request['method']}}\\n")
+    result = {{"ok": True}}
+    print(json.dumps({{"jsonrpc": "2.0", "id": request["id"], "result": result}}))
+    sys.stdout.flush()
+"""
+
+HELMRELEASES_YAML = """
+apiVersion: helm.toolkit.fluxcd.io/v2
+kind: HelmRelease
+metadata:
+  name: authentik
+  namespace: authentik
+  labels: {app: authentik}
+  managedFields: [{manager: helm-controller, fieldsV1: {big: true}}]
+spec:
+  values: {replicas: 2}
+status:
+  conditions:
+  - {type: Ready, status: "True", reason: InstallSucceeded, message: ok}
+---
+apiVersion: helm.toolkit.fluxcd.io/v2
+kind: HelmRelease
+metadata:
+  name: longhorn
+  namespace: longhorn-system
+  labels: {app: longhorn}
+status:
+  conditions:
+  - type: Ready
+    status: "False"
+    reason: UpgradeFailed
+    message: "timed out\\nwaiting"
+"""
+
+
+def _text(text):
+    return {"result": {"content": [{"type": "text", "text": text}]}}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingClient(FluxMCPClient):
+    """FluxMCPClient that answers locally and counts server round trips."""
+
+    def __init__(self, cache):
+        super().__init__(cache=cache)
+        self.calls = []
+        self.arguments = []
+
+    def _call_method(self, method, params=None):
+        self.calls.append(params["name"])
+        self.arguments.append(params["arguments"])
+        if params["arguments"].get("kind") == "Broken":
+            return {"error": "No valid response", "stderr": "boom"}
+        return {"result": {"content": [{"type": "text", "text": str(len(self.calls))}]}}
+
+
+class TestResultCache(unittest.TestCase):
+    """Test cases for the TTL/LRU cache of read-only tool results."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ResultCache(ttl=10, max_entries=3, clock=self.clock)
+        self.client = CountingClient(self.cache)
+
+    def test_identical_calls_hit_until_ttl(self):
+        """Test that repeated reads are served from the cache within the TTL."""
+        first = self.client.get_flux_instance()
+        self.assertEqual(self.client.get_flux_instance(), first)
+        self.client.get_kubernetes_resources("v1", "Pod", "default")
+        self.client.get_kubernetes_resources("v1", "Pod", "default")
+        self.assertEqual(len(self.client.calls), 2)
+        self.assertEqual(self.cache.hits, 2)
+
+        self.clock.now += 10
+        self.client.get_flux_instance()
+        self.assertEqual(len(self.client.calls), 3)
+
+    def test_lru_bound_and_errors_not_cached(self):
+        """Test that the least recently used entry is evicted and errors skipped."""
+        for kind in ("A", "B", "C"):
+            self.client.get_kubernetes_resources("v1", kind, "default")
+        self.client.get_kubernetes_resources("v1", "A", "default")  # A is fresh
+        self.client.get_kubernetes_resources("v1", "D", "default")  # evicts B
+        self.client.get_kubernetes_resources("v1", "Broken", "default")
+        self.client.get_kubernetes_resources("v1", "Broken", "default")
+        calls = len(self.client.calls)
+
+        self.client.get_kubernetes_resources("v1", "A", "default")
+        self.assertEqual(len(self.client.calls), calls)
+        self.client.get_kubernetes_resources("v1", "B", "default")
+        self.assertEqual(len(self.client.calls), calls + 1)
+        self.assertEqual(self.client.calls.count("get_kubernetes_resources"), 7)
+
+    def test_reconcile_invalidates_namespace_and_kind(self):
+        """Test that a reconcile drops results for its namespace and kinds."""
+        ks_api = "kustomize.toolkit.fluxcd.io/v1"
+        self.client.get_flux_instance()
+        self.client.get_kubernetes_resources(ks_api, "Kustomization", "apps")
+        self.client.get_kubernetes_resources("v1", "ConfigMap", "flux-system")
+        self.client.get_kubernetes_resources("v1", "ConfigMap", "authentik")
+        self.client.get_kubernetes_resources("helm.toolkit.fluxcd.io/v2", "HelmRelease")
+
+        self.client.reconcile_flux_kustomization("infrastructure-sources")
+        before = len(self.client.calls)
+        # Untouched namespace and kind: still cached
+        self.client.get_kubernetes_resources("v1", "ConfigMap", "authentik")
+        self.assertEqual(len(self.client.calls), before)
+
+        self.client.get_flux_instance()
+        self.client.get_kubernetes_resources(ks_api, "Kustomization", "apps")
+        self.client.get_kubernetes_resources("v1", "ConfigMap", "flux-system")
+        self.client.get_kubernetes_resources("helm.toolkit.fluxcd.io/v2", "HelmRelease")
+        self.assertEqual(len(self.client.calls), before + 4)
+
+
+class TestProjectionAndFilters(unittest.TestCase):
+    """Test cases for field projection and filtering of resource lists."""
+
+    def test_projection_keeps_only_requested_paths(self):
+        """Test that projection drops everything but the listed field paths."""
+        items = parse_resources(
+            _text(HELMRELEASES_YAML),
+            fields=["metadata.name", "status.conditions.status"],
+        )
+        self.assertEqual(
+            items[0],
+            {
+                "metadata": {"name": "authentik"},
+                "status": {"conditions": [{"status": "True"}]},
+            },
+        )
+        self.assertEqual(project({"a": 1}, ["b.c"]), {})
+
+    def test_condition_and_selector_filters(self):
+        """Test that condition and label filters are applied while parsing."""
+        failing = parse_resources(_text(HELMRELEASES_YAML), condition="Ready=False")
+        self.assertEqual([o["metadata"]["name"] for o in failing], ["longhorn"])
+        ready = parse_resources(_text(HELMRELEASES_YAML), condition="Ready")
+        self.assertEqual([o["metadata"]["name"] for o in ready], ["authentik"])
+        selected = parse_resources(_text(HELMRELEASES_YAML), selector="app!=authentik")
+        self.assertEqual([o["metadata"]["name"] for o in selected], ["longhorn"])
+
+    def test_json_items_are_filtered_as_decoded(self):
+        """Test that JSON lists and List objects are filtered item by item."""
+        objects = parse_resources(_text(HELMRELEASES_YAML))
+        for document in (objects, {"kind": "List", "items": objects, "metadata": {}}):
+            items = parse_resources(
+                _text(json.dumps(document, indent=1)),
+                fields=["metadata.name"],
+                condition="Ready=False",
+            )
+            self.assertEqual(items, [{"metadata": {"name": "longhorn"}}])
+
+    def test_selector_is_sent_to_the_server(self):
+        """Test that list_resources passes the label selector in the request."""
+        client = CountingClient(None)
+        client.list_resources("v1", "Pod", "default", selector="app=authentik")
+        self.assertEqual(client.arguments[-1]["selector"], "app=authentik")
+
+    def test_table_output(self):
+        """Test the compact table of namespace, name and Ready condition."""
+        table = format_table(parse_resources(_text(HELMRELEASES_YAML)))
+        lines = table.splitlines()
+        self.assertEqual(
+            lines[0].split(), ["NAMESPACE", "NAME", "READY", "REASON", "MESSAGE"]
+        )
+        self.assertEqual(
+            lines[2].split(),
+            [
+                "longhorn-system",
+                "longhorn",
+                "False",
+                "UpgradeFailed",
+                "timed",
+                "out",
+                "waiting",
+            ],
+        )
+
+
+class TestFrameDecoder(unittest.TestCase):
+    """Test cases for the incremental JSON-RPC frame decoder."""
+
+    def test_frames_split_across_chunks(self):
+        """Test that frames are decoded as soon as their newline arrives."""
+        decoder = FrameDecoder()
+        self.assertEqual(decoder.feed(b'{"id": 1, "res'), [])
+        self.assertEqual(
+            decoder.feed(b'ult": 2}\nnot json\n{"id"'), [{"id": 1, "result": 2}]
+        )
+        self.assertEqual(decoder.feed(b": 2}\n\n"), [{"id": 2}])
+
+    def test_max_frame_size(self):
+        """Test that an oversized frame is rejected before it completes."""
+        decoder = FrameDecoder(max_frame_size=16)
+        decoder.feed(b'{"id": 1}\n{"id": 2, ')
+        with self.assertRaises(FrameTooLarge):
+            decoder.feed(b'"result": "too long"')
+
+
+class TestStreamingTransport(unittest.TestCase):
+    """Test cases for reading responses from a server process as they arrive."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.client = FluxMCPClient()
+        self.client.mcp_path = os.path.join(self.directory, "fake-mcp")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _server(self, padding):
+        with open(self.client.mcp_path, "w") as f:
+            f.write(FAKE_SERVER.format(python=sys.executable, padding=padding))
+        os.chmod(self.client.mcp_path, 0o755)
+
+    def test_every_server_process_is_initialized(self):
+        """Test that each call's server process receives initialize first."""
+        log = os.path.join(self.directory, "methods.log")
+        with open(self.client.mcp_path, "w") as f:
+            f.write(RECORDING_SERVER.format(python=sys.executable, log=log))
+        os.chmod(self.client.mcp_path, 0o755)
+        for _ in range(3):
+            self.assertEqual(self.client.get_flux_instance()["result"], {"ok": True})
+        methods = {}
+        with open(log) as f:
+            for line in f:
+                pid, method = line.split()
+                methods.setdefault(pid, []).append(method)
+        self.assertEqual(list(methods.values()), [["initialize", "tools/call"]] * 3)
+
+    def test_response_returned_before_server_exits(self):
+        """Test that the matching frame is returned without waiting for exit."""
+        self._server(padding=1024 * 1024)
+        started = time.monotonic()
+        response = self.client.get_flux_instance()
+        self.assertEqual(response["result"], {"ok": True})
+        self.assertLess(time.monotonic() - started, 10)
+
+    def test_oversized_frame_is_an_error(self):
+        """Test that a frame above max_frame_size fails the call."""
+        self._server(padding=4096)
+        self.client.max_frame_size = 1024
+        response = self.client.get_flux_instance()
+        self.assertIn("exceeds 1024 bytes", response["error"])
+
+
+class TestSharedResultCache(unittest.TestCase):
+    """Test cases for sharing the cache between invocations on disk."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "cache", "results.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_entries_and_invalidations_are_shared(self):
+        """Test that a second process sees results and invalidations on disk."""
+        first = CountingClient(ResultCache(path=self.path))
+        first.get_kubernetes_resources("v1", "Pod", "default")
+
+        second = CountingClient(ResultCache(path=self.path))
+        second.get_kubernetes_resources("v1", "Pod", "default")
+        self.assertEqual(second.calls, [])
+
+        second.reconcile_flux_helmrelease("podinfo", "default")
+        first.get_kubernetes_resources("v1", "Pod", "default")
+        self.assertEqual(first.calls, ["get_kubernetes_resources"] * 2)
+
+    def test_file_is_opt_in_and_private(self):
+        """Test the cache file is only used when named, and is owner-only."""
+        with patch.dict(os.environ, {"FLUX_MCP_CACHE_TTL": "10"}):
+            os.environ.pop("FLUX_MCP_CACHE_FILE", None)
+            self.assertIsNone(ResultCache.from_env().path)
+        with patch.dict(os.environ, {"FLUX_MCP_CACHE_FILE": self.path}):
+            cache = ResultCache.from_env()
+        CountingClient(cache).get_kubernetes_resources("v1", "Pod", "default")
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o600)
+
+
+class TestCLI(unittest.TestCase):
+    """Test cases for the wrapper's command line."""
+
+    def test_help_never_starts_the_server(self):
+        """Test --help on each command prints help instead of calling a tool."""
+        commands = ["flux-status", "kustomizations", "reconcile-ks", "reconcile-hr"]
+        with patch("flux_mcp_wrapper.FluxMCPClient") as client:
+            for command in commands:
+                with redirect_stdout(StringIO()) as output:
+                    with self.assertRaises(SystemExit) as raised:
+                        main([command, "--help"])
+                self.assertEqual(raised.exception.code, 0)
+                self.assertIn(f"flux_mcp_wrapper.py {command}", output.getvalue())
+        client.assert_not_called()
+
+    def test_reconcile_arguments(self):
+        """Test reconcile-ks defaults its namespace to flux-system."""
+        with patch("flux_mcp_wrapper.FluxMCPClient") as client:
+            client.return_value.reconcile_flux_kustomization.return_value = {}
+            with redirect_stdout(StringIO()):
+                self.assertEqual(main(["reconcile-ks", "apps"]), 0)
+        client.return_value.reconcile_flux_kustomization.assert_called_once_with(
+            "apps", "flux-system"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Flux Timeout Audit
+"""
+
+import threading
+import time
+import unittest
+
+from flux_mcp_wrapper import FluxMCPError
+from flux_timeout_audit import (
+    AUDITED_KINDS,
+    FAIL,
+    WARNING,
+    FluxTimeoutAudit,
+    audit_objects,
+    parse_duration,
+)
+
+
+def _hr(name, timeout="15m", **spec):
+    base = {
+        "timeout": timeout,
+        "interval": "30m",
+        "install": {"timeout": timeout, "remediation": {"retries": 3}},
+        "upgrade": {"timeout": timeout, "remediation": {"retries": 3}},
+        "rollback": {"timeout": timeout},
+    }
+    base.update(spec)
+    return {
+        "kind": "HelmRelease",
+        "metadata": {"name": name, "namespace": name},
+        "spec": base,
+    }
+
+
+def _ks(name, **spec):
+    base = {
+        "interval": "10m0s",
+        "retryInterval": "2m0s",
+        "timeout": "10m",
+        "wait": True,
+    }
+    base.update(spec)
+    return {
+        "kind": "Kustomization",
+        "metadata": {"name": name, "namespace": "flux-system"},
+        "spec": base,
+    }
+
+
+def _deployment(name, ready=1):
+    return {
+        "metadata": {"name": name, "namespace": "flux-system"},
+        "spec": {"replicas": 1},
+        "status": {"readyReplicas": ready},
+    }
+
+
+def _rules(report):
+    return sorted((f.rule, f.name) for f in report.findings)
+
+
+class TestParseDuration(unittest.TestCase):
+    """Test cases for Flux duration parsing."""
+
+    def test_durations(self):
+        """Test compound and single-unit durations convert to seconds."""
+        self.assertEqual(parse_duration("15m"), 900)
+        self.assertEqual(parse_duration("5m0s"), 300)
+        self.assertEqual(parse_duration("1h30m"), 5400)
+        self.assertEqual(parse_duration("60s"), 60)
+        self.assertIsNone(parse_duration("soon"))
+        self.assertIsNone(parse_duration("15"))
+
+
+class TestAuditObjects(unittest.TestCase):
+    """Test cases for evaluating the rules table."""
+
+    def test_helmrelease_rules(self):
+        """Test missing timeouts fail and short critical timeouts warn."""
+        incomplete = _hr("grafana")
+        del incomplete["spec"]["install"]["timeout"]
+        del incomplete["spec"]["rollback"]
+
+        report = audit_objects(
+            {
+                "HelmRelease": [
+                    _hr("longhorn", timeout="10m"),
+                    _hr("cert-manager", timeout="10m"),
+                    incomplete,
+                ]
+            },
+            required=[],
+        )
+
+        self.assertEqual(
+            _rules(report),
+            [
+                ("hr-critical-timeout", "longhorn"),
+                ("hr-install-timeout", "grafana"),
+                ("hr-rollback-timeout", "grafana"),
+            ],
+        )
+        self.assertEqual([f.rule for f in report.failures], ["hr-install-timeout"])
+
+    def test_kustomization_interval_rules(self):
+        """Test wait and retryInterval versus interval are checked."""
+        report = audit_objects(
+            {
+                "Kustomization": [
+                    _ks("apps"),
+                    _ks("infra", wait=False, retryInterval="15m"),
+                ]
+            },
+            required=[],
+        )
+
+        self.assertEqual(
+            _rules(report),
+            [("ks-retry-below-interval", "infra"), ("ks-wait", "infra")],
+        )
+        self.assertTrue(report.passed)
+
+    def test_controllers_required_and_ready(self):
+        """Test a missing or unready Flux controller fails the audit."""
+        report = audit_objects(
+            {
+                "Deployment": [
+                    _deployment("source-controller"),
+                    _deployment("kustomize-controller", ready=0),
+                    _deployment("notification-controller"),
+                ]
+            }
+        )
+
+        self.assertEqual(
+            _rules(report),
+            [
+                ("controller-ready", "kustomize-controller"),
+                ("exists", "helm-controller"),
+            ],
+        )
+        self.assertFalse(report.passed)
+
+
+class TestFluxTimeoutAudit(unittest.TestCase):
+    """Test cases for listing each kind once."""
+
+    def test_each_kind_listed_once_concurrently(self):
+        """Test every kind is fetched exactly once and in parallel."""
+        calls = []
+        lock = threading.Lock()
+
+        def fetch(kind):
+            with lock:
+                calls.append(kind.kind)
+            time.sleep(0.2)
+            if kind.kind == "ServiceMonitor":
+                raise FluxMCPError("no matches for kind ServiceMonitor")
+            return []
+
+        report = FluxTimeoutAudit(fetch).run()
+
+        self.assertEqual(sorted(calls), sorted(k.kind for k in AUDITED_KINDS))
+        self.assertLess(report.wall_seconds, 0.2 * len(AUDITED_KINDS) / 2)
+        listing = [f for f in report.findings if f.rule == "list"]
+        self.assertEqual(
+            [(f.kind, f.severity) for f in listing], [("ServiceMonitor", WARNING)]
+        )
+        self.assertIn(FAIL, {f.severity for f in report.findings})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the GitOps Operations CLI
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+import gitops_cli
+
+CLI_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gitops_cli.py")
+
+HEAVY_MODULES = {"requests", "urllib.request", "http.client", "ssl", "json"}
+
+# The --help imports may cost at most this fraction of `import urllib.request`,
+# both measured beyond interpreter startup on the same machine. Comparing the
+# two, best of a few runs each, keeps the budget independent of runner speed;
+# the CLI measures well under a quarter of it.
+IMPORT_BUDGET_RATIO = 0.5
+IMPORT_RUNS = 3
+
+
+def _import_profile(argv):
+    """Return {module: cumulative_us} for the top-level imports of a run."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime"] + argv,
+        capture_output=True,
+        text=True,
+        env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"),
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        # Only top-level imports; nested ones are included in cumulative
+        if not name.startswith("  "):
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def _imported_modules(*args):
+    """Return the top-level modules the CLI imports beyond interpreter startup."""
+    return set(_import_profile([CLI_PATH] + list(args))) - set(
+        _import_profile(["-c", "pass"])
+    )
+
+
+def _import_cost_us(argv):
+    """Best-of-N microseconds spent importing modules beyond interpreter startup."""
+    startup = set(_import_profile(["-c", "pass"]))
+    costs = []
+    for _ in range(IMPORT_RUNS):
+        profile = _import_profile(argv)
+        costs.append(sum(us for name, us in profile.items() if name not in startup))
+    return min(costs)
+
+
+class TestImportBudget(unittest.TestCase):
+    """Test the CLI's startup imports stay light."""
+
+    def test_help_skips_heavy_modules(self):
+        """Test --help loads no subcommand scripts or network libraries."""
+        modules = _imported_modules("--help")
+
+        self.assertFalse(HEAVY_MODULES & modules)
+
+    def test_help_within_import_budget(self):
+        """Test --help imports cost a fraction of importing urllib.request."""
+        cli = _import_cost_us([CLI_PATH, "--help"])
+        urllib_cost = _import_cost_us(["-c", "import urllib.request"])
+
+        self.assertLess(cli, urllib_cost * IMPORT_BUDGET_RATIO)
+
+    def test_tokens_list_skips_requests(self):
+        """Test the token manager loads without importing requests."""
+        modules = _imported_modules("tokens", "list", "--help")
+
+        # The script itself is exec'd by path, so check one of its imports
+        self.assertIn("subprocess", modules)
+        self.assertNotIn("requests", modules)
+        self.assertNotIn("urllib.request", modules)
+
+
+class TestDispatch(unittest.TestCase):
+    """Test cases for subcommand dispatch."""
+
+    def setUp(self):
+        self.argv = sys.argv
+
+    def tearDown(self):
+        sys.argv = self.argv
+
+    def test_scripts_exist(self):
+        """Test every registered subcommand points at an existing script."""
+        for commands in gitops_cli.COMMANDS.values():
+            for command in commands.values():
+                path = os.path.join(gitops_cli.SCRIPTS_DIR, command.script)
+                self.assertTrue(os.path.exists(path), path)
+
+    def test_arguments_passed_through(self):
+        """Test the prefix and remaining arguments reach the script's argv."""
+        module = MagicMock()
+        module.main.side_effect = lambda: sys.argv[1:]
+
+        with patch.object(gitops_cli, "load_script", return_value=module):
+            gitops_cli.main(["tokens", "rotate", "--overlap-days", "7", "--dry-run"])
+
+        self.assertEqual(sys.argv[1:], ["rotate", "--overlap-days", "7", "--dry-run"])
+
+    def test_exit_code_propagates(self):
+        """Test integer return values from main() become the exit code."""
+        module = MagicMock()
+        module.main.return_value = 1
+
+        with patch.object(gitops_cli, "load_script", return_value=module):
+            self.assertEqual(gitops_cli.main(["flux", "reconcile-ks", "apps"]), 1)
+
+        self.assertEqual(sys.argv[1:], ["reconcile-ks", "apps"])
+
+    def test_load_hyphenated_script(self):
+        """Test scripts with hyphenated file names load under a valid module name."""
+        module = gitops_cli.load_script(
+            "authentik-proxy-config/fix-outpost-conflicts.py"
+        )
+
+        self.assertEqual(module.__name__, "fix_outpost_conflicts")
+        self.assertTrue(callable(module.main))
+
+
+if __name__ == "__main__":
+    unittest.main()
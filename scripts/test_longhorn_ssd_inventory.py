@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Longhorn Samsung Portable SSD T5 inventory
+"""
+
+import unittest
+
+from flux_mcp_wrapper import FluxMCPError
+from longhorn_ssd_inventory import (
+    COLLECTED_KINDS,
+    InventoryCollector,
+    evaluate,
+    format_table,
+)
+
+GIB = 1024**3
+
+
+def _disk_status(ready="True", schedulable="True", maximum=500, available=400):
+    return {
+        "conditions": [
+            {"type": "Ready", "status": ready},
+            {"type": "Schedulable", "status": schedulable},
+        ],
+        "storageMaximum": maximum * GIB,
+        "storageAvailable": available * GIB,
+        "storageScheduled": 50 * GIB,
+    }
+
+
+def _node(name, ssd_tags=("ssd",), **ssd_status):
+    return {
+        "metadata": {"name": name, "namespace": "longhorn-system"},
+        "spec": {
+            "allowScheduling": True,
+            "disks": {
+                "default-disk": {"path": "/var/lib/longhorn", "tags": []},
+                "ssd-disk": {
+                    "path": "/var/lib/longhorn-ssd",
+                    "tags": list(ssd_tags),
+                    "allowScheduling": True,
+                    "storageReserved": 10 * GIB,
+                },
+            },
+        },
+        "status": {
+            "conditions": [{"type": "Ready", "status": "True"}],
+            "diskStatus": {
+                "default-disk": _disk_status(),
+                "ssd-disk": _disk_status(**ssd_status),
+            },
+        },
+    }
+
+
+def _named(name, **fields):
+    return {"metadata": {"name": name}, **fields}
+
+
+def _objects():
+    return {
+        "Node": [_node("mini01"), _node("mini02"), _node("mini03")],
+        "Setting": [
+            _named("create-default-disk-labeled-nodes", value="false"),
+            _named("storage-over-provisioning-percentage", value="150"),
+            _named("storage-minimal-available-percentage", value="15"),
+        ],
+        "InstanceManager": [_named("im-1", status={"currentState": "running"})],
+        "Deployment": [
+            _named(
+                "longhorn-driver-deployer",
+                spec={"replicas": 1},
+                status={"readyReplicas": 1},
+            )
+        ],
+        "DaemonSet": [
+            _named(
+                name,
+                status={"numberReady": 3, "desiredNumberScheduled": 3},
+            )
+            for name in ("longhorn-manager", "longhorn-csi-plugin")
+        ],
+        "StorageClass": [
+            _named(
+                "longhorn-ssd",
+                parameters={"diskSelector": "ssd", "numberOfReplicas": "2"},
+            )
+        ],
+    }
+
+
+def _findings(report):
+    return sorted((f.rule, f.severity, f.ref) for f in report.findings)
+
+
+class TestEvaluate(unittest.TestCase):
+    """Test cases for joining nodes, disks, settings and workloads."""
+
+    def test_healthy_inventory(self):
+        """Test that a correct three node setup has no findings."""
+        report = evaluate(_objects())
+        self.assertTrue(report.passed)
+        self.assertEqual(report.findings, [])
+        self.assertEqual(len(report.disks), 6)
+        self.assertEqual(len(report.ssd_disks), 3)
+        self.assertTrue(all(d.usable for d in report.ssd_disks))
+
+    def test_disk_tags_and_schedulability(self):
+        """Test untagged, mistagged and unschedulable disks."""
+        objects = _objects()
+        objects["Node"][0] = _node("mini01", ssd_tags=())
+        objects["Node"][1] = _node("mini02", schedulable="False")
+        objects["Node"][2]["spec"]["disks"]["default-disk"]["tags"] = ["ssd"]
+        report = evaluate(objects)
+        self.assertFalse(report.passed)
+        self.assertEqual(
+            _findings(report),
+            [
+                ("ssd", "fail", "longhorn-ssd"),
+                ("ssd-ready", "warning", "mini02/ssd-disk"),
+                ("ssd-tag", "fail", "mini01/ssd-disk"),
+                ("ssd-tag", "fail", "mini03/default-disk"),
+            ],
+        )
+
+    def test_capacity_and_settings(self):
+        """Test capacity is checked against the Longhorn settings."""
+        objects = _objects()
+        objects["Node"][0] = _node("mini01", maximum=50, available=5)
+        objects["Setting"][1] = _named(
+            "storage-over-provisioning-percentage", value="200"
+        )
+        report = evaluate(objects)
+        self.assertTrue(report.passed)
+        self.assertEqual(
+            _findings(report),
+            [
+                ("capacity", "warning", "mini01/ssd-disk"),
+                ("capacity", "warning", "mini01/ssd-disk"),
+                ("setting", "warning", "storage-over-provisioning-percentage"),
+            ],
+        )
+
+    def test_workloads(self):
+        """Test required Longhorn workloads must be fully ready."""
+        objects = _objects()
+        objects["DaemonSet"][0]["status"]["numberReady"] = 2
+        objects["Deployment"] = []
+        objects["InstanceManager"][0]["status"]["currentState"] = "error"
+        report = evaluate(objects)
+        self.assertEqual(
+            _findings(report),
+            [
+                ("instance-manager", "warning", "longhorn-system/im-1"),
+                ("workload", "fail", "longhorn-system/longhorn-driver-deployer"),
+                ("workload", "fail", "longhorn-system/longhorn-manager"),
+            ],
+        )
+
+
+class TestCollector(unittest.TestCase):
+    """Test cases for listing each kind once and the capacity table."""
+
+    def test_one_list_per_kind(self):
+        """Test that the API call count does not grow with nodes and disks."""
+        objects = _objects()
+        objects["Node"] += [_node(f"worker{i}") for i in range(30)]
+        calls = []
+
+        def fetch(kind):
+            calls.append(kind.kind)
+            if kind.kind == "InstanceManager":
+                raise FluxMCPError("timed out")
+            return objects[kind.kind]
+
+        report = InventoryCollector(fetch).run()
+        self.assertEqual(sorted(calls), sorted(k.kind for k in COLLECTED_KINDS))
+        self.assertEqual(report.api_calls, len(COLLECTED_KINDS))
+        self.assertEqual(len(report.ssd_disks), 33)
+        self.assertEqual(_findings(report), [("list", "warning", "longhorn-system/")])
+
+    def test_table(self):
+        """Test the capacity table rows and SSD totals."""
+        lines = format_table(evaluate(_objects()).disks).splitlines()
+        self.assertEqual(lines[0].split()[:3], ["NODE", "DISK", "PATH"])
+        self.assertEqual(
+            lines[2].split(),
+            [
+                "mini01",
+                "ssd-disk",
+                "/var/lib/longhorn-ssd",
+                "ssd",
+                "True",
+                "True",
+                "500.0GiB",
+                "400.0GiB",
+                "50.0GiB",
+                "10.0GiB",
+            ],
+        )
+        self.assertEqual(
+            lines[-1].split(),
+            ["TOTAL", "3/3", "ssd", "/var/lib/longhorn-ssd", "1.5TiB", "1.2TiB"]
+            + ["150.0GiB", "30.0GiB"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Repository Manifest Index
+"""
+
+import os
+import tempfile
+import unittest
+
+from manifest_index import ManifestIndex, load_index
+
+FLUX_KUSTOMIZATIONS = """\
+apiVersion: kustomize.toolkit.fluxcd.io/v1
+kind: Kustomization
+metadata:
+  name: infrastructure-authentik-proxy
+  namespace: flux-system
+spec:
+  path: ./infrastructure/authentik-proxy
+  dependsOn:
+    - name: infrastructure-authentik
+---
+apiVersion: kustomize.toolkit.fluxcd.io/v1
+kind: Kustomization
+metadata:
+  name: infrastructure-authentik
+  namespace: flux-system
+spec:
+  path: ./infrastructure/authentik
+"""
+
+KUSTOMIZATION = """\
+apiVersion: kustomize.config.k8s.io/v1beta1
+kind: Kustomization
+resources:
+  - external-secret.yaml
+  - job.yaml
+"""
+
+EXTERNAL_SECRET = """\
+apiVersion: external-secrets.io/v1
+kind: ExternalSecret
+metadata:
+  name: authentik-proxy-token
+  namespace: authentik-proxy
+spec:
+  secretStoreRef:
+    name: onepassword-connect
+  data:
+    - secretKey: token
+      remoteRef:
+        key: Authentik Proxy Token
+        property: token
+    - secretKey: host
+      remoteRef:
+        key: Authentik Proxy Token
+        property: host
+"""
+
+JOB = """\
+apiVersion: batch/v1
+kind: Job
+metadata:
+  name: authentik-proxy-config
+  namespace: authentik-proxy
+spec:
+  template:
+    spec:
+      containers:
+        - name: configure
+          command:
+            - /bin/sh
+            - -c
+            - |
+              cat > /tmp/configure_proxy.py << 'EOF'
+              print("configured")
+              EOF
+              python3 /tmp/configure_proxy.py
+"""
+
+
+class TestManifestIndex(unittest.TestCase):
+    """Test cases for indexing, cross-references and incremental rebuilds."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.root = self.tmpdir.name
+        self.cache = os.path.join(self.root, ".cache", "index.json")
+        self._write("clusters/home-ops/infrastructure.yaml", FLUX_KUSTOMIZATIONS)
+        self._write("infrastructure/authentik-proxy/kustomization.yaml", KUSTOMIZATION)
+        self._write(
+            "infrastructure/authentik-proxy/external-secret.yaml", EXTERNAL_SECRET
+        )
+        self._write("infrastructure/authentik-proxy/job.yaml", JOB)
+
+    def _write(self, path, text):
+        full = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, "w") as f:
+            f.write(text)
+
+    def test_index_by_kind_namespace_name(self):
+        """Test documents can be looked up by kind, namespace and name."""
+        index = load_index(None, self.root)
+
+        found = index.find("ExternalSecret", "authentik-proxy")
+        self.assertEqual([d.name for d in found], ["authentik-proxy-token"])
+        self.assertEqual(len(index.find(kind="Kustomization")), 3)
+
+    def test_cross_references(self):
+        """Test Kustomization, ExternalSecret and Job references are extracted."""
+        index = load_index(None, self.root)
+
+        refs = {(t, target) for _, t, target in index.references()}
+        self.assertIn(("path", "infrastructure/authentik-proxy"), refs)
+        self.assertIn(("resource", "infrastructure/authentik-proxy/job.yaml"), refs)
+        self.assertIn(
+            ("onepassword", "onepassword-connect/Authentik Proxy Token"), refs
+        )
+        self.assertIn(("script", "/tmp/configure_proxy.py"), refs)
+        self.assertEqual(len(index.references("onepassword")), 1)
+
+    def test_validate_reports_dangling_references(self):
+        """Test missing paths, resources and dependencies are reported."""
+        os.remove(os.path.join(self.root, "infrastructure/authentik-proxy/job.yaml"))
+        self._write(
+            "clusters/home-ops/apps.yaml",
+            FLUX_KUSTOMIZATIONS.split("---")[0].replace(
+                "infrastructure-authentik\n", "infrastructure-missing\n"
+            ),
+        )
+
+        problems = load_index(None, self.root).validate()
+
+        self.assertEqual(
+            sorted(p.split(": ", 1)[1] for p in problems),
+            [
+                "Kustomization infrastructure-authentik path "
+                "infrastructure/authentik does not exist",
+                "Kustomization infrastructure-authentik-proxy depends on "
+                "unknown Kustomization infrastructure-missing",
+                "resource infrastructure/authentik-proxy/job.yaml does not exist",
+            ],
+        )
+
+    def test_only_changed_files_reparsed(self):
+        """Test a rebuild from the persisted index parses only changed files."""
+        first = load_index(self.cache, self.root)
+        self.assertEqual(first.parsed, 4)
+
+        self._write("infrastructure/authentik-proxy/job.yaml", JOB + "\n# edited\n")
+        second = load_index(self.cache, self.root)
+        third = load_index(self.cache, self.root)
+
+        self.assertEqual(second.parsed, 1)
+        self.assertEqual(third.parsed, 0)
+        self.assertEqual(
+            [d.to_dict() for d in third.documents()],
+            [d.to_dict() for d in first.documents()],
+        )
+
+    def test_parallel_parse_matches_inline(self):
+        """Test the process pool produces the same index as inline parsing."""
+        for i in range(40):
+            self._write(f"apps/app{i}/external-secret.yaml", EXTERNAL_SECRET)
+
+        inline = ManifestIndex(self.root).build(jobs=1)
+        parallel = ManifestIndex(self.root).build(jobs=2)
+
+        self.assertEqual(
+            [d.to_dict() for d in parallel.documents()],
+            [d.to_dict() for d in inline.documents()],
+        )
+
+    def test_yaml_errors_recorded(self):
+        """Test unparseable manifests are recorded and reported, not raised."""
+        self._write("apps/broken.yaml", "key: [unclosed\n")
+
+        index = load_index(None, self.root)
+
+        self.assertIsNotNone(index.files["apps/broken.yaml"].error)
+        self.assertTrue(
+            any(p.startswith("apps/broken.yaml: YAML error") for p in index.validate())
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Kustomization reconcile scheduler
+"""
+
+import copy
+import threading
+import time
+import unittest
+
+from reconcile_scheduler import (
+    FAILED,
+    READY,
+    SKIPPED,
+    SUSPENDED,
+    KustomizationNode,
+    ReconcileScheduler,
+    SchedulerError,
+    graph_from_objects,
+    topological_waves,
+    validate_graph,
+)
+
+
+def _ks(name, depends_on=(), suspend=False):
+    return {
+        "kind": "Kustomization",
+        "metadata": {"name": name, "namespace": "flux-system", "generation": 1},
+        "spec": {"dependsOn": [{"name": d} for d in depends_on], "suspend": suspend},
+        "status": {"observedGeneration": 1},
+    }
+
+
+class FakeFluxClient:
+    """Kustomizations that become Ready a fixed time after each reconcile."""
+
+    def __init__(self, objects, durations=None, failing=()):
+        self.objects = {o["metadata"]["name"]: o for o in objects}
+        self.durations = durations or {}
+        self.failing = set(failing)
+        self.requests = {}
+        self.lock = threading.Lock()
+        self.list_calls = 0
+
+    def reconcile_flux_kustomization(self, name, namespace, with_source=True):
+        with self.lock:
+            token = f"{name}-{len(self.requests)}"
+            self.requests[name] = time.monotonic()
+            annotations = self.objects[name]["metadata"].setdefault("annotations", {})
+            annotations["reconcile.fluxcd.io/requestedAt"] = token
+        return {"result": {"content": [{"type": "text", "text": "ok"}]}}
+
+    def list_resources(self, api_version, kind, namespace=None, **options):
+        with self.lock:
+            self.list_calls += 1
+            now = time.monotonic()
+            items = []
+            for name, obj in self.objects.items():
+                obj = copy.deepcopy(obj)
+                requested = self.requests.get(name)
+                if requested is not None and now - requested >= self.durations.get(
+                    name, 0.05
+                ):
+                    token = obj["metadata"]["annotations"][
+                        "reconcile.fluxcd.io/requestedAt"
+                    ]
+                    obj["status"]["lastHandledReconcileAt"] = token
+                    failed = name in self.failing
+                    obj["status"]["conditions"] = [
+                        {
+                            "type": "Ready",
+                            "status": "False" if failed else "True",
+                            "reason": "HealthCheckFailed" if failed else "Succeeded",
+                            "message": "timeout waiting for Deployment",
+                        }
+                    ]
+                items.append(obj)
+            return items
+
+
+# sources -> (secrets, cert-manager) -> ingress
+DIAMOND = [
+    _ks("sources"),
+    _ks("secrets", ["sources"]),
+    _ks("cert-manager", ["sources"]),
+    _ks("ingress", ["secrets", "cert-manager"]),
+]
+
+
+def _scheduler(client, **kwargs):
+    kwargs.setdefault("poll_interval", 0.01)
+    kwargs.setdefault("timeout", 5)
+    graph = graph_from_objects(list(client.objects.values()))
+    return ReconcileScheduler(client, graph, **kwargs)
+
+
+class TestGraph(unittest.TestCase):
+    """Test cases for building and validating the dependency graph."""
+
+    def test_waves_follow_depends_on(self):
+        """Test that each wave only depends on earlier waves."""
+        waves = topological_waves(graph_from_objects(DIAMOND))
+        self.assertEqual(
+            waves,
+            [
+                ["flux-system/sources"],
+                ["flux-system/cert-manager", "flux-system/secrets"],
+                ["flux-system/ingress"],
+            ],
+        )
+
+    def test_cycle_and_unknown_dependency_are_reported(self):
+        """Test that cycles and unknown dependencies make the graph invalid."""
+        graph = graph_from_objects(
+            [_ks("a", ["b"]), _ks("b", ["a"]), _ks("c", ["missing"])]
+        )
+        problems = validate_graph(graph)
+        self.assertIn(
+            "flux-system/c depends on unknown Kustomization flux-system/missing",
+            problems,
+        )
+        self.assertTrue(any("dependency cycle" in p for p in problems))
+        with self.assertRaises(SchedulerError):
+            ReconcileScheduler(FakeFluxClient([]), graph).plan()
+
+    def test_duplicate_definitions_merge_dependencies(self):
+        """Test that a Kustomization defined twice keeps both dependency lists."""
+        graph = graph_from_objects([_ks("a", ["b"]), _ks("a", ["c"])])
+        self.assertEqual(
+            graph["flux-system/a"].depends_on,
+            ["flux-system/b", "flux-system/c"],
+        )
+        self.assertIsInstance(graph["flux-system/a"], KustomizationNode)
+
+
+class TestReconcileScheduler(unittest.TestCase):
+    """Test cases for the dependency-aware reconcile run."""
+
+    def test_independent_kustomizations_run_concurrently(self):
+        """Test that the run takes the critical path, not the sum of reconciles."""
+        client = FakeFluxClient(
+            DIAMOND, {"sources": 0.1, "secrets": 0.3, "cert-manager": 0.1}
+        )
+        report = _scheduler(client, parallelism=4).run()
+
+        self.assertTrue(report.succeeded)
+        self.assertEqual(
+            report.critical_path,
+            ["flux-system/sources", "flux-system/secrets", "flux-system/ingress"],
+        )
+        # 0.1 + 0.3 + 0.05 along the path; serially it would be 0.55
+        self.assertLess(report.wall_seconds, report.serial_seconds)
+        self.assertGreaterEqual(report.critical_path_seconds, 0.45)
+
+    def test_dependents_wait_for_ready(self):
+        """Test that nothing starts before all its dependencies are Ready."""
+        client = FakeFluxClient(DIAMOND, {"secrets": 0.2})
+        report = _scheduler(client).run()
+
+        for result in report.nodes.values():
+            for dependency in result.depends_on:
+                self.assertGreaterEqual(
+                    result.started, report.nodes[dependency].finished
+                )
+        # Progress is tracked with list calls, not one get per Kustomization
+        self.assertEqual(report.polls, client.list_calls)
+
+    def test_parallelism_limit(self):
+        """Test that at most `parallelism` Kustomizations are in flight."""
+        objects = [_ks(f"app-{i}") for i in range(6)]
+        report = _scheduler(
+            FakeFluxClient(objects, {f"app-{i}": 0.1 for i in range(6)}),
+            parallelism=2,
+        ).run()
+
+        events = sorted(
+            [(n.started, 1) for n in report.nodes.values()]
+            + [(n.finished, -1) for n in report.nodes.values()]
+        )
+        in_flight = peak = 0
+        for _, delta in events:
+            in_flight += delta
+            peak = max(peak, in_flight)
+        self.assertEqual(peak, 2)
+        self.assertEqual(len(report.by_status(READY)), 6)
+
+    def test_failure_skips_dependents(self):
+        """Test that a failed Kustomization skips everything downstream."""
+        client = FakeFluxClient(DIAMOND, failing={"secrets"})
+        report = _scheduler(client).run()
+
+        self.assertFalse(report.succeeded)
+        self.assertEqual(report.nodes["flux-system/secrets"].status, FAILED)
+        self.assertIn("HealthCheckFailed", report.nodes["flux-system/secrets"].message)
+        ingress = report.nodes["flux-system/ingress"]
+        self.assertEqual(ingress.status, SKIPPED)
+        self.assertIsNone(ingress.started)
+        self.assertNotIn("ingress", client.requests)
+
+    def test_targets_include_dependencies_and_suspended_do_not_block(self):
+        """Test that targets pull in their dependencies and suspend is honoured."""
+        objects = DIAMOND[:2] + [
+            _ks("cert-manager", ["sources"], suspend=True),
+            DIAMOND[3],
+            _ks("unrelated"),
+        ]
+        client = FakeFluxClient(objects)
+        report = _scheduler(client).run(["flux-system/ingress"])
+
+        self.assertTrue(report.succeeded)
+        self.assertNotIn("flux-system/unrelated", report.nodes)
+        self.assertEqual(report.nodes["flux-system/cert-manager"].status, SUSPENDED)
+        self.assertNotIn("cert-manager", client.requests)
+        self.assertEqual(report.nodes["flux-system/ingress"].status, READY)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Event-Driven Cluster Recovery Monitor
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "authentik-proxy-config"))
+
+from kube_api import KubernetesClient, KubernetesConfig  # noqa: E402
+from recovery_monitor import (  # noqa: E402
+    ClusterState,
+    KindWatcher,
+    ObjectState,
+    RecoveryMonitor,
+    Transition,
+    WatchedKind,
+    replay,
+    select_kinds,
+)
+
+NODES = WatchedKind("Node", "/api/v1/nodes")
+
+# A watch stream the server drops mid-chunk
+DROPPED = "dropped"
+
+
+def _node(name, ready, rv):
+    return {
+        "metadata": {"name": name, "resourceVersion": rv},
+        "status": {"conditions": [{"type": "Ready", "status": ready}]},
+    }
+
+
+class FakeWatchServer:
+    """Local API server with scripted list responses and watch streams."""
+
+    def __init__(self, items, list_rv, streams):
+        self.items = items
+        self.list_rv = list_rv
+        self.streams = list(streams)
+        self.watch_versions = []
+        self.lists = 0
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = dict(
+                    urllib.parse.parse_qsl(urllib.parse.urlparse(self.path).query)
+                )
+                if query.get("watch") != "1":
+                    fake.lists += 1
+                    body = {
+                        "items": fake.items,
+                        "metadata": {"resourceVersion": fake.list_rv},
+                    }
+                    lines = [json.dumps(body)]
+                else:
+                    fake.watch_versions.append(query.get("resourceVersion"))
+                    stream = fake.streams.pop(0) if fake.streams else None
+                    if stream == DROPPED:
+                        # Promise a chunk, send part of it and hang up
+                        self.send_response(200)
+                        self.send_header("Transfer-Encoding", "chunked")
+                        self.end_headers()
+                        self.wfile.write(b"400\r\n" + b'{"type": "MOD')
+                        self.wfile.flush()
+                        self.close_connection = True
+                        return
+                    if stream is not None:
+                        lines = [json.dumps(e) for e in stream]
+                    else:
+                        time.sleep(0.05)
+                        lines = []
+
+                self.send_response(200)
+                self.end_headers()
+                for line in lines:
+                    self.wfile.write(line.encode() + b"\n")
+                    self.wfile.flush()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.client = KubernetesClient(
+            KubernetesConfig(f"http://127.0.0.1:{self.server.server_address[1]}")
+        )
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestClusterState(unittest.TestCase):
+    """Test cases for the in-memory readiness model."""
+
+    def test_only_readiness_changes_are_transitions(self):
+        """Test status churn without a readiness flip is not reported."""
+        state = ClusterState(["Node"])
+
+        first = state.apply("Node", "ADDED", "mini01", ObjectState(False, "Booting"))
+        churn = state.apply("Node", "MODIFIED", "mini01", ObjectState(False, "Other"))
+        flip = state.apply("Node", "MODIFIED", "mini01", ObjectState(True))
+
+        self.assertIsNone(first.previous_ready)
+        self.assertIsNone(churn)
+        self.assertEqual((flip.previous_ready, flip.ready), (False, True))
+
+    def test_suspended_excluded_from_progress(self):
+        """Test suspended objects do not block recovery."""
+        state = ClusterState(["Kustomization"])
+        state.replace(
+            "Kustomization",
+            {
+                "flux-system/apps": ObjectState(True),
+                "flux-system/legacy": ObjectState(False, suspended=True),
+            },
+        )
+
+        self.assertEqual(state.progress(), "Kustomizations 1/1")
+        self.assertTrue(state.recovered())
+
+
+class TestKindWatcher(unittest.TestCase):
+    """Test cases for list-then-watch with resourceVersion resume."""
+
+    def _run(self, fake, until):
+        state = ClusterState(["Node"])
+        transitions = []
+        stop = threading.Event()
+        watcher = KindWatcher(
+            fake.client, NODES, state, transitions.append, stop, retry_interval=0.01
+        )
+        watcher.start()
+        deadline = time.monotonic() + 5
+        while not until(fake, transitions) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stop.set()
+        watcher.join(2)
+        return state, transitions
+
+    def test_resumes_from_last_resource_version(self):
+        """Test a closed stream resumes from the last event, not a relist."""
+        fake = FakeWatchServer(
+            [_node("mini01", "False", "10")],
+            "10",
+            [[{"type": "MODIFIED", "object": _node("mini01", "True", "11")}]],
+        )
+        self.addCleanup(fake.close)
+
+        state, transitions = self._run(fake, lambda f, t: len(f.watch_versions) >= 2)
+
+        self.assertEqual(fake.watch_versions[:2], ["10", "11"])
+        self.assertEqual(fake.lists, 1)
+        self.assertTrue(state.recovered())
+        self.assertEqual([t.event for t in transitions], ["SYNC", "MODIFIED"])
+
+    def test_survives_dropped_stream(self):
+        """Test a stream cut mid-chunk is resumed instead of killing the thread."""
+        fake = FakeWatchServer(
+            [_node("mini01", "False", "10")],
+            "10",
+            [
+                DROPPED,
+                [{"type": "MODIFIED", "object": _node("mini01", "True", "11")}],
+            ],
+        )
+        self.addCleanup(fake.close)
+
+        state, transitions = self._run(fake, lambda f, t: len(t) >= 2)
+
+        self.assertEqual(fake.watch_versions[:2], ["10", "10"])
+        self.assertTrue(state.recovered())
+
+    def test_relists_on_gone(self):
+        """Test an expired resourceVersion triggers a relist."""
+        fake = FakeWatchServer(
+            [_node("mini01", "True", "10")],
+            "10",
+            [[{"type": "ERROR", "object": {"code": 410}}]],
+        )
+        self.addCleanup(fake.close)
+
+        self._run(fake, lambda f, t: f.lists >= 2)
+
+        self.assertGreaterEqual(fake.lists, 2)
+
+
+class TestRecoveryMonitor(unittest.TestCase):
+    """Test cases for the monitor, transition log and replay."""
+
+    def test_log_replays_to_same_state(self):
+        """Test replaying the transition log rebuilds the final state."""
+        fake = FakeWatchServer(
+            [_node("mini01", "False", "10"), _node("mini02", "True", "10")],
+            "10",
+            [[{"type": "MODIFIED", "object": _node("mini01", "True", "11")}]],
+        )
+        self.addCleanup(fake.close)
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        path = os.path.join(tmpdir.name, "recovery.jsonl")
+
+        with open(path, "w") as log:
+            monitor = RecoveryMonitor(fake.client, kinds=[NODES], log=log)
+            monitor.start()
+            recovered = monitor.wait(5)
+            monitor.stop()
+
+        self.assertTrue(recovered)
+        replayed = replay(path)
+        self.assertEqual(replayed.progress(), "Nodes 2/2")
+        self.assertEqual(replayed.objects["Node"], monitor.state.objects["Node"])
+
+    def test_nothing_logged_after_stop(self):
+        """Test a watcher delivering during shutdown cannot write a closed log."""
+        with tempfile.TemporaryFile("w+") as log:
+            monitor = RecoveryMonitor(None, kinds=[NODES], log=log)
+            monitor.stop()
+            monitor._emit(
+                Transition("2026-01-01T00:00:00Z", "Node", "mini01", "SYNC", True)
+            )
+            log.seek(0)
+            self.assertEqual(log.read(), "")
+
+    def test_select_kinds(self):
+        """Test --kinds picks watched kinds by name and rejects unknown ones."""
+        self.assertEqual([k.name for k in select_kinds("node, Pod")], ["Node", "Pod"])
+        with self.assertRaises(ValueError):
+            select_kinds("Node,Deployment")
+
+
+if __name__ == "__main__":
+    unittest.main()
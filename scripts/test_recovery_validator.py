@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Cluster Recovery Validator
+"""
+
+import os
+import sys
+import time
+import unittest
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "authentik-proxy-config"))
+
+from flux_mcp_wrapper import FluxMCPError, parse_resources  # noqa: E402
+from recovery_validator import (  # noqa: E402
+    RecoveryValidator,
+    evaluate_auth,
+    evaluate_kustomizations,
+    evaluate_nodes,
+    evaluate_pods,
+)
+from service_prober import ProbeReport, ProbeResult  # noqa: E402
+
+
+def _ready(name, status="True", namespace=None, **spec):
+    metadata = {"name": name}
+    if namespace:
+        metadata["namespace"] = namespace
+    return {
+        "metadata": metadata,
+        "spec": spec,
+        "status": {
+            "conditions": [{"type": "Ready", "status": status, "reason": "Failed"}]
+        },
+    }
+
+
+def _pod(name, namespace="default", phase="Running", waiting=None):
+    status = {"phase": phase}
+    if waiting:
+        status["containerStatuses"] = [{"state": {"waiting": {"reason": waiting}}}]
+    return {"metadata": {"name": name, "namespace": namespace}, "status": status}
+
+
+class FakeFluxClient:
+    """FluxMCPClient stand-in that answers list calls after a delay."""
+
+    def __init__(self, resources, delay=0.0):
+        self.resources = resources
+        self.delay = delay
+
+    def list_resources(self, api_version, kind, namespace=None):
+        time.sleep(self.delay)
+        if kind not in self.resources:
+            raise FluxMCPError(f"no {kind}")
+        return self.resources[kind]
+
+
+class TestEvaluators(unittest.TestCase):
+    """Test cases for the per-check evaluation rules."""
+
+    def test_kustomization_counts_come_from_cluster(self):
+        """Test the expected count excludes suspended Kustomizations."""
+        items = [
+            _ready("flux-system", namespace="flux-system"),
+            _ready("apps", "False", namespace="flux-system"),
+            _ready("legacy", "False", namespace="flux-system", suspend=True),
+        ]
+
+        result = evaluate_kustomizations(items)
+
+        self.assertFalse(result.passed)
+        self.assertEqual((result.ready, result.expected), (1, 2))
+        self.assertEqual(result.summary, "1/2 Kustomizations Ready (1 suspended)")
+        self.assertEqual(result.details, ["flux-system/apps: Failed"])
+
+    def test_nodes(self):
+        """Test every listed node must be Ready."""
+        result = evaluate_nodes([_ready("mini01"), _ready("mini02"), _ready("mini03")])
+
+        self.assertTrue(result.passed)
+        self.assertEqual(result.summary, "3/3 nodes Ready")
+
+    def test_pods_ignore_completed(self):
+        """Test completed pods pass and crash-looping Running pods fail."""
+        items = [
+            _pod("job-abc", phase="Succeeded"),
+            _pod("web"),
+            _pod("api", waiting="CrashLoopBackOff"),
+            _pod("pending", phase="Pending"),
+        ]
+
+        result = evaluate_pods(items)
+
+        self.assertEqual(
+            result.details,
+            ["default/api: CrashLoopBackOff", "default/pending: Pending"],
+        )
+
+    def test_auth_requires_running_proxy(self):
+        """Test the authentication check looks only at the proxy namespace."""
+        items = [_pod("proxy", namespace="authentik-proxy", phase="Pending"), _pod("x")]
+
+        self.assertFalse(evaluate_auth(items).passed)
+
+
+class TestRecoveryValidator(unittest.TestCase):
+    """Test cases for running the checks concurrently."""
+
+    def test_checks_run_concurrently(self):
+        """Test validation takes about as long as the slowest check."""
+        client = FakeFluxClient(
+            {
+                "Kustomization": [_ready("apps", namespace="flux-system")],
+                "Node": [_ready("mini01")],
+                "Pod": [_pod("proxy", namespace="authentik-proxy")],
+            },
+            delay=0.3,
+        )
+        prober = MagicMock()
+        prober.probe_services.side_effect = lambda services: (
+            time.sleep(0.3)
+            or ProbeReport(
+                results=[
+                    ProbeResult("grafana", "https://g/", "auth_redirect", status=302)
+                ]
+            )
+        )
+
+        report = RecoveryValidator(client, prober, services=["grafana"]).validate()
+
+        self.assertTrue(report.passed)
+        self.assertEqual(
+            [c.name for c in report.checks],
+            ["kustomizations", "nodes", "pods", "authentication", "services"],
+        )
+        self.assertLess(report.wall_seconds, 0.9)
+
+    def test_query_failure_fails_check(self):
+        """Test an MCP error fails its check without aborting the others."""
+        client = FakeFluxClient({"Node": [_ready("mini01")], "Pod": []})
+
+        report = RecoveryValidator(client).validate()
+
+        by_name = {c.name: c for c in report.checks}
+        self.assertFalse(by_name["kustomizations"].passed)
+        self.assertIn("no Kustomization", by_name["kustomizations"].summary)
+        self.assertTrue(by_name["nodes"].passed)
+
+
+class TestParseResources(unittest.TestCase):
+    """Test cases for parsing MCP resource output."""
+
+    def test_json_list_and_items(self):
+        """Test JSON lists and List objects are flattened into items."""
+        response = {
+            "result": {
+                "content": [
+                    {"type": "text", "text": '{"kind": "List", "items": [{"a": 1}]}'}
+                ]
+            }
+        }
+
+        self.assertEqual(parse_resources(response), [{"a": 1}])
+
+    def test_tool_error(self):
+        """Test tool errors are raised instead of parsed."""
+        response = {
+            "result": {"isError": True, "content": [{"type": "text", "text": "denied"}]}
+        }
+
+        with self.assertRaises(FluxMCPError):
+            parse_resources(response)
+
+
+if __name__ == "__main__":
+    unittest.main()
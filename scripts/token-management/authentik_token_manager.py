@@ -2,15 +2,19 @@
 """
 Authentik Token Manager - Updates 1Password with current Authentik tokens
 """
+
 import argparse
 import json
 import subprocess
 import sys
-from dataclasses import dataclass
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
-import requests
+# Concurrent requests used when validating many tokens at once
+DEFAULT_VALIDATION_WORKERS = 16
 
 
 @dataclass
@@ -32,6 +36,95 @@ class TokenInfo:
         return delta.days
 
 
+class TokenStatus:
+    """Classification of a token after validation"""
+
+    VALID = "valid"
+    EXPIRING = "expiring"
+    EXPIRED = "expired"
+    REVOKED = "revoked"
+    ERROR = "error"
+
+
+@dataclass
+class TokenValidation:
+    """Validation result for a single token"""
+
+    token: TokenInfo
+    status: str
+    http_status: Optional[int] = None
+    error: Optional[str] = None
+    latency_ms: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "key": self.token.key[:8] + "...",
+            "user": self.token.user,
+            "description": self.token.description,
+            "expires": self.token.expires.isoformat() if self.token.expires else None,
+            "days_remaining": self.token.days_remaining,
+            "status": self.status,
+            "http_status": self.http_status,
+            "error": self.error,
+            "latency_ms": round(self.latency_ms, 1),
+        }
+
+
+@dataclass
+class TokenValidationReport:
+    """Results of validating a set of tokens in one sweep"""
+
+    expiring_within_days: int
+    results: List[TokenValidation] = field(default_factory=list)
+    duration_seconds: float = 0.0
+
+    def by_status(self, status: str) -> List[TokenInfo]:
+        """Tokens classified with the given status"""
+        return [r.token for r in self.results if r.status == status]
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        counts = {
+            status: 0
+            for status in (
+                TokenStatus.VALID,
+                TokenStatus.EXPIRING,
+                TokenStatus.EXPIRED,
+                TokenStatus.REVOKED,
+                TokenStatus.ERROR,
+            )
+        }
+        for result in self.results:
+            counts[result.status] += 1
+        return counts
+
+    @property
+    def needs_rotation(self) -> List[TokenInfo]:
+        """Tokens revoked by the API, expired, or expiring inside the window
+
+        A token whose check failed still counts when its expiry is inside the
+        window.
+        """
+        rotate = (TokenStatus.EXPIRING, TokenStatus.EXPIRED, TokenStatus.REVOKED)
+        return [
+            r.token
+            for r in self.results
+            if r.status in rotate
+            or (
+                r.token.days_remaining is not None
+                and r.token.days_remaining <= self.expiring_within_days
+            )
+        ]
+
+    def to_dict(self) -> Dict:
+        return {
+            "expiring_within_days": self.expiring_within_days,
+            "duration_seconds": round(self.duration_seconds, 3),
+            "counts": self.counts,
+            "tokens": [r.to_dict() for r in self.results],
+        }
+
+
 class AuthentikTokenManager:
     """Manages Authentik tokens and 1Password integration"""
 
@@ -118,6 +211,9 @@ EOF
 
     def validate_token(self, token: str) -> bool:
         """Validate a token by making an API request"""
+        # Imported here so list/rotate --dry-run start without loading requests
+        import requests
+
         try:
             headers = {
                 "Authorization": f"Bearer {token}",
@@ -133,6 +229,87 @@ EOF
             print(f"Token validation failed: {e}")
             return False
 
+    def _classify_token(
+        self, session, token: TokenInfo, expiring_within_days: int
+    ) -> TokenValidation:
+        """Classify one token, skipping the API call if it has already expired"""
+        days_remaining = token.days_remaining
+        if days_remaining is not None and days_remaining < 0:
+            return TokenValidation(token=token, status=TokenStatus.EXPIRED)
+
+        started = time.monotonic()
+        try:
+            response = session.get(
+                f"{self.authentik_host}/api/v3/core/users/me/",
+                headers={
+                    "Authorization": f"Bearer {token.key}",
+                    "Content-Type": "application/json",
+                },
+                timeout=10,
+            )
+        except Exception as e:
+            return TokenValidation(
+                token=token,
+                status=TokenStatus.ERROR,
+                error=str(e),
+                latency_ms=(time.monotonic() - started) * 1000,
+            )
+
+        latency_ms = (time.monotonic() - started) * 1000
+        if response.status_code in (401, 403):
+            status = TokenStatus.REVOKED
+        elif response.status_code != 200:
+            status = TokenStatus.ERROR
+        elif days_remaining is not None and days_remaining <= expiring_within_days:
+            status = TokenStatus.EXPIRING
+        else:
+            status = TokenStatus.VALID
+
+        return TokenValidation(
+            token=token,
+            status=status,
+            http_status=response.status_code,
+            latency_ms=latency_ms,
+        )
+
+    def validate_tokens(
+        self,
+        tokens: List[TokenInfo],
+        expiring_within_days: int = 30,
+        max_workers: int = DEFAULT_VALIDATION_WORKERS,
+    ) -> TokenValidationReport:
+        """Validate many tokens concurrently over one pooled HTTP session"""
+        import requests
+
+        started = time.monotonic()
+        workers = max(1, min(max_workers, len(tokens)))
+
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=workers
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(
+                    pool.map(
+                        lambda token: self._classify_token(
+                            session, token, expiring_within_days
+                        ),
+                        tokens,
+                    )
+                )
+        finally:
+            session.close()
+
+        return TokenValidationReport(
+            expiring_within_days=expiring_within_days,
+            results=results,
+            duration_seconds=time.monotonic() - started,
+        )
+
     def create_long_lived_token(self, force: bool = False) -> Optional[TokenInfo]:
         """Create a new long-lived token"""
         if not self._check_prerequisites():
@@ -284,20 +461,24 @@ print(f"TOKEN_LIST:{json.dumps(tokens)}")
             print("No tokens found")
             return False
 
-        # Check if any tokens need rotation
-        needs_rotation = []
-        for token in tokens:
-            if (
-                token.days_remaining is not None
-                and token.days_remaining <= overlap_days
-            ):
-                needs_rotation.append(token)
-
+        # Check every token in one concurrent sweep
+        report = self.validate_tokens(tokens, expiring_within_days=overlap_days)
+        counts = report.counts
+        print(
+            f"Validated {len(tokens)} tokens in {report.duration_seconds:.2f}s: "
+            + ", ".join(f"{count} {status}" for status, count in counts.items())
+        )
+        needs_rotation = report.needs_rotation
         if not needs_rotation:
             print("No tokens need rotation")
             return True
 
-        print(f"Found {len(needs_rotation)} tokens that need rotation")
+        print(
+            f"Found {len(needs_rotation)} tokens that need rotation "
+            f"({counts[TokenStatus.REVOKED]} revoked, "
+            f"{counts[TokenStatus.EXPIRED]} expired, "
+            f"{counts[TokenStatus.EXPIRING]} expiring)"
+        )
 
         # Create new token
         new_token = self.create_long_lived_token(force=True)
@@ -377,13 +558,19 @@ def rotate_tokens(overlap_days=30):
 def main():
     parser = argparse.ArgumentParser(description="Authentik Token Manager")
     parser.add_argument(
-        "command", choices=["list", "rotate"], help="Command to execute"
+        "command", choices=["list", "rotate", "validate"], help="Command to execute"
     )
     parser.add_argument("--json", action="store_true", help="Output in JSON format")
     parser.add_argument(
         "--overlap-days", type=int, default=30, help="Overlap days for rotation"
     )
     parser.add_argument("--dry-run", action="store_true", help="Dry run mode")
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=DEFAULT_VALIDATION_WORKERS,
+        help="Concurrent requests for validate",
+    )
 
     args = parser.parse_args()
 
@@ -415,6 +602,25 @@ def main():
         success = manager.rotate_tokens(args.overlap_days)
         sys.exit(0 if success else 1)
 
+    elif args.command == "validate":
+        report = manager.validate_tokens(
+            manager.list_tokens(),
+            expiring_within_days=args.overlap_days,
+            max_workers=args.max_workers,
+        )
+        if args.json:
+            print(json.dumps(report.to_dict()))
+        else:
+            for result in report.results:
+                print(
+                    f"Token: {result.token.key[:8]}..., "
+                    f"Status: {result.status}, "
+                    f"Days remaining: {result.token.days_remaining}, "
+                    f"User: {result.token.user}"
+                )
+        counts = report.counts
+        sys.exit(1 if counts[TokenStatus.EXPIRED] or counts[TokenStatus.REVOKED] else 0)
+
 
 if __name__ == "__main__":
     main()
@@ -10,7 +10,26 @@ import unittest
 from datetime import datetime, timedelta
 from unittest.mock import Mock, patch
 
-from authentik_token_manager import AuthentikTokenManager, TokenInfo
+from authentik_token_manager import (
+    AuthentikTokenManager,
+    TokenInfo,
+    TokenStatus,
+)
+
+
+def _session_returning(status_by_key):
+    """Build a mock requests.Session answering per bearer token"""
+    session = Mock()
+
+    def get(url, headers=None, timeout=None):
+        key = headers["Authorization"].split(" ", 1)[1]
+        status = status_by_key[key]
+        if isinstance(status, Exception):
+            raise status
+        return Mock(status_code=status)
+
+    session.get.side_effect = get
+    return session
 
 
 class TestAuthentikTokenManager(unittest.TestCase):
@@ -176,12 +195,13 @@ class TestAuthentikTokenManager(unittest.TestCase):
 
         self.assertTrue(result)
 
+    @patch("requests.Session")
     @patch.object(AuthentikTokenManager, "list_tokens")
     @patch.object(AuthentikTokenManager, "create_long_lived_token")
     @patch.object(AuthentikTokenManager, "validate_token")
     @patch.object(AuthentikTokenManager, "update_1password_token")
     def test_rotate_tokens_success(
-        self, mock_update, mock_validate, mock_create, mock_list
+        self, mock_update, mock_validate, mock_create, mock_list, mock_session
     ):
         """Test successful token rotation"""
         # Mock existing token that needs rotation
@@ -203,6 +223,7 @@ class TestAuthentikTokenManager(unittest.TestCase):
         )
 
         mock_list.return_value = [expiring_token]
+        mock_session.return_value = _session_returning({"expiring_token": 200})
         mock_create.return_value = new_token
         mock_validate.return_value = True
         mock_update.return_value = True
@@ -214,8 +235,9 @@ class TestAuthentikTokenManager(unittest.TestCase):
         mock_validate.assert_called_once_with(new_token.key)
         mock_update.assert_called_once_with(new_token)
 
+    @patch("requests.Session")
     @patch.object(AuthentikTokenManager, "list_tokens")
-    def test_rotate_tokens_no_rotation_needed(self, mock_list):
+    def test_rotate_tokens_no_rotation_needed(self, mock_list, mock_session):
         """Test token rotation when no tokens need rotation"""
         # Mock token that doesn't need rotation
         valid_token = TokenInfo(
@@ -227,10 +249,107 @@ class TestAuthentikTokenManager(unittest.TestCase):
         )
 
         mock_list.return_value = [valid_token]
+        mock_session.return_value = _session_returning({"valid_token": 200})
+
+        result = self.manager.rotate_tokens(overlap_days=30)
+
+        self.assertTrue(result)
+
+    @patch("requests.Session")
+    @patch.object(AuthentikTokenManager, "list_tokens")
+    @patch.object(AuthentikTokenManager, "create_long_lived_token")
+    @patch.object(AuthentikTokenManager, "validate_token")
+    @patch.object(AuthentikTokenManager, "update_1password_token")
+    def test_rotate_tokens_revoked(
+        self, mock_update, mock_validate, mock_create, mock_list, mock_session
+    ):
+        """Test a token rejected by the API is rotated despite a distant expiry"""
+        revoked_token = TokenInfo(
+            key="revoked_token",
+            expires=datetime.now() + timedelta(days=300),
+            description="Revoked token",
+            user="akadmin",
+            created=datetime.now(),
+        )
+        new_token = TokenInfo(
+            key="new_token",
+            expires=datetime.now() + timedelta(days=365),
+            description="New token",
+            user="akadmin",
+            created=datetime.now(),
+        )
+
+        mock_list.return_value = [revoked_token]
+        mock_session.return_value = _session_returning({"revoked_token": 401})
+        mock_create.return_value = new_token
+        mock_validate.return_value = True
+        mock_update.return_value = True
 
         result = self.manager.rotate_tokens(overlap_days=30)
 
         self.assertTrue(result)
+        mock_create.assert_called_once_with(force=True)
+        mock_update.assert_called_once_with(new_token)
+
+    @patch("requests.Session")
+    def test_validate_tokens_classification(self, mock_session):
+        """Test bulk validation classifies every token in one sweep"""
+        now = datetime.now()
+
+        def token(key, days):
+            expires = now + timedelta(days=days, hours=1) if days is not None else None
+            return TokenInfo(key, expires, key, "akadmin", now)
+
+        tokens = [
+            token("valid", 300),
+            token("permanent", None),
+            token("expiring", 10),
+            token("expired", -3),
+            token("revoked", 200),
+            token("unreachable", 200),
+        ]
+        mock_session.return_value = _session_returning(
+            {
+                "valid": 200,
+                "permanent": 200,
+                "expiring": 200,
+                "revoked": 403,
+                "unreachable": ConnectionError("connection refused"),
+            }
+        )
+
+        report = self.manager.validate_tokens(tokens, expiring_within_days=30)
+
+        self.assertEqual(
+            [r.status for r in report.results],
+            [
+                TokenStatus.VALID,
+                TokenStatus.VALID,
+                TokenStatus.EXPIRING,
+                TokenStatus.EXPIRED,
+                TokenStatus.REVOKED,
+                TokenStatus.ERROR,
+            ],
+        )
+        self.assertEqual(
+            [t.key for t in report.needs_rotation], ["expiring", "expired", "revoked"]
+        )
+        # Expired tokens are classified without an API call
+        self.assertEqual(mock_session.return_value.get.call_count, 5)
+
+    @patch("requests.Session")
+    def test_validate_tokens_report_redacts_keys(self, mock_session):
+        """Test the structured report never contains full token keys"""
+        mock_session.return_value = _session_returning({"secret_token_key": 200})
+        token = TokenInfo(
+            "secret_token_key", None, "Outpost", "akadmin", datetime.now()
+        )
+
+        report = self.manager.validate_tokens([token]).to_dict()
+
+        self.assertEqual(report["counts"][TokenStatus.VALID], 1)
+        self.assertEqual(report["tokens"][0]["key"], "secret_t...")
+        self.assertNotIn("secret_token_key", json.dumps(report))
 
     def test_create_shell_job_manifest(self):
         """Test Kubernetes job manifest creation"""
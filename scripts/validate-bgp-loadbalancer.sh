@@ -125,105 +125,18 @@ validate_cilium_configuration() {
     fi
 }
 
-validate_service_ips() {
-    log "Validating LoadBalancer service IPs..."
+probe_load_balancers() {
+    log "Probing LoadBalancer service IPs..."
 
-    # Get all LoadBalancer services
-    services=$(kubectl get svc --all-namespaces -o json | jq -r '.items[] | select(.spec.type=="LoadBalancer") | "\(.metadata.namespace)/\(.metadata.name)/\(.status.loadBalancer.ingress[0].ip // "pending")"')
-
-    if [ -z "$services" ]; then
-        warn "No LoadBalancer services found"
-        return
-    fi
-
-    service_count=0
-    valid_ip_count=0
-
-    while IFS= read -r service_info; do
-        if [ -z "$service_info" ]; then continue; fi
-
-        namespace=$(echo "$service_info" | cut -d'/' -f1)
-        name=$(echo "$service_info" | cut -d'/' -f2)
-        ip=$(echo "$service_info" | cut -d'/' -f3)
-
-        service_count=$((service_count + 1))
-
-        if [ "$ip" = "pending" ] || [ "$ip" = "null" ]; then
-            warn "Service $namespace/$name has no IP assigned"
-        else
-            # Check if IP is in new load balancer range
-            if [[ "$ip" =~ ^172\.29\.52\. ]]; then
-                success "Service $namespace/$name has valid BGP IP: $ip"
-                valid_ip_count=$((valid_ip_count + 1))
-            else
-                warn "Service $namespace/$name has IP outside BGP range: $ip"
-            fi
-        fi
-    done <<< "$services"
-
-    log "LoadBalancer services summary: $valid_ip_count/$service_count have valid BGP IPs"
-}
-
-test_network_connectivity() {
-    log "Testing network connectivity..."
-
-    # Test connectivity to new load balancer network
-    if ping -c 1 -W 2 172.29.52.1 &> /dev/null; then
-        success "New load balancer network (172.29.52.0/24) is reachable"
+    # One list of services, IP pools and advertisements, then every LB IP is
+    # probed concurrently over TCP, HTTP and ICMP; see bgp_lb_prober.py
+    if python3 "$SCRIPT_DIR/bgp_lb_prober.py" "${PROBE_ARGS[@]+"${PROBE_ARGS[@]}"}"; then
+        success "All LoadBalancer IPs are in a pool, advertised and reachable"
     else
-        warn "New load balancer network may not be fully configured"
-    fi
-
-    # Test connectivity to load balancer IPs
-    services=$(kubectl get svc --all-namespaces -o json | jq -r '.items[] | select(.spec.type=="LoadBalancer" and .status.loadBalancer.ingress[0].ip != null) | .status.loadBalancer.ingress[0].ip')
-
-    if [ -n "$services" ]; then
-        while IFS= read -r ip; do
-            if [ -n "$ip" ] && [[ "$ip" =~ ^172\.29\.52\. ]]; then
-                if ping -c 1 -W 2 "$ip" &> /dev/null; then
-                    success "Load balancer IP $ip is reachable"
-                else
-                    warn "Load balancer IP $ip is not reachable"
-                fi
-            fi
-        done <<< "$services"
+        warn "Some LoadBalancer IPs are not pooled, advertised or reachable"
     fi
 }
 
-test_service_endpoints() {
-    log "Testing service endpoints..."
-
-    # Test common services
-    services_to_test=(
-        "longhorn-system/longhorn-frontend:80"
-        "kube-system/hubble-ui:80"
-        "monitoring/grafana:80"
-        "monitoring/prometheus:9090"
-        "monitoring/alertmanager:9093"
-    )
-
-    for service_info in "${services_to_test[@]}"; do
-        namespace=$(echo "$service_info" | cut -d'/' -f1)
-        service_port=$(echo "$service_info" | cut -d'/' -f2)
-        service_name=$(echo "$service_port" | cut -d':' -f1)
-        port=$(echo "$service_port" | cut -d':' -f2)
-
-        if kubectl get svc "$service_name" -n "$namespace" &> /dev/null; then
-            ip=$(kubectl get svc "$service_name" -n "$namespace" -o jsonpath='{.status.loadBalancer.ingress[0].ip}' 2>/dev/null || echo "")
-
-            if [ -n "$ip" ] && [ "$ip" != "null" ]; then
-                if curl -s --connect-timeout 5 "http://$ip:$port" &> /dev/null; then
-                    success "Service $namespace/$service_name is accessible at $ip:$port"
-                else
-                    warn "Service $namespace/$service_name is not accessible at $ip:$port"
-                fi
-            else
-                warn "Service $namespace/$service_name has no external IP"
-            fi
-        fi
-    done
-}
-
 validate_dns_resolution() {
     log "Validating DNS resolution..."
 
@@ -306,11 +219,13 @@ generate_validation_report() {
 main() {
     case "${1:-}" in
         --help|-h)
-            echo "Usage: $0 [--help]"
+            echo "Usage: $0 [--help] [bgp_lb_prober.py options]"
             echo "Validates BGP-only load balancer configuration"
+            echo "Options such as --samples N or --api-server URL are passed to the prober"
             exit 0
             ;;
     esac
+    PROBE_ARGS=("$@")
 
     log "Starting BGP load balancer validation..."
     echo
@@ -319,9 +234,7 @@ main() {
     validate_bgp_configuration
     validate_load_balancer_pools
     validate_cilium_configuration
-    validate_service_ips
-    test_network_connectivity
-    test_service_endpoints
+    probe_load_balancers
     validate_dns_resolution
     check_bgp_peering_status
     generate_validation_report
@@ -20,6 +20,7 @@ PROJECT_ROOT="${SCRIPT_DIR}/.."
 LOG_FILE="${PROJECT_ROOT}/backup-validation-$(date +%Y%m%d-%H%M%S).log"
 TIMEOUT_SECONDS=${TIMEOUT_SECONDS:-900}
 DRY_RUN=${DRY_RUN:-false}
+HEALTH_ARGS=()
 
 # Test configuration
 declare -A CLUSTERS
@@ -68,12 +69,10 @@ check_prerequisites() {
     fi
 
     # Check plugin availability
-    if ! kubectl get pods -n cnpg-system -l app.kubernetes.io/name=cnpg-barman-plugin &> /dev/null; then
+    local plugin_pods
+    if ! plugin_pods=$(kubectl get pods -n cnpg-system -l app.kubernetes.io/name=cnpg-barman-plugin --field-selector=status.phase=Running --no-headers 2>/dev/null | wc -l); then
         error "Barman Cloud Plugin not found - migration may not be complete"
     fi
-
-    local plugin_pods
-    plugin_pods=$(kubectl get pods -n cnpg-system -l app.kubernetes.io/name=cnpg-barman-plugin --field-selector=status.phase=Running | wc -l)
     if [[ $plugin_pods -eq 0 ]]; then
         error "No running plugin pods found"
     fi
@@ -86,78 +85,11 @@ validate_cluster_status() {
     section "CLUSTER STATUS VALIDATION"
     log "Validating cluster configurations..."
 
-    local validation_failed=false
-
-    for cluster in "${!CLUSTERS[@]}"; do
-        local namespace="${CLUSTERS[$cluster]}"
-        step "Validating cluster: $cluster ($namespace)"
-
-        # Check cluster exists and is healthy
-        if ! kubectl get cluster "$cluster" -n "$namespace" &> /dev/null; then
-            warn "Cluster $cluster not found in namespace $namespace"
-            validation_failed=true
-            continue
-        fi
-
-        local status
-        status=$(kubectl get cluster "$cluster" -n "$namespace" -o jsonpath='{.status.phase}')
-        info "Cluster Status: $status"
-
-        if [[ "$status" != "Cluster in healthy state" ]] && [[ "$status" != "Running" ]]; then
-            warn "Cluster $cluster is not healthy: $status"
-            validation_failed=true
-        fi
-
-        # Check plugin configuration
-        local plugins
-        plugins=$(kubectl get cluster "$cluster" -n "$namespace" -o jsonpath='{.spec.plugins[*].name}' 2>/dev/null || echo "None")
-        info "Configured Plugins: $plugins"
-
-        if [[ "$plugins" != *"barman-cloud.cloudnative-pg.io"* ]]; then
-            warn "Cluster $cluster missing barman-cloud plugin"
-            validation_failed=true
-        fi
-
-        # Check ObjectStore reference
-        local objectstore_name
-        objectstore_name=$(kubectl get cluster "$cluster" -n "$namespace" -o jsonpath='{.spec.plugins[?(@.name=="barman-cloud.cloudnative-pg.io")].parameters.objectStoreName}' 2>/dev/null || echo "")
-        info "ObjectStore Reference: $objectstore_name"
-
-        if [[ -z "$objectstore_name" ]]; then
-            warn "No ObjectStore configured for cluster $cluster"
-            validation_failed=true
-        else
-            # Verify ObjectStore exists
-            if kubectl get objectstore "$objectstore_name" -n "$namespace" &> /dev/null; then
-                info "✅ ObjectStore $objectstore_name exists"
-            else
-                warn "ObjectStore $objectstore_name not found"
-                validation_failed=true
-            fi
-        fi
-
-        # Check continuous archiving
-        local archiving_status
-        archiving_status=$(kubectl get cluster "$cluster" -n "$namespace" -o jsonpath='{.status.conditions[?(@.type=="ContinuousArchiving")].status}' 2>/dev/null || echo "Unknown")
-        info "Continuous Archiving: $archiving_status"
+    # One list per kind for all clusters; see cnpg_backup_health.py
+    local status=0
+    python3 "$SCRIPT_DIR/cnpg_backup_health.py" "${HEALTH_ARGS[@]+"${HEALTH_ARGS[@]}"}" | tee -a "$LOG_FILE" || status=$?
 
-        if [[ "$archiving_status" == "False" ]]; then
-            local reason
-            reason=$(kubectl get cluster "$cluster" -n "$namespace" -o jsonpath='{.status.conditions[?(@.type=="ContinuousArchiving")].message}' 2>/dev/null || echo "Unknown")
-            warn "Archiving issues: $reason"
-            validation_failed=true
-        fi
-
-        # Check for deprecated configuration
-        local has_barman_config
-        has_barman_config=$(kubectl get cluster "$cluster" -n "$namespace" -o jsonpath='{.spec.backup.barmanObjectStore}' 2>/dev/null || echo "")
-        if [[ -n "$has_barman_config" ]]; then
-            warn "Cluster $cluster still has deprecated barmanObjectStore configuration"
-            validation_failed=true
-        fi
-    done
-
-    if [[ "$validation_failed" == "true" ]]; then
+    if [[ $status -ne 0 ]]; then
         error "Cluster validation failed - fix issues before testing backups"
     fi
 
@@ -506,35 +438,12 @@ This report validates the backup functionality after migrating from deprecated \
 
 EOF
 
-    for cluster in "${!CLUSTERS[@]}"; do
-        local namespace="${CLUSTERS[$cluster]}"
-
-        cat >> "$report_file" <<EOF
-### Cluster: $cluster ($namespace)
-
-EOF
-
-        if kubectl get cluster "$cluster" -n "$namespace" &> /dev/null; then
-            local status plugins archiving_status objectstore_name
-            status=$(kubectl get cluster "$cluster" -n "$namespace" -o jsonpath='{.status.phase}')
-            plugins=$(kubectl get cluster "$cluster" -n "$namespace" -o jsonpath='{.spec.plugins[*].name}' 2>/dev/null || echo "None")
-            archiving_status=$(kubectl get cluster "$cluster" -n "$namespace" -o jsonpath='{.status.conditions[?(@.type=="ContinuousArchiving")].status}' 2>/dev/null || echo "Unknown")
-            objectstore_name=$(kubectl get cluster "$cluster" -n "$namespace" -o jsonpath='{.spec.plugins[?(@.name=="barman-cloud.cloudnative-pg.io")].parameters.objectStoreName}' 2>/dev/null || echo "")
-
-            cat >> "$report_file" <<EOF
-- **Status:** $status
-- **Plugins:** $plugins
-- **ObjectStore:** $objectstore_name
-- **Continuous Archiving:** $archiving_status
-
-EOF
-        else
-            cat >> "$report_file" <<EOF
-- **Status:** Cluster not found
+    cat >> "$report_file" <<EOF
+\`\`\`text
+$(python3 "$SCRIPT_DIR/cnpg_backup_health.py" "${HEALTH_ARGS[@]+"${HEALTH_ARGS[@]}"}" 2>&1 || true)
+\`\`\`
 
 EOF
-        fi
-    done
 
     cat >> "$report_file" <<EOF
 ## Backup Tests
@@ -592,6 +501,8 @@ COMMANDS:
 OPTIONS:
     --dry-run              Perform validation without creating backups
     --timeout SECONDS      Set timeout for backup operations (default: 900)
+    --api-server URL       Collect cluster status from this Kubernetes API URL
+                           (e.g. kubectl proxy) instead of the Flux MCP server
 
 ENVIRONMENT VARIABLES:
     DRY_RUN=true           Perform dry run validation
@@ -634,6 +545,10 @@ main() {
                 TIMEOUT_SECONDS="$2"
                 shift 2
                 ;;
+            --api-server)
+                HEALTH_ARGS+=(--api-server "$2")
+                shift 2
+                ;;
             validate|status|test|report|help)
                 command="$1"
                 shift
@@ -14,6 +14,7 @@ MAGENTA='\033[0;35m'
 NC='\033[0m' # No Color
 
 # Configuration
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 NODES=("mini01" "mini02" "mini03")
 NODE_IPS=("172.29.51.11" "172.29.51.12" "172.29.51.13")
 MOUNT_POINT="/var/lib/longhorn-ssd"
@@ -314,9 +315,9 @@ validate_usb_mounting() {
     return 0
 }
 
-# Validate Longhorn deployment
-validate_longhorn_deployment() {
-    log_section "Longhorn Deployment Validation"
+# Validate Longhorn workloads, disk discovery and settings
+validate_longhorn_inventory() {
+    log_section "Longhorn Inventory Validation"
 
     log_test "Checking Longhorn namespace"
     if kubectl get namespace longhorn-system &> /dev/null; then
@@ -326,143 +327,18 @@ validate_longhorn_deployment() {
         return 1
     fi
 
-    log_test "Checking Longhorn manager deployment"
-    local manager_ready
-    manager_ready=$(kubectl get deployment longhorn-manager -n longhorn-system -o jsonpath='{.status.readyReplicas}' 2>/dev/null || echo "0")
-    local manager_desired
-    manager_desired=$(kubectl get deployment longhorn-manager -n longhorn-system -o jsonpath='{.spec.replicas}' 2>/dev/null || echo "1")
+    # One list per kind for all nodes and disks; see longhorn_ssd_inventory.py
+    log_test "Checking Longhorn workloads, Samsung Portable SSD T5 disks and settings"
+    local status=0
+    python3 "$SCRIPT_DIR/longhorn_ssd_inventory.py" | tee -a "$REPORT_FILE" || status=$?
 
-    if [[ "$manager_ready" == "$manager_desired" ]] && [[ "$manager_ready" -gt 0 ]]; then
-        log_success "Longhorn manager is ready ($manager_ready/$manager_desired replicas)"
+    if [[ $status -eq 0 ]]; then
+        log_success "Longhorn Samsung Portable SSD T5 inventory is healthy"
     else
-        log_error "Longhorn manager not ready ($manager_ready/$manager_desired replicas)"
+        log_error "Longhorn Samsung Portable SSD T5 inventory has failures"
         return 1
     fi
 
-    log_test "Checking Longhorn driver deployment"
-    local driver_ready
-    driver_ready=$(kubectl get daemonset longhorn-driver-deployer -n longhorn-system -o jsonpath='{.status.numberReady}' 2>/dev/null || echo "0")
-    local driver_desired
-    driver_desired=$(kubectl get daemonset longhorn-driver-deployer -n longhorn-system -o jsonpath='{.status.desiredNumberScheduled}' 2>/dev/null || echo "1")
-
-    if [[ "$driver_ready" == "$driver_desired" ]] && [[ "$driver_ready" -gt 0 ]]; then
-        log_success "Longhorn driver is ready ($driver_ready/$driver_desired pods)"
-    else
-        log_error "Longhorn driver not ready ($driver_ready/$driver_desired pods)"
-        return 1
-    fi
-
-    log_test "Checking Longhorn instance manager"
-    local im_pods
-    im_pods=$(kubectl get pods -n longhorn-system -l app=longhorn-instance-manager --no-headers 2>/dev/null | wc -l || echo "0")
-    local im_running
-    im_running=$(kubectl get pods -n longhorn-system -l app=longhorn-instance-manager --no-headers 2>/dev/null | grep -c "Running" || echo "0")
-
-    if [[ "$im_running" -gt 0 ]] && [[ "$im_running" == "$im_pods" ]]; then
-        log_success "Longhorn instance managers are running ($im_running/$im_pods)"
-    else
-        log_warning "Some Longhorn instance managers not running ($im_running/$im_pods)"
-    fi
-
-    return 0
-}
-
-# Validate Longhorn disk discovery
-validate_longhorn_disks() {
-    log_section "Longhorn Disk Discovery Validation"
-
-    log_test "Checking Longhorn nodes"
-    local longhorn_nodes
-    longhorn_nodes=$(kubectl get nodes.longhorn.io -n longhorn-system -o jsonpath='{.items[*].metadata.name}' 2>/dev/null || echo "")
-
-    if [[ -z "$longhorn_nodes" ]]; then
-        log_error "No Longhorn nodes found"
-        return 1
-    fi
-
-    log_success "Longhorn nodes found: $longhorn_nodes"
-
-    local total_disks=0
-    local ssd_disks=0
-    local ready_ssd_disks=0
-
-    for node in $longhorn_nodes; do
-        log_test "Checking disks on Longhorn node: $node"
-
-        # Get all disks for this node
-        local node_disks
-        node_disks=$(kubectl get disks.longhorn.io -n longhorn-system -l longhornnode="$node" -o jsonpath='{.items[*].metadata.name}' 2>/dev/null || echo "")
-
-        if [[ -z "$node_disks" ]]; then
-            log_warning "No disks found for node $node"
-            continue
-        fi
-
-        for disk in $node_disks; do
-            ((total_disks++))
-
-            local disk_path
-            disk_path=$(kubectl get disk.longhorn.io "$disk" -n longhorn-system -o jsonpath='{.spec.path}' 2>/dev/null || echo "")
-
-            local disk_tags
-            disk_tags=$(kubectl get disk.longhorn.io "$disk" -n longhorn-system -o jsonpath='{.spec.tags[*]}' 2>/dev/null || echo "")
-
-            local disk_ready
-            disk_ready=$(kubectl get disk.longhorn.io "$disk" -n longhorn-system -o jsonpath='{.status.conditions[?(@.type=="Ready")].status}' 2>/dev/null || echo "False")
-
-            local disk_schedulable
-            disk_schedulable=$(kubectl get disk.longhorn.io "$disk" -n longhorn-system -o jsonpath='{.status.conditions[?(@.type=="Schedulable")].status}' 2>/dev/null || echo "False")
-
-            log_info "  Disk: $disk"
-            log_info "    Path: $disk_path"
-            log_info "    Tags: $disk_tags"
-            log_info "    Ready: $disk_ready"
-            log_info "    Schedulable: $disk_schedulable"
-
-            # Check if this is an SSD disk
-            if [[ "$disk_path" == "$MOUNT_POINT" ]] && [[ "$disk_tags" == *"ssd"* ]]; then
-                ((ssd_disks++))
-                log_success "    Samsung Portable SSD T5 disk identified"
-
-                if [[ "$disk_ready" == "True" ]] && [[ "$disk_schedulable" == "True" ]]; then
-                    ((ready_ssd_disks++))
-                    log_success "    Samsung Portable SSD T5 disk is ready and schedulable"
-                else
-                    log_warning "    Samsung Portable SSD T5 disk is not ready or not schedulable"
-                fi
-
-                # Check disk space
-                local disk_storage
-                disk_storage=$(kubectl get disk.longhorn.io "$disk" -n longhorn-system -o jsonpath='{.spec.storageReserved}' 2>/dev/null || echo "0")
-                local disk_max_storage
-                disk_max_storage=$(kubectl get disk.longhorn.io "$disk" -n longhorn-system -o jsonpath='{.status.storageMaximum}' 2>/dev/null || echo "0")
-                local disk_available
-                disk_available=$(kubectl get disk.longhorn.io "$disk" -n longhorn-system -o jsonpath='{.status.storageAvailable}' 2>/dev/null || echo "0")
-
-                log_info "    Storage Maximum: $disk_max_storage bytes"
-                log_info "    Storage Available: $disk_available bytes"
-                log_info "    Storage Reserved: $disk_storage bytes"
-            fi
-        done
-    done
-
-    log_test "Overall Longhorn disk status"
-    log_info "Total disks: $total_disks"
-    log_info "SSD disks: $ssd_disks"
-    log_info "Ready SSD disks: $ready_ssd_disks"
-
-    if [[ $ssd_disks -eq 0 ]]; then
-        log_error "No Samsung Portable SSD T5 disks found in Longhorn"
-        return 1
-    elif [[ $ready_ssd_disks -eq 0 ]]; then
-        log_error "No ready Samsung Portable SSD T5 disks found in Longhorn"
-        return 1
-    elif [[ $ready_ssd_disks -eq $ssd_disks ]]; then
-        log_success "All Samsung Portable SSD T5 disks are ready in Longhorn"
-    else
-        log_warning "Some Samsung Portable SSD T5 disks are not ready in Longhorn ($ready_ssd_disks/$ssd_disks)"
-    fi
-
     return 0
 }
 
@@ -779,47 +655,6 @@ EOF
     return 0
 }
 
-# Validate Longhorn settings
-validate_longhorn_settings() {
-    log_section "Longhorn Settings Validation"
-
-    log_test "Checking createDefaultDiskLabeledNodes setting"
-    local create_default_disks
-    create_default_disks=$(kubectl get setting create-default-disk-labeled-nodes -n longhorn-system -o jsonpath='{.value}' 2>/dev/null || echo "true")
-
-    if [[ "$create_default_disks" == "false" ]]; then
-        log_success "createDefaultDiskLabeledNodes is disabled (correct for Samsung Portable SSD T5 setup)"
-    else
-        log_warning "createDefaultDiskLabeledNodes is enabled (should be false for Samsung Portable SSD T5 setup)"
-    fi
-
-    log_test "Checking storage over-provisioning setting"
-    local storage_over_provisioning
-    storage_over_provisioning=$(kubectl get setting storage-over-provisioning-percentage -n longhorn-system -o jsonpath='{.value}' 2>/dev/null || echo "200")
-
-    log_info "Storage over-provisioning percentage: $storage_over_provisioning%"
-
-    if [[ $storage_over_provisioning -le 150 ]]; then
-        log_success "Storage over-provisioning is optimized for SSDs"
-    else
-        log_warning "Storage over-provisioning might be too high for SSDs"
-    fi
-
-    log_test "Checking storage minimal available setting"
-    local storage_minimal
-    storage_minimal=$(kubectl get setting storage-minimal-available-percentage -n longhorn-system -o jsonpath='{.value}' 2>/dev/null || echo "25")
-
-    log_info "Storage minimal available percentage: $storage_minimal%"
-
-    if [[ $storage_minimal -le 20 ]]; then
-        log_success "Storage minimal available is optimized for SSDs"
-    else
-        log_warning "Storage minimal available might be too high for SSDs"
-    fi
-
-    return 0
-}
-
 # Integration with existing validation scripts
 run_existing_validations() {
     log_section "Running Existing Validation Scripts"
@@ -922,13 +757,11 @@ main() {
     check_prerequisites || exit_code=1
     validate_usb_hardware || exit_code=1
     validate_usb_mounting || exit_code=1
-    validate_longhorn_deployment || exit_code=1
-    validate_longhorn_disks || exit_code=1
+    validate_longhorn_inventory || exit_code=1
     validate_storage_classes || exit_code=1
     test_storage_functionality || exit_code=1
     validate_performance || exit_code=1
     test_failover_scenarios || exit_code=1
-    validate_longhorn_settings || exit_code=1
     run_existing_validations || exit_code=1
 
     # Calculate validation time
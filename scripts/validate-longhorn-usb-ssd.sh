@@ -12,6 +12,8 @@ YELLOW='\033[1;33m'
 BLUE='\033[0;34m'
 NC='\033[0m' # No Color
 
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+
 # Logging functions
 log_info() {
     echo -e "${BLUE}[INFO]${NC} $1"
@@ -51,100 +53,16 @@ check_prerequisites() {
     log_success "Prerequisites check passed"
 }
 
-# Check Longhorn deployment status
-check_longhorn_status() {
-    log_info "Checking Longhorn deployment status..."
-
-    # Check if Longhorn manager is running
-    if ! kubectl get deployment longhorn-manager -n longhorn-system &> /dev/null; then
-        log_error "Longhorn manager deployment not found"
-        return 1
-    fi
+# Check Longhorn workloads, nodes, Samsung Portable SSD T5 disks and settings
+check_longhorn_inventory() {
+    log_info "Checking Longhorn workloads, nodes, Samsung Portable SSD T5 disks and settings..."
 
-    local ready_replicas
-    ready_replicas=$(kubectl get deployment longhorn-manager -n longhorn-system -o jsonpath='{.status.readyReplicas}' 2>/dev/null || echo "0")
-    local desired_replicas
-    desired_replicas=$(kubectl get deployment longhorn-manager -n longhorn-system -o jsonpath='{.spec.replicas}' 2>/dev/null || echo "1")
-
-    if [[ "$ready_replicas" != "$desired_replicas" ]]; then
-        log_warning "Longhorn manager not fully ready ($ready_replicas/$desired_replicas replicas)"
+    # One list per kind for all nodes and disks; see longhorn_ssd_inventory.py
+    if python3 "$SCRIPT_DIR/longhorn_ssd_inventory.py" "$@"; then
+        log_success "Longhorn Samsung Portable SSD T5 inventory is healthy"
     else
-        log_success "Longhorn manager is running ($ready_replicas/$desired_replicas replicas)"
-    fi
-
-    # Check Longhorn driver
-    local driver_ready
-    driver_ready=$(kubectl get daemonset longhorn-driver-deployer -n longhorn-system -o jsonpath='{.status.numberReady}' 2>/dev/null || echo "0")
-    local driver_desired
-    driver_desired=$(kubectl get daemonset longhorn-driver-deployer -n longhorn-system -o jsonpath='{.status.desiredNumberScheduled}' 2>/dev/null || echo "1")
-
-    if [[ "$driver_ready" != "$driver_desired" ]]; then
-        log_warning "Longhorn driver not fully ready ($driver_ready/$driver_desired pods)"
-    else
-        log_success "Longhorn driver is running ($driver_ready/$driver_desired pods)"
-    fi
-}
-
-# Check Longhorn nodes and Samsung Portable SSD T5 disks
-check_longhorn_nodes() {
-    log_info "Checking Longhorn nodes and Samsung Portable SSD T5 disks..."
-
-    local nodes
-    nodes=$(kubectl get nodes.longhorn.io -n longhorn-system -o jsonpath='{.items[*].metadata.name}' 2>/dev/null || echo "")
-
-    if [[ -z "$nodes" ]]; then
-        log_error "No Longhorn nodes found"
-        return 1
-    fi
-
-    log_success "Found Longhorn nodes: $nodes"
-
-    # Check for Samsung Portable SSD T5 disks
-    local ssd_disks=0
-    local total_disks=0
-
-    for node in $nodes; do
-        log_info "Checking disks on node: $node"
-
-        local node_disks
-        node_disks=$(kubectl get disks.longhorn.io -n longhorn-system -l longhornnode="$node" -o jsonpath='{.items[*].metadata.name}' 2>/dev/null || echo "")
-
-        for disk in $node_disks; do
-            total_disks=$((total_disks + 1))
-
-            local disk_path
-            disk_path=$(kubectl get disk.longhorn.io "$disk" -n longhorn-system -o jsonpath='{.spec.path}' 2>/dev/null || echo "")
-
-            local disk_tags
-            disk_tags=$(kubectl get disk.longhorn.io "$disk" -n longhorn-system -o jsonpath='{.spec.tags[*]}' 2>/dev/null || echo "")
-
-            local disk_ready
-            disk_ready=$(kubectl get disk.longhorn.io "$disk" -n longhorn-system -o jsonpath='{.status.conditions[?(@.type=="Ready")].status}' 2>/dev/null || echo "False")
-
-            log_info "  Disk: $disk"
-            log_info "    Path: $disk_path"
-            log_info "    Tags: $disk_tags"
-            log_info "    Ready: $disk_ready"
-
-            if [[ "$disk_path" == "/var/lib/longhorn-ssd" ]] && [[ "$disk_tags" == *"ssd"* ]]; then
-                ssd_disks=$((ssd_disks + 1))
-                if [[ "$disk_ready" == "True" ]]; then
-                    log_success "    Samsung Portable SSD T5 disk is ready"
-                else
-                    log_warning "    Samsung Portable SSD T5 disk is not ready"
-                fi
-            fi
-        done
-    done
-
-    log_info "Total disks found: $total_disks"
-    log_info "Samsung Portable SSD T5 disks found: $ssd_disks"
-
-    if [[ $ssd_disks -eq 0 ]]; then
-        log_error "No Samsung Portable SSD T5 disks found with path '/var/lib/longhorn-ssd' and 'ssd' tag"
+        log_error "Longhorn Samsung Portable SSD T5 inventory has failures"
         return 1
-    else
-        log_success "Found $ssd_disks Samsung Portable SSD T5 disk(s)"
     fi
 }
 
@@ -284,45 +202,6 @@ EOF
     kubectl delete pvc "$test_pvc" -n "$test_namespace" --ignore-not-found=true
 }
 
-# Check Longhorn settings
-check_longhorn_settings() {
-    log_info "Checking Longhorn settings..."
-
-    # Check if createDefaultDiskLabeledNodes is disabled
-    local create_default_disks
-    create_default_disks=$(kubectl get setting create-default-disk-labeled-nodes -n longhorn-system -o jsonpath='{.value}' 2>/dev/null || echo "true")
-
-    if [[ "$create_default_disks" == "false" ]]; then
-        log_success "createDefaultDiskLabeledNodes is disabled (correct for Samsung Portable SSD T5 setup)"
-    else
-        log_warning "createDefaultDiskLabeledNodes is enabled (should be false for Samsung Portable SSD T5 setup)"
-    fi
-
-    # Check storage over-provisioning
-    local storage_over_provisioning
-    storage_over_provisioning=$(kubectl get setting storage-over-provisioning-percentage -n longhorn-system -o jsonpath='{.value}' 2>/dev/null || echo "200")
-
-    log_info "Storage over-provisioning percentage: $storage_over_provisioning%"
-
-    if [[ $storage_over_provisioning -le 150 ]]; then
-        log_success "Storage over-provisioning is optimized for SSDs"
-    else
-        log_warning "Storage over-provisioning might be too high for SSDs"
-    fi
-
-    # Check storage minimal available
-    local storage_minimal
-    storage_minimal=$(kubectl get setting storage-minimal-available-percentage -n longhorn-system -o jsonpath='{.value}' 2>/dev/null || echo "25")
-
-    log_info "Storage minimal available percentage: $storage_minimal%"
-
-    if [[ $storage_minimal -le 20 ]]; then
-        log_success "Storage minimal available is optimized for SSDs"
-    else
-        log_warning "Storage minimal available might be too high for SSDs"
-    fi
-}
-
 # Main validation function
 main() {
     echo "=============================================="
@@ -336,10 +215,7 @@ main() {
     check_prerequisites || exit_code=1
     echo
 
-    check_longhorn_status || exit_code=1
-    echo
-
-    check_longhorn_nodes || exit_code=1
+    check_longhorn_inventory "$@" || exit_code=1
     echo
 
     check_storage_classes || exit_code=1
@@ -348,9 +224,6 @@ main() {
     check_snapshot_classes || exit_code=1
     echo
 
-    check_longhorn_settings || exit_code=1
-    echo
-
     test_usb_ssd_storage || exit_code=1
     echo
 
@@ -3,6 +3,12 @@
 
 set -euo pipefail
 
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+TEST_DIR="/tmp/idempotency-test"
+# Namespaces apps:deploy-core deploys into; cluster-scoped objects are always captured
+CORE_NAMESPACES=(kube-system external-secrets-system onepassword-connect longhorn-system)
+SNAPSHOT_ARGS=()
+
 # Colors for output
 RED='\033[0;31m'
 GREEN='\033[0;32m'
@@ -39,6 +45,10 @@ check_prerequisites() {
         error "task is not installed or not in PATH"
     fi
 
+    if ! command -v python3 &> /dev/null; then
+        error "python3 is not installed or not in PATH"
+    fi
+
     if ! kubectl get namespaces &> /dev/null; then
         error "Kubernetes cluster is not accessible"
     fi
@@ -46,11 +56,29 @@ check_prerequisites() {
     success "All prerequisites met"
 }
 
+# Snapshot the core namespaces and cluster-scoped objects
+capture_snapshot() {
+    local run_number=$1
+    local snapshot="$TEST_DIR/snapshot-${run_number}.jsonl.gz"
+    local namespace_args=()
+    local namespace
+
+    for namespace in "${CORE_NAMESPACES[@]}"; do
+        namespace_args+=(--namespace "$namespace")
+    done
+
+    if ! python3 "$SCRIPT_DIR/cluster_snapshot.py" capture "$snapshot" "${namespace_args[@]}" \
+        "${SNAPSHOT_ARGS[@]+"${SNAPSHOT_ARGS[@]}"}"; then
+        warn "Snapshot $snapshot is incomplete; some kinds could not be listed"
+    fi
+}
+
 # Capture cluster state before test
 capture_initial_state() {
     log "Capturing initial cluster state..."
 
-    mkdir -p /tmp/idempotency-test
+    mkdir -p "$TEST_DIR"
+    capture_snapshot 0
 
     # Capture resource counts
     kubectl get all --all-namespaces > /tmp/idempotency-test/initial-resources.txt
@@ -189,25 +217,24 @@ verify_component_health() {
     return $health_issues
 }
 
-# Compare states between runs
+# Compare the snapshots taken after two runs, keyed by object
 compare_states() {
     local run1=$1
     local run2=$2
     log "Comparing cluster state between run $run1 and run $run2..."
 
-    # Compare resource counts
-    local resources1="/tmp/idempotency-test/run-${run1}-resources.txt"
-    local resources2="/tmp/idempotency-test/run-${run2}-resources.txt"
-
-    kubectl get all --all-namespaces > "$resources1"
-    kubectl get all --all-namespaces > "$resources2"
+    local diff_file="$TEST_DIR/diff-${run1}-${run2}.txt"
 
-    if diff -q "$resources1" "$resources2" > /dev/null; then
-        success "Resource state identical between run $run1 and run $run2"
-    else
-        warn "Resource state differences found between run $run1 and run $run2"
-        diff "$resources1" "$resources2" | head -20 || true
+    if python3 "$SCRIPT_DIR/cluster_snapshot.py" diff \
+        "$TEST_DIR/snapshot-${run1}.jsonl.gz" "$TEST_DIR/snapshot-${run2}.jsonl.gz" > "$diff_file"; then
+        success "No objects re-created or changed between run $run1 and run $run2"
+        tail -1 "$diff_file" | sed 's/^/  /'
+        return 0
     fi
+
+    warn "Run $run2 re-created or changed objects left by run $run1:"
+    head -40 "$diff_file"
+    return 1
 }
 
 # Wait for components to stabilize
@@ -227,6 +254,7 @@ main() {
 
     local total_runs=3
     local health_issues_total=0
+    local state_changes_total=0
 
     # Run multiple iterations
     for run in $(seq 1 $total_runs); do
@@ -235,15 +263,18 @@ main() {
 
         run_deploy_core "$run"
         wait_for_stabilization 30
+        capture_snapshot "$run"
         check_resource_conflicts "$run"
 
         if ! verify_component_health "$run"; then
-            ((health_issues_total++))
+            health_issues_total=$((health_issues_total + 1))
         fi
 
         # Compare with previous run
         if [[ "$run" -gt 1 ]]; then
-            compare_states $((run-1)) "$run"
+            if ! compare_states $((run-1)) "$run"; then
+                state_changes_total=$((state_changes_total + 1))
+            fi
         fi
 
         echo ""
@@ -253,14 +284,15 @@ main() {
     echo ""
     log "=== Idempotency Test Results ==="
 
-    if [[ "$health_issues_total" -eq 0 ]]; then
+    if [[ "$health_issues_total" -eq 0 && "$state_changes_total" -eq 0 ]]; then
         success "✅ IDEMPOTENCY TEST PASSED"
         success "apps:deploy-core can be run multiple times safely"
-        success "No resource conflicts or health issues detected"
+        success "No resource conflicts, state changes or health issues detected"
     else
         warn "⚠️ IDEMPOTENCY TEST COMPLETED WITH WARNINGS"
         warn "Found $health_issues_total health issues across $total_runs runs"
-        warn "Review logs in /tmp/idempotency-test/ for details"
+        warn "Found $state_changes_total repeat runs that re-created or changed objects"
+        warn "Review logs in $TEST_DIR/ for details"
     fi
 
     echo ""
@@ -268,7 +300,8 @@ main() {
     log "Review the following files for detailed analysis:"
     echo "  - /tmp/idempotency-test/run-*-output.txt (task output)"
     echo "  - /tmp/idempotency-test/run-*-errors.txt (error logs)"
-    echo "  - /tmp/idempotency-test/run-*-resources.txt (resource states)"
+    echo "  - /tmp/idempotency-test/snapshot-*.jsonl.gz (cluster snapshots, 0 is before the first run)"
+    echo "  - /tmp/idempotency-test/diff-*.txt (objects re-created or changed between runs)"
     echo ""
 
     # Cleanup option
@@ -280,5 +313,22 @@ main() {
     fi
 }
 
+while [[ $# -gt 0 ]]; do
+    case $1 in
+        --api-server)
+            # Snapshot through this Kubernetes API URL (e.g. kubectl proxy) instead of the Flux MCP server
+            SNAPSHOT_ARGS+=(--api-server "$2")
+            shift 2
+            ;;
+        -h|--help)
+            echo "Usage: $0 [--api-server URL]"
+            exit 0
+            ;;
+        *)
+            error "Unknown option: $1"
+            ;;
+    esac
+done
+
 # Run main function
-main "$@"
+main
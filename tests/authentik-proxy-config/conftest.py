@@ -0,0 +1,26 @@
+"""
+Shared pytest configuration for the authentik-proxy configuration tests
+"""
+
+import os
+import sys
+
+import pytest
+
+SERVICE_CATALOG_PATH = os.path.join(
+    os.path.dirname(__file__),
+    "../../infrastructure/authentik-proxy/service-catalog.json",
+)
+
+# The Jobs import bundled modules from gitops-tools.pyz; use their sources here
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(__file__), "../../scripts/authentik-proxy-config"),
+)
+
+
+@pytest.fixture(autouse=True)
+def service_catalog_path(monkeypatch):
+    """Point the embedded Job scripts at the repository service catalog"""
+    monkeypatch.setenv("SERVICE_CATALOG_PATH", SERVICE_CATALOG_PATH)
+    return SERVICE_CATALOG_PATH
@@ -0,0 +1,148 @@
+"""
+Parsed-manifest cache shared by the embedded-script tests
+
+Several test classes read the same Job manifests: some load the YAML, others
+pull the Python script out of the `cat > /tmp/x.py << 'EOF'` heredoc and
+parse, compile or exec it. Doing that in per-test fixtures re-reads and
+re-parses the manifest for every test. Everything here is cached for the
+test session instead, so each manifest is read and parsed once, each embedded
+script is extracted once, and each script is compiled and parsed to an AST
+once no matter how many tests use it.
+
+YAML is loaded with the libyaml-backed CSafeLoader when PyYAML was built
+with it, falling back to the pure-Python SafeLoader.
+
+Cached objects are shared between tests: treat the loaded documents and ASTs
+as read-only and exec compiled scripts into a fresh namespace (exec_script
+does that).
+"""
+
+import ast
+import functools
+import os
+import re
+from types import CodeType
+from typing import Any, Callable, Dict, List, Optional
+
+import yaml
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Called with the absolute path on every lookup, cached or not, so tools such
+# as the incremental test runner can see which manifests a test depends on
+ACCESS_HOOKS: List[Callable[[str], None]] = []
+
+# `cat > /tmp/configure_proxy.py << 'EOF'` and the unquoted/<<- variants
+_HEREDOC_START = re.compile(
+    r"^(?P<indent>\s*)cat\s+>\s*(?P<target>\S+)\s+<<-?\s*"
+    r"(?P<quote>['\"]?)(?P<delimiter>\w+)(?P=quote)\s*$"
+)
+
+
+def manifest_path(path: str) -> str:
+    """Resolve a manifest path relative to the repository root."""
+    resolved = os.path.normpath(os.path.join(REPO_ROOT, path))
+    for hook in ACCESS_HOOKS:
+        hook(resolved)
+    return resolved
+
+
+@functools.lru_cache(maxsize=None)
+def _read(path: str) -> str:
+    with open(path, "r") as f:
+        return f.read()
+
+
+def read_manifest(path: str) -> str:
+    """Return the raw text of a manifest."""
+    return _read(manifest_path(path))
+
+
+@functools.lru_cache(maxsize=None)
+def _load_all(path: str) -> List[Any]:
+    return [doc for doc in yaml.load_all(_read(path), Loader=YAML_LOADER) if doc]
+
+
+def load_documents(path: str) -> List[Any]:
+    """Return every non-empty YAML document in a manifest."""
+    return _load_all(manifest_path(path))
+
+
+def load_manifest(path: str) -> Any:
+    """Return the first YAML document in a manifest."""
+    documents = load_documents(path)
+    return documents[0] if documents else None
+
+
+@functools.lru_cache(maxsize=None)
+def _scripts(path: str) -> Dict[str, str]:
+    scripts: Dict[str, str] = {}
+    lines = _read(path).split("\n")
+    index = 0
+    while index < len(lines):
+        match = _HEREDOC_START.match(lines[index])
+        index += 1
+        if not match:
+            continue
+
+        indent = match.group("indent")
+        delimiter = match.group("delimiter")
+        body = []
+        while index < len(lines) and lines[index].strip() != delimiter:
+            line = lines[index]
+            # The block scalar indentation is the heredoc line's indentation
+            body.append(line[len(indent) :] if line.startswith(indent) else line)
+            index += 1
+        index += 1
+        scripts[match.group("target")] = "\n".join(body).strip()
+    return scripts
+
+
+def embedded_scripts(path: str) -> Dict[str, str]:
+    """Return every heredoc-embedded script in a manifest, keyed by target file."""
+    return _scripts(manifest_path(path))
+
+
+def embedded_script(path: str, target: str) -> str:
+    """Return the heredoc script written to target, e.g. /tmp/configure_proxy.py."""
+    scripts = embedded_scripts(path)
+    if target not in scripts:
+        raise KeyError(f"No heredoc writing {target} in {path}")
+    return scripts[target]
+
+
+@functools.lru_cache(maxsize=None)
+def _compiled(path: str, target: str) -> CodeType:
+    return compile(embedded_script(path, target), f"{path}:{target}", "exec")
+
+
+def compiled_script(path: str, target: str) -> CodeType:
+    """Return the compiled code object of an embedded Python script."""
+    return _compiled(manifest_path(path), target)
+
+
+@functools.lru_cache(maxsize=None)
+def _tree(path: str, target: str) -> ast.Module:
+    return ast.parse(embedded_script(path, target), f"{path}:{target}")
+
+
+def script_ast(path: str, target: str) -> ast.Module:
+    """Return the AST of an embedded Python script (shared, do not modify)."""
+    return _tree(manifest_path(path), target)
+
+
+def exec_script(
+    path: str, target: str, namespace: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Exec an embedded script's cached code object into a fresh namespace."""
+    namespace = {} if namespace is None else namespace
+    exec(compiled_script(path, target), namespace)
+    return namespace
+
+
+def clear():
+    """Drop every cached manifest, script, code object and AST."""
+    for cached in (_read, _load_all, _scripts, _compiled, _tree):
+        cached.cache_clear()
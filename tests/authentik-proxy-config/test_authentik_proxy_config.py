@@ -12,7 +12,10 @@ import os
 from unittest.mock import patch
 
 import pytest
-import yaml
+
+from manifest_cache import compiled_script, load_manifest, script_ast
+
+SCRIPT = "/tmp/configure_proxy.py"
 
 
 class TestAuthentikProxyScript:
@@ -25,7 +28,7 @@ class TestAuthentikProxyScript:
             os.path.dirname(__file__),
             "../../infrastructure/authentik-proxy/proxy-config-job-python.yaml",
         )
-        self.python_script = self._extract_python_script()
+        self.python_code = compiled_script(self.yaml_file_path, SCRIPT)
 
         # Sample test data
         self.sample_outposts = [
@@ -49,43 +52,10 @@ class TestAuthentikProxyScript:
             },
         ]
 
-    def _extract_python_script(self):
-        """Extract the Python script from the YAML file"""
-        with open(self.yaml_file_path, "r") as f:
-            content = f.read()
-
-        # Find the Python script between EOF markers
-        start_marker = "cat > /tmp/configure_proxy.py << 'EOF'"
-        end_marker = "EOF"
-
-        start_idx = content.find(start_marker)
-        assert start_idx != -1, "Could not find start marker in YAML"
-
-        start_idx = content.find("\n", start_idx) + 1
-        end_idx = content.find(end_marker, start_idx)
-        assert end_idx != -1, "Could not find end marker in YAML"
-
-        python_script = content[start_idx:end_idx].strip()
-
-        # Remove the common indentation (14 spaces)
-        lines = python_script.split("\n")
-        cleaned_lines = []
-        for line in lines:
-            if line.strip():  # Non-empty line
-                if line.startswith("              "):  # Remove 14 spaces
-                    cleaned_lines.append(line[14:])
-                else:
-                    cleaned_lines.append(line)
-            else:  # Empty line
-                cleaned_lines.append("")
-
-        return "\n".join(cleaned_lines)
-
     @pytest.mark.syntax
     def test_yaml_structure_valid(self):
         """Test that the YAML file has valid structure"""
-        with open(self.yaml_file_path, "r") as f:
-            yaml_content = yaml.safe_load(f)
+        yaml_content = load_manifest(self.yaml_file_path)
 
         # Verify basic Kubernetes Job structure
         assert yaml_content.get("kind") == "Job"
@@ -103,7 +73,7 @@ class TestAuthentikProxyScript:
     def test_python_script_syntax_valid(self):
         """Test that the embedded Python script has valid syntax"""
         try:
-            ast.parse(self.python_script)
+            script_ast(self.yaml_file_path, SCRIPT)
         except SyntaxError as e:
             pytest.fail(f"Python script has syntax error: {e}")
 
@@ -111,7 +81,7 @@ class TestAuthentikProxyScript:
     def test_python_script_contains_required_classes(self):
         """Test that the script contains all required classes and methods"""
         # Parse the AST to find class and method definitions
-        tree = ast.parse(self.python_script)
+        tree = script_ast(self.yaml_file_path, SCRIPT)
 
         classes = {}
         functions = []
@@ -164,7 +134,7 @@ class TestAuthentikProxyScript:
         """Test ServiceConfig dataclass properties"""
         # Execute the script in a temporary namespace to test the classes
         namespace = {}
-        exec(self.python_script, namespace)
+        exec(self.python_code, namespace)
 
         ServiceConfig = namespace["ServiceConfig"]
 
@@ -183,7 +153,7 @@ class TestAuthentikProxyScript:
     def test_authentik_config_dataclass(self):
         """Test AuthentikConfig dataclass"""
         namespace = {}
-        exec(self.python_script, namespace)
+        exec(self.python_code, namespace)
 
         AuthentikConfig = namespace["AuthentikConfig"]
 
@@ -204,7 +174,7 @@ class TestAuthentikProxyScript:
     def test_service_configurations(self):
         """Test that all required services are configured"""
         namespace = {}
-        exec(self.python_script, namespace)
+        exec(self.python_code, namespace)
 
         AuthentikConfig = namespace["AuthentikConfig"]
         AuthentikProxyConfigurator = namespace["AuthentikProxyConfigurator"]
@@ -237,11 +207,39 @@ class TestAuthentikProxyScript:
         expected_host = "kube-prometheus-stack-grafana.monitoring"
         assert grafana_service.internal_host == expected_host
 
+    @pytest.mark.unit
+    def test_catalog_provider_names_and_validation(self, monkeypatch, tmp_path):
+        """Test services come from the validated catalog with their provider names"""
+        namespace = {}
+        exec(self.python_code, namespace)
+        load_services = namespace["load_services"]
+
+        catalog = tmp_path / "catalog.json"
+        catalog.write_text(
+            '{"services": [{"name": "grafana",'
+            ' "external_host": "grafana.example.com",'
+            ' "internal_host": "grafana.monitoring", "internal_port": 80,'
+            ' "provider_name": "grafana-sso"},'
+            ' {"name": "hubble", "external_host": "hubble.example.com",'
+            ' "internal_host": "hubble-ui.kube-system", "internal_port": 80}]}'
+        )
+        monkeypatch.setenv("SERVICE_CATALOG_PATH", str(catalog))
+        assert [s.provider_name for s in load_services()] == [
+            "grafana-sso",
+            "hubble-proxy",
+        ]
+
+        invalid = tmp_path / "invalid.json"
+        invalid.write_text('{"services": [{"name": "grafana"}]}')
+        monkeypatch.setenv("SERVICE_CATALOG_PATH", str(invalid))
+        with pytest.raises(SystemExit):
+            load_services()
+
     @pytest.mark.unit
     def test_outpost_detection_logic(self):
         """Test the external outpost detection logic"""
         namespace = {}
-        exec(self.python_script, namespace)
+        exec(self.python_code, namespace)
 
         AuthentikConfig = namespace["AuthentikConfig"]
         AuthentikProxyConfigurator = namespace["AuthentikProxyConfigurator"]
@@ -282,7 +280,7 @@ class TestAuthentikProxyScript:
     def test_embedded_outpost_cleanup(self):
         """Test that embedded outpost providers are properly removed"""
         namespace = {}
-        exec(self.python_script, namespace)
+        exec(self.python_code, namespace)
 
         AuthentikConfig = namespace["AuthentikConfig"]
         AuthentikProxyConfigurator = namespace["AuthentikProxyConfigurator"]
@@ -325,8 +323,7 @@ class TestAuthentikProxyJobConfiguration:
     @pytest.mark.security
     def test_job_security_context(self):
         """Test that the job has proper security context"""
-        with open(self.yaml_file_path, "r") as f:
-            yaml_content = yaml.safe_load(f)
+        yaml_content = load_manifest(self.yaml_file_path)
 
         spec = yaml_content["spec"]["template"]["spec"]
 
@@ -353,8 +350,7 @@ class TestAuthentikProxyJobConfiguration:
     @pytest.mark.unit
     def test_job_environment_variables(self):
         """Test that required environment variables are configured"""
-        with open(self.yaml_file_path, "r") as f:
-            yaml_content = yaml.safe_load(f)
+        yaml_content = load_manifest(self.yaml_file_path)
 
         containers = yaml_content["spec"]["template"]["spec"]["containers"]
         config_container = next(
@@ -384,8 +380,7 @@ class TestAuthentikProxyJobConfiguration:
     @pytest.mark.unit
     def test_job_resource_limits(self):
         """Test that the job has appropriate resource configuration"""
-        with open(self.yaml_file_path, "r") as f:
-            yaml_content = yaml.safe_load(f)
+        yaml_content = load_manifest(self.yaml_file_path)
 
         job_spec = yaml_content["spec"]
 
@@ -409,30 +404,8 @@ class TestAuthentikProxyIntegration:
             "../../infrastructure/authentik-proxy/proxy-config-job-python.yaml",
         )
 
-        # Extract and execute the Python script
-        with open(yaml_file_path, "r") as f:
-            content = f.read()
-
-        # Find and clean the Python script
-        start_marker = "cat > /tmp/configure_proxy.py << 'EOF'"
-        start_idx = content.find(start_marker)
-        start_idx = content.find("\n", start_idx) + 1
-        end_idx = content.find("EOF", start_idx)
-        python_script = content[start_idx:end_idx].strip()
-
-        # Remove indentation
-        lines = python_script.split("\n")
-        cleaned_lines = []
-        for line in lines:
-            if line.strip():
-                if line.startswith("              "):
-                    cleaned_lines.append(line[14:])
-                else:
-                    cleaned_lines.append(line)
-            else:
-                cleaned_lines.append("")
-
-        cleaned_script = "\n".join(cleaned_lines)
+        # Execute the cached compiled script
+        cleaned_script = compiled_script(yaml_file_path, SCRIPT)
 
         # Execute in namespace with mocked environment
         namespace = {
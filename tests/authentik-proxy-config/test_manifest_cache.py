@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for the session-scoped parsed-manifest cache
+"""
+
+import os
+import tempfile
+
+import pytest
+
+import manifest_cache
+
+MANIFEST = """\
+apiVersion: batch/v1
+kind: Job
+metadata:
+  name: example
+spec:
+  template:
+    spec:
+      containers:
+        - name: run
+          command:
+            - /bin/sh
+            - -c
+            - |
+              cat > /tmp/first.py << 'EOF'
+              def answer():
+                  return 42
+              EOF
+              cat > /tmp/second.py << EOF
+              VALUE = "EOF inside a string"
+              EOF
+              python3 /tmp/first.py
+"""
+
+
+class TestManifestCache:
+    """Test cases for manifest and embedded script caching"""
+
+    @pytest.fixture(autouse=True)
+    def manifest(self):
+        """Write a throwaway manifest and start from an empty cache"""
+        manifest_cache.clear()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.path = os.path.join(tmpdir, "job.yaml")
+            with open(self.path, "w") as f:
+                f.write(MANIFEST)
+            yield
+        manifest_cache.clear()
+
+    def test_scripts_extracted_by_heredoc_target(self):
+        """Test every heredoc is extracted and dedented to the script body"""
+        scripts = manifest_cache.embedded_scripts(self.path)
+
+        assert list(scripts) == ["/tmp/first.py", "/tmp/second.py"]
+        assert scripts["/tmp/first.py"] == "def answer():\n    return 42"
+        assert scripts["/tmp/second.py"] == 'VALUE = "EOF inside a string"'
+
+    def test_parsed_once_per_session(self):
+        """Test repeated lookups return the same cached objects"""
+        first = manifest_cache.load_manifest(self.path)
+        os.remove(self.path)
+
+        assert manifest_cache.load_manifest(self.path) is first
+        assert manifest_cache.compiled_script(
+            self.path, "/tmp/first.py"
+        ) is manifest_cache.compiled_script(self.path, "/tmp/first.py")
+        assert manifest_cache.script_ast(
+            self.path, "/tmp/first.py"
+        ) is manifest_cache.script_ast(self.path, "/tmp/first.py")
+
+    def test_exec_script_uses_fresh_namespace(self):
+        """Test each exec gets its own namespace from the shared code object"""
+        first = manifest_cache.exec_script(self.path, "/tmp/first.py")
+        second = manifest_cache.exec_script(self.path, "/tmp/first.py")
+
+        assert first["answer"]() == 42
+        assert first["answer"] is not second["answer"]
+
+    def test_missing_script(self):
+        """Test asking for an unknown heredoc target names the manifest"""
+        with pytest.raises(KeyError, match="/tmp/missing.py"):
+            manifest_cache.embedded_script(self.path, "/tmp/missing.py")
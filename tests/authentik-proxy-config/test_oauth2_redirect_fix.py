@@ -11,7 +11,10 @@ import os
 from unittest.mock import MagicMock, patch
 
 import pytest
-import yaml
+
+from manifest_cache import compiled_script, load_manifest, script_ast
+
+SCRIPT = "/tmp/fix_oauth2_redirects.py"
 
 
 class TestOAuth2RedirectFixScript:
@@ -24,7 +27,7 @@ class TestOAuth2RedirectFixScript:
             os.path.dirname(__file__),
             "../../infrastructure/authentik-proxy/fix-oauth2-redirect-urls-job.yaml",
         )
-        self.python_script = self._extract_python_script()
+        self.python_code = compiled_script(self.yaml_file_path, SCRIPT)
 
         # Sample test data
         self.sample_services = [
@@ -73,43 +76,10 @@ class TestOAuth2RedirectFixScript:
             },
         }
 
-    def _extract_python_script(self):
-        """Extract the Python script from the YAML file"""
-        with open(self.yaml_file_path, "r") as f:
-            content = f.read()
-
-        # Find the Python script between EOF markers
-        start_marker = "cat > /tmp/fix_oauth2_redirects.py << 'EOF'"
-        end_marker = "EOF"
-
-        start_idx = content.find(start_marker)
-        assert start_idx != -1, "Could not find start marker in YAML"
-
-        start_idx = content.find("\n", start_idx) + 1
-        end_idx = content.find(end_marker, start_idx)
-        assert end_idx != -1, "Could not find end marker in YAML"
-
-        python_script = content[start_idx:end_idx].strip()
-
-        # Remove the common indentation (14 spaces)
-        lines = python_script.split("\n")
-        cleaned_lines = []
-        for line in lines:
-            if line.strip():  # Non-empty line
-                if line.startswith("              "):  # Remove 14 spaces
-                    cleaned_lines.append(line[14:])
-                else:
-                    cleaned_lines.append(line)
-            else:  # Empty line
-                cleaned_lines.append("")
-
-        return "\n".join(cleaned_lines)
-
     @pytest.mark.syntax
     def test_yaml_structure_valid(self):
         """Test that the YAML file has valid structure"""
-        with open(self.yaml_file_path, "r") as f:
-            yaml_content = yaml.safe_load(f)
+        yaml_content = load_manifest(self.yaml_file_path)
 
         # Verify basic Kubernetes Job structure
         assert yaml_content.get("kind") == "Job"
@@ -128,7 +98,7 @@ class TestOAuth2RedirectFixScript:
     def test_python_script_syntax_valid(self):
         """Test that the embedded Python script has valid syntax"""
         try:
-            ast.parse(self.python_script)
+            script_ast(self.yaml_file_path, SCRIPT)
         except SyntaxError as e:
             pytest.fail(f"Python script has syntax error: {e}")
 
@@ -136,7 +106,7 @@ class TestOAuth2RedirectFixScript:
     def test_python_script_contains_required_classes(self):
         """Test that the script contains all required classes and methods"""
         # Parse the AST to find class and method definitions
-        tree = ast.parse(self.python_script)
+        tree = script_ast(self.yaml_file_path, SCRIPT)
 
         classes = {}
         functions = []
@@ -185,7 +155,7 @@ class TestOAuth2RedirectFixScript:
         """Test ServiceConfig OAuth2 redirect URI generation"""
         # Execute the script in a temporary namespace to test the classes
         namespace = {}
-        exec(self.python_script, namespace)
+        exec(self.python_code, namespace)
 
         ServiceConfig = namespace["ServiceConfig"]
 
@@ -211,7 +181,7 @@ class TestOAuth2RedirectFixScript:
     def test_authentik_config_dataclass(self):
         """Test AuthentikConfig dataclass"""
         namespace = {}
-        exec(self.python_script, namespace)
+        exec(self.python_code, namespace)
 
         AuthentikConfig = namespace["AuthentikConfig"]
 
@@ -231,7 +201,7 @@ class TestOAuth2RedirectFixScript:
     def test_service_configurations(self):
         """Test that all required services are configured"""
         namespace = {}
-        exec(self.python_script, namespace)
+        exec(self.python_code, namespace)
 
         AuthentikConfig = namespace["AuthentikConfig"]
         OAuth2RedirectFixer = namespace["OAuth2RedirectFixer"]
@@ -266,7 +236,7 @@ class TestOAuth2RedirectFixScript:
     def test_proxy_provider_external_host_fix(self):
         """Test fixing proxy provider external host"""
         namespace = {}
-        exec(self.python_script, namespace)
+        exec(self.python_code, namespace)
 
         AuthentikConfig = namespace["AuthentikConfig"]
         OAuth2RedirectFixer = namespace["OAuth2RedirectFixer"]
@@ -313,7 +283,7 @@ class TestOAuth2RedirectFixScript:
     def test_oauth2_provider_redirect_uris_fix(self):
         """Test fixing OAuth2 provider redirect URIs"""
         namespace = {}
-        exec(self.python_script, namespace)
+        exec(self.python_code, namespace)
 
         AuthentikConfig = namespace["AuthentikConfig"]
         OAuth2RedirectFixer = namespace["OAuth2RedirectFixer"]
@@ -360,7 +330,7 @@ class TestOAuth2RedirectFixScript:
     def test_application_launch_url_fix(self):
         """Test fixing application launch URL"""
         namespace = {}
-        exec(self.python_script, namespace)
+        exec(self.python_code, namespace)
 
         AuthentikConfig = namespace["AuthentikConfig"]
         OAuth2RedirectFixer = namespace["OAuth2RedirectFixer"]
@@ -407,7 +377,7 @@ class TestOAuth2RedirectFixScript:
     def test_fix_all_oauth2_redirects_integration(self):
         """Test the complete OAuth2 redirect fix process"""
         namespace = {}
-        exec(self.python_script, namespace)
+        exec(self.python_code, namespace)
 
         AuthentikConfig = namespace["AuthentikConfig"]
         OAuth2RedirectFixer = namespace["OAuth2RedirectFixer"]
@@ -464,8 +434,7 @@ class TestOAuth2RedirectFixJobConfiguration:
     @pytest.mark.security
     def test_job_security_context(self):
         """Test that the job has proper security context"""
-        with open(self.yaml_file_path, "r") as f:
-            yaml_content = yaml.safe_load(f)
+        yaml_content = load_manifest(self.yaml_file_path)
 
         spec = yaml_content["spec"]["template"]["spec"]
 
@@ -492,8 +461,7 @@ class TestOAuth2RedirectFixJobConfiguration:
     @pytest.mark.unit
     def test_job_environment_variables(self):
         """Test that required environment variables are configured"""
-        with open(self.yaml_file_path, "r") as f:
-            yaml_content = yaml.safe_load(f)
+        yaml_content = load_manifest(self.yaml_file_path)
 
         containers = yaml_content["spec"]["template"]["spec"]["containers"]
         config_container = next(
@@ -530,8 +498,7 @@ class TestOAuth2RedirectFixJobConfiguration:
     @pytest.mark.unit
     def test_job_resource_limits(self):
         """Test that the job has appropriate resource configuration"""
-        with open(self.yaml_file_path, "r") as f:
-            yaml_content = yaml.safe_load(f)
+        yaml_content = load_manifest(self.yaml_file_path)
 
         job_spec = yaml_content["spec"]
 
@@ -546,8 +513,7 @@ class TestOAuth2RedirectFixJobConfiguration:
     @pytest.mark.unit
     def test_job_hook_configuration(self):
         """Test that the job has correct ArgoCD hook configuration"""
-        with open(self.yaml_file_path, "r") as f:
-            yaml_content = yaml.safe_load(f)
+        yaml_content = load_manifest(self.yaml_file_path)
 
         annotations = yaml_content["metadata"]["annotations"]
 
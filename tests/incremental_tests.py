@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Incremental test runner for the proxy and token management tests
+
+Runs pytest over tests/authentik-proxy-config and tests/token-management,
+skipping every test whose inputs are unchanged since it last passed. A test's
+inputs are:
+
+- its test file, the conftest.py and pytest.ini files above it
+- the repository modules its test module imports (e.g. the token manager)
+- every repository file it opens while running, seen through an audit hook
+- every manifest it looks up through manifest_cache, including cache hits,
+  e.g. proxy-config-job-python.yaml or fix-oauth2-redirect-urls-job.yaml
+
+Each input is stored with its SHA-256 in .cache/incremental-tests.json. Tests
+that failed, are new, or have any changed or missing input always run, so a
+commit that only touches an unrelated manifest runs nothing.
+
+    tests/incremental_tests.py                 # changed tests only
+    tests/incremental_tests.py --all           # full run, refreshes the state
+    tests/incremental_tests.py -- -k oauth2    # extra pytest arguments
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Set
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TEST_DIRS = ["tests/authentik-proxy-config", "tests/token-management"]
+DEFAULT_STATE = os.path.join(REPO_ROOT, ".cache", "incremental-tests.json")
+STATE_VERSION = 1
+
+# Paths under the repository that are never test inputs
+_IGNORED_PARTS = {".git", ".cache", "__pycache__", ".pytest_cache"}
+
+
+def _repo_file(path) -> Optional[str]:
+    """Repository-relative path for a file inside the repository, else None."""
+    if isinstance(path, bytes):
+        path = os.fsdecode(path)
+    if not isinstance(path, str):
+        return None
+    absolute = os.path.abspath(path)
+    if not absolute.startswith(REPO_ROOT + os.sep) or not os.path.isfile(absolute):
+        return None
+    relative = os.path.relpath(absolute, REPO_ROOT)
+    if _IGNORED_PARTS & set(relative.split(os.sep)):
+        return None
+    return relative
+
+
+class IncrementalPlugin:
+    """Select tests by input hashes and record each test's inputs."""
+
+    def __init__(self, state_path: str = DEFAULT_STATE, run_all: bool = False):
+        self.state_path = state_path
+        self.run_all = run_all
+        self.state: Dict[str, Dict] = self._load()
+        self._hashes: Dict[str, Optional[str]] = {}
+        self._recording: Optional[Set[str]] = None
+        self._failed: Set[str] = set()
+        self.selected = 0
+        self.deselected = 0
+
+        sys.addaudithook(self._audit)
+        manifest_cache = sys.modules.get("manifest_cache")
+        if manifest_cache is not None:
+            manifest_cache.ACCESS_HOOKS.append(self._record)
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.state_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data.get("tests", {}) if data.get("version") == STATE_VERSION else {}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp = f"{self.state_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(
+                {"version": STATE_VERSION, "tests": self.state},
+                f,
+                indent=1,
+                sort_keys=True,
+            )
+        os.replace(tmp, self.state_path)
+
+    def file_hash(self, path: str) -> Optional[str]:
+        """SHA-256 of a repository file, computed once per run."""
+        if path not in self._hashes:
+            try:
+                with open(os.path.join(REPO_ROOT, path), "rb") as f:
+                    self._hashes[path] = hashlib.sha256(f.read()).hexdigest()
+            except OSError:
+                self._hashes[path] = None
+        return self._hashes[path]
+
+    def _record(self, path):
+        if self._recording is not None:
+            relative = _repo_file(path)
+            if relative:
+                self._recording.add(relative)
+
+    def _audit(self, event, args):
+        if event == "open" and self._recording is not None:
+            mode = args[1] if len(args) > 1 else "r"
+            if not isinstance(mode, str) or not set("wax+") & set(mode):
+                self._record(args[0])
+
+    def static_inputs(self, item) -> Set[str]:
+        """Inputs known without running the test: its files and repo imports."""
+        inputs = set()
+        test_file = _repo_file(str(item.path))
+        if test_file:
+            inputs.add(test_file)
+            directory = os.path.dirname(test_file)
+            while directory:
+                for name in ("conftest.py", "pytest.ini"):
+                    found = _repo_file(os.path.join(REPO_ROOT, directory, name))
+                    if found:
+                        inputs.add(found)
+                directory = os.path.dirname(directory)
+
+        module = getattr(item, "module", None)
+        for value in vars(module).values() if module else ():
+            try:
+                source = value if inspect.ismodule(value) else inspect.getmodule(value)
+            except Exception:
+                continue
+            found = _repo_file(getattr(source, "__file__", None))
+            if found:
+                inputs.add(found)
+        return inputs
+
+    def unchanged(self, nodeid: str) -> bool:
+        entry = self.state.get(nodeid)
+        if not entry or not entry.get("passed"):
+            return False
+        return all(
+            self.file_hash(path) == digest for path, digest in entry["inputs"].items()
+        )
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, config, items):
+        if self.run_all:
+            self.selected = len(items)
+            return
+        selected, deselected = [], []
+        for item in items:
+            (deselected if self.unchanged(item.nodeid) else selected).append(item)
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = selected
+        self.selected, self.deselected = len(selected), len(deselected)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        self._recording = self.static_inputs(item)
+        try:
+            yield
+        finally:
+            inputs, self._recording = self._recording, None
+            self.state[item.nodeid] = {
+                "passed": item.nodeid not in self._failed,
+                "inputs": {path: self.file_hash(path) for path in sorted(inputs)},
+            }
+
+    def pytest_runtest_logreport(self, report):
+        if report.failed:
+            self._failed.add(report.nodeid)
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        self.save()
+
+    def pytest_terminal_summary(self, terminalreporter):
+        terminalreporter.write_line(
+            f"incremental: {self.selected} selected, {self.deselected} unchanged "
+            "since they last passed"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description="Run only the tests whose inputs changed since they passed"
+    )
+    parser.add_argument(
+        "paths", nargs="*", help=f"Test directories (default: {DEFAULT_TEST_DIRS})"
+    )
+    parser.add_argument("--all", action="store_true", help="Run every test")
+    parser.add_argument("--state", default=DEFAULT_STATE, help="State file")
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # Everything after -- goes to pytest unchanged
+    extra: List[str] = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, extra = argv[:split], argv[split + 1 :]
+    args = parser.parse_args(argv)
+
+    paths = args.paths or [os.path.join(REPO_ROOT, p) for p in DEFAULT_TEST_DIRS]
+    # manifest_cache must come from the tests directory, not a stale copy, so
+    # the access hook is installed on the module the tests import
+    sys.path.insert(0, os.path.join(REPO_ROOT, "tests", "authentik-proxy-config"))
+    import manifest_cache  # noqa: F401
+
+    plugin = IncrementalPlugin(args.state, args.all)
+    exit_code = pytest.main(
+        [
+            "-q",
+            "-p",
+            "no:cacheprovider",
+            "--rootdir",
+            REPO_ROOT,
+            "--continue-on-collection-errors",
+        ]
+        + extra
+        + paths,
+        plugins=[plugin],
+    )
+    # Nothing selected is success for an incremental run
+    if exit_code == pytest.ExitCode.NO_TESTS_COLLECTED:
+        return 0
+    return int(exit_code)
+
+
+if __name__ == "__main__":
+    sys.exit(main())